@@ -0,0 +1,56 @@
+"""
+Benchmarks the storage backing DECLARE ... ARRAY: the memory held by a large INTEGER array, and the cost of indexed
+reads and writes made by the interpreter
+
+Run from the repository root with: python -m benchmarks.arrays
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.typechecker import TypeChecker
+from core.storage import TypedArray
+from core.datatype import DataType
+import timeit
+import tracemalloc
+
+ARRAY_SIZE = 10_000_000
+ITERATIONS = 200_000
+
+def array_memory():
+    tracemalloc.start()
+    array = TypedArray([(1, ARRAY_SIZE)], DataType.INTEGER)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"ARRAY[1:{ARRAY_SIZE}] OF INTEGER: {current / 2**20:.1f} MiB held, {peak / 2**20:.1f} MiB peak")
+
+    tracemalloc.start()
+    boxed = [i for i in range(ARRAY_SIZE)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Python list of {ARRAY_SIZE} distinct ints: {current / 2**20:.1f} MiB held")
+    del array, boxed
+
+def indexed_access():
+    source = f"""START
+        DECLARE A : ARRAY[1:{ITERATIONS}] OF INTEGER;
+        LET i = 1;
+        A[i] = A[i] + i
+    END"""
+    interpreter = Interpreter(Parser(Lexer(source)))
+    interpreter.interpret()
+
+    # Loops are not part of the language yet, so the indexed assignment statement is re-executed from Python
+    statement = TypeChecker().check(Parser(Lexer(source)).parse()).children[-1]
+    scope = interpreter.GLOBAL_SCOPE
+
+    def run():
+        for i in range(1, ITERATIONS + 1):
+            scope["i"] = i
+            interpreter.visit(statement)
+
+    seconds = timeit.timeit(run, number=1)
+    print(f"A[i] = A[i] + i: {ITERATIONS / seconds:,.0f} indexed read/write pairs per second")
+
+if __name__ == "__main__":
+    array_memory()
+    indexed_access()
@@ -0,0 +1,58 @@
+"""
+Benchmarks the memory held by a large generated program: as a type checked AST, and as a program image (the flat node
+arena) built one statement at a time without the AST of the whole program ever existing. Checks both produce the same
+output
+
+Run from the repository root with: python -m benchmarks.ast_memory
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.interpreter import Interpreter
+from core.image import ProgramImage
+from core.streams import CaptureOutput
+import gc
+import time
+import tracemalloc
+
+STATEMENTS = 100_000
+
+SOURCE = "START\n" + ";\n".join(
+    [f"LET x{i} = {i}" for i in range(50)] + [f"LET y{i} = 0" for i in range(30)]
+) + ";\n" + ";\n".join(
+    f"OUTPUT x{i % 50} - y{i % 30}" if i % 1000 == 999 else
+    f"IF x{i % 50} > {i % 17} THEN y{i % 30} <- {i % 11} * 2 ELSE y{i % 30} <- -{i % 13} + 1 ENDIF" if i % 5 == 4 else
+    f"LET x{i % 50} = ({i} + y{(i + 1) % 30}) * {i % 7} - {i % 3}"
+    for i in range(STATEMENTS)
+) + "\nEND"
+
+def measure(label: str, build) -> any:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {current / 2**20:.1f} MiB held, {peak / 2**20:.1f} MiB peak, {seconds:.1f}s")
+    return result
+
+def type_checked_tree():
+    parser = Parser(Lexer(SOURCE))
+    return TypeChecker(parser.lexer.line_index).check(parser.parse())
+
+def run(execute) -> str:
+    Interpreter.GLOBAL_SCOPE = {}
+    output = CaptureOutput()
+    execute(output)
+    return output.getvalue()
+
+if __name__ == "__main__":
+    print(f"{STATEMENTS:,} statements, {len(SOURCE) / 2**20:.1f} MiB of source code")
+    tree = measure("AST", type_checked_tree)
+    del tree
+    image = measure("Arena", lambda: ProgramImage.parse(SOURCE))
+    print(f"Arena image: {len(image) / 2**20:.1f} MiB")
+
+    expected = run(lambda output: Interpreter(Parser(Lexer(SOURCE)), output_sink=output).interpret())
+    assert run(image.execute) == expected
@@ -0,0 +1,47 @@
+"""
+Benchmarks calls to recursive user defined FUNCTIONs: Fibonacci (many shallow calls) and factorial (deep recursion),
+with and without memoization
+
+Run from the repository root with: python -m benchmarks.calls
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+import timeit
+
+FIBONACCI_N = 22
+FACTORIAL_N = 5000
+
+SOURCE = f"""START
+    FUNCTION Fib(n : INTEGER) RETURNS INTEGER
+        IF n < 2 THEN
+            RETURN n
+        ENDIF;
+        RETURN Fib(n - 1) + Fib(n - 2)
+    ENDFUNCTION;
+    FUNCTION Factorial(n : INTEGER) RETURNS INTEGER
+        IF n <= 1 THEN
+            RETURN 1
+        ENDIF;
+        RETURN n * Factorial(n - 1)
+    ENDFUNCTION;
+    LET fib = Fib({FIBONACCI_N});
+    LET factorial = Factorial({FACTORIAL_N})
+END"""
+
+def fibonacci_calls(n: int) -> int:
+    return 1 if n < 2 else 1 + fibonacci_calls(n - 1) + fibonacci_calls(n - 2)
+
+if __name__ == "__main__":
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(SOURCE)))
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    calls = fibonacci_calls(FIBONACCI_N) + FACTORIAL_N
+    print(f"Fib({FIBONACCI_N}) and Factorial({FACTORIAL_N}): {seconds:.3f}s ({calls / seconds:,.0f} calls per second)")
+    assert interpreter.GLOBAL_SCOPE["fib"] == 17711
+
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(SOURCE)), memoize=True)
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    print(f"Memoized: {seconds:.3f}s {interpreter.memo_stats()}")
+    assert interpreter.GLOBAL_SCOPE["fib"] == 17711
@@ -0,0 +1,55 @@
+"""
+Benchmarks CASE statements dispatched through their jump table against the equivalent IF/ELSE chain, which compares the
+value against each branch in turn, as the number of branches grows. Values cycle through every branch, so the IF/ELSE
+chain makes half as many comparisons as there are branches on average. Both run in the tree-walking interpreter, as loops
+containing CASE statements are not compiled
+
+Run from the repository root with: python -m benchmarks.case
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+import sys
+import timeit
+
+ITERATIONS = 20_000
+BRANCHES = (4, 16, 64, 256)
+
+def program(branches: int, dispatch: str) -> str:
+    return f"""START
+    v <- 0;
+    total <- 0;
+    FOR i <- 1 TO {ITERATIONS}
+        v <- v + 1;
+        IF v > {branches} THEN v <- 1 ENDIF;
+        {dispatch}
+    NEXT i
+END"""
+
+def case_statement(branches: int) -> str:
+    labels = "\n".join(f"            {k} : total <- total + {k}" for k in range(1, branches + 1))
+    return f"CASE OF v\n{labels}\n            OTHERWISE total <- 0\n        ENDCASE"
+
+def if_chain(branches: int) -> str:
+    chain = "total <- 0"
+    for k in range(branches, 0, -1):
+        chain = f"IF v = {k} THEN total <- total + {k} ELSE {chain} ENDIF"
+    return chain
+
+def run(source: str) -> tuple[float, dict]:
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(source)), tier_threshold=None)
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    return seconds, dict(interpreter.GLOBAL_SCOPE)
+
+if __name__ == "__main__":
+    # Long IF/ELSE chains nest one statement per branch, which the parser and interpreter recurse through
+    sys.setrecursionlimit(20_000)
+    for branches in BRANCHES:
+        chained, expected = run(program(branches, if_chain(branches)))
+        dispatched, result = run(program(branches, case_statement(branches)))
+        assert result == expected
+        print(
+            f"{branches:3} branches, {ITERATIONS:,} iterations: IF/ELSE chain {chained:.3f}s, "
+            f"CASE {dispatched:.3f}s ({chained / dispatched:.1f}x)"
+        )
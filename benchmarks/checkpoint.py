@@ -0,0 +1,129 @@
+"""
+Benchmarks checkpointing a long-running simulation with the command line interpreter: the time taken uninterrupted,
+with periodic checkpoints, and when terminated at various points and resumed from its checkpoint by a fresh process
+until it completes. Checks every run produces exactly the output of the uninterrupted run, and reports the size of the
+checkpoint file
+
+Run from the repository root with: python -m benchmarks.checkpoint
+"""
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVERY = 50_000
+# Seconds after starting each process at which it is terminated
+DELAYS = (0.5, 1.0, 2.0)
+
+SOURCE = """START
+DECLARE Heights : ARRAY[1:200] OF REAL;
+DECLARE Speeds : ARRAY[1:200] OF REAL;
+FOR i <- 1 TO 200
+  Heights[i] <- i * 1.5;
+  Speeds[i] <- 0.0
+NEXT i;
+steps <- 0;
+log <- "";
+FOR t <- 1 TO 2000
+  FOR i <- 1 TO 200
+    Speeds[i] <- Speeds[i] - 0.25;
+    Heights[i] <- Heights[i] + Speeds[i];
+    IF Heights[i] < 0 THEN
+      Heights[i] <- 0 - Heights[i];
+      Speeds[i] <- 0 - Speeds[i] * 0.9
+    ENDIF
+  NEXT i;
+  IF t = t / 250 * 250 THEN
+    total <- 0.0;
+    FOR i <- 1 TO 200 total <- total + Heights[i] NEXT i;
+    OUTPUT "t=", t, " total height=", total;
+    log <- log & "|"
+  ENDIF;
+  n <- t;
+  WHILE n > 1 DO
+    CASE OF n - n / 2 * 2
+      0 : n <- n / 2
+      OTHERWISE : n <- n - 1
+    ENDCASE;
+    steps <- steps + 1
+  ENDWHILE
+NEXT t;
+OUTPUT "steps=", steps, " log=", log
+END"""
+
+def start(directory: str, *arguments: str) -> subprocess.Popen:
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "main.py"), "program.txt", *arguments],
+        cwd=directory, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+
+def run(directory: str, *arguments: str) -> tuple[float, str]:
+    begin = time.perf_counter()
+    process = start(directory, *arguments)
+    stdout, _ = process.communicate()
+    assert process.returncode == 0
+    return time.perf_counter() - begin, stdout
+
+def output_saved(path: str) -> int:
+    """
+    Returns the number of characters of output written before the checkpoint was saved (0 if there is none)
+    """
+    try:
+        with open(path, "rb") as file:
+            return pickle.loads(zlib.decompress(file.read()))["output"]
+    except FileNotFoundError:
+        return 0
+
+def interrupted(directory: str, delay: float) -> tuple[int, str, int]:
+    """
+    Runs the program in processes terminated after a delay, each resuming from the checkpoint left by the last, until
+    one completes
+
+    :return: The number of processes, the output of the run pieced together, and the largest checkpoint in bytes
+    :rtype: tuple[int, str, int]
+    """
+    path = os.path.join(directory, "program.checkpoint")
+    transcript, processes, largest = "", 0, 0
+    while True:
+        process = start(directory, "--checkpoint", path)
+        processes += 1
+        try:
+            stdout, _ = process.communicate(timeout=delay)
+        except subprocess.TimeoutExpired:
+            process.send_signal(signal.SIGTERM)
+            stdout, _ = process.communicate()
+        if process.returncode == 0:
+            assert not os.path.exists(path), "checkpoint left behind by a completed run"
+            return processes, transcript + stdout, largest
+        if os.path.exists(path):
+            largest = max(largest, os.path.getsize(path))
+        # Output written after the checkpoint is written again by the next process
+        transcript = (transcript + stdout)[:output_saved(path)]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "program.txt"), "w", encoding="utf-8") as file:
+            file.write(SOURCE)
+
+        seconds, expected = run(directory)
+        print(f"Uninterrupted: {seconds:.3f}s")
+        path = os.path.join(directory, "periodic.checkpoint")
+        seconds, output = run(directory, "--checkpoint", path, "--checkpoint-every", str(EVERY))
+        assert output == expected
+        print(f"Checkpointed every {EVERY:,} steps: {seconds:.3f}s")
+
+        for delay in DELAYS:
+            begin = time.perf_counter()
+            processes, output, largest = interrupted(directory, delay)
+            assert output == expected, f"resumed output differs when terminated after {delay}s"
+            print(
+                f"Terminated after {delay}s: completed by process {processes} in {time.perf_counter() - begin:.3f}s, "
+                f"largest checkpoint {largest:,} bytes"
+            )
+    print("Resumed runs produced the same output as the uninterrupted run")
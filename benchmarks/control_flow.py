@@ -0,0 +1,72 @@
+"""
+Benchmarks control flow on nested-loop programs: FOR loops with a STEP, REPEAT loops and IF statements with AND/OR
+conditions, run by the tree-walking interpreter alone and with hot loops compiled. Then times a single comparison
+evaluated through generic BinOP dispatch against the CompareOP the type checker specialises it into
+
+Run from the repository root with: python -m benchmarks.control_flow
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.interpreter import Interpreter
+from core.ast import BinOP
+import timeit
+
+SIZE = 300
+EVALUATIONS = 1_000_000
+
+SOURCE = f"""START
+    DECLARE total : INTEGER;
+    DECLARE hits : INTEGER;
+    total <- 0;
+    hits <- 0;
+    FOR i <- 1 TO {SIZE}
+        FOR j <- {SIZE} TO 1 STEP -3
+            IF i > j AND (i + j) / 2 < {SIZE} OR i = j THEN
+                hits <- hits + 1
+            ELSE
+                total <- total + i - j
+            ENDIF
+        NEXT j;
+        k <- 0;
+        REPEAT
+            k <- k + 7;
+            total <- total + k
+        UNTIL k >= i OR NOT total > 0
+    NEXT i;
+    OUTPUT total, " ", hits
+END"""
+
+CONDITION = "START DECLARE a : INTEGER; DECLARE b : INTEGER; a <- 1; b <- 2; IF a < b THEN a <- 0 ENDIF END"
+
+def run(tier_threshold: int | None) -> tuple[float, dict]:
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(SOURCE)), tier_threshold=tier_threshold)
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    return seconds, dict(interpreter.GLOBAL_SCOPE)
+
+def time_condition() -> tuple[float, float]:
+    """
+    Returns the time taken to evaluate a comparison of two INTEGER variables as a generic BinOP, then as a CompareOP
+    """
+    parser = Parser(Lexer(CONDITION))
+    tree = TypeChecker(parser.lexer.line_index).check(parser.parse())
+    Interpreter.GLOBAL_SCOPE = {"a": 1, "b": 2}
+    interpreter = Interpreter(parser)
+    specialised = tree.children[-1].condition
+    generic = BinOP(specialised.left, specialised.op, specialised.right)
+    times = []
+    for node in (generic, specialised):
+        assert interpreter.visit(node) is True
+        times.append(timeit.timeit(lambda: interpreter.visit(node), number=EVALUATIONS) / EVALUATIONS)
+    return times[0], times[1]
+
+if __name__ == "__main__":
+    interpreted, expected = run(None)
+    print(f"Tree-walking interpreter, {SIZE}x{SIZE // 3} nested iterations: {interpreted:.3f}s")
+    tiered, result = run(1000)
+    print(f"Tiered (compiled after 1,000 iterations): {tiered:.3f}s ({interpreted / tiered:.1f}x)")
+    assert result == expected
+
+    generic, specialised = time_condition()
+    print(f"a < b as BinOP: {generic * 1e9:.0f}ns, as CompareOP: {specialised * 1e9:.0f}ns ({generic / specialised:.1f}x)")
@@ -0,0 +1,66 @@
+"""
+Benchmarks line-by-line file processing on a 1M-line file: a program that reads every line with READFILE, sums the
+values and writes each one back out doubled with WRITEFILE, against the same loop written in native Python iterating
+over the file. The program is run by the tree-walking interpreter alone and with its hot loop compiled
+
+Run from the repository root with: python -m benchmarks.file_io
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+import os
+import tempfile
+import timeit
+
+LINES = 1_000_000
+
+SOURCE = """START
+    DECLARE x : INTEGER;
+    total <- 0;
+    OPENFILE "{source}" FOR READ;
+    OPENFILE "{target}" FOR WRITE;
+    WHILE NOT EOF("{source}") DO
+        READFILE "{source}", x;
+        total <- total + x;
+        WRITEFILE "{target}", x * 2
+    ENDWHILE;
+    CLOSEFILE "{source}";
+    CLOSEFILE "{target}"
+END"""
+
+def native(source: str, target: str) -> int:
+    total = 0
+    with open(source, encoding="utf-8") as lines, open(target, "w", encoding="utf-8") as output:
+        for line in lines:
+            x = int(line)
+            total += x
+            output.write(f"{x * 2}\n")
+    return total
+
+def run(source: str, target: str, tier_threshold: int | None) -> tuple[float, int]:
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(
+        Parser(Lexer(SOURCE.format(source=source, target=target))), tier_threshold=tier_threshold
+    )
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    return seconds, interpreter.GLOBAL_SCOPE["total"]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "input.txt")
+        target = os.path.join(directory, "output.txt")
+        with open(source, "w", encoding="utf-8") as file:
+            file.write("".join(f"{i % 1000}\n" for i in range(LINES)))
+
+        seconds = timeit.timeit(lambda: native(source, target), number=1)
+        with open(target, "rb") as file:
+            expected_output = file.read()
+        expected = native(source, target)
+        print(f"Native Python, {LINES:,} lines: {seconds:.3f}s")
+
+        for name, tier_threshold in (("Tree-walking interpreter", None), ("Tiered", 1000)):
+            elapsed, total = run(source, target, tier_threshold)
+            assert total == expected
+            with open(target, "rb") as file:
+                assert file.read() == expected_output
+            print(f"{name}: {elapsed:.3f}s ({elapsed / seconds:.1f}x native)")
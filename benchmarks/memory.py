@@ -0,0 +1,79 @@
+"""
+Benchmarks counting the memory held by a program's values with a MemoryMeter: the time taken with and without the meter
+by a program making many assignments (to global variables, array elements and the locals of a recursive FUNCTION), run
+in the tree-walking interpreter so every assignment is counted as it is made, and the peak the meter counted against
+the memory tracemalloc saw allocated. Then checks a program growing a string
+without bound is ended by the limit, as soon as it passes it
+
+Run from the repository root with: python -m benchmarks.memory
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.memory import MemoryMeter, MemoryLimitExceeded
+from core.streams import CaptureOutput
+import timeit
+import tracemalloc
+
+REPEATS = 5
+LIMIT = 1_000_000
+
+SOURCE = """START
+DECLARE Values : ARRAY[1:20000] OF INTEGER;
+DECLARE Names : ARRAY[1:2000] OF STRING;
+FUNCTION Depth(n : INTEGER) RETURNS INTEGER
+  DECLARE label : STRING;
+  label <- "level";
+  IF n = 0 THEN RETURN 0 ENDIF;
+  RETURN Depth(n - 1) + 1
+ENDFUNCTION;
+name <- "";
+FOR i <- 1 TO 2000
+  name <- name & "n";
+  Names[i] <- name
+NEXT i;
+total <- 0;
+j <- 0;
+WHILE total < 200000 DO
+  total <- total + 1;
+  j <- j + 1;
+  IF j > 20000 THEN j <- 1 ENDIF;
+  Values[j] <- total
+ENDWHILE;
+OUTPUT Depth(2000), " ", total
+END"""
+
+GROWING = """START
+s <- "";
+WHILE TRUE DO s <- s & "0123456789" ENDWHILE
+END"""
+
+def run(source: str, memory: MemoryMeter | None) -> str:
+    Interpreter.GLOBAL_SCOPE.clear()
+    output = CaptureOutput()
+    Interpreter(Parser(Lexer(source)), output_sink=output, tier_threshold=None, memory=memory).interpret()
+    return output.getvalue()
+
+if __name__ == "__main__":
+    expected = run(SOURCE, None)
+    assert run(SOURCE, MemoryMeter()) == expected
+    timings = {}
+    for label, make_meter in (("unmetered", lambda: None), ("metered", MemoryMeter)):
+        timings[label] = min(timeit.repeat(lambda: run(SOURCE, make_meter()), number=1, repeat=REPEATS))
+        print(f"{label:>10}: {timings[label]:.3f}s")
+    print(f"The meter adds {timings['metered'] / timings['unmetered'] - 1:.1%}")
+
+    meter = MemoryMeter()
+    tracemalloc.start()
+    run(SOURCE, meter)
+    _, allocated = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Peak counted by the meter: {meter.peak:,} bytes (tracemalloc peak, including the interpreter: {allocated:,})")
+
+    meter = MemoryMeter(limit=LIMIT)
+    try:
+        run(GROWING, meter)
+        raise AssertionError("the limit did not end the program")
+    except MemoryLimitExceeded as error:
+        assert error.name == "s" and LIMIT < error.used <= LIMIT + 10
+        print(f"Growing string ended: {error}")
@@ -0,0 +1,56 @@
+"""
+Benchmarks the cost of leaving metrics on: the time taken by each counter and histogram update, from one thread and
+from several at once, against the time taken to run a program. Then scrapes the HTTP endpoint and checks it reports
+what the Python API does
+
+Run from the repository root with: python -m benchmarks.metrics
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.metrics import METRICS, Counter, Histogram, STATEMENTS_EXECUTED, TOKENS_LEXED
+from core.streams import CaptureOutput
+from benchmarks.tiering import SOURCE
+from concurrent.futures import ThreadPoolExecutor
+import time
+import urllib.request
+
+UPDATES = 1_000_000
+THREADS = 4
+
+def time_updates(update) -> float:
+    start = time.perf_counter()
+    for _ in range(UPDATES):
+        update()
+    return (time.perf_counter() - start) / UPDATES
+
+if __name__ == "__main__":
+    counter = Counter("benchmark_total", "Counter updated by the benchmark")
+    histogram = Histogram("benchmark_seconds", "Histogram updated by the benchmark", "phase")
+    print(f"Counter.inc: {time_updates(counter.inc) * 1e9:.0f}ns")
+    print(f"Histogram.observe: {time_updates(lambda: histogram.observe(0.003, 'Parser')) * 1e9:.0f}ns")
+    with ThreadPoolExecutor(THREADS) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: time_updates(counter.inc), range(THREADS)))
+    print(f"Counter.inc from {THREADS} threads: {(time.perf_counter() - start) / UPDATES / THREADS * 1e9:.0f}ns")
+    assert counter.value() == UPDATES * (THREADS + 1)
+
+    METRICS.reset()
+    Interpreter.GLOBAL_SCOPE = {}
+    start = time.perf_counter()
+    Interpreter(Parser(Lexer(SOURCE)), output_sink=CaptureOutput()).interpret()
+    seconds = time.perf_counter() - start
+    print(
+        f"Program: {seconds * 1000:.1f}ms, {TOKENS_LEXED.value()} tokens lexed, "
+        f"{STATEMENTS_EXECUTED.value()} statements executed by the tree-walking interpreter"
+    )
+
+    server = METRICS.serve(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            scraped = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+    assert f"pseudocode_tokens_lexed_total {TOKENS_LEXED.value()}\n" in scraped
+    assert 'pseudocode_phase_seconds_count{phase="Interpreter"} 1\n' in scraped
+    print(f"Scraped {len(scraped.splitlines())} lines from /metrics")
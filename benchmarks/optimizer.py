@@ -0,0 +1,107 @@
+"""
+Differential check and benchmark of the dataflow optimizer: each program is run unoptimised, with each pass on its own
+and with every pass, checking all runs produce the same output and variables, and timing the tree-walking interpreter
+on each (best of REPEATS runs)
+
+Run from the repository root with: python -m benchmarks.optimizer
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.optimizer import DataflowOptimizer
+from core.storage import TypedArray
+from core.streams import CaptureOutput
+import timeit
+
+ITERATIONS = 50_000
+REPEATS = 3
+
+PROGRAMS = {
+    "common subexpressions": f"""START
+        LET a = 3;
+        LET b = 4;
+        LET c = 0;
+        FOR i <- 1 TO {ITERATIONS}
+            LET x = a * b + i;
+            LET y = a * b + i;
+            LET c = (a * b + i) * 2 - c
+        NEXT i;
+        OUTPUT x, " ", y, " ", c
+    END""",
+    "loop invariants": f"""START
+        DECLARE A : ARRAY[1:{ITERATIONS}] OF REAL;
+        LET scale = 2.5;
+        LET offset = 7;
+        LET n = {ITERATIONS};
+        WHILE n > 0 DO
+            A[n] <- n * (scale * scale - offset / 2) + offset * 3;
+            IF n * 1 > offset + 1 THEN
+                A[n] <- A[n] + 1
+            ENDIF;
+            n <- n - 1
+        ENDWHILE;
+        OUTPUT A[1], " ", A[{ITERATIONS}]
+    END""",
+    "subroutine": f"""START
+        FUNCTION Poly(x : INTEGER, k : INTEGER) RETURNS INTEGER
+            DECLARE total : INTEGER;
+            total <- 0;
+            FOR j <- 1 TO 20
+                total <- total + (k * k + x) * j + (k * k + x)
+            NEXT j;
+            RETURN total
+        ENDFUNCTION;
+        LET sum = 0;
+        FOR i <- 1 TO {ITERATIONS // 20}
+            sum = sum + Poly(i, 3)
+        NEXT i;
+        OUTPUT sum
+    END""",
+    "unsafe to move": """START
+        LET d = 0;
+        LET s = 0;
+        FOR i <- 1 TO 10
+            IF d <> 0 THEN
+                s = s + 10 / d
+            ENDIF;
+            s = s + i
+        NEXT i;
+        OUTPUT s
+    END""",
+}
+
+CONFIGURATIONS = {
+    "unoptimised": None,
+    "strength reduction": dict(cse=False, licm=False, strength_reduction=True),
+    "CSE": dict(cse=True, licm=False, strength_reduction=False),
+    "LICM": dict(cse=False, licm=True, strength_reduction=False),
+    "all passes": dict(cse=True, licm=True, strength_reduction=True),
+}
+
+def run(source: str, passes: dict | None) -> tuple[float, str, dict]:
+    seconds = None
+    for _ in range(REPEATS):
+        Interpreter.GLOBAL_SCOPE = {}
+        output = CaptureOutput()
+        optimizer = DataflowOptimizer(**passes) if passes is not None else None
+        # Loops are kept in the tree-walking interpreter, which is what the optimizer speeds up
+        interpreter = Interpreter(Parser(Lexer(source)), output_sink=output, optimizer=optimizer, tier_threshold=None)
+        elapsed = timeit.timeit(interpreter.interpret, number=1)
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    variables = {
+        name: value.to_list() if isinstance(value, TypedArray) else value
+        for name, value in interpreter.GLOBAL_SCOPE.items()
+    }
+    return seconds, output.getvalue(), variables
+
+if __name__ == "__main__":
+    for program, source in PROGRAMS.items():
+        print(f"{program}:")
+        baseline = None
+        for configuration, passes in CONFIGURATIONS.items():
+            seconds, output, variables = run(source, passes)
+            if baseline is None:
+                baseline = seconds, output, variables
+            assert (output, variables) == baseline[1:], f"{configuration} changed the result of {program}"
+            print(f"    {configuration}: {seconds:.3f}s ({baseline[0] / seconds:.2f}x)")
+    print("Results identical")
@@ -0,0 +1,80 @@
+"""
+Benchmarks partial evaluation on a program run repeatedly against the same fixed input, as when grading submissions
+against test cases. The program is specialised once for its input set and the residual program flattened into a
+ProgramImage, which is then executed on every run, against executing the image of the original program on every run
+
+Run from the repository root with: python -m benchmarks.partial
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.image import ProgramImage
+from core.partial import PartialEvaluator
+from core.streams import CaptureOutput, IterableInput
+import timeit
+
+RUNS = 200
+
+SOURCE = """START
+    DECLARE n : INTEGER;
+    DECLARE rate : REAL;
+    DECLARE values : ARRAY[1:50] OF INTEGER;
+    INPUT n;
+    INPUT rate;
+    FOR i <- 1 TO n
+        INPUT values[i]
+    NEXT i;
+    longest <- 0;
+    FOR i <- 1 TO n
+        c <- values[i];
+        steps <- 0;
+        WHILE c > 1 DO
+            IF c / 2 > 100 THEN c <- c - 100 ELSE c <- c - 1 ENDIF;
+            steps <- steps + 1
+        ENDWHILE;
+        IF steps > longest THEN longest <- steps ENDIF
+    NEXT i;
+    balance <- 1000.0;
+    years <- 0;
+    REPEAT
+        balance <- balance * (1 + rate / 100);
+        years <- years + 1
+    UNTIL balance >= 2000;
+    OUTPUT "Longest countdown: ", longest;
+    OUTPUT "Doubled after ", years, " years"
+END"""
+
+INPUTS = ["8", "3.5", "27", "97", "871", "6171", "7703", "12", "1", "3"]
+
+def check(source: str):
+    parser = Parser(Lexer(source))
+    return TypeChecker(parser.lexer.line_index).check(parser.parse())
+
+def execute(image: ProgramImage, inputs: list[str]) -> tuple[str, dict]:
+    output = CaptureOutput()
+    scope = image.execute(output, IterableInput(inputs))
+    return output.getvalue(), scope
+
+if __name__ == "__main__":
+    original = ProgramImage.from_tree(check(SOURCE))
+    evaluator = PartialEvaluator()
+    specialising = timeit.default_timer()
+    residual = ProgramImage.from_tree(evaluator.specialise(check(SOURCE), tuple(INPUTS)))
+    specialising = timeit.default_timer() - specialising
+    remaining = INPUTS[evaluator.consumed:]
+
+    expected, scope = execute(original, INPUTS)
+    result, residual_scope = execute(residual, remaining)
+    assert result == expected
+    assert {name: value for name, value in residual_scope.items() if name != "values"} == {
+        name: value for name, value in scope.items() if name != "values"
+    }
+
+    print(f"Original image: {len(original):,} bytes, residual image: {len(residual):,} bytes")
+    print(f"Specialised in {specialising * 1000:.1f}ms, reading {evaluator.consumed} line(s) of input")
+    run_original = timeit.timeit(lambda: execute(original, INPUTS), number=RUNS) / RUNS
+    run_residual = timeit.timeit(lambda: execute(residual, remaining), number=RUNS) / RUNS
+    print(
+        f"Per run: original {run_original * 1000:.3f}ms, residual {run_residual * 1000:.3f}ms "
+        f"({run_original / run_residual:.0f}x)"
+    )
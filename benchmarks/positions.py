@@ -0,0 +1,66 @@
+"""
+Benchmarks the cost of recording source positions while lexing: a large source is lexed with Lexer, which records the
+offset of each token, and with a Lexer doing the same work except recording offsets. The two are timed back to back
+many times over, and the overhead taken as the median of the ratios of each pair, so noise in a few timings does not
+skew it. Also times converting offsets into lines and columns through the lazily built line index, and finding the
+lengths of tokens
+
+Run from the repository root with: python -m benchmarks.positions
+"""
+from core.lexer import Lexer
+from core.token import Token, TokenType
+import gc
+import operator
+import statistics
+import time
+import timeit
+
+LINES = 10_000
+REPEATS = 40
+
+SOURCE = "START\n" + ";\n".join(
+    f'    LET total{i % 10} <- total{i % 10} + {i} * (x - 2.5) & "text {i}"' for i in range(LINES)
+) + "\nEND"
+
+class UntrackedLexer(Lexer):
+    """
+    Lexer.get_next_token(), without recording the offset of each token
+    """
+    def get_next_token(self) -> Token:
+        cur_char = self.cur_char
+        if cur_char is not None and cur_char.isspace():
+            self.skip_whitespaces()
+        token = self.scan()
+        self.tokens += 1
+        return token
+
+def lex(with_positions: bool) -> tuple[int, float]:
+    next_token = (Lexer if with_positions else UntrackedLexer)(SOURCE).get_next_token
+    count = 0
+    # As in timeit, the garbage collector is kept out of the timings
+    gc.disable()
+    start = time.process_time()
+    while next_token().type != TokenType.EOF:
+        count += 1
+    seconds = time.process_time() - start
+    gc.enable()
+    return count, seconds
+
+if __name__ == "__main__":
+    timings = {False: [], True: []}
+    for repeat in range(REPEATS):
+        # Alternating which goes first, so the machine speeding up or slowing down does not favour either
+        for with_positions in (False, True) if repeat % 2 else (True, False):
+            tokens, seconds = lex(with_positions)
+            timings[with_positions].append(seconds)
+    overhead = (statistics.median(map(operator.truediv, timings[True], timings[False])) - 1) * 100
+    print(f"{tokens:,} tokens without positions: {min(timings[False]):.3f}s")
+    print(f"{tokens:,} tokens with positions: {min(timings[True]):.3f}s ({overhead:+.1f}%)")
+
+    lexer = Lexer(SOURCE)
+    offsets = range(0, len(SOURCE), 97)
+    seconds = timeit.timeit(lambda: [lexer.line_index.location(offset) for offset in offsets], number=1)
+    print(f"{len(offsets):,} offsets converted to line and column (including building the index): {seconds:.3f}s")
+    token_offsets = [lexer.get_next_token().offset for _ in range(1000)]
+    seconds = timeit.timeit(lambda: [lexer.span(offset) for offset in token_offsets], number=1)
+    print(f"Lengths of {len(token_offsets):,} tokens found: {seconds:.3f}s")
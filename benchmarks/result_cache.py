@@ -0,0 +1,59 @@
+"""
+Benchmarks running the same deterministic program repeatedly: executed every time, answered from the in-memory result
+cache, and answered from the on-disk store by a fresh cache (as a new process would be). Checks every run produces the
+same output and variables
+
+Run from the repository root with: python -m benchmarks.result_cache
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.resultcache import ResultCache
+from core.streams import CaptureOutput
+from core.storage import TypedArray
+import tempfile
+import time
+
+RUNS = 20
+
+SOURCE = """START
+DECLARE Squares : ARRAY[1:500] OF INTEGER;
+LET total = 0;
+FOR i <- 1 TO 500
+  Squares[i] <- i * i
+NEXT i;
+FOR n <- 1 TO 200
+  FOR i <- 1 TO 500
+    total <- total + Squares[i] - n
+  NEXT i
+NEXT n;
+OUTPUT "Total: ", total
+END"""
+
+def run(make_cache) -> tuple[str, dict]:
+    results = []
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        Interpreter.GLOBAL_SCOPE = {}
+        output = CaptureOutput()
+        Interpreter(Parser(Lexer(SOURCE)), output_sink=output, result_cache=make_cache()).interpret()
+        scope = {
+            name: value.to_list() if isinstance(value, TypedArray) else value
+            for name, value in Interpreter.GLOBAL_SCOPE.items()
+        }
+        results.append((output.getvalue(), scope))
+    seconds = time.perf_counter() - start
+    assert all(result == results[0] for result in results)
+    return seconds, results[0]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        memory = ResultCache()
+        timings = {
+            "uncached": run(lambda: None),
+            "in-memory cache": run(lambda: memory),
+            "on-disk store": run(lambda: ResultCache(directory=directory)),
+        }
+    for label, (seconds, _) in timings.items():
+        print(f"{label}: {seconds / RUNS * 1000:.2f}ms per run")
+    assert len({repr(result) for _, result in timings.values()}) == 1
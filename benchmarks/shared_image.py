@@ -0,0 +1,87 @@
+"""
+Benchmarks a pool of worker processes running one program on different inputs: each worker receiving the program as a
+pickled AST, and each worker attaching to a single program image in shared memory. Reports how much program data each
+worker has to receive and the total time, and checks both agree with the Interpreter
+
+Run from the repository root with: python -m benchmarks.shared_image
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.interpreter import Interpreter
+from core.image import ProgramImage, SharedProgramImage
+from core.streams import CaptureOutput, IterableInput
+from multiprocessing import Pool
+import pickle
+import sys
+import time
+
+WORKERS = 4
+JOBS = 64
+
+# A long program, so shipping it to each worker dominates the cost of a job
+SOURCE = "START\n" + ";\n".join(
+    [
+        "FUNCTION SumSquares(n : INTEGER) RETURNS INTEGER\n"
+        "  DECLARE total : INTEGER;\n"
+        "  total <- 0;\n"
+        "  WHILE n > 0 DO\n"
+        "    total <- total + n * n;\n"
+        "    n <- n - 1\n"
+        "  ENDWHILE;\n"
+        "  RETURN total\n"
+        "ENDFUNCTION",
+        "INPUT seed",
+    ]
+    + [f"LET x{i} = seed * {i} + {i % 13}" for i in range(2000)]
+    + ["OUTPUT SumSquares(seed), \" \", x1999"]
+) + "\nEND"
+
+def interpret(seed: int) -> str:
+    Interpreter.GLOBAL_SCOPE = {}
+    output = CaptureOutput()
+    Interpreter(Parser(Lexer(SOURCE)), output_sink=output, input_source=IterableInput([str(seed)])).interpret()
+    return output.getvalue()
+
+def run_tree(job: tuple[bytes, int]) -> str:
+    pickled, seed = job
+    tree = pickle.loads(pickled)
+    Interpreter.GLOBAL_SCOPE = {}
+    output = CaptureOutput()
+    interpreter = Interpreter(
+        None, output_sink=output, input_source=IterableInput([str(seed)]), tier_threshold=None, vectorize=False
+    )
+    interpreter.run_with_deep_stack(interpreter.visit, tree)
+    output.flush()
+    return output.getvalue()
+
+def run_image(job: tuple[str, int]) -> str:
+    name, seed = job
+    output = CaptureOutput()
+    with SharedProgramImage.attach(name) as shared:
+        shared.image.execute(output, IterableInput([str(seed)]))
+    return output.getvalue()
+
+def timed(label: str, function, jobs: list, payload: int) -> list[str]:
+    with Pool(WORKERS) as pool:
+        start = time.perf_counter()
+        results = pool.map(function, jobs)
+        seconds = time.perf_counter() - start
+    print(f"{label}: {seconds:.2f}s, {payload / 1024:.1f} KiB of program data sent per job")
+    return results
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(100_000)
+    seeds = [27 + i for i in range(JOBS)]
+    parser = Parser(Lexer(SOURCE))
+    tree = TypeChecker(parser.lexer.line_index).check(parser.parse())
+    pickled = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+    image = ProgramImage.from_tree(tree)
+    print(f"{JOBS} jobs on {WORKERS} workers; pickled AST {len(pickled) / 1024:.1f} KiB, image {len(image) / 1024:.1f} KiB")
+
+    expected = [interpret(seed) for seed in seeds[:4]]
+    from_trees = timed("pickled AST per job", run_tree, [(pickled, seed) for seed in seeds], len(pickled))
+    with SharedProgramImage.create(image) as shared:
+        from_image = timed("shared image", run_image, [(shared.name, seed) for seed in seeds], len(shared.name))
+    assert from_trees == from_image
+    assert from_image[:4] == expected
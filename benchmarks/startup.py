@@ -0,0 +1,75 @@
+"""
+Benchmarks the cold start of the command line interpreter running a one-line program, each run in a fresh Python
+process. Reports the wall clock time per run, then uses `python -X importtime` to list the slowest imports, and checks
+importing the package creates no files.
+
+Also checks none of the optional engines, which are only imported when a flag (or the program) needs them, is imported
+by the run. core.metrics is not one of them: the lexer, type checker and interpreter update its counters on every run,
+whether or not --metrics asks for them to be printed, so it is always imported (it takes around a millisecond)
+
+Run from the repository root with: python -m benchmarks.startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 20
+SLOWEST = 10
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM = "START\nOUTPUT 1 + 2\nEND"
+OPTIONAL = (
+    "core.optimizer", "core.tiering", "core.purity", "core.resultcache", "core.partial", "core.checkpoint",
+    "core.memory", "core.tableparser", "core.image", "http.server", "numpy",
+)
+
+def run(arguments: list[str], directory: str) -> subprocess.CompletedProcess:
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *arguments], cwd=directory, env=environment, capture_output=True, text=True, check=True
+    )
+
+def import_times(stderr: str) -> list[tuple[int, str]]:
+    """
+    Returns the cumulative import time in microseconds of each module listed by -X importtime, slowest first
+    """
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.append((int(cumulative), name.rstrip()))
+    return sorted(times, reverse=True)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "program.txt")
+        with open(source, "w", encoding="utf-8") as file:
+            file.write(PROGRAM)
+        main = os.path.join(ROOT, "main.py")
+
+        seconds = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            assert run([main, source], directory).stdout == "3\n"
+            seconds.append(time.perf_counter() - start)
+        print(
+            f"One-line program, {RUNS} cold runs: best {min(seconds) * 1000:.1f}ms, "
+            f"median {statistics.median(seconds) * 1000:.1f}ms"
+        )
+
+        times = import_times(run(["-X", "importtime", main, source], directory).stderr)
+        print("Slowest imports (cumulative):")
+        for microseconds, name in times[:SLOWEST]:
+            print(f"  {microseconds / 1000:6.1f}ms {name}")
+        imported = {name.strip() for _, name in times}
+        assert not imported.intersection(OPTIONAL), f"optional engines imported: {imported.intersection(OPTIONAL)}"
+        metrics = next(microseconds for microseconds, name in times if name.strip() == "core.metrics")
+        print(f"No optional engine imported; core.metrics took {metrics / 1000:.1f}ms")
+
+    # Runs log to core.log, so the import is checked in a directory of its own
+    with tempfile.TemporaryDirectory() as directory:
+        run(["-c", "import core"], directory)
+        assert not os.listdir(directory), "importing core created files"
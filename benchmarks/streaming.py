@@ -0,0 +1,55 @@
+"""
+Benchmarks a long generated straight-line script executed after parsing the whole program, and executed one statement
+at a time as it is parsed: peak memory held and time until the first OUTPUT is written
+
+Run from the repository root with: python -m benchmarks.streaming
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.streams import OutputSink
+import time
+import tracemalloc
+
+STATEMENTS = 20_000
+
+SOURCE = "START\n" + ";\n".join(
+    f"OUTPUT x{i % 100} * 2" if i % 1000 == 999 else f"LET x{i % 100} = {i} + {i % 7} * 3"
+    for i in range(STATEMENTS)
+) + "\nEND"
+
+class TimedOutput(OutputSink):
+    """
+    Discards output, recording when it was first written to
+    """
+    def __init__(self):
+        super().__init__()
+        self.first_write: float | None = None
+
+    def write(self, text: str):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+
+    def flush(self):
+        pass
+
+def run(streaming: bool):
+    Interpreter.GLOBAL_SCOPE = {}
+    output = TimedOutput()
+    interpreter = Interpreter(Parser(Lexer(SOURCE)), output_sink=output, streaming=streaming)
+    tracemalloc.start()
+    start = time.perf_counter()
+    interpreter.interpret()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mode = "streaming" if streaming else "whole program"
+    print(
+        f"{mode}: {seconds:.2f}s, first OUTPUT after {(output.first_write - start) * 1000:.1f}ms, "
+        f"peak {peak / 2**20:.1f} MiB"
+    )
+    return dict(interpreter.GLOBAL_SCOPE)
+
+if __name__ == "__main__":
+    print(f"{STATEMENTS:,} statements, {len(SOURCE) / 2**20:.1f} MiB of source code")
+    assert run(streaming=False) == run(streaming=True)
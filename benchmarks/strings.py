@@ -0,0 +1,53 @@
+"""
+Benchmarks repeatedly appending to a STRING variable: 1M appends in an interpreted FOR loop, and StringBuilder against
+concatenating plain Python strings held in a dictionary (as the interpreter stores variables)
+
+Run from the repository root with: python -m benchmarks.strings
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.strings import StringBuilder
+import timeit
+
+PIECES = 1_000_000
+NAIVE_PIECES = 200_000
+
+def interpreted_appends():
+    source = f"""START
+        DECLARE s : STRING;
+        LET s = "";
+        FOR i <- 1 TO {PIECES}
+            s <- s & "x"
+        NEXT i;
+        LET n = LENGTH(s)
+    END"""
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(source)))
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    assert interpreter.GLOBAL_SCOPE["n"] == PIECES
+    print(f"Interpreted s <- s & \"x\" x {PIECES:,}: {seconds:.3f}s")
+
+def builder_appends(pieces: int) -> float:
+    scope = {"s": ""}
+    def run():
+        for _ in range(pieces):
+            scope["s"] = StringBuilder.concat(scope["s"], "x")
+        return str(scope["s"])
+    return timeit.timeit(run, number=1)
+
+def naive_appends(pieces: int) -> float:
+    scope = {"s": ""}
+    def run():
+        for _ in range(pieces):
+            # Bind to a second name as well, as the interpreter's stack does while evaluating, which stops CPython from
+            # resizing the string in place
+            value = scope["s"]
+            scope["s"] = value + "x"
+        return scope["s"]
+    return timeit.timeit(run, number=1)
+
+if __name__ == "__main__":
+    interpreted_appends()
+    print(f"StringBuilder x {NAIVE_PIECES:,}: {builder_appends(NAIVE_PIECES):.3f}s")
+    print(f"Plain str x {NAIVE_PIECES:,}: {naive_appends(NAIVE_PIECES):.3f}s")
@@ -0,0 +1,96 @@
+"""
+Benchmarks the table-driven LL(1) TableParser against the hand-written recursive descent Parser on a large program mixing
+every kind of statement. Tokens are lexed up front and replayed, so the timings are of the parsers alone; lexing and
+parsing together is timed as well. Both produce the same syntax tree.
+
+Also parses an expression nested in parentheses more deeply than Python's default recursion limit allows the
+hand-written Parser to handle
+
+Run from the repository root with: python -m benchmarks.table_parser
+"""
+from core.parser import Parser
+from core.tableparser import TableParser
+from core.lexer import Lexer
+from core.token import TokenType
+import sys
+import timeit
+
+BLOCKS = 2_000
+DEPTH = 5_000
+REPEATS = 5
+
+BLOCK = """
+    DECLARE total{i} : INTEGER;
+    DECLARE values{i} : ARRAY[1:10] OF REAL;
+    LET total{i} <- (total{i} + {i}) * 2 - values{i}[3] / 4;
+    IF total{i} >= 10 AND NOT done OR count <> {i} THEN
+        OUTPUT "big", total{i}
+    ELSE
+        values{i}[1] <- -1.5
+    ENDIF;
+    FOR k <- 1 TO 10 STEP 2
+        values{i}[k] <- values{i}[k] + Square(k)
+    NEXT k;
+    WHILE count < {i} DO count <- count + 1 ENDWHILE;
+    CASE OF count
+        1 : OUTPUT "one"
+        2 TO 5 : OUTPUT "few"
+        OTHERWISE : OUTPUT "many" & name
+    ENDCASE;
+    PROCEDURE Step{i}(BYREF x : INTEGER, y : INTEGER)
+        DECLARE z : INTEGER;
+        z <- x + y;
+        x <- z * 2
+    ENDPROCEDURE;
+    CALL Step{i}(total{i}, {i})"""
+
+SOURCE = "START" + ";".join(BLOCK.format(i=i) for i in range(BLOCKS)) + "\nEND"
+
+class ReplayLexer(object):
+    """
+    Hands out tokens lexed beforehand, so parsing can be timed without lexing
+    """
+    def __init__(self, lexer: Lexer, tokens: list):
+        self.line_index = lexer.line_index
+        self.get_next_token = iter(tokens).__next__
+
+    def report(self):
+        pass
+
+def lex(source: str) -> tuple[Lexer, list]:
+    lexer = Lexer(source)
+    tokens = [lexer.get_next_token()]
+    while tokens[-1].type != TokenType.EOF:
+        tokens.append(lexer.get_next_token())
+    # The parsers may look for the end of the source more than once
+    tokens.append(tokens[-1])
+    return lexer, tokens
+
+def parse(parser_class: type, source: str, tokens: list | None = None):
+    lexer = Lexer(source)
+    if tokens is not None:
+        lexer = ReplayLexer(lexer, tokens)
+    return parser_class(lexer).parse()
+
+if __name__ == "__main__":
+    lexer, tokens = lex(SOURCE)
+    print(f"{BLOCKS * BLOCK.count(chr(10)):,} lines, {len(tokens) - 1:,} tokens")
+    timings = {}
+    for parser_class in (Parser, TableParser):
+        parsing = min(timeit.repeat(lambda: parse(parser_class, SOURCE, tokens), number=1, repeat=REPEATS))
+        total = min(timeit.repeat(lambda: parse(parser_class, SOURCE), number=1, repeat=REPEATS))
+        timings[parser_class] = parsing
+        print(
+            f"{parser_class.__name__:>11}: parsing {parsing:.3f}s ({(len(tokens) - 1) / parsing:,.0f} tokens/s), "
+            f"lexing and parsing {total:.3f}s"
+        )
+    print(f"TableParser takes {timings[TableParser] / timings[Parser]:.2f}x the time of Parser")
+
+    nested = f"START x <- {'(' * DEPTH}1{')' * DEPTH} END"
+    for parser_class in (Parser, TableParser):
+        try:
+            parse(parser_class, nested)
+            print(f"{parser_class.__name__:>11}: parsed {DEPTH:,} nested parentheses")
+        except RecursionError:
+            print(f"{parser_class.__name__:>11}: recursion limit of {sys.getrecursionlimit():,} exceeded by {DEPTH:,} "
+                  f"nested parentheses")
@@ -0,0 +1,44 @@
+"""
+Benchmarks tiered execution: a hot WHILE loop (with a nested FOR loop) run by the tree-walking interpreter alone, and
+with loops compiled into Python code once they are hot
+
+Run from the repository root with: python -m benchmarks.tiering
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+import timeit
+
+ITERATIONS = 200_000
+
+SOURCE = f"""START
+    LET a = 0;
+    LET b = 1;
+    LET total = 0;
+    LET n = {ITERATIONS};
+    WHILE n > 0 DO
+        LET c = a + b;
+        LET a = b;
+        LET b = c - a * 2 + 3;
+        IF b > 1000 THEN
+            b = 1
+        ENDIF;
+        FOR i <- 1 TO 3
+            total = total + i
+        NEXT i;
+        LET n = n - 1
+    ENDWHILE
+END"""
+
+def run(tier_threshold: int | None) -> tuple[float, dict]:
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(SOURCE)), tier_threshold=tier_threshold)
+    seconds = timeit.timeit(interpreter.interpret, number=1)
+    return seconds, dict(interpreter.GLOBAL_SCOPE)
+
+if __name__ == "__main__":
+    interpreted, expected = run(None)
+    print(f"Tree-walking interpreter, {ITERATIONS:,} iterations: {interpreted:.3f}s")
+    tiered, result = run(1000)
+    print(f"Tiered (compiled after 1,000 iterations): {tiered:.3f}s ({interpreted / tiered:.1f}x)")
+    assert result == expected
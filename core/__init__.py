@@ -1,12 +1,16 @@
+import importlib
 import logging
-import logging.config
+
+# Version of the interpreter. Cached program results are keyed by it, so changing the interpreter invalidates them
+__version__ = "1.1.0"
 
 # Create a logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # Create a handler that will save logs to a file
-logger_handler = logging.FileHandler(filename="core.log", mode="w", encoding="utf-8")
+# The file is only created (or truncated) once the first message is logged, so importing the package does no file I/O
+logger_handler = logging.FileHandler(filename="core.log", mode="w", encoding="utf-8", delay=True)
 logger_handler.setLevel(logging.DEBUG)
 
 # Create a formatter for saved logs and add it to the handler
@@ -15,4 +19,34 @@ logger_handler.setFormatter(logging_formatter)
 
 # Now add the handler to the original logger
 logger.addHandler(logger_handler)
-logging.info("Logger configured successfully!")
\ No newline at end of file
+logging.info("Logger configured successfully!")
+
+# Public names, by the submodule defining them. Submodules are only imported when one of their names is first used, so
+# importing the package stays cheap for short-lived runs
+EXPORTS = {
+    "compile_expression": "compiler",
+    "Lexer": "lexer",
+    "Parser": "parser",
+    "TableParser": "tableparser",
+    "TypeChecker": "typechecker",
+    "Interpreter": "interpreter",
+    "DataflowOptimizer": "optimizer",
+    "PartialEvaluator": "partial",
+    "ProgramImage": "image",
+    "SharedProgramImage": "image",
+    "ResultCache": "resultcache",
+    "Checkpointer": "checkpoint",
+    "MemoryMeter": "memory",
+    "METRICS": "metrics",
+}
+
+def __getattr__(name: str) -> any:
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(EXPORTS))
@@ -1,10 +1,26 @@
-from .token import Token
+from .token import Token, TokenType
+import operator
 
 class AST(object):
     """
     Base abstract syntax tree (AST) node class
+
+    Statement nodes are given the offset of their first character in the source code by the parser, which a LineIndex
+    converts into a line and column when needed. Literal and variable nodes have the offset of their token instead.
+    Expression nodes are given their static `type` by the type checker.
+
+    Nodes declare their fields with __slots__, so they have no per-instance __dict__ and large programs take a fraction
+    of the memory. `offset` and `type` read as None until they are set
     """
-    pass
+    __slots__ = ("offset", "type", "__weakref__")
+    DEFAULTS = {"offset": None, "type": None}
+
+    def __getattr__(self, name: str) -> any:
+        # Only called for fields which have not been set
+        try:
+            return AST.DEFAULTS[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
 
 class BinOP(AST):
     """
@@ -19,22 +35,161 @@ class BinOP(AST):
     :param right: Right operand
     :type right: Token()
     """
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left: Token, op: Token, right: Token):
         self.left: Token = left
-        self.token = self.op = op
+        self.op: Token = op
         self.right: Token = right
 
+class IntBinOP(BinOP):
+    """
+    Binary operator node specialised by the type checker for operands that are both statically known to be INTEGER.
+    The operation is resolved once at construction so the interpreter does not re-dispatch on the operator each visit
+
+    :param left: Left operand
+    :type left: AST()
+    :param op: Binary operator being used (PLUS, MINUS or MUL)
+    :type op: Token()
+    :param right: Right operand
+    :type right: AST()
+    """
+    __slots__ = ("func",)
+    OPERATIONS = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+    }
+
+    def __init__(self, left: AST, op: Token, right: AST):
+        super().__init__(left, op, right)
+        self.func = self.OPERATIONS[op.type]
+
+class RealBinOP(BinOP):
+    """
+    Binary operator node specialised by the type checker for numeric operands where at least one is REAL, or for
+    division (which always produces a REAL)
+
+    :param left: Left operand
+    :type left: AST()
+    :param op: Binary operator being used (PLUS, MINUS, MUL or DIV)
+    :type op: Token()
+    :param right: Right operand
+    :type right: AST()
+    """
+    __slots__ = ("func",)
+    OPERATIONS = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+        TokenType.DIV: operator.truediv,
+    }
+
+    def __init__(self, left: AST, op: Token, right: AST):
+        super().__init__(left, op, right)
+        self.func = self.OPERATIONS[op.type]
+
+class CompareOP(BinOP):
+    """
+    Comparison node specialised by the type checker for operands that are both statically known to be numeric, or both
+    BOOLEAN. The comparison is resolved once at construction, and as neither operand can be a string being built by
+    concatenation the values are compared directly
+
+    :param left: Left operand
+    :type left: AST()
+    :param op: Comparison operator being used
+    :type op: Token()
+    :param right: Right operand
+    :type right: AST()
+    """
+    __slots__ = ("func",)
+    OPERATIONS = {
+        TokenType.EQ: operator.eq,
+        TokenType.EQEQ: operator.eq,
+        TokenType.NOTEQ: operator.ne,
+        TokenType.LTHAN: operator.lt,
+        TokenType.LTEQ: operator.le,
+        TokenType.GTHAN: operator.gt,
+        TokenType.GTEQ: operator.ge,
+    }
+
+    def __init__(self, left: AST, op: Token, right: AST):
+        super().__init__(left, op, right)
+        self.func = self.OPERATIONS[op.type]
+
+class LogicalOP(BinOP):
+    """
+    Boolean AND/OR node. The right operand is only evaluated if the left one does not decide the result on its own
+
+    eg. x > 0 AND y / x > 2
+
+    :param left: Left operand
+    :type left: AST()
+    :param op: Logical operator being used (AND or OR)
+    :type op: Token()
+    :param right: Right operand
+    :type right: AST()
+    """
+    __slots__ = ()
+
 class Num(AST):
     """
-    Numerical node to represent integers
+    Numerical node to represent integers and real numbers
 
     :param token: Token of integer to be represented
     :type token: Token()
     """
+    __slots__ = ("value",)
+
+    def __init__(self, token: Token):
+        self.value: any = token.value
+        self.offset: int | None = token.offset
+
+class String(AST):
+    """
+    String literal node
+
+    :param token: Token of the string to be represented
+    :type token: Token()
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, token: Token):
+        self.value: str = token.value
+        self.offset: int | None = token.offset
+
+class Boolean(AST):
+    """
+    Boolean literal node, constructed using TokenType.TRUE or TokenType.FALSE
+
+    :param token: Token of the boolean to be represented
+    :type token: Token()
+    """
+    __slots__ = ("value",)
+
     def __init__(self, token: Token):
-        self.token: Token = token
-        self.value: any = self.token.value
-    
+        self.value: bool = token.type == TokenType.TRUE
+        self.offset: int | None = token.offset
+
+class FunctionCall(AST):
+    """
+    Function call node, calling either a built in function or a user defined FUNCTION
+
+    eg. SUBSTRING(s, 1, 3)
+
+    :param name: The name of the function being called
+    :type name: str
+    :param args: The argument expressions
+    :type args: list[AST()]
+    """
+    __slots__ = ("name", "args", "subroutine")
+
+    def __init__(self, name: str, args: list[AST]):
+        self.name: str = name
+        self.args: list[AST] = args
+        # Resolved by the type checker if a user defined FUNCTION is being called
+        self.subroutine: SubroutineDecl | None = None
+
 class UnaryOP(AST):
     """
     Unary operator node
@@ -44,18 +199,21 @@ class UnaryOP(AST):
     :param expr: The expression representing the right operand
     :type expr: BinOP() | UnaryOP() | Num()
     """
+    __slots__ = ("op", "expr")
+
     def __init__(self, op: Token, expr: BinOP | Num):
-        self.token = self.op = op
-        self.expr = expr
+        self.op: Token = op
+        self.expr: AST = expr
 
 
 class Compound(AST):
     """
     Compound statement node (multiple statement nodes in succession)
     """
+    __slots__ = ("children",)
+
     def __init__(self):
-        self.children = []
-    
+        self.children: list[AST] = []
 
 class Assign(AST):
     """
@@ -68,25 +226,432 @@ class Assign(AST):
     :param right: Right operand
     :type right: Token()
     """
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left: Token, op: Token, right: Token):
         self.left: Token = left
-        self.token = self.op = op
+        self.op: Token = op
         self.right: Token = right
 
 class Variable(AST):
     """
     Variable statement node, constructed using TokenType.ID
 
+    Variables local to a subroutine (its parameters and anything declared in its body) are resolved to a fixed `slot`
+    in the subroutine's call frame by the parser. `slot` is None for global variables
+
     :param token: Token to be represented
     :type token: Token()
     """
+    __slots__ = ("value", "slot", "byref")
+
     def __init__(self, token: Token):
-        self.token = token
-        self.value = token.value
+        self.value: str = token.value
+        self.offset: int | None = token.offset
+        self.slot: int | None = None
+        self.byref: bool = False
 
 class NoOP(AST):
     """
     Empty statement node, typically used to represent keywords such as "ENDIF", "NEXT"
     """
-    def __init__(self):
-        pass
\ No newline at end of file
+    __slots__ = ()
+
+class VarDecl(AST):
+    """
+    Variable declaration node
+
+    eg. DECLARE x : INTEGER
+
+    :param var_node: The variable being declared
+    :type var_node: Variable()
+    :param type_node: The data type the variable is declared as
+    :type type_node: Type()
+    """
+    __slots__ = ("var_node", "type_node")
+
+    def __init__(self, var_node: Variable, type_node: "Type"):
+        self.var_node: Variable = var_node
+        self.type_node: Type = type_node
+
+class Type(AST):
+    """
+    Data type node, constructed using TokenType.DATATYPE
+
+    :param token: Token of the data type
+    :type token: Token()
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, token: Token):
+        self.value: str = token.value
+        self.offset: int | None = token.offset
+
+class ArrayType(AST):
+    """
+    Array data type node
+
+    eg. ARRAY[1:10, 1:5] OF INTEGER
+
+    :param bounds: The (lower, upper) bound expressions of each dimension
+    :type bounds: list[tuple[AST(), AST()]]
+    :param element_type: The data type of each element in the array
+    :type element_type: Type()
+    """
+    __slots__ = ("bounds", "element_type")
+
+    def __init__(self, bounds: list[tuple[AST, AST]], element_type: Type):
+        self.bounds: list[tuple[AST, AST]] = bounds
+        self.element_type: Type = element_type
+
+class ArrayElement(AST):
+    """
+    Array element access node
+
+    eg. A[i] or A[i, j]
+
+    :param var_node: The array variable being indexed
+    :type var_node: Variable()
+    :param indices: The index expressions, one for each dimension of the array
+    :type indices: list[AST()]
+    """
+    __slots__ = ("var_node", "indices")
+
+    def __init__(self, var_node: Variable, indices: list[AST]):
+        self.var_node: Variable = var_node
+        self.indices: list[AST] = indices
+
+    @property
+    def value(self) -> str:
+        """
+        The name of the array
+        """
+        return self.var_node.value
+
+class ForLoop(AST):
+    """
+    Count-controlled loop node
+
+    eg. FOR i <- 1 TO 10 STEP 2 ... NEXT i
+
+    :param var_node: The loop counter variable
+    :type var_node: Variable()
+    :param start: Expression for the first value of the counter
+    :type start: AST()
+    :param end: Expression for the last value of the counter
+    :type end: AST()
+    :param body: The statements executed on each iteration
+    :type body: Compound()
+    :param step: Expression for the amount the counter changes by after each iteration, if not 1
+    :type step: AST() | None
+    """
+    __slots__ = ("var_node", "start", "end", "body", "step")
+
+    def __init__(self, var_node: Variable, start: AST, end: AST, body: Compound, step: AST | None = None):
+        self.var_node: Variable = var_node
+        self.start: AST = start
+        self.end: AST = end
+        self.body: Compound = body
+        self.step: AST | None = step
+
+class WhileLoop(AST):
+    """
+    Pre-condition loop node
+
+    eg. WHILE x > 0 DO ... ENDWHILE
+
+    :param condition: The condition checked before each iteration
+    :type condition: AST()
+    :param body: The statements executed on each iteration
+    :type body: Compound()
+    """
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: AST, body: Compound):
+        self.condition: AST = condition
+        self.body: Compound = body
+
+class RepeatLoop(AST):
+    """
+    Post-condition loop node, whose body is always executed at least once
+
+    eg. REPEAT ... UNTIL x > 10
+
+    :param body: The statements executed on each iteration
+    :type body: Compound()
+    :param condition: The condition checked after each iteration, ending the loop once it is TRUE
+    :type condition: AST()
+    """
+    __slots__ = ("body", "condition")
+
+    def __init__(self, body: Compound, condition: AST):
+        self.body: Compound = body
+        self.condition: AST = condition
+
+class IfStatement(AST):
+    """
+    Selection statement node
+
+    eg. IF x > 0 THEN ... ELSE ... ENDIF
+
+    :param condition: The condition deciding which branch is executed
+    :type condition: AST()
+    :param then_body: The statements executed if the condition is TRUE
+    :type then_body: Compound()
+    :param else_body: The statements executed if the condition is FALSE, if there is an ELSE branch
+    :type else_body: Compound() | None
+    """
+    __slots__ = ("condition", "then_body", "else_body")
+
+    def __init__(self, condition: AST, then_body: Compound, else_body: Compound | None):
+        self.condition: AST = condition
+        self.then_body: Compound = then_body
+        self.else_body: Compound | None = else_body
+
+class CaseBranch(AST):
+    """
+    A branch of a CASE statement, labelled with a single value or a range of values
+
+    eg. 1 TO 5 : OUTPUT "low"
+
+    :param low: The literal value of the label, or the first value of its range
+    :type low: Num() | String() | Boolean()
+    :param high: The last value of the label's range, if it is a range
+    :type high: Num() | String() | None
+    :param body: The statements executed if the branch is selected
+    :type body: Compound()
+    """
+    __slots__ = ("low", "high", "body")
+
+    def __init__(self, low: AST, high: AST | None, body: Compound):
+        self.low: AST = low
+        self.high: AST | None = high
+        self.body: Compound = body
+
+class CaseStatement(AST):
+    """
+    Selection statement node choosing a branch by the value of an expression
+
+    eg. CASE OF choice 1 : ... 2 TO 4 : ... OTHERWISE ... ENDCASE
+
+    :param expr: The expression whose value selects the branch
+    :type expr: AST()
+    :param branches: The labelled branches, in order
+    :type branches: list[CaseBranch()]
+    :param otherwise: The statements executed if no label matches, if there is an OTHERWISE branch
+    :type otherwise: Compound() | None
+    """
+    __slots__ = ("expr", "branches", "otherwise", "table")
+
+    def __init__(self, expr: AST, branches: list[CaseBranch], otherwise: Compound | None):
+        self.expr: AST = expr
+        self.branches: list[CaseBranch] = branches
+        self.otherwise: Compound | None = otherwise
+        # Built by the type checker once the labels are known to be comparable
+        self.table: "JumpTable | None" = None
+
+class Param(AST):
+    """
+    Subroutine parameter node
+
+    eg. BYREF x : INTEGER
+
+    :param var_node: The parameter's variable, resolved to its slot in the call frame
+    :type var_node: Variable()
+    :param type_node: The data type of the parameter
+    :type type_node: Type()
+    :param byref: Whether the argument is passed by reference (BYREF) instead of by value (BYVAL)
+    :type byref: bool
+    """
+    __slots__ = ("var_node", "type_node", "byref")
+
+    def __init__(self, var_node: Variable, type_node: Type, byref: bool):
+        self.var_node: Variable = var_node
+        self.type_node: Type = type_node
+        self.byref: bool = byref
+
+class SubroutineDecl(AST):
+    """
+    PROCEDURE or FUNCTION declaration node
+
+    :param name: The name of the subroutine
+    :type name: str
+    :param params: The parameters of the subroutine, in order
+    :type params: list[Param()]
+    :param body: The statements executed when the subroutine is called
+    :type body: Compound()
+    :param return_type: The data type returned by a FUNCTION, or None for a PROCEDURE
+    :type return_type: Type() | None
+    :param slot_count: The number of slots in the subroutine's call frame (parameters and local variables)
+    :type slot_count: int
+    """
+    __slots__ = ("name", "params", "body", "return_type", "slot_count")
+
+    def __init__(self, name: str, params: list[Param], body: Compound, return_type: Type | None, slot_count: int):
+        self.name: str = name
+        self.params: list[Param] = params
+        self.body: Compound = body
+        self.return_type: Type | None = return_type
+        self.slot_count: int = slot_count
+
+class Return(AST):
+    """
+    Return statement node, ending a FUNCTION with the value of its expression
+
+    :param expr: The value returned
+    :type expr: AST()
+    """
+    __slots__ = ("expr",)
+
+    def __init__(self, expr: AST):
+        self.expr: AST = expr
+
+class ProcedureCall(AST):
+    """
+    Procedure call statement node
+
+    eg. CALL Swap(a, b)
+
+    :param name: The name of the procedure being called
+    :type name: str
+    :param args: The argument expressions
+    :type args: list[AST()]
+    """
+    __slots__ = ("name", "args", "subroutine")
+
+    def __init__(self, name: str, args: list[AST]):
+        self.name: str = name
+        self.args: list[AST] = args
+        # Resolved by the type checker
+        self.subroutine: SubroutineDecl | None = None
+
+class Output(AST):
+    """
+    Output statement node, writing the values of its expressions on a single line
+
+    eg. OUTPUT x, y
+
+    :param exprs: The expressions to output
+    :type exprs: list[AST()]
+    """
+    __slots__ = ("exprs",)
+
+    def __init__(self, exprs: list[AST]):
+        self.exprs: list[AST] = exprs
+
+class Input(AST):
+    """
+    Input statement node, reading a line of input into a variable
+
+    eg. INPUT x
+
+    :param var_node: The variable or array element to store the input in
+    :type var_node: Variable() | ArrayElement()
+    """
+    __slots__ = ("var_node",)
+
+    def __init__(self, var_node: Variable | ArrayElement):
+        self.var_node: Variable | ArrayElement = var_node
+
+class OpenFile(AST):
+    """
+    File opening statement node
+
+    eg. OPENFILE "data.txt" FOR READ
+
+    :param filename: Expression for the name of the file
+    :type filename: AST()
+    :param mode: READ, WRITE or APPEND
+    :type mode: str
+    """
+    __slots__ = ("filename", "mode")
+
+    def __init__(self, filename: AST, mode: str):
+        self.filename: AST = filename
+        self.mode: str = mode
+
+class ReadFile(AST):
+    """
+    File reading statement node, reading the next line of a file into a variable
+
+    eg. READFILE "data.txt", line
+
+    :param filename: Expression for the name of the file
+    :type filename: AST()
+    :param var_node: The variable or array element to store the line in
+    :type var_node: Variable() | ArrayElement()
+    """
+    __slots__ = ("filename", "var_node")
+
+    def __init__(self, filename: AST, var_node: Variable | ArrayElement):
+        self.filename: AST = filename
+        self.var_node: Variable | ArrayElement = var_node
+
+class WriteFile(AST):
+    """
+    File writing statement node, writing the value of an expression to a file as a line
+
+    eg. WRITEFILE "data.txt", total
+
+    :param filename: Expression for the name of the file
+    :type filename: AST()
+    :param expr: The expression to write
+    :type expr: AST()
+    """
+    __slots__ = ("filename", "expr")
+
+    def __init__(self, filename: AST, expr: AST):
+        self.filename: AST = filename
+        self.expr: AST = expr
+
+class CloseFile(AST):
+    """
+    File closing statement node
+
+    eg. CLOSEFILE "data.txt"
+
+    :param filename: Expression for the name of the file
+    :type filename: AST()
+    """
+    __slots__ = ("filename",)
+
+    def __init__(self, filename: AST):
+        self.filename: AST = filename
+
+class EndOfFile(AST):
+    """
+    Expression node which is TRUE once every line of a file open for reading has been read
+
+    eg. EOF("data.txt")
+
+    :param filename: Expression for the name of the file
+    :type filename: AST()
+    """
+    __slots__ = ("filename",)
+
+    def __init__(self, filename: AST):
+        self.filename: AST = filename
+
+class VectorizedFor(AST):
+    """
+    FOR loop rewritten by the loop vectorizer into whole-array operations. Each statement assigns an element-wise
+    expression to the slice of an array covered by the loop's range
+
+    :param loop: The original loop, executed instead if the vectorized form cannot be used at runtime
+    :type loop: ForLoop()
+    :param statements: (target array name, expression) pairs, in the order they appear in the loop body
+    :type statements: list[tuple[str, AST()]]
+    :param arrays: Names of every array read or written by the statements
+    :type arrays: set[str]
+    :param scalars: The static type of every scalar variable read by the statements, other than the loop counter
+    :type scalars: dict[str, DataType()]
+    """
+    __slots__ = ("loop", "statements", "arrays", "scalars")
+
+    def __init__(
+        self, loop: ForLoop, statements: list[tuple[str, AST]], arrays: set[str], scalars: dict[str, "DataType"]
+    ):
+        self.loop: ForLoop = loop
+        self.statements: list[tuple[str, AST]] = statements
+        self.arrays: set[str] = arrays
+        self.scalars: dict[str, "DataType"] = scalars
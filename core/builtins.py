@@ -0,0 +1,49 @@
+from .datatype import DataType
+
+class Builtin(object):
+    """
+    A function built into the language, such as LENGTH or SUBSTRING
+
+    :param name: The name the function is called by
+    :type name: str
+    :param params: The data types accepted for each parameter
+    :type params: tuple[tuple[DataType(), ...], ...]
+    :param return_type: The data type returned, or None if it is the data type of the first argument
+    :type return_type: DataType() | None
+    :param func: The Python function implementing it
+    :type func: Callable
+    :param deterministic: Whether it always returns the same result for the same arguments (False for eg. a random
+        number generator), which programs must only call for their results to be cached
+    :type deterministic: bool
+    """
+    def __init__(self, name: str, params: tuple, return_type: DataType | None, func, deterministic: bool = True):
+        self.name: str = name
+        self.params: tuple[tuple[DataType, ...], ...] = params
+        self.return_type: DataType | None = return_type
+        self.func = func
+        self.deterministic: bool = deterministic
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+
+def substring(text: str, start: int, length: int) -> str:
+    """
+    SUBSTRING(text, start, length): the `length` characters of `text` starting at the 1-based position `start`
+    """
+    text = str(text)
+    if start < 1 or length < 0 or start + length - 1 > len(text):
+        raise IndexError(f"SUBSTRING({text!r}, {start}, {length}) is out of range")
+    return text[start - 1:start - 1 + length]
+
+
+TEXT = (DataType.STRING, DataType.CHAR)
+BUILTINS: dict[str, Builtin] = {
+    builtin.name: builtin
+    for builtin in (
+        Builtin("LENGTH", (TEXT,), DataType.INTEGER, len),
+        Builtin("SUBSTRING", (TEXT, (DataType.INTEGER,), (DataType.INTEGER,)), DataType.STRING, substring),
+        Builtin("UCASE", (TEXT,), None, lambda text: str(text).upper()),
+        Builtin("LCASE", (TEXT,), None, lambda text: str(text).lower()),
+    )
+}
@@ -0,0 +1,405 @@
+from . import __version__
+from .exception import ExceptionHandler
+from .nodevisitor import NodeVisitor
+from .strings import StringBuilder
+from .streams import CountingInput, CountingOutput
+from .ast import *
+import hashlib
+import logging
+import math
+import os
+import pickle
+import tempfile
+import zlib
+
+class Suspended(Exception):
+    """
+    Raised at a safe point once the run has been checkpointed, to stop it there
+    """
+
+
+class Checkpointer(object):
+    """
+    Saves the execution state of a program to a file at safe points, so a run cut short (eg. by its worker being
+    recycled) can be resumed from there by another process instead of starting over. Running a program with a
+    checkpointer resumes it from the checkpoint file if there is one, and removes the file once the program completes.
+
+    Safe points are the start of each statement outside of subroutine calls, and the gaps between the batches of
+    iterations a compiled FOR loop is run in. A checkpoint holds the position of the statement about to be executed
+    (which branch each enclosing IF and CASE took, the remaining range of each enclosing FOR loop's counter and the
+    statement reached in each enclosing block), the global variables, the number of lines read by INPUT, the number of
+    characters of output written, and how far each open file has been read or written. It is stored as a compressed
+    pickle, written to a temporary file and renamed over the previous checkpoint so there is always a complete one.
+
+    Output is flushed at every checkpoint, and output written after the last checkpoint is written again when the run
+    is resumed. The checkpoint records how much output had been written (`output` in the file) so a captured transcript
+    can be cut back to it. Resumed runs must be given the same input, whose lines read before the checkpoint are
+    skipped.
+
+    WHILE and REPEAT loops run in the tree-walking interpreter while checkpointing, as their compiled code runs them to
+    the end; FOR loops are still compiled once hot
+
+    :param path: Path of the checkpoint file
+    :type path: str
+    :param every: Number of steps (statements executed outside of subroutines, counting each iteration of a compiled
+        FOR loop as the statements of its body) between automatic checkpoints (None to only checkpoint when requested)
+    :type every: int | None
+    :param stop_after: Number of steps after which the run is checkpointed and stopped (None to run to completion)
+    :type stop_after: int | None
+    """
+    VERSION = 1
+
+    # Iterations of a compiled FOR loop run between safe points when no checkpoint is due sooner, so requests are served
+    CHUNK = 10_000
+
+    def __init__(self, path: str, every: int | None = None, stop_after: int | None = None):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.path: str = path
+        self.every: int | None = every
+        self.stop_after: int | None = stop_after
+        # Whether a checkpoint has been requested, and whether the run should stop once it has been saved
+        self.requested: bool = False
+        self.stopping: bool = False
+        # Whether the last run stopped at a checkpoint instead of completing, and the checkpoints it saved
+        self.suspended: bool = False
+        self.saved: int = 0
+        self.program: str | None = None
+        self.runner: ResumableRun | None = None
+
+    def request(self, stop: bool = False):
+        """
+        Asks for a checkpoint at the next safe point. Safe to call from a signal handler
+
+        :param stop: Whether to stop the run once the checkpoint has been saved
+        :type stop: bool
+        """
+        self.requested = True
+        self.stopping = self.stopping or stop
+        if self.runner is not None:
+            self.runner.due = 0
+
+    def fingerprint(self, interpreter: "Interpreter") -> str:
+        """
+        Returns the digest identifying the program being run and the transformations applied to it, which positions in
+        checkpoints refer to
+
+        :param interpreter: The interpreter running the program
+        :type interpreter: Interpreter()
+        :rtype: str
+        """
+        optimizer = interpreter.optimizer
+        settings = (
+            interpreter.vectorize,
+            None if optimizer is None else (optimizer.cse, optimizer.licm, optimizer.strength_reduction),
+        )
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}/{self.VERSION}/{settings}\0".encode())
+        digest.update(interpreter.parser.lexer.source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self) -> dict | None:
+        """
+        Reads the checkpoint file, or returns None if there is none
+
+        :rtype: dict | None
+        """
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            state = pickle.loads(zlib.decompress(data))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            self.ExceptionHandler.raise_exception(f"Checkpoint {self.path!r} is corrupt")
+        if state.get("version") != self.VERSION or state.get("program") != self.program:
+            self.ExceptionHandler.raise_exception(f"Checkpoint {self.path!r} was saved by a different program")
+        return state
+
+    def save(self, state: dict):
+        """
+        Writes a checkpoint, replacing the previous one
+
+        :param state: The execution state
+        :type state: dict
+        """
+        data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self.saved += 1
+        self.requested = False
+        self.logger.info(f"Saved checkpoint after {state['steps']} steps ({len(data)} bytes)")
+
+    def run(self, interpreter: "Interpreter", tree: AST):
+        """
+        Executes a program, resuming it from the checkpoint file if there is one
+
+        :param interpreter: The interpreter the program's statements are executed by
+        :type interpreter: Interpreter()
+        :param tree: The program, type checked and transformed
+        :type tree: AST()
+        """
+        self.suspended = False
+        self.saved = 0
+        self.program = self.fingerprint(interpreter)
+        state = self.load()
+        input_source, output_sink = interpreter.input_source, interpreter.output_sink
+        interpreter.input_source = CountingInput(input_source)
+        interpreter.output_sink = CountingOutput(output_sink)
+        try:
+            path, steps = None, 0
+            if state is not None:
+                self.restore(interpreter, state)
+                path, steps = state["path"], state["steps"]
+                self.logger.info(f"Resuming from checkpoint after {steps} steps")
+            self.runner = ResumableRun(self, interpreter, path, steps)
+            try:
+                self.runner.visit(tree)
+            except Suspended:
+                self.suspended = True
+                return
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        finally:
+            self.runner = None
+            interpreter.input_source, interpreter.output_sink = input_source, output_sink
+
+    def restore(self, interpreter: "Interpreter", state: dict):
+        """
+        Restores the global variables and the progress through the input and files saved in a checkpoint
+
+        :param interpreter: The interpreter the program is run by, with its counting input and output in place
+        :type interpreter: Interpreter()
+        :param state: The execution state
+        :type state: dict
+        """
+        interpreter.GLOBAL_SCOPE.clear()
+        interpreter.GLOBAL_SCOPE.update(state["scope"])
+        if interpreter.memory is not None:
+            interpreter.memory.sync(interpreter.GLOBAL_SCOPE)
+        for _ in range(state["inputs"]):
+            interpreter.input_source.read_line()
+        interpreter.output_sink.written = state["output"]
+        interpreter.files.restore(state["files"])
+
+
+class ResumableRun(NodeVisitor):
+    """
+    Executes a program with safe points, keeping track of the position of the statement being executed. Statements
+    which contain other statements are executed here, and every other statement (including subroutine calls, which
+    run to completion between safe points) by the interpreter. A run resumed from a checkpoint descends straight to the
+    saved position, restoring the state of each enclosing statement on the way instead of executing it again
+
+    :param checkpointer: The checkpointer configuring when checkpoints are saved
+    :type checkpointer: Checkpointer()
+    :param interpreter: The interpreter executing the statements
+    :type interpreter: Interpreter()
+    :param path: The position to resume from, as saved in a checkpoint (None to run from the start)
+    :type path: list[tuple] | None
+    :param steps: The steps run before the position resumed from
+    :type steps: int
+    """
+    def __init__(self, checkpointer: Checkpointer, interpreter: "Interpreter", path: list[tuple] | None, steps: int):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.checkpointer: Checkpointer = checkpointer
+        self.interpreter: "Interpreter" = interpreter
+        # The position of the statement being executed: an entry for each enclosing statement, from the outermost
+        self.path: list[list] = []
+        # The entries of the position being resumed not reached yet, innermost first
+        self.resuming: list[tuple] = list(reversed(path)) if path else []
+        self.steps: int = steps
+        self.stop_at: float = math.inf if checkpointer.stop_after is None else steps + checkpointer.stop_after
+        # The step at which the next safe point saves a checkpoint
+        self.due: float = 0 if checkpointer.requested else self.next_due()
+
+    def next_due(self) -> float:
+        every = self.checkpointer.every
+        return min(self.steps + every if every is not None else math.inf, self.stop_at)
+
+    def safe_point(self, steps: int = 1):
+        """
+        Saves a checkpoint if one is due, then counts the steps about to be run
+
+        :param steps: The number of steps about to be run
+        :type steps: int
+        """
+        if self.steps >= self.due:
+            self.checkpoint()
+        self.steps += steps
+
+    def checkpoint(self):
+        """
+        Saves a checkpoint of the current position, stopping the run afterwards if it should stop
+        """
+        interpreter = self.interpreter
+        interpreter.output_sink.flush()
+        scope = {
+            name: str(value) if isinstance(value, StringBuilder) else value
+            for name, value in interpreter.GLOBAL_SCOPE.items()
+        }
+        self.checkpointer.save({
+            "version": Checkpointer.VERSION,
+            "program": self.checkpointer.program,
+            "steps": self.steps,
+            "path": [tuple(entry) for entry in self.path],
+            "scope": scope,
+            "inputs": interpreter.input_source.count,
+            "output": interpreter.output_sink.written,
+            "files": interpreter.files.cursors(),
+        })
+        if self.checkpointer.stopping or self.steps >= self.stop_at:
+            raise Suspended()
+        self.due = self.next_due()
+
+    def resume(self, node: AST) -> tuple | None:
+        """
+        Returns the saved entry of a statement on the position being resumed, or None if it is not being resumed
+
+        :rtype: tuple | None
+        """
+        if not self.resuming:
+            return None
+        entry = self.resuming.pop()
+        if entry[0] != type(node).__name__:
+            self.ExceptionHandler.raise_exception("Checkpoint does not match the program being run")
+        return entry
+
+    def generic_visit(self, node: AST) -> any:
+        return self.interpreter.visit(node)
+
+    def visit_Compound(self, node: Compound):
+        entry = self.resume(node)
+        children = node.children
+        position = ["Compound", 0 if entry is None else entry[1]]
+        self.interpreter.statements += len(children) - position[1]
+        self.path.append(position)
+        # A statement resumed part of the way through was counted before the checkpoint
+        resumed = bool(self.resuming)
+        for index in range(position[1], len(children)):
+            position[1] = index
+            if resumed:
+                resumed = False
+            else:
+                self.safe_point()
+            self.visit(children[index])
+        self.path.pop()
+
+    def visit_IfStatement(self, node: IfStatement):
+        entry = self.resume(node)
+        if entry is not None:
+            branch = entry[1]
+        elif self.interpreter.visit(node.condition):
+            branch = 0
+        elif node.else_body is not None:
+            branch = 1
+        else:
+            return
+        self.path.append(["IfStatement", branch])
+        self.visit(node.else_body if branch else node.then_body)
+        self.path.pop()
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        entry = self.resume(node)
+        if entry is not None:
+            index = entry[1]
+        else:
+            value = self.interpreter.visit(node.expr)
+            if isinstance(value, StringBuilder):
+                value = str(value)
+            index = node.table.lookup(value)
+            if index is None:
+                if node.otherwise is None:
+                    return
+                index = -1
+        self.path.append(["CaseStatement", index])
+        self.visit(node.otherwise if index == -1 else node.branches[index].body)
+        self.path.pop()
+
+    def visit_ForLoop(self, node: ForLoop):
+        """
+        Executes a FOR loop. Its entry holds the remaining range of its counter, starting from the current value. Once
+        hot, the rest of the loop is run by its compiled code in batches of iterations ending at the next checkpoint
+        """
+        interpreter = self.interpreter
+        entry = self.resume(node)
+        counters = interpreter.counters(node) if entry is None else range(*entry[1:])
+        # The first iteration is resumed part of the way through its body if the position goes further
+        resumed = bool(self.resuming)
+        position = ["ForLoop", counters.start, counters.stop, counters.step]
+        remaining = interpreter.hot_after(node)
+        self.path.append(position)
+        index = 0
+        try:
+            while index < len(counters):
+                if remaining is not None and index >= remaining and not resumed:
+                    interpreter.back_edges[node] = interpreter.back_edges.get(node, 0) + index
+                    loop = interpreter.tier_up(node)
+                    if loop is not None:
+                        index = self.run_compiled(node, loop, counters, index, position)
+                    remaining = None
+                    continue
+                value = counters[index]
+                position[1] = value
+                if resumed:
+                    resumed = False
+                else:
+                    interpreter.store(node.var_node, value)
+                self.visit(node.body)
+                index += 1
+        finally:
+            if remaining is not None:
+                interpreter.back_edges[node] = interpreter.back_edges.get(node, 0) + index
+        self.path.pop()
+
+    def run_compiled(self, node: ForLoop, loop: "function", counters: range, index: int, position: list) -> int:
+        """
+        Runs the iterations of a FOR loop from an index onwards with its compiled code, in batches separated by safe
+        points
+
+        :return: The index of the first iteration left to the tree-walking interpreter (all of them have run if it is
+            the length of the range), as the loop's compiled code deoptimised there
+        :rtype: int
+        """
+        interpreter = self.interpreter
+        per_iteration = max(len(node.body.children), 1)
+        while index < len(counters):
+            position[1] = counters[index]
+            self.safe_point(0)
+            batch = min(self.due - self.steps, Checkpointer.CHUNK * per_iteration) // per_iteration
+            chunk = counters[index:index + max(int(batch), 1)]
+            resume = loop(interpreter.GLOBAL_SCOPE, None, chunk)
+            if resume is not None:
+                interpreter.deoptimise(node)
+                done = (resume - chunk.start) // chunk.step
+                self.steps += done * per_iteration
+                return index + done
+            self.steps += len(chunk) * per_iteration
+            index += len(chunk)
+        return index
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        resumed = self.resume(node) is not None
+        condition = node.condition
+        self.path.append(["WhileLoop"])
+        while resumed or self.interpreter.visit(condition):
+            resumed = False
+            self.visit(node.body)
+        self.path.pop()
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.resume(node)
+        condition = node.condition
+        self.path.append(["RepeatLoop"])
+        while True:
+            self.visit(node.body)
+            if self.interpreter.visit(condition):
+                break
+        self.path.pop()
@@ -0,0 +1,228 @@
+from .exception import ExceptionHandler
+from .nodevisitor import NodeVisitor
+from .token import TokenType
+from .lexer import Lexer
+from .parser import Parser
+from .optional import optional_import
+from .vectorizer import VectorEvaluator
+from .ast import *
+import functools
+import logging
+import operator
+
+def checked(operation: "function", product: bool = False) -> "function":
+    """
+    Wraps an arithmetic operator, so it throws an OverflowError where NumPy's INTEGER arithmetic would wrap around
+
+    :param operation: The operator, taking two operands
+    :type operation: function
+    :param product: Whether the operator multiplies its operands
+    :type product: bool
+    :rtype: function
+    """
+    def apply(left: any, right: any) -> any:
+        VectorEvaluator.check_overflow(left, right, product)
+        return operation(left, right)
+
+    return apply
+
+def divide(left: any, right: any) -> any:
+    """
+    Divides like the interpreter, throwing a ZeroDivisionError if any divisor is zero, where NumPy would give inf or nan
+
+    :param left: The dividend
+    :type left: any
+    :param right: The divisor
+    :type right: any
+    :rtype: any
+    """
+    zero = right == 0
+    if zero.any() if hasattr(zero, "any") else zero:
+        raise ZeroDivisionError("division by zero")
+    return left / right
+
+# The functions operators are compiled to in checked expressions
+CHECKED_OPERATIONS = {
+    "add": checked(operator.add),
+    "sub": checked(operator.sub),
+    "mul": checked(operator.mul, product=True),
+    "div": divide,
+    "neg": lambda value: checked(operator.sub)(0, value),
+}
+
+class ExpressionCompiler(NodeVisitor):
+    """
+    Translates an expression AST into the source code of an equivalent Python expression. Variables are renamed with a
+    "v_" prefix, so identifiers that happen to be Python keywords or builtins cannot clash with generated code
+
+    :param checked: Whether arithmetic is compiled to calls to the functions in CHECKED_OPERATIONS, which detect INTEGER
+        overflow and division by zero in NumPy arrays
+    :type checked: bool
+    """
+    OPERATORS = {
+        TokenType.PLUS: "+",
+        TokenType.MINUS: "-",
+        TokenType.MUL: "*",
+        TokenType.DIV: "/",
+    }
+    CHECKED = {
+        TokenType.PLUS: "add",
+        TokenType.MINUS: "sub",
+        TokenType.MUL: "mul",
+        TokenType.DIV: "div",
+    }
+
+    def __init__(self, checked: bool = False):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.checked: bool = checked
+        self.names: list[str] = []
+
+    def generic_visit(self, node: AST):
+        self.ExceptionHandler.raise_exception(f"{type(node).__name__} is not supported in compiled expressions")
+
+    def visit_Num(self, node: Num) -> str:
+        return repr(node.value)
+
+    def visit_Variable(self, node: Variable) -> str:
+        if node.value not in self.names:
+            self.names.append(node.value)
+        return f"v_{node.value}"
+
+    def visit_UnaryOP(self, node: UnaryOP) -> str:
+        if self.checked and node.op.type == TokenType.MINUS:
+            return f"neg({self.visit(node.expr)})"
+        return f"({self.OPERATORS[node.op.type]}{self.visit(node.expr)})"
+
+    def visit_BinOP(self, node: BinOP) -> str:
+        if node.op.type not in self.OPERATORS:
+            self.ExceptionHandler.raise_exception(f"Operator {node.op.value} is not supported in compiled expressions")
+        if self.checked and node.op.type in self.CHECKED:
+            return f"{self.CHECKED[node.op.type]}({self.visit(node.left)}, {self.visit(node.right)})"
+        return f"({self.visit(node.left)} {self.OPERATORS[node.op.type]} {self.visit(node.right)})"
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+
+
+class CompiledExpression(object):
+    """
+    An expression compiled into a Python function, which can be evaluated against a single set of variable bindings or
+    against whole columns of values at once. Created through compile_expression()
+
+    :param source: The source code of the expression
+    :type source: str
+    :param names: The names of the variables used in the expression, in order of first use
+    :type names: list[str]
+    :param python_source: Source code of the equivalent Python expression
+    :type python_source: str
+    :param batch_source: Source code of the equivalent Python expression with its arithmetic checked for INTEGER
+        overflow and division by zero, used to evaluate batches
+    :type batch_source: str
+    """
+    def __init__(self, source: str, names: list[str], python_source: str, batch_source: str):
+        self.source: str = source
+        self.names: tuple[str, ...] = tuple(names)
+        self.python_source: str = python_source
+        self.batch_source: str = batch_source
+        arguments = ", ".join(f"v_{name}" for name in names)
+        self.func = eval(compile(f"lambda {arguments}: {python_source}", f"<expression {source!r}>", "eval"), {})
+        self.batch_func = eval(
+            compile(f"lambda {arguments}: {batch_source}", f"<expression {source!r}>", "eval"), dict(CHECKED_OPERATIONS)
+        )
+
+    def arguments(self, bindings: dict) -> list:
+        try:
+            return [bindings[name] for name in self.names]
+        except KeyError as error:
+            raise NameError(repr(error.args[0])) from None
+
+    def evaluate(self, bindings: dict | None = None) -> any:
+        """
+        Evaluates the expression with a single set of variable bindings
+
+        :param bindings: The value of each variable used in the expression (extra keys are ignored)
+        :type bindings: dict
+        :return: The value of the expression
+        :rtype: any
+        """
+        return self.func(*self.arguments(bindings or {}))
+
+    def evaluate_batch(self, columns: dict, size: int | None = None) -> "numpy.ndarray | list":
+        """
+        Evaluates the expression for every row of a batch of variable bindings, given as one column of values per
+        variable. With NumPy installed the whole batch is evaluated in a single vectorized call, returning an array.
+        Otherwise the expression is evaluated row by row, returning a list.
+
+        INTEGERs are computed exactly, as by the interpreter: if NumPy's 64 bit INTEGER arithmetic could overflow, the
+        batch is evaluated row by row instead (giving an array of Python ints if any result does not fit in 64 bits)
+
+        :param columns: A column of values (NumPy array or any sequence) for each variable used in the expression. All
+            columns must have the same length
+        :type columns: dict
+        :param size: The number of rows, if not the length of the columns (needed when no columns are given)
+        :type size: int | None
+        :return: The value of the expression for each row
+        :rtype: numpy.ndarray | list
+        """
+        arguments = self.arguments(columns)
+        if size is None:
+            size = len(next(iter(columns.values()))) if columns else 0
+        numpy = optional_import("numpy")
+        if numpy is None:
+            return self.evaluate_rows(arguments, size)
+        if not arguments:
+            # Without variables the expression has the same value for every row
+            return numpy.full(size, self.func())
+
+        arguments = [numpy.asarray(column) for column in arguments]
+        # Division by zero is checked for as the interpreter throws ZeroDivisionError for it. Other REAL arithmetic
+        # gives nan or inf as in Python (eg. inf - inf), without a warning
+        with numpy.errstate(all="ignore"):
+            try:
+                result = self.batch_func(*arguments)
+            except OverflowError:
+                return numpy.array(self.evaluate_rows([column.tolist() for column in arguments], size))
+
+        return result
+
+    def evaluate_rows(self, arguments: list, size: int) -> list:
+        """
+        Evaluates the expression one row at a time
+
+        :param arguments: A column of values for each variable used in the expression, in order
+        :type arguments: list
+        :param size: The number of rows
+        :type size: int
+        :rtype: list
+        """
+        if not arguments:
+            return [self.func()] * size
+        return [self.func(*row) for row in zip(*arguments)]
+
+    def __str__(self):
+        return f"CompiledExpression({self.source!r})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(source: str) -> CompiledExpression:
+    """
+    Compiles an expression written in pseudocode (eg. "a * b + 1") into a CompiledExpression. Compiled expressions are
+    cached by their source text, so compiling the same formula again is free
+
+    :param source: The source code of the expression
+    :type source: str
+    :rtype: CompiledExpression()
+    """
+    parser = Parser(Lexer(source))
+    node = parser.expr()
+    if parser.cur_token.type != TokenType.EOF:
+        parser.ExceptionHandler.raise_exception(f"Unexpected {parser.cur_token.type} after expression")
+
+    compiler = ExpressionCompiler()
+    python_source = compiler.visit(node)
+    batch_source = ExpressionCompiler(checked=True).visit(node)
+    return CompiledExpression(source, compiler.names, python_source, batch_source)
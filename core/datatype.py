@@ -0,0 +1,56 @@
+from .strings import StringBuilder
+import enum
+
+class DataType(enum.Enum):
+    """
+    Data types supported by IGCSE pseudocode
+    """
+    INTEGER = "INTEGER"
+    REAL = "REAL"
+    STRING = "STRING"
+    BOOLEAN = "BOOLEAN"
+    CHAR = "CHAR"
+
+    @property
+    def is_numeric(self) -> bool:
+        """
+        Whether arithmetic operators can be applied to values of this data type
+
+        :rtype: bool
+        """
+        return self in (DataType.INTEGER, DataType.REAL)
+
+    def accepts(self, other: "DataType") -> bool:
+        """
+        Checks if a value of data type `other` can be stored in a variable of this data type. Apart from exact matches,
+        INTEGER values are implicitly widened into REAL variables, and CHAR values into STRING variables
+
+        :param other: The data type of the value being stored
+        :type other: DataType()
+        :rtype: bool
+        """
+        return (
+            self == other
+            or (self == DataType.REAL and other == DataType.INTEGER)
+            or (self == DataType.STRING and other == DataType.CHAR)
+        )
+
+    @classmethod
+    def of(cls, value: any) -> "DataType | None":
+        """
+        Returns the data type of a Python value produced by the interpreter, or None if it has no pseudocode equivalent
+
+        :param value: The value to inspect
+        :type value: any
+        :rtype: DataType() | None
+        """
+        # bool has to be tested before int as it is a subclass of int
+        if isinstance(value, bool):
+            return cls.BOOLEAN
+        if isinstance(value, int):
+            return cls.INTEGER
+        if isinstance(value, float):
+            return cls.REAL
+        if isinstance(value, (str, StringBuilder)):
+            return cls.STRING
+        return None
@@ -1,3 +1,4 @@
+from .metrics import ERRORS, PHASES
 import sys
 import logging
 
@@ -23,4 +24,5 @@ class ExceptionHandler():
         :return: N/A
         """
         self.logger.error(f"{self.source} error: {error_msg}")
+        ERRORS.inc(label=PHASES.get(self.source, "Interpreter"))
         sys.exit("Exception thrown. Please reference interpreter logs for details")
\ No newline at end of file
@@ -0,0 +1,286 @@
+from .exception import ExceptionHandler
+from .datatype import DataType
+from .streams import parse_value
+import codecs
+import logging
+
+class LineReader(object):
+    """
+    Reads a text file one line at a time, for READFILE. The file is read ahead in large blocks of bytes, and each block
+    is decoded, cut at its last line break and split into lines in one go, so reading a line is a pop from a list. Blocks
+    are decoded incrementally, so a character whose bytes are split between two blocks is decoded whole whatever the
+    encoding. Line terminators ("\\n" or "\\r\\n") are not included in the lines returned
+
+    :param path: Path of the file
+    :type path: str
+    :param buffer_size: Number of bytes read ahead at a time
+    :type buffer_size: int
+    :param encoding: Text encoding of the file
+    :type encoding: str
+    """
+    def __init__(self, path: str, buffer_size: int, encoding: str):
+        self.file = open(path, "rb", buffering=0)
+        self.buffer_size: int = buffer_size
+        self.encoding: str = encoding
+        self.decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(encoding)()
+        # The lines read ahead, last line first
+        self.lines: list[str] = []
+        # Text decoded after the last line break, which is the start of a line not read in full yet
+        self.tail: str = ""
+        self.exhausted: bool = False
+        # Lines read ahead so far, of which all but those still in `lines` have been read
+        self.buffered: int = 0
+
+    def fill(self) -> bool:
+        """
+        Reads ahead until at least one line is buffered
+
+        :return: False if the end of the file has been reached
+        :rtype: bool
+        """
+        while not self.lines:
+            if self.exhausted:
+                return False
+            block = self.file.read(self.buffer_size)
+            self.exhausted = not block
+            data = self.tail + self.decoder.decode(block, final=self.exhausted)
+            # At the end of the file the last line may not end with a line break
+            end = len(data) if self.exhausted else data.rfind("\n") + 1
+            data, self.tail = data[:end], data[end:]
+            if data:
+                lines = data.replace("\r\n", "\n").split("\n")
+                if lines[-1]:
+                    lines[-1] = lines[-1].rstrip("\r")
+                else:
+                    lines.pop()
+                lines.reverse()
+                self.lines = lines
+                self.buffered += len(lines)
+        return True
+
+    def read_line(self) -> str | None:
+        """
+        Returns the next line, or None at the end of the file
+
+        :rtype: str | None
+        """
+        if not self.lines and not self.fill():
+            return None
+        return self.lines.pop()
+
+    def at_end(self) -> bool:
+        return not self.lines and not self.fill()
+
+    def position(self) -> int:
+        """
+        Returns the number of lines read
+
+        :rtype: int
+        """
+        return self.buffered - len(self.lines)
+
+    def skip(self, count: int):
+        """
+        Skips lines, as many at a time as have been read ahead
+
+        :param count: The number of lines to skip
+        :type count: int
+        """
+        while count and (self.lines or self.fill()):
+            taken = min(count, len(self.lines))
+            del self.lines[len(self.lines) - taken:]
+            count -= taken
+
+    def close(self):
+        self.file.close()
+
+
+class LineWriter(object):
+    """
+    Writes lines to a text file, for WRITEFILE. Lines are kept in memory and written out in bulk, encoded in a single
+    call, once at least `buffer_size` characters are pending or the file is closed
+
+    :param path: Path of the file
+    :type path: str
+    :param append: Whether to add to the end of the file rather than replacing its contents
+    :type append: bool
+    :param buffer_size: Number of pending characters that triggers a write
+    :type buffer_size: int
+    :param encoding: Text encoding of the file
+    :type encoding: str
+    """
+    def __init__(self, path: str, append: bool, buffer_size: int, encoding: str):
+        self.file = open(path, "ab" if append else "wb", buffering=0)
+        self.buffer_size: int = buffer_size
+        self.encoding: str = encoding
+        self.parts: list[str] = []
+        self.pending: int = 0
+
+    def write_line(self, text: str):
+        self.parts.append(text)
+        self.parts.append("\n")
+        self.pending += len(text) + 1
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.file.write("".join(self.parts).encode(self.encoding))
+            self.parts.clear()
+            self.pending = 0
+
+    def size(self) -> int:
+        """
+        Writes out what is pending, and returns the size of the file
+
+        :rtype: int
+        """
+        self.flush()
+        return self.file.tell()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+
+
+class FileTable(object):
+    """
+    The files opened by a program with OPENFILE, by the name they were opened with. A file is opened for READ, WRITE
+    (replacing its contents) or APPEND, and stays open until CLOSEFILE or the end of the program
+
+    :param buffer_size: Number of bytes read ahead, or characters held before being written, for each file
+    :type buffer_size: int
+    :param encoding: Text encoding of the files
+    :type encoding: str
+    """
+    def __init__(self, buffer_size: int = 1 << 20, encoding: str = "utf-8"):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.buffer_size: int = buffer_size
+        self.encoding: str = encoding
+        # Files open for READ, and files open for WRITE or APPEND, kept apart so finding a handle is a single lookup
+        self.readers: dict[str, LineReader] = {}
+        self.writers: dict[str, LineWriter] = {}
+
+    def open(self, name: str, mode: str):
+        """
+        Opens a file
+
+        :param name: Path of the file
+        :type name: str
+        :param mode: READ, WRITE or APPEND
+        :type mode: str
+        """
+        name = str(name)
+        if name in self.readers or name in self.writers:
+            self.ExceptionHandler.raise_exception(f"File {name!r} is already open")
+        try:
+            if mode == "READ":
+                self.readers[name] = LineReader(name, self.buffer_size, self.encoding)
+            else:
+                self.writers[name] = LineWriter(name, mode == "APPEND", self.buffer_size, self.encoding)
+        except OSError as error:
+            self.ExceptionHandler.raise_exception(f"Cannot open file {name!r} for {mode}: {error.strerror}")
+        self.logger.info(f"Opened file {name!r} for {mode}")
+
+    def handle(self, name: str, reading: bool) -> LineReader | LineWriter:
+        """
+        Returns the handle of an open file, which must have been opened for reading or for writing. Only called when
+        the name is not found directly, so it may still need converting to a string
+
+        :rtype: LineReader() | LineWriter()
+        """
+        name = str(name)
+        handles, others = (self.readers, self.writers) if reading else (self.writers, self.readers)
+        if name in handles:
+            return handles[name]
+        if name in others:
+            self.ExceptionHandler.raise_exception(
+                f"File {name!r} is not open for {'READ' if reading else 'WRITE or APPEND'}"
+            )
+        self.ExceptionHandler.raise_exception(f"File {name!r} is not open")
+
+    def read_line(self, name: str) -> str:
+        """
+        Returns the next line of a file open for READ
+
+        :rtype: str
+        """
+        reader = self.readers.get(name) or self.handle(name, True)
+        if reader.lines:
+            return reader.lines.pop()
+        line = reader.read_line()
+        if line is None:
+            self.ExceptionHandler.raise_exception(f"No more lines to read from file {str(name)!r}")
+        return line
+
+    def read_value(self, name: str, data_type: DataType | None) -> any:
+        """
+        Reads the next line of a file open for READ, converted to a data type as INPUT would
+
+        :param name: The name of the file
+        :type name: str
+        :param data_type: The data type of the variable being read into
+        :type data_type: DataType() | None
+        :rtype: any
+        """
+        text = self.read_line(name)
+        try:
+            return parse_value(text, data_type)
+        except ValueError:
+            self.ExceptionHandler.raise_exception(f"Invalid {data_type.value} in file {str(name)!r}: {repr(text)}")
+
+    def write_line(self, name: str, text: str):
+        (self.writers.get(name) or self.handle(name, False)).write_line(text)
+
+    def eof(self, name: str) -> bool:
+        """
+        Whether every line of a file open for READ has been read
+
+        :rtype: bool
+        """
+        reader = self.readers.get(name) or self.handle(name, True)
+        return not reader.lines and not reader.fill()
+
+    def close(self, name: str):
+        name = str(name)
+        handle = self.readers.pop(name, None) or self.writers.pop(name, None)
+        if handle is None:
+            self.ExceptionHandler.raise_exception(f"File {name!r} is not open")
+        handle.close()
+
+    def cursors(self) -> list[tuple[str, str, int]]:
+        """
+        Returns how far each open file has got, for checkpoints: the number of lines read from each file open for READ,
+        and the size of each file open for WRITE or APPEND once what is pending has been written out
+
+        :rtype: list[tuple[str, str, int]]
+        """
+        cursors = [(name, "READ", reader.position()) for name, reader in self.readers.items()]
+        cursors += [(name, "APPEND", writer.size()) for name, writer in self.writers.items()]
+        return cursors
+
+    def restore(self, cursors: list[tuple[str, str, int]]):
+        """
+        Reopens the files returned by cursors() where they had got to. Anything written to a file after its size was
+        taken is discarded, and it is appended to from there
+
+        :param cursors: The files, as returned by cursors()
+        :type cursors: list[tuple[str, str, int]]
+        """
+        for name, mode, position in cursors:
+            self.open(name, mode)
+            if mode == "READ":
+                self.readers[name].skip(position)
+            else:
+                self.writers[name].file.truncate(position)
+
+    def close_all(self):
+        """
+        Closes every file still open, writing out what is pending
+        """
+        for handles in (self.readers, self.writers):
+            while handles:
+                handles.popitem()[1].close()
@@ -0,0 +1,122 @@
+import sys
+import threading
+
+# Programs with subroutines are run on a thread with a large stack, so deep recursion in the program is not limited by
+# the default size of the interpreter's own stack. The stack is only reserved: memory is used as recursion reaches it.
+# Each call in the program nests 7 to 9 Python frames. Python keeps frames on the heap, but calls made through C (such
+# as to memoized FUNCTIONs) also take up to about 90 bytes of the stack per frame, so the recursion limit allows each
+# frame 160 bytes of the stack, and deep recursion ends with a RecursionError rather than overflowing it
+DEEP_STACK_SIZE = 1024 * 1024 * 1024
+DEEP_RECURSION_LIMIT = DEEP_STACK_SIZE // 160
+
+class Reference(object):
+    """
+    Reference to a variable or array element passed to a BYREF parameter. Reading or writing the parameter reads or
+    writes the caller's variable through the reference
+
+    :param container: What holds the variable: the global scope, a call frame, or an array
+    :type container: dict | list | TypedArray()
+    :param key: The variable's name, slot or index in the container
+    :type key: str | int | tuple[int, ...]
+    """
+    __slots__ = ("container", "key")
+
+    def __init__(self, container: any, key: any):
+        self.container = container
+        self.key = key
+
+    def get(self) -> any:
+        return self.container[self.key]
+
+    def set(self, value: any):
+        self.container[self.key] = value
+
+
+class FramePool(object):
+    """
+    Free list of call frames for a single subroutine. A frame is a list with one slot per parameter or local variable;
+    frames are taken from the pool on each call and returned to it (cleared) afterwards, so calls do not allocate
+
+    :param slot_count: The number of slots in each frame
+    :type slot_count: int
+    """
+    __slots__ = ("free", "empty")
+
+    def __init__(self, slot_count: int):
+        self.free: list[list] = []
+        self.empty: tuple = (None,) * slot_count
+
+    def acquire(self) -> list:
+        """
+        Returns a frame with every slot empty
+
+        :rtype: list
+        """
+        if self.free:
+            return self.free.pop()
+        return list(self.empty)
+
+    def release(self, frame: list):
+        """
+        Clears a frame that is no longer in use and returns it to the pool
+
+        :param frame: The frame
+        :type frame: list
+        """
+        frame[:] = self.empty
+        self.free.append(frame)
+
+
+class ReturnSignal(Exception):
+    """
+    Raised by a RETURN statement nested inside other statements (such as an IF) to unwind to the FUNCTION call
+
+    :param value: The value returned
+    :type value: any
+    """
+    def __init__(self, value: any):
+        self.value = value
+
+
+def run_with_deep_stack(func, args: tuple, recursion_limit: int, stack_size: int) -> any:
+    """
+    Calls a function on a separate thread with a large stack and recursion limit, so deeply recursive subroutines do not
+    overflow the stack. Exceptions are rethrown on the calling thread
+
+    :param func: The function to call
+    :type func: function
+    :param args: The arguments to call the function with
+    :type args: tuple
+    :param recursion_limit: The minimum recursion limit while the function runs
+    :type recursion_limit: int
+    :param stack_size: The stack size of the thread, in bytes
+    :type stack_size: int
+    :return: The result of the function
+    :rtype: any
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func(*args)
+        except BaseException as error:
+            outcome["error"] = error
+
+    previous_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(previous_limit, recursion_limit))
+    try:
+        previous_size = threading.stack_size(stack_size)
+        try:
+            thread = threading.Thread(target=run, name="pseudocode-interpreter")
+            thread.start()
+        finally:
+            # Only this thread needs the large stack
+            threading.stack_size(previous_size)
+        thread.join()
+    finally:
+        # The recursion limit is shared by every thread, so is raised only while the function runs
+        sys.setrecursionlimit(previous_limit)
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
@@ -0,0 +1,361 @@
+from .token import TokenType
+from .exception import ExceptionHandler
+import argparse
+import hashlib
+import logging
+import os
+import re
+import textwrap
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "grammar", "syntax.txt")
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parsetable.py")
+
+# Token types of the terminals written by their spelling in the grammar
+LITERALS = {
+    ";": "SEMI",
+    ":": "COLON",
+    ",": "COMMA",
+    "<-": "ASSIGN",
+    "=": "EQ",
+    "==": "EQEQ",
+    "<>": "NOTEQ",
+    "<": "LTHAN",
+    "<=": "LTEQ",
+    ">": "GTHAN",
+    ">=": "GTEQ",
+    "+": "PLUS",
+    "-": "MINUS",
+    "*": "MUL",
+    "/": "DIV",
+    "&": "CONCAT",
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "[": "LBRACKET",
+    "]": "RBRACKET",
+}
+
+SYMBOL = re.compile(r'\s*(?:(<[a-z_]+>)|(::=)|"([^"]+)"|#([a-z_]+)|([A-Z]+)|([{}\[\]()|]))')
+
+
+def is_nonterminal(symbol: str) -> bool:
+    return symbol[0] == "<"
+
+
+def is_action(symbol: str) -> bool:
+    return symbol[0] == "#"
+
+
+class Grammar(object):
+    """
+    A context-free grammar read from the EBNF notation of grammar/syntax.txt, with the FIRST and FOLLOW sets of its
+    nonterminals and its LL(1) parse table. Repetitions, options and groups are rewritten into plain productions of
+    new nonterminals named after the rule they appear in (eg. <expr.1>), and semantic actions are kept in the
+    productions as symbols which match nothing
+
+    :param text: The grammar
+    :type text: str
+    """
+    def __init__(self, text: str):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.digest: str = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        # The productions, in order, as the nonterminal expanded and the symbols it expands into
+        self.productions: list[tuple[str, tuple[str, ...]]] = []
+        self.rules: dict[str, list[int]] = {}
+        self.read(text)
+
+        self.nullable: set[str] = set()
+        self.first: dict[str, set[str]] = {name: set() for name in self.rules}
+        self.follow: dict[str, set[str]] = {name: set() for name in self.rules}
+        self.compute_first()
+        self.compute_follow()
+        # Tokens which could either continue a construct or follow it, resolved in favour of continuing it
+        self.resolved: list[tuple[str, str]] = []
+        self.table: dict[str, dict[str, int]] = self.build_table()
+
+    def read(self, text: str):
+        """
+        Reads the rules of the grammar into productions
+
+        :param text: The grammar
+        :type text: str
+        """
+        text = "\n".join(line.split("//", 1)[0] for line in text.splitlines())
+        symbols = []
+        pos = 0
+        while text[pos:].strip():
+            match = SYMBOL.match(text, pos)
+            if match is None:
+                self.ExceptionHandler.raise_exception(f"Invalid grammar symbol: {text[pos:].split()[0]}")
+            nonterminal, define, literal, action, terminal, punctuation = match.groups()
+            if literal is not None:
+                if literal not in LITERALS:
+                    self.ExceptionHandler.raise_exception(f"Unknown terminal {literal!r} in grammar")
+                symbols.append(LITERALS[literal])
+            elif terminal is not None:
+                if TokenType.get_token_type(terminal) is None:
+                    self.ExceptionHandler.raise_exception(f"Unknown token type {terminal} in grammar")
+                symbols.append(terminal)
+            elif action is not None:
+                symbols.append(f"#{action}")
+            else:
+                symbols.append(nonterminal or define or punctuation)
+            pos = match.end()
+
+        self.symbols: list[str] = symbols
+        self.pos: int = 0
+        self.counters: dict[str, int] = {}
+        while self.pos < len(symbols):
+            name = symbols[self.pos]
+            if not is_nonterminal(name) or self.peek(1) != "::=":
+                self.ExceptionHandler.raise_exception(f"Expected a rule, got {name} instead")
+            if name in self.rules:
+                self.ExceptionHandler.raise_exception(f"Rule {name} is defined more than once")
+            self.pos += 2
+            self.rules[name] = []
+            self.define(name, self.alternatives(name))
+
+        for lhs, rhs in self.productions:
+            for symbol in rhs:
+                if is_nonterminal(symbol) and symbol not in self.rules:
+                    self.ExceptionHandler.raise_exception(f"Rule {lhs} refers to undefined rule {symbol}")
+
+    def peek(self, ahead: int = 0) -> str | None:
+        pos = self.pos + ahead
+        return self.symbols[pos] if pos < len(self.symbols) else None
+
+    def define(self, name: str, alternatives: list[tuple[str, ...]]):
+        for alternative in alternatives:
+            self.rules[name].append(len(self.productions))
+            self.productions.append((name, alternative))
+
+    def alternatives(self, rule: str) -> list[tuple[str, ...]]:
+        """
+        Reads alternatives separated by |
+        Ruleset: <alternatives> ::= <sequence> {"|" <sequence>}
+
+        :param rule: The rule being read, which new nonterminals are named after
+        :type rule: str
+        :rtype: list[tuple[str, ...]]
+        """
+        alternatives = [self.sequence(rule)]
+        while self.peek() == "|":
+            self.pos += 1
+            alternatives.append(self.sequence(rule))
+        return alternatives
+
+    def sequence(self, rule: str) -> tuple[str, ...]:
+        """
+        Reads the symbols of an alternative, up to the end of its group or rule
+        Ruleset: <sequence> ::= {<symbol> | "(" <alternatives> ")" | "[" <alternatives> "]" | "{" <alternatives> "}"}
+
+        :param rule: The rule being read, which new nonterminals are named after
+        :type rule: str
+        :rtype: tuple[str, ...]
+        """
+        symbols = []
+        while True:
+            symbol = self.peek()
+            if symbol is None or symbol in ("|", ")", "]", "}") or self.peek(1) == "::=":
+                return tuple(symbols)
+            self.pos += 1
+            if symbol not in ("(", "[", "{"):
+                symbols.append(symbol)
+                continue
+
+            alternatives = self.alternatives(rule)
+            closing = {"(": ")", "[": "]", "{": "}"}[symbol]
+            if self.peek() != closing:
+                self.ExceptionHandler.raise_exception(f"Expected {closing} in rule {rule}, got {self.peek()} instead")
+            self.pos += 1
+            if symbol == "(" and len(alternatives) == 1:
+                # A group of a single alternative needs no nonterminal of its own
+                symbols.extend(alternatives[0])
+                continue
+
+            self.counters[rule] = self.counters.get(rule, 0) + 1
+            name = f"{rule[:-1]}.{self.counters[rule]}>"
+            self.rules[name] = []
+            if symbol == "[":
+                alternatives.append(())
+            elif symbol == "{":
+                alternatives = [alternative + (name,) for alternative in alternatives] + [()]
+            self.define(name, alternatives)
+            symbols.append(name)
+
+    def first_of(self, symbols: tuple[str, ...]) -> tuple[set[str], bool]:
+        """
+        Returns the terminals which can start a sequence of symbols, and whether the sequence can match nothing
+
+        :rtype: tuple[set[str], bool]
+        """
+        first = set()
+        for symbol in symbols:
+            if is_action(symbol):
+                continue
+            if not is_nonterminal(symbol):
+                first.add(symbol)
+                return first, False
+            first |= self.first[symbol]
+            if symbol not in self.nullable:
+                return first, False
+        return first, True
+
+    def compute_first(self):
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                first, nullable = self.first_of(rhs)
+                if not first <= self.first[lhs]:
+                    self.first[lhs] |= first
+                    changed = True
+                if nullable and lhs not in self.nullable:
+                    self.nullable.add(lhs)
+                    changed = True
+
+    def compute_follow(self):
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                for index, symbol in enumerate(rhs):
+                    if not is_nonterminal(symbol):
+                        continue
+                    follow, nullable = self.first_of(rhs[index + 1:])
+                    if nullable:
+                        follow |= self.follow[lhs]
+                    if not follow <= self.follow[symbol]:
+                        self.follow[symbol] |= follow
+                        changed = True
+
+    def build_table(self) -> dict[str, dict[str, int]]:
+        """
+        Builds the LL(1) parse table: for each nonterminal, the production to expand it with for each token which can
+        come next. A token which can start one production and follow a nonterminal which can match nothing selects the
+        production it starts; any other conflict is an error
+
+        :rtype: dict[str, dict[str, int]]
+        """
+        table = {name: {} for name in self.rules}
+        # Whether each entry was selected by a token starting the production rather than following it
+        starts = {name: {} for name in self.rules}
+        for number, (lhs, rhs) in enumerate(self.productions):
+            first, nullable = self.first_of(rhs)
+            entries = [(token, True) for token in first]
+            if nullable:
+                entries += [(token, False) for token in self.follow[lhs]]
+            for token, starting in entries:
+                existing = table[lhs].get(token)
+                if existing is None or existing == number:
+                    table[lhs][token] = number
+                    starts[lhs][token] = starting
+                elif starting != starts[lhs][token]:
+                    self.resolved.append((lhs, token))
+                    if starting:
+                        table[lhs][token] = number
+                        starts[lhs][token] = starting
+                else:
+                    self.ExceptionHandler.raise_exception(
+                        f"Grammar is not LL(1): {lhs} can expand to both {self.describe(existing)} and "
+                        f"{self.describe(number)} before {token}"
+                    )
+        return table
+
+    def describe(self, number: int) -> str:
+        lhs, rhs = self.productions[number]
+        return " ".join(symbol for symbol in rhs if not is_action(symbol)) or "nothing"
+
+    def starts(self) -> list[str]:
+        """
+        Returns the nonterminals no rule refers to, which are the start symbols of the grammar
+
+        :rtype: list[str]
+        """
+        used = {symbol for _, rhs in self.productions for symbol in rhs}
+        return [name for name in self.rules if name not in used]
+
+    def emit(self) -> str:
+        """
+        Returns the source code of the module holding the parse table. Each production is listed once, and each row of
+        the table only lists the tokens which do not make the nonterminal a syntax error, grouped by production
+
+        :rtype: str
+        """
+        lines = [
+            '"""',
+            "LL(1) parse table of the pseudocode, generated from grammar/syntax.txt by core.grammar. Do not edit: regenerate",
+            "it with python -m core.grammar",
+            '"""',
+            "",
+            "# SHA-256 digest of the grammar the table was generated from",
+            f"GRAMMAR_DIGEST = {self.digest!r}",
+            "",
+            "# The nonterminals parsing can start from",
+            f"STARTS = {tuple(self.starts())!r}",
+            "",
+            "# The productions, by number, as the nonterminal expanded and the symbols it expands into: nonterminals in <>,",
+            "# actions after #, and the names of token types",
+            "PRODUCTIONS = (",
+        ]
+        for number, (lhs, rhs) in enumerate(self.productions):
+            wrapped = textwrap.wrap(f"({lhs!r}, {rhs!r}),  # {number}", width=116)
+            lines.append(f"    {wrapped[0]}")
+            lines += [f"        {line}" for line in wrapped[1:]]
+        lines += [
+            ")",
+            "",
+            "# For each nonterminal, the production it is expanded with by the token types which can come next. Any other",
+            "# token type is a syntax error",
+            "TABLE = {",
+        ]
+        for name, row in self.table.items():
+            lines.append(f"    {name!r}: {{")
+            tokens = {}
+            for token, number in row.items():
+                tokens.setdefault(number, []).append(token)
+            for number in sorted(tokens):
+                names = ", ".join(repr(token) for token in sorted(tokens[number]))
+                wrapped = textwrap.wrap(f"{number}: ({names},),", width=108)
+                lines.append(f"        {wrapped[0]}")
+                lines += [f"            {line}" for line in wrapped[1:]]
+            lines.append("    },")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generates the LL(1) parse table of the pseudocode from its grammar")
+    arg_parser.add_argument("--grammar", default=GRAMMAR_PATH, help="path to the grammar")
+    arg_parser.add_argument("--output", default=TABLE_PATH, help="path of the module to write the table to")
+    arg_parser.add_argument(
+        "--check", action="store_true", help="only check that the table is up to date with the grammar"
+    )
+    args = arg_parser.parse_args()
+
+    with open(args.grammar, encoding="utf-8") as file:
+        grammar = Grammar(file.read())
+    source = grammar.emit()
+    if args.check:
+        try:
+            with open(args.output, encoding="utf-8") as file:
+                current = file.read()
+        except FileNotFoundError:
+            current = None
+        if current != source:
+            raise SystemExit(f"{args.output} is out of date with {args.grammar}")
+        print(f"{args.output} is up to date")
+        return
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        file.write(source)
+    entries = sum(len(row) for row in grammar.table.values())
+    print(
+        f"{len(grammar.rules)} nonterminals, {len(grammar.productions)} productions, {entries} table entries "
+        f"written to {args.output}"
+    )
+    for lhs, token in grammar.resolved:
+        print(f"{token} continues {lhs} rather than following it")
+
+if __name__ == "__main__":
+    main()
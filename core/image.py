@@ -0,0 +1,805 @@
+from .exception import ExceptionHandler
+from .nodevisitor import NodeVisitor
+from .token import TokenType
+from .lexer import Lexer
+from .parser import Parser
+from .typechecker import TypeChecker
+from .datatype import DataType
+from .storage import TypedArray
+from .strings import StringBuilder
+from .builtins import BUILTINS
+from .streams import OutputSink, InputSource, ConsoleOutput, ConsoleInput, format_value, parse_value
+from .frames import Reference, FramePool, ReturnSignal, run_with_deep_stack, DEEP_RECURSION_LIMIT, DEEP_STACK_SIZE
+from .jumptable import JumpTable
+from .files import FileTable
+from .ast import *
+import array
+import operator
+import pickle
+import struct
+import logging
+
+# Every kind of node a program image can hold, in the order of their kind numbers. IntBinOP, RealBinOP and CompareOP are
+# stored as BinOP, as the executor dispatches on the operator either way
+KINDS = (
+    "Compound",
+    "NoOP",
+    "Num",
+    "String",
+    "Boolean",
+    "Variable",
+    "BinOP",
+    "UnaryOP",
+    "Assign",
+    "ArrayElement",
+    "VarDecl",
+    "ForLoop",
+    "WhileLoop",
+    "IfStatement",
+    "SubroutineDecl",
+    "Param",
+    "Return",
+    "ProcedureCall",
+    "FunctionCall",
+    "Output",
+    "Input",
+    "LogicalOP",
+    "RepeatLoop",
+    "CaseStatement",
+    "OpenFile",
+    "ReadFile",
+    "WriteFile",
+    "CloseFile",
+    "EndOfFile",
+)
+KIND_NUMBERS = {kind: number for number, kind in enumerate(KINDS)}
+TOKEN_TYPES = tuple(TokenType)
+TOKEN_TYPE_NUMBERS = {token_type: number for number, token_type in enumerate(TOKEN_TYPES)}
+DATA_TYPES = tuple(DataType)
+DATA_TYPE_NUMBERS = {data_type: number for number, data_type in enumerate(DATA_TYPES)}
+
+# Fields are stored as 32 bit integers; missing children, slots and types are stored as NONE
+NONE = -1
+
+class ProgramImage(object):
+    """
+    A type checked program flattened into a position-independent binary image, which can be executed directly by an
+    ImageExecutor without rebuilding its AST. As the image holds no pointers, a single copy can be placed in shared
+    memory and executed by any number of worker processes at once (see SharedProgramImage).
+
+    Layout (native byte order):
+
+    - Header: magic number, format version, node count, operand count, root node, size of the constant pool
+    - Kinds: the kind number of each node (int32 array)
+    - Starts: where the operands of each node start, plus the end of the last node's (int32 array)
+    - Operands: the fields of every node in turn: child node numbers, constant pool indices, operator and data type
+      numbers, slots and flags (int32 array)
+    - Constant pool: pickled tuple of every number, string and name used by the program
+
+    Nodes are numbered in post-order, so every node comes after its children and the root node is the last one.
+
+    Images are flattened from a type checked AST (from_tree()), or built from source code one statement at a time
+    (parse()), in which case they are a compact arena holding the program in place of its AST.
+
+    :param buffer: The bytes of the image. Any buffer (including a shared memory block) is used without being copied
+    :type buffer: bytes | bytearray | memoryview
+    """
+    MAGIC = b"PIMG"
+    VERSION = 4
+    HEADER = struct.Struct("=4sIIIII")
+
+    def __init__(self, buffer: bytes | bytearray | memoryview):
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.buffer: memoryview = memoryview(buffer).cast("B")
+        magic, version, node_count, operand_count, root, constants_size = self.HEADER.unpack_from(self.buffer)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.ExceptionHandler.raise_exception("Not a program image of a supported version")
+
+        offset = self.HEADER.size
+        self.kinds: memoryview = self.buffer[offset:offset + node_count * 4].cast("i")
+        offset += node_count * 4
+        self.starts: memoryview = self.buffer[offset:offset + (node_count + 1) * 4].cast("i")
+        offset += (node_count + 1) * 4
+        self.operands: memoryview = self.buffer[offset:offset + operand_count * 4].cast("i")
+        offset += operand_count * 4
+        self.constants: tuple = pickle.loads(self.buffer[offset:offset + constants_size])
+        self.size: int = offset + constants_size
+        self.root: int = root
+
+    @classmethod
+    def from_tree(cls, tree: AST) -> "ProgramImage":
+        """
+        Flattens a type checked AST into an image
+
+        :param tree: Root node of the AST
+        :type tree: AST()
+        :rtype: ProgramImage()
+        """
+        return cls(ImageBuilder().build(tree))
+
+    @classmethod
+    def compile(cls, source: str) -> "ProgramImage":
+        """
+        Parses and type checks source code, then flattens it into an image
+
+        :param source: The source code of the program
+        :type source: str
+        :rtype: ProgramImage()
+        """
+        parser = Parser(Lexer(source))
+        checker = TypeChecker(parser.lexer.line_index)
+        return cls.from_tree(checker.check(parser.parse()))
+
+    @classmethod
+    def parse(cls, source: str) -> "ProgramImage":
+        """
+        Parses, type checks and flattens source code one top level statement at a time, so the AST of the whole program
+        is never built and the image is the only copy of the program held in memory. As when streaming, subroutines
+        must be declared before they are called
+
+        :param source: The source code of the program
+        :type source: str
+        :rtype: ProgramImage()
+        """
+        parser = Parser(Lexer(source))
+        checker = TypeChecker(parser.lexer.line_index)
+        builder = ImageBuilder()
+        statements = [builder.visit(checker.check_statement(statement)) for statement in parser.parse_statements()]
+        return cls(builder.finish(builder.node("Compound", *statements)))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tobytes(self) -> bytes:
+        return self.buffer[:self.size].tobytes()
+
+    def release(self):
+        """
+        Releases the views of the image's buffer, which must be done before a shared memory block holding it is closed
+        """
+        for view in (self.kinds, self.starts, self.operands, self.buffer):
+            view.release()
+
+    def execute(self, output_sink: OutputSink | None = None, input_source: InputSource | None = None) -> dict:
+        """
+        Executes the program held by the image
+
+        :param output_sink: Destination of OUTPUT statements (buffered standard output by default)
+        :type output_sink: OutputSink()
+        :param input_source: Source of INPUT statements (standard input by default)
+        :type input_source: InputSource()
+        :return: The global variables once the program has finished
+        :rtype: dict
+        """
+        executor = ImageExecutor(self, output_sink, input_source)
+        executor.run()
+        return executor.scope
+
+
+class ImageBuilder(NodeVisitor):
+    """
+    Flattens a type checked AST into the bytes of a ProgramImage
+    """
+    def __init__(self):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.kinds: array.array = array.array("i")
+        self.starts: array.array = array.array("i")
+        self.operands: array.array = array.array("i")
+        self.constants: list = []
+        self.constant_indices: dict = {}
+
+    def build(self, tree: AST) -> bytes:
+        """
+        Returns the bytes of the image of an AST
+
+        :param tree: Root node of a type checked AST
+        :type tree: AST()
+        :rtype: bytes
+        """
+        return self.finish(self.visit(tree))
+
+    def finish(self, root: int) -> bytes:
+        """
+        Returns the bytes of the image of the nodes appended so far
+
+        :param root: The number of the root node
+        :type root: int
+        :rtype: bytes
+        """
+        self.starts.append(len(self.operands))
+        constants = pickle.dumps(tuple(self.constants), protocol=pickle.HIGHEST_PROTOCOL)
+        header = ProgramImage.HEADER.pack(
+            ProgramImage.MAGIC, ProgramImage.VERSION, len(self.kinds), len(self.operands), root, len(constants)
+        )
+        self.logger.info(f"Built program image of {len(self.kinds)} nodes, {len(self.constants)} constants")
+        return b"".join((header, self.kinds, self.starts, self.operands, constants))
+
+    def generic_visit(self, node: AST):
+        self.ExceptionHandler.raise_exception(f"{type(node).__name__} cannot be stored in a program image")
+
+    def node(self, kind: str, *operands: int) -> int:
+        """
+        Appends a node whose children have all been appended already, and returns its number
+
+        :param kind: The kind of node
+        :type kind: str
+        :param operands: The node's fields
+        :type operands: int
+        :rtype: int
+        """
+        self.kinds.append(KIND_NUMBERS[kind])
+        self.starts.append(len(self.operands))
+        self.operands.extend(operands)
+        return len(self.kinds) - 1
+
+    def constant(self, value: any) -> int:
+        """
+        Returns the index of a value in the constant pool, adding it if it is not there yet
+
+        :rtype: int
+        """
+        # The type is part of the key, so 1, 1.0 and TRUE are kept apart
+        key = (type(value), value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    @staticmethod
+    def data_type(node: AST) -> int:
+        data_type = getattr(node, "type", None)
+        return DATA_TYPE_NUMBERS[data_type] if data_type is not None else NONE
+
+    def optional(self, node: AST | None) -> int:
+        return self.visit(node) if node is not None else NONE
+
+    def visit_Compound(self, node: Compound) -> int:
+        children = [self.visit(child) for child in node.children]
+        return self.node("Compound", *children)
+
+    def visit_NoOP(self, node: NoOP) -> int:
+        return self.node("NoOP")
+
+    def visit_Num(self, node: Num) -> int:
+        return self.node("Num", self.constant(node.value))
+
+    def visit_String(self, node: String) -> int:
+        return self.node("String", self.constant(node.value))
+
+    def visit_Boolean(self, node: Boolean) -> int:
+        return self.node("Boolean", self.constant(node.value))
+
+    def visit_Variable(self, node: Variable) -> int:
+        slot = node.slot if node.slot is not None else NONE
+        return self.node("Variable", self.constant(node.value), slot, int(node.byref), self.data_type(node))
+
+    def visit_BinOP(self, node: BinOP) -> int:
+        left, right = self.visit(node.left), self.visit(node.right)
+        return self.node("BinOP", TOKEN_TYPE_NUMBERS[node.op.type], left, right)
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+
+    def visit_LogicalOP(self, node: LogicalOP) -> int:
+        left, right = self.visit(node.left), self.visit(node.right)
+        return self.node("LogicalOP", TOKEN_TYPE_NUMBERS[node.op.type], left, right)
+
+    def visit_UnaryOP(self, node: UnaryOP) -> int:
+        return self.node("UnaryOP", TOKEN_TYPE_NUMBERS[node.op.type], self.visit(node.expr))
+
+    def visit_Assign(self, node: Assign) -> int:
+        left, right = self.visit(node.left), self.visit(node.right)
+        return self.node("Assign", left, right)
+
+    def visit_ArrayElement(self, node: ArrayElement) -> int:
+        var_node = self.visit(node.var_node)
+        indices = [self.visit(index) for index in node.indices]
+        return self.node("ArrayElement", var_node, *indices)
+
+    def visit_VarDecl(self, node: VarDecl) -> int:
+        var_node = self.visit(node.var_node)
+        type_node = node.type_node
+        if not isinstance(type_node, ArrayType):
+            return self.node("VarDecl", var_node, self.constant(type_node.value))
+        bounds = [self.visit(bound) for pair in type_node.bounds for bound in pair]
+        return self.node("VarDecl", var_node, self.constant(type_node.element_type.value), *bounds)
+
+    def visit_ForLoop(self, node: ForLoop) -> int:
+        var_node, start, end = self.visit(node.var_node), self.visit(node.start), self.visit(node.end)
+        step = self.optional(node.step)
+        return self.node("ForLoop", var_node, start, end, step, self.visit(node.body))
+
+    def visit_WhileLoop(self, node: WhileLoop) -> int:
+        condition = self.visit(node.condition)
+        return self.node("WhileLoop", condition, self.visit(node.body))
+
+    def visit_RepeatLoop(self, node: RepeatLoop) -> int:
+        body = self.visit(node.body)
+        return self.node("RepeatLoop", body, self.visit(node.condition))
+
+    def visit_IfStatement(self, node: IfStatement) -> int:
+        condition, then_body = self.visit(node.condition), self.visit(node.then_body)
+        return self.node("IfStatement", condition, then_body, self.optional(node.else_body))
+
+    def visit_CaseStatement(self, node: CaseStatement) -> int:
+        expr = self.visit(node.expr)
+        branches = []
+        for branch in node.branches:
+            branches += [self.visit(branch.low), self.optional(branch.high), self.visit(branch.body)]
+        return self.node("CaseStatement", expr, self.optional(node.otherwise), *branches)
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl) -> int:
+        params = [self.visit(param) for param in node.params]
+        body = self.visit(node.body)
+        is_function = int(node.return_type is not None)
+        return self.node("SubroutineDecl", self.constant(node.name), body, is_function, node.slot_count, *params)
+
+    def visit_Param(self, node: Param) -> int:
+        return self.node("Param", self.visit(node.var_node), int(node.byref))
+
+    def visit_Return(self, node: Return) -> int:
+        return self.node("Return", self.visit(node.expr))
+
+    def visit_ProcedureCall(self, node: ProcedureCall) -> int:
+        args = [self.visit(arg) for arg in node.args]
+        return self.node("ProcedureCall", self.constant(node.name), *args)
+
+    def visit_FunctionCall(self, node: FunctionCall) -> int:
+        args = [self.visit(arg) for arg in node.args]
+        return self.node("FunctionCall", self.constant(node.name), int(node.subroutine is not None), *args)
+
+    def visit_Output(self, node: Output) -> int:
+        return self.node("Output", *[self.visit(expr) for expr in node.exprs])
+
+    def visit_Input(self, node: Input) -> int:
+        return self.node("Input", self.visit(node.var_node), self.data_type(node.var_node))
+
+    def visit_OpenFile(self, node: OpenFile) -> int:
+        return self.node("OpenFile", self.visit(node.filename), self.constant(node.mode))
+
+    def visit_ReadFile(self, node: ReadFile) -> int:
+        filename, var_node = self.visit(node.filename), self.visit(node.var_node)
+        return self.node("ReadFile", filename, var_node, self.data_type(node.var_node))
+
+    def visit_WriteFile(self, node: WriteFile) -> int:
+        filename, expr = self.visit(node.filename), self.visit(node.expr)
+        return self.node("WriteFile", filename, expr)
+
+    def visit_CloseFile(self, node: CloseFile) -> int:
+        return self.node("CloseFile", self.visit(node.filename))
+
+    def visit_EndOfFile(self, node: EndOfFile) -> int:
+        return self.node("EndOfFile", self.visit(node.filename))
+
+
+class ImageExecutor(object):
+    """
+    Executes a ProgramImage directly from its arrays, with the same semantics as the Interpreter. Nodes are never
+    rebuilt: each node is a number, and its fields are read from the image's operands as it is executed, so the only
+    memory an executor holds of its own is the constant pool and the program's variables
+
+    :param image: The image to execute
+    :type image: ProgramImage()
+    :param output_sink: Destination of OUTPUT statements (buffered standard output by default)
+    :type output_sink: OutputSink()
+    :param input_source: Source of INPUT statements (standard input by default)
+    :type input_source: InputSource()
+    """
+    OPERATIONS = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+        TokenType.DIV: operator.truediv,
+        TokenType.EQ: operator.eq,
+        TokenType.EQEQ: operator.eq,
+        TokenType.NOTEQ: operator.ne,
+        TokenType.LTHAN: operator.lt,
+        TokenType.LTEQ: operator.le,
+        TokenType.GTHAN: operator.gt,
+        TokenType.GTEQ: operator.ge,
+    }
+    COMPARISONS = (
+        TokenType.EQ, TokenType.EQEQ, TokenType.NOTEQ, TokenType.LTHAN, TokenType.LTEQ, TokenType.GTHAN, TokenType.GTEQ
+    )
+    RECURSION_LIMIT = DEEP_RECURSION_LIMIT
+    STACK_SIZE = DEEP_STACK_SIZE
+
+    def __init__(self, image: ProgramImage, output_sink: OutputSink | None = None, input_source: InputSource | None = None):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.image: ProgramImage = image
+        self.kinds: memoryview = image.kinds
+        self.starts: memoryview = image.starts
+        self.operands: memoryview = image.operands
+        self.constants: tuple = image.constants
+        self.output_sink: OutputSink = output_sink if output_sink is not None else ConsoleOutput()
+        self.input_source: InputSource = input_source if input_source is not None else ConsoleInput()
+        self.handlers: list = [getattr(self, f"exec_{kind}") for kind in KINDS]
+        self.scope: dict = {}
+        self.frame: list | None = None
+        self.frame_pools: dict[int, FramePool] = {}
+        # The jump table of each CASE statement executed, by node number
+        self.tables: dict[int, JumpTable] = {}
+        self.files: FileTable = FileTable()
+        # Subroutines are found by name; only their node numbers are kept
+        self.subroutines: dict[str, int] = {}
+        declaration = KIND_NUMBERS["SubroutineDecl"]
+        for node, kind in enumerate(self.kinds):
+            if kind == declaration:
+                self.subroutines[self.constants[self.operands[self.starts[node]]]] = node
+
+    def run(self):
+        """
+        Executes the program, on a thread with a deep stack if it declares any subroutines
+        """
+        try:
+            if self.subroutines:
+                try:
+                    run_with_deep_stack(self.execute, (self.image.root,), self.RECURSION_LIMIT, self.STACK_SIZE)
+                except RecursionError:
+                    self.ExceptionHandler.raise_exception(
+                        f"Subroutine calls nested too deeply (more than {self.RECURSION_LIMIT:,} levels of executor "
+                        f"frames)"
+                    )
+            else:
+                self.execute(self.image.root)
+        finally:
+            self.files.close_all()
+            self.output_sink.flush()
+
+    def execute(self, node: int) -> any:
+        """
+        Executes a statement or evaluates an expression
+
+        :param node: The node number
+        :type node: int
+        :return: The value of the expression
+        :rtype: any
+        """
+        return self.handlers[self.kinds[node]](node)
+
+    def fields(self, node: int) -> memoryview:
+        """
+        Returns the operands of a node, as a view of the image
+
+        :rtype: memoryview
+        """
+        return self.operands[self.starts[node]:self.starts[node + 1]]
+
+    def exec_Compound(self, node: int):
+        operands, execute = self.operands, self.execute
+        for position in range(self.starts[node], self.starts[node + 1]):
+            execute(operands[position])
+
+    def exec_NoOP(self, node: int):
+        pass
+
+    def exec_Num(self, node: int) -> any:
+        return self.constants[self.operands[self.starts[node]]]
+
+    exec_String = exec_Num
+    exec_Boolean = exec_Num
+
+    def exec_Variable(self, node: int) -> any:
+        start = self.starts[node]
+        operands = self.operands
+        slot = operands[start + 1]
+        if slot == NONE:
+            value = self.scope.get(self.constants[operands[start]])
+        elif operands[start + 2]:
+            value = self.frame[slot].get()
+        else:
+            value = self.frame[slot]
+        if value is None:
+            raise NameError(repr(self.constants[operands[start]]))
+        return value
+
+    def exec_BinOP(self, node: int) -> any:
+        op, left, right = self.fields(node)
+        op = TOKEN_TYPES[op]
+        left, right = self.execute(left), self.execute(right)
+        if op == TokenType.CONCAT:
+            return StringBuilder.concat(left, right)
+        if op in self.COMPARISONS:
+            if isinstance(left, StringBuilder):
+                left = str(left)
+            if isinstance(right, StringBuilder):
+                right = str(right)
+        return self.OPERATIONS[op](left, right)
+
+    def exec_LogicalOP(self, node: int) -> bool:
+        op, left, right = self.fields(node)
+        if TOKEN_TYPES[op] == TokenType.AND:
+            return self.execute(left) and self.execute(right)
+        return self.execute(left) or self.execute(right)
+
+    def exec_UnaryOP(self, node: int) -> any:
+        op, expr = self.fields(node)
+        op = TOKEN_TYPES[op]
+        if op == TokenType.MINUS:
+            return -self.execute(expr)
+        if op == TokenType.NOT:
+            return not self.execute(expr)
+        return +self.execute(expr)
+
+    def lookup(self, var_node: int) -> any:
+        """
+        Returns the value of a variable, which is None if it has not been assigned
+
+        :rtype: any
+        """
+        name, slot, byref, _ = self.fields(var_node)
+        if slot == NONE:
+            return self.scope.get(self.constants[name])
+        if byref:
+            return self.frame[slot].get()
+        return self.frame[slot]
+
+    def store(self, var_node: int, value: any):
+        """
+        Stores a value in a variable, in the global scope or the current call frame
+        """
+        name, slot, byref, _ = self.fields(var_node)
+        if slot == NONE:
+            self.scope[self.constants[name]] = value
+        elif byref:
+            self.frame[slot].set(value)
+        else:
+            self.frame[slot] = value
+
+    def element(self, node: int) -> tuple[TypedArray, int | tuple[int, ...]]:
+        """
+        Returns the array and index of an array element node
+        """
+        fields = self.fields(node)
+        indices = [self.execute(index) for index in fields[1:]]
+        return self.lookup(fields[0]), indices[0] if len(indices) == 1 else tuple(indices)
+
+    def exec_ArrayElement(self, node: int) -> any:
+        array, index = self.element(node)
+        return array[index]
+
+    def assign_to(self, target: int, value: any):
+        if self.kinds[target] == KIND_NUMBERS["ArrayElement"]:
+            array, index = self.element(target)
+            array[index] = value
+        else:
+            self.store(target, value)
+
+    def exec_Assign(self, node: int):
+        left, right = self.fields(node)
+        self.assign_to(left, self.execute(right))
+
+    def exec_VarDecl(self, node: int):
+        fields = self.fields(node)
+        if len(fields) == 2:
+            return
+        values = [self.execute(bound) for bound in fields[2:]]
+        bounds = list(zip(values[::2], values[1::2]))
+        self.store(fields[0], TypedArray(bounds, DataType(self.constants[fields[1]])))
+
+    def exec_ForLoop(self, node: int):
+        var_node, start, end, step, body = self.fields(node)
+        start, end = self.execute(start), self.execute(end)
+        if step == NONE:
+            counters = range(start, end + 1)
+        else:
+            step = self.execute(step)
+            if step == 0:
+                self.ExceptionHandler.raise_exception("FOR loop STEP cannot be 0")
+            counters = range(start, end + 1 if step > 0 else end - 1, step)
+        for value in counters:
+            self.store(var_node, value)
+            self.execute(body)
+
+    def exec_WhileLoop(self, node: int):
+        condition, body = self.fields(node)
+        while self.execute(condition):
+            self.execute(body)
+
+    def exec_RepeatLoop(self, node: int):
+        body, condition = self.fields(node)
+        self.execute(body)
+        while not self.execute(condition):
+            self.execute(body)
+
+    def exec_IfStatement(self, node: int):
+        condition, then_body, else_body = self.fields(node)
+        if self.execute(condition):
+            self.execute(then_body)
+        elif else_body != NONE:
+            self.execute(else_body)
+
+    def exec_CaseStatement(self, node: int):
+        fields = self.fields(node)
+        table = self.tables.get(node)
+        if table is None:
+            # Labels are literals, so the jump table is built from them the first time the statement is executed
+            labels = [
+                (self.execute(low), self.execute(high) if high != NONE else None)
+                for low, high in zip(fields[2::3], fields[3::3])
+            ]
+            table = self.tables[node] = JumpTable(labels)
+        value = self.execute(fields[0])
+        if isinstance(value, StringBuilder):
+            value = str(value)
+        index = table.lookup(value)
+        if index is not None:
+            self.execute(fields[4 + index * 3])
+        elif fields[1] != NONE:
+            self.execute(fields[1])
+
+    def exec_SubroutineDecl(self, node: int):
+        pass
+
+    def exec_Param(self, node: int):
+        pass
+
+    def exec_Return(self, node: int):
+        raise ReturnSignal(self.execute(self.operands[self.starts[node]]))
+
+    def reference(self, node: int) -> Reference:
+        """
+        Creates a reference to the variable or array element passed to a BYREF parameter
+        """
+        if self.kinds[node] == KIND_NUMBERS["ArrayElement"]:
+            return Reference(*self.element(node))
+        name, slot, byref, _ = self.fields(node)
+        if slot == NONE:
+            return Reference(self.scope, self.constants[name])
+        if byref:
+            return self.frame[slot]
+        return Reference(self.frame, slot)
+
+    def call(self, name: str, args: memoryview) -> any:
+        """
+        Calls a user defined subroutine with the argument nodes passed
+
+        :param name: The name of the subroutine
+        :type name: str
+        :param args: The argument node numbers
+        :type args: memoryview
+        :return: The value returned, for a FUNCTION
+        :rtype: any
+        """
+        subroutine = self.subroutines[name]
+        _, body, is_function, slot_count, *params = self.fields(subroutine)
+        values = []
+        for param, arg in zip(params, args):
+            var_node, byref = self.fields(param)
+            values.append(self.reference(arg) if byref else self.execute(arg))
+
+        pool = self.frame_pools.get(subroutine)
+        if pool is None:
+            pool = self.frame_pools[subroutine] = FramePool(slot_count)
+        frame = pool.acquire()
+        for param, value in zip(params, values):
+            frame[self.fields(self.operands[self.starts[param]])[1]] = value
+
+        caller_frame = self.frame
+        self.frame = frame
+        try:
+            self.execute(body)
+        except ReturnSignal as signal:
+            return signal.value
+        finally:
+            self.frame = caller_frame
+            pool.release(frame)
+
+        if is_function:
+            self.ExceptionHandler.raise_exception(f"FUNCTION {name} ended without a RETURN")
+
+    def exec_ProcedureCall(self, node: int):
+        fields = self.fields(node)
+        self.call(self.constants[fields[0]], fields[1:])
+
+    def exec_FunctionCall(self, node: int) -> any:
+        fields = self.fields(node)
+        name = self.constants[fields[0]]
+        if fields[1]:
+            return self.call(name, fields[2:])
+        try:
+            return BUILTINS[name](*[self.execute(arg) for arg in fields[2:]])
+        except IndexError as error:
+            self.ExceptionHandler.raise_exception(str(error))
+
+    def exec_Output(self, node: int):
+        values = [format_value(self.execute(expr)) for expr in self.fields(node)]
+        self.output_sink.write("".join(values) + "\n")
+
+    def exec_Input(self, node: int):
+        target, data_type = self.fields(node)
+        data_type = DATA_TYPES[data_type] if data_type != NONE else None
+        if self.input_source.interactive:
+            self.output_sink.flush()
+        text = self.input_source.read_line()
+        try:
+            value = parse_value(text, data_type)
+        except ValueError:
+            self.ExceptionHandler.raise_exception(f"Invalid {data_type.value} input: {repr(text)}")
+        self.assign_to(target, value)
+
+    def exec_OpenFile(self, node: int):
+        filename, mode = self.fields(node)
+        self.files.open(self.execute(filename), self.constants[mode])
+
+    def exec_ReadFile(self, node: int):
+        filename, target, data_type = self.fields(node)
+        data_type = DATA_TYPES[data_type] if data_type != NONE else None
+        self.assign_to(target, self.files.read_value(self.execute(filename), data_type))
+
+    def exec_WriteFile(self, node: int):
+        filename, expr = self.fields(node)
+        self.files.write_line(self.execute(filename), format_value(self.execute(expr)))
+
+    def exec_CloseFile(self, node: int):
+        self.files.close(self.execute(self.operands[self.starts[node]]))
+
+    def exec_EndOfFile(self, node: int) -> bool:
+        return self.files.eof(self.execute(self.operands[self.starts[node]]))
+
+
+class SharedProgramImage(object):
+    """
+    A ProgramImage placed in a shared memory block, so worker processes can each execute the same copy of a program.
+    The process creating it owns the block and unlinks it when closed; workers attach to it by name
+
+    eg. with SharedProgramImage.create(ProgramImage.compile(source)) as shared:
+            pool.map(worker, [(shared.name, inputs) for inputs in batches])
+
+        def worker(name, inputs):
+            with SharedProgramImage.attach(name) as shared:
+                return shared.image.execute(...)
+
+    :param memory: The shared memory block holding the image
+    :type memory: multiprocessing.shared_memory.SharedMemory
+    :param owner: Whether this process created the block, and must unlink it
+    :type owner: bool
+    """
+    def __init__(self, memory: "shared_memory.SharedMemory", owner: bool):
+        self.memory: "shared_memory.SharedMemory" = memory
+        self.owner: bool = owner
+        self.image: ProgramImage = ProgramImage(memory.buf)
+
+    @classmethod
+    def create(cls, image: ProgramImage) -> "SharedProgramImage":
+        """
+        Copies an image into a new shared memory block
+
+        :rtype: SharedProgramImage()
+        """
+        from multiprocessing import shared_memory
+
+        memory = shared_memory.SharedMemory(create=True, size=len(image))
+        memory.buf[:len(image)] = image.buffer[:len(image)]
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedProgramImage":
+        """
+        Attaches to the shared memory block of an image created by another process, without copying it
+
+        :rtype: SharedProgramImage()
+        """
+        from multiprocessing import shared_memory
+
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self):
+        self.image.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self) -> "SharedProgramImage":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -2,7 +2,24 @@ from .exception import ExceptionHandler
 from .nodevisitor import NodeVisitor
 from .token import Token, TokenType
 from .parser import Parser
+from .typechecker import TypeChecker
+from .datatype import DataType
+from .storage import TypedArray
+from .strings import StringBuilder
+from .builtins import BUILTINS
+from .vectorizer import LoopVectorizer, VectorEvaluator, SCALAR_TYPES
+from .optional import optional_import
+from .streams import (
+    OutputSink, InputSource, ConsoleOutput, ConsoleInput, IterableInput, RecordingOutput, format_value, parse_value
+)
+from .frames import Reference, FramePool, ReturnSignal, run_with_deep_stack, DEEP_RECURSION_LIMIT, DEEP_STACK_SIZE
+from .files import FileTable
+from .metrics import STATEMENTS_EXECUTED, CACHE_HITS, CACHE_MISSES, ERRORS, PHASE_SECONDS, PEAK_MEMORY
 from .ast import *
+import functools
+import operator
+import time
+import weakref
 import logging
 
 class Interpreter(NodeVisitor):
@@ -11,35 +28,195 @@ class Interpreter(NodeVisitor):
 
     :param parser: The parser used to parse the tokens
     :type parser: Parser()
+    :param vectorize: Whether eligible FOR loops are executed as whole-array NumPy operations (if NumPy is installed)
+    :type vectorize: bool
+    :param output_sink: Destination of OUTPUT statements (buffered standard output by default)
+    :type output_sink: OutputSink()
+    :param input_source: Source of INPUT statements (standard input by default)
+    :type input_source: InputSource()
+    :param memoize: Whether the results of pure FUNCTIONs are cached
+    :type memoize: bool
+    :param memo_size: The maximum number of results cached for each memoized FUNCTION
+    :type memo_size: int
+    :param tier_threshold: The number of iterations after which a loop is compiled into Python code (None to never
+        compile loops)
+    :type tier_threshold: int | None
+    :param optimizer: Optimisation pipeline run over the AST before it is executed (None to run it unoptimised)
+    :type optimizer: DataflowOptimizer()
+    :param streaming: Whether the program is executed one top level statement at a time as it is parsed, instead of
+        being parsed in full first
+    :type streaming: bool
+    :param result_cache: Cache the results of deterministic programs are looked up in and stored in (None to always
+        execute programs). Programs are only cached when run from an empty global scope, and programs using INPUT only
+        when their input is known in advance
+    :type result_cache: ResultCache()
+    :param partial_evaluator: Partial evaluator specialising the program against its input (if known in advance) and the
+        variables already in the global scope before it is executed (None to execute it as written). Not used when
+        streaming
+    :type partial_evaluator: PartialEvaluator()
+    :param checkpointer: Checkpointer saving the execution state at safe points, and resuming the program from its last
+        checkpoint (None to run it without checkpoints). The result cache and partial evaluator are not used when
+        checkpointing. Not used when streaming
+    :type checkpointer: Checkpointer()
+    :param memory: Meter counting the memory held by the program's values as they are stored, which ends the run once
+        they hold more than its limit (None to not count it). Its peak is added to the metrics after each run
+    :type memory: MemoryMeter()
     """
 
     GLOBAL_SCOPE = {}
 
-    def __init__(self, parser: Parser):
+    ARITHMETIC = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+        TokenType.DIV: operator.truediv,
+    }
+    COMPARISONS = {
+        TokenType.EQ: operator.eq,
+        TokenType.EQEQ: operator.eq,
+        TokenType.NOTEQ: operator.ne,
+        TokenType.LTHAN: operator.lt,
+        TokenType.LTEQ: operator.le,
+        TokenType.GTHAN: operator.gt,
+        TokenType.GTEQ: operator.ge,
+    }
+
+    # Programs with subroutines are run on a thread with a large stack (see core.frames)
+    RECURSION_LIMIT = DEEP_RECURSION_LIMIT
+    STACK_SIZE = DEEP_STACK_SIZE
+
+    # Loops whose compiled code had to deoptimise this many times are left to the tree-walking interpreter
+    MAX_DEOPTIMISATIONS = 3
+
+    def __init__(
+        self,
+        parser: Parser,
+        vectorize: bool = True,
+        output_sink: OutputSink | None = None,
+        input_source: InputSource | None = None,
+        memoize: bool = False,
+        memo_size: int = 65536,
+        tier_threshold: int | None = 1000,
+        optimizer: "DataflowOptimizer | None" = None,
+        streaming: bool = False,
+        result_cache: "ResultCache | None" = None,
+        partial_evaluator: "PartialEvaluator | None" = None,
+        checkpointer: "Checkpointer | None" = None,
+        memory: "MemoryMeter | None" = None,
+    ):
         self.parser: Parser = parser
+        self.vectorize: bool = vectorize
+        self.output_sink: OutputSink = output_sink if output_sink is not None else ConsoleOutput()
+        self.input_source: InputSource = input_source if input_source is not None else ConsoleInput()
+        self.files: FileTable = FileTable()
         self.logger: logging.Logger = logging.getLogger(__name__)
         self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)    
+        # Call frame of the subroutine being executed (None at the top level of the program)
+        self.frame: list | None = None
+        self.frame_pools: dict[str, FramePool] = {}
+        self.memoize: bool = memoize
+        self.memo_size: int = memo_size
+        self.memo_caches: dict[str, functools._lru_cache_wrapper] = {}
+        self.tier_threshold: int | None = tier_threshold
+        self.optimizer: "DataflowOptimizer | None" = optimizer
+        self.streaming: bool = streaming
+        self.result_cache: "ResultCache | None" = result_cache
+        self.partial_evaluator: "PartialEvaluator | None" = partial_evaluator
+        self.checkpointer: "Checkpointer | None" = checkpointer
+        self.memory: "MemoryMeter | None" = memory
+        # Statements executed since they were last added to the metrics
+        self.statements: int = 0
+        # Iterations run by each loop in the interpreter, and the compiled code of each loop (None if it cannot be). Loops
+        # are weakly referenced, so statements discarded after being executed while streaming can be freed
+        self.back_edges: weakref.WeakKeyDictionary[AST, int] = weakref.WeakKeyDictionary()
+        self.compiled_loops: weakref.WeakKeyDictionary[AST, "function | None"] = weakref.WeakKeyDictionary()
+        self.deoptimisations: weakref.WeakKeyDictionary[AST, int] = weakref.WeakKeyDictionary()
     
     def visit_BinOP(self, node: BinOP) -> any:
         """
-        Traverses the left and right nodes and evaluates based on the operator type of the current node
+        Traverses the left and right nodes and evaluates based on the operator type of the current node. The operands of
+        arithmetic whose types the type checker could not know are checked to be numbers once evaluated
 
         :param node: The current node
         :type node: BinOP()
         :return: Evaluated results
         :rtype: any
         """
-        if node.op.type == TokenType.PLUS:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.op.type == TokenType.MINUS:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.op.type == TokenType.MUL:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.op.type == TokenType.DIV:
-            return self.visit(node.left) / self.visit(node.right)
+        operation = self.ARITHMETIC.get(node.op.type)
+        if operation is not None:
+            left, right = self.visit(node.left), self.visit(node.right)
+            for operand in (left, right):
+                if type(operand) not in (int, float):
+                    operand_type = DataType.of(operand)
+                    self.ExceptionHandler.raise_exception(
+                        f"Operator {node.op.value} cannot be applied to "
+                        f"{operand_type.value if operand_type is not None else type(operand).__name__}"
+                    )
+            return operation(left, right)
+        elif node.op.type == TokenType.CONCAT:
+            return StringBuilder.concat(self.visit(node.left), self.visit(node.right))
+        elif node.op.type in self.COMPARISONS:
+            return self.compare(node.op.type, self.visit(node.left), self.visit(node.right))
         else:
             pass  # Placeholder
+
+    def compare(self, op: TokenType, left: any, right: any) -> bool:
+        """
+        Compares two values with a comparison operator
+
+        :param op: The comparison operator
+        :type op: TokenType()
+        :rtype: bool
+        """
+        if isinstance(left, StringBuilder):
+            left = str(left)
+        if isinstance(right, StringBuilder):
+            right = str(right)
+        return self.COMPARISONS[op](left, right)
     
+    def visit_IntBinOP(self, node: IntBinOP) -> int:
+        """
+        Evaluates a binary operation whose operands were statically typed as INTEGER by the type checker
+
+        :param node: The current node
+        :type node: IntBinOP()
+        :rtype: int
+        """
+        return node.func(self.visit(node.left), self.visit(node.right))
+
+    def visit_RealBinOP(self, node: RealBinOP) -> float:
+        """
+        Evaluates a binary operation whose operands were statically typed as numeric, with at least one REAL operand
+
+        :param node: The current node
+        :type node: RealBinOP()
+        :rtype: float
+        """
+        return node.func(self.visit(node.left), self.visit(node.right))
+
+    def visit_CompareOP(self, node: CompareOP) -> bool:
+        """
+        Evaluates a comparison whose operands were statically typed as both numeric or both BOOLEAN by the type checker
+
+        :param node: The current node
+        :type node: CompareOP()
+        :rtype: bool
+        """
+        return node.func(self.visit(node.left), self.visit(node.right))
+
+    def visit_LogicalOP(self, node: LogicalOP) -> bool:
+        """
+        Evaluates an AND or OR operation, short-circuiting: the right operand is not evaluated if the left one decides
+        the result
+
+        :param node: The current node
+        :type node: LogicalOP()
+        :rtype: bool
+        """
+        if node.op.type == TokenType.AND:
+            return self.visit(node.left) and self.visit(node.right)
+        return self.visit(node.left) or self.visit(node.right)
+
     def visit_Num(self, node: Token) -> any:
         """
         Traverses and returns the value of the node passed as argument
@@ -51,12 +228,37 @@ class Interpreter(NodeVisitor):
         """
         return node.value
     
+    def visit_String(self, node: String) -> str:
+        return node.value
+
+    def visit_Boolean(self, node: Boolean) -> bool:
+        return node.value
+
+    def visit_FunctionCall(self, node: FunctionCall) -> any:
+        """
+        Evaluates the arguments of a function call and calls the function
+
+        :param node: The function call node
+        :type node: FunctionCall()
+        :return: The value returned by the function
+        :rtype: any
+        """
+        if node.subroutine is not None:
+            return self.call(node.subroutine, node.args)
+        builtin = BUILTINS[node.name]
+        try:
+            return builtin(*[self.visit(arg) for arg in node.args])
+        except IndexError as error:
+            self.ExceptionHandler.raise_exception(str(error))
+
     def visit_UnaryOP(self, node: UnaryOP) -> any:
         op = node.op.type
         if op == TokenType.PLUS:
             return +self.visit(node.expr)
         elif op == TokenType.MINUS:
             return -self.visit(node.expr)
+        elif op == TokenType.NOT:
+            return not self.visit(node.expr)
         else:
             pass # Placeholder
 
@@ -67,11 +269,230 @@ class Interpreter(NodeVisitor):
         :param node: The compound node
         :type node: Compound()
         """
+        self.statements += len(node.children)
         for child in node.children:
             self.visit(child)
 
     def visit_NoOP(self, noce: NoOP):
         pass
+
+    def visit_IfStatement(self, node: IfStatement):
+        """
+        Executes the branch of an IF statement selected by its condition
+
+        :param node: The IF statement node
+        :type node: IfStatement()
+        """
+        if self.visit(node.condition):
+            self.visit(node.then_body)
+        elif node.else_body is not None:
+            self.visit(node.else_body)
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        """
+        Executes the branch of a CASE statement whose label matches the value of its expression, found through its jump
+        table, or the OTHERWISE branch if none does
+
+        :param node: The CASE statement node
+        :type node: CaseStatement()
+        """
+        value = self.visit(node.expr)
+        if isinstance(value, StringBuilder):
+            value = str(value)
+        index = node.table.lookup(value)
+        if index is not None:
+            self.visit(node.branches[index].body)
+        elif node.otherwise is not None:
+            self.visit(node.otherwise)
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl):
+        pass
+
+    def visit_Return(self, node: Return):
+        raise ReturnSignal(self.visit(node.expr))
+
+    def visit_ProcedureCall(self, node: ProcedureCall):
+        self.call(node.subroutine, node.args)
+
+    def call(self, subroutine: SubroutineDecl, args: list[AST]) -> any:
+        """
+        Calls a user defined subroutine. The arguments are evaluated in the caller's frame, then passed to the
+        subroutine's memoized version if it has one, or invoked directly otherwise
+
+        :param subroutine: The subroutine being called
+        :type subroutine: SubroutineDecl()
+        :param args: The argument expressions
+        :type args: list[AST()]
+        :return: The value returned, for a FUNCTION
+        :rtype: any
+        """
+        values = [
+            self.reference(arg) if param.byref else self.visit(arg) for param, arg in zip(subroutine.params, args)
+        ]
+        if self.memo_caches:
+            memoized = self.memo_caches.get(subroutine.name)
+            if memoized is not None:
+                return memoized(*values)
+        return self.invoke(subroutine, values)
+
+    def invoke(self, subroutine: SubroutineDecl, values: list) -> any:
+        """
+        Executes the body of a subroutine with the argument values passed. The values are stored in the slots of a frame
+        taken from the subroutine's frame pool, which becomes the current frame while the body is executed
+
+        :param subroutine: The subroutine being called
+        :type subroutine: SubroutineDecl()
+        :param values: The values of the arguments (references for BYREF parameters)
+        :type values: list
+        :return: The value returned, for a FUNCTION
+        :rtype: any
+        """
+        pool = self.frame_pools.get(subroutine.name)
+        if pool is None:
+            pool = self.frame_pools[subroutine.name] = FramePool(subroutine.slot_count)
+        frame = pool.acquire()
+        for param, value in zip(subroutine.params, values):
+            frame[param.var_node.slot] = value
+        if self.memory is not None:
+            self.memory.enter(frame)
+
+        caller_frame = self.frame
+        self.frame = frame
+        try:
+            for child in subroutine.body.children:
+                # A RETURN directly in the body can return without unwinding through a ReturnSignal
+                if type(child) is Return:
+                    return self.visit(child.expr)
+                self.visit(child)
+        except ReturnSignal as signal:
+            return signal.value
+        finally:
+            self.frame = caller_frame
+            if self.memory is not None:
+                self.memory.leave(frame)
+            pool.release(frame)
+
+        if subroutine.return_type is not None:
+            self.ExceptionHandler.raise_exception(f"FUNCTION {subroutine.name} ended without a RETURN")
+
+    def memoize_subroutines(self, subroutines: dict[str, SubroutineDecl]):
+        """
+        Wraps every pure FUNCTION in a bounded LRU cache of its results, keyed by the values (and types) of its arguments
+
+        :param subroutines: Every subroutine in the program, by name
+        :type subroutines: dict[str, SubroutineDecl()]
+        """
+        from .purity import PurityAnalyser
+
+        for name in PurityAnalyser().analyse(subroutines):
+            subroutine = subroutines[name]
+            if name in self.memo_caches:
+                continue
+            # Arrays are mutable and hashed by identity, so FUNCTIONs taking them cannot be cached by argument
+            if subroutine.return_type is None or any(isinstance(p.type_node, ArrayType) for p in subroutine.params):
+                continue
+            invoke = functools.partial(self.invoke_with_args, subroutine)
+            self.memo_caches[name] = functools.lru_cache(maxsize=self.memo_size, typed=True)(invoke)
+
+    def invoke_with_args(self, subroutine: SubroutineDecl, *values) -> any:
+        """
+        Positional form of invoke(), as memoized FUNCTIONs are cached by their arguments
+
+        :rtype: any
+        """
+        return self.invoke(subroutine, values)
+
+    def memo_stats(self) -> dict[str, "functools._CacheInfo"]:
+        """
+        Returns the hits, misses and size of the result cache of each memoized FUNCTION
+
+        :rtype: dict[str, functools._CacheInfo]
+        """
+        return {name: memoized.cache_info() for name, memoized in self.memo_caches.items()}
+
+    def reference(self, node: Variable | ArrayElement) -> Reference:
+        """
+        Creates a reference to the variable or array element passed to a BYREF parameter
+
+        :param node: The argument
+        :type node: Variable() | ArrayElement()
+        :rtype: Reference()
+        """
+        if isinstance(node, ArrayElement):
+            return Reference(self.lookup(node.var_node), self.array_index(node))
+        if node.slot is None:
+            return Reference(self.GLOBAL_SCOPE, node.value)
+        if node.byref:
+            return self.frame[node.slot]
+        return Reference(self.frame, node.slot)
+
+    def lookup(self, node: Variable) -> any:
+        """
+        Returns the value of a variable, which is None if it has not been assigned
+
+        :param node: The variable node
+        :type node: Variable()
+        :rtype: any
+        """
+        if node.slot is None:
+            return self.GLOBAL_SCOPE.get(node.value)
+        if node.byref:
+            return self.frame[node.slot].get()
+        return self.frame[node.slot]
+
+    def store(self, node: Variable, value: any):
+        """
+        Stores a value in a variable, in the global scope or the current call frame
+
+        :param node: The variable node
+        :type node: Variable()
+        :param value: The value to store
+        :type value: any
+        """
+        if self.memory is not None:
+            self.meter(node, value)
+        if node.slot is None:
+            self.GLOBAL_SCOPE[node.value] = value
+        elif node.byref:
+            self.frame[node.slot].set(value)
+        else:
+            self.frame[node.slot] = value
+
+    def meter(self, node: Variable, value: any):
+        """
+        Counts the memory held by a value about to be stored in a variable, in place of the value it holds
+
+        :param node: The variable node
+        :type node: Variable()
+        :param value: The value to store
+        :type value: any
+        """
+        if node.slot is None:
+            self.memory.assign(node.value, value)
+        elif node.byref:
+            # Counted as a store to the variable or array element referred to
+            reference = self.frame[node.slot]
+            if reference.container is self.GLOBAL_SCOPE:
+                self.memory.assign(reference.key, value)
+            elif type(reference.container) is TypedArray:
+                self.memory.replace_element(reference.container, reference.get(), value)
+            else:
+                self.memory.replace(reference.get(), value)
+        else:
+            self.memory.replace(self.frame[node.slot], value)
+
+    def visit_VarDecl(self, node: VarDecl):
+        """
+        Allocates the storage for arrays being declared. Declarations of other variables have no effect at runtime
+
+        :param node: The declaration node
+        :type node: VarDecl()
+        """
+        type_node = node.type_node
+        if isinstance(type_node, ArrayType):
+            bounds = [(self.visit(lower), self.visit(upper)) for lower, upper in type_node.bounds]
+            element_type = DataType(type_node.element_type.value)
+            self.store(node.var_node, TypedArray(bounds, element_type))
     
     def visit_Assign(self, node: Assign):
         """
@@ -80,23 +501,338 @@ class Interpreter(NodeVisitor):
         :param node: The assignment node
         :type node: Assign()
         """
-        var_name = node.left.value
-        self.GLOBAL_SCOPE[var_name] = self.visit(node.right)
+        left = node.left
+        if isinstance(left, ArrayElement):
+            if self.memory is not None:
+                self.assign_to(left, self.visit(node.right))
+                return
+            array = self.lookup(left.var_node)
+            array[self.array_index(left)] = self.visit(node.right)
+        elif left.slot is None:
+            value = self.visit(node.right)
+            if self.memory is not None:
+                self.memory.assign(left.value, value)
+            self.GLOBAL_SCOPE[left.value] = value
+        else:
+            self.store(left, self.visit(node.right))
+
+    def array_index(self, node: ArrayElement) -> int | tuple[int, ...]:
+        """
+        Evaluates the index expressions of an array element node
+
+        :param node: The array element node
+        :type node: ArrayElement()
+        :return: The index for one dimensional arrays, or a tuple of indices otherwise
+        :rtype: int | tuple[int, ...]
+        """
+        if len(node.indices) == 1:
+            return self.visit(node.indices[0])
+        return tuple(self.visit(index) for index in node.indices)
+
+    def visit_ArrayElement(self, node: ArrayElement) -> any:
+        """
+        Traverses through an array element node and returns the value stored at its index
+
+        :param node: The array element node
+        :type node: ArrayElement()
+        :return: The value of the element
+        :rtype: any
+        """
+        return self.lookup(node.var_node)[self.array_index(node)]
+
+    def visit_Output(self, node: Output):
+        """
+        Writes the values of the expressions of an output statement to the output sink, followed by a newline
+
+        :param node: The output node
+        :type node: Output()
+        """
+        self.output_sink.write("".join([format_value(self.visit(expr)) for expr in node.exprs]) + "\n")
+
+    def visit_Input(self, node: Input):
+        """
+        Reads a line from the input source, converts it to the type of the target variable, and stores it
+
+        :param node: The input node
+        :type node: Input()
+        """
+        if self.input_source.interactive:
+            self.output_sink.flush()
+        text = self.input_source.read_line()
+        var_node = node.var_node
+        try:
+            value = parse_value(text, var_node.type)
+        except ValueError:
+            self.ExceptionHandler.raise_exception(f"Invalid {var_node.type.value} input: {repr(text)}")
+        self.assign_to(var_node, value)
+
+    def assign_to(self, var_node: Variable | ArrayElement, value: any):
+        """
+        Stores a value in a variable or an array element
+
+        :param var_node: The variable or array element node
+        :type var_node: Variable() | ArrayElement()
+        :param value: The value to store
+        :type value: any
+        """
+        if isinstance(var_node, ArrayElement):
+            array = self.lookup(var_node.var_node)
+            index = self.array_index(var_node)
+            if self.memory is not None:
+                self.memory.store(array, index, value)
+            else:
+                array[index] = value
+        else:
+            self.store(var_node, value)
+
+    def visit_OpenFile(self, node: OpenFile):
+        self.files.open(self.visit(node.filename), node.mode)
+
+    def visit_ReadFile(self, node: ReadFile):
+        """
+        Reads the next line of a file, converts it to the type of the target variable, and stores it
+
+        :param node: The file reading node
+        :type node: ReadFile()
+        """
+        self.assign_to(node.var_node, self.files.read_value(self.visit(node.filename), node.var_node.type))
+
+    def visit_WriteFile(self, node: WriteFile):
+        self.files.write_line(self.visit(node.filename), format_value(self.visit(node.expr)))
+
+    def visit_CloseFile(self, node: CloseFile):
+        self.files.close(self.visit(node.filename))
+
+    def visit_EndOfFile(self, node: EndOfFile) -> bool:
+        return self.files.eof(self.visit(node.filename))
+
+    def visit_ForLoop(self, node: ForLoop):
+        """
+        Executes the body of a FOR loop once for each value of the loop counter. The bounds and step are only evaluated
+        once, before the first iteration, into a range the counter is taken from. Once the loop has run enough
+        iterations, the remaining ones are run by its compiled code if it can be compiled
+
+        :param node: The loop node
+        :type node: ForLoop()
+        """
+        counters = self.counters(node)
+        remaining = self.hot_after(node)
+        if remaining is None or remaining >= len(counters):
+            self.run_for(node, counters)
+            self.back_edges[node] = self.back_edges.get(node, 0) + len(counters)
+            return
+
+        self.run_for(node, counters[:remaining])
+        self.back_edges[node] = self.back_edges.get(node, 0) + remaining
+        counters = counters[remaining:]
+        loop = self.tier_up(node)
+        if loop is not None:
+            resume = loop(self.GLOBAL_SCOPE, self.frame, counters)
+            if resume is None:
+                return
+            self.deoptimise(node)
+            counters = range(resume, counters.stop, counters.step)
+        self.run_for(node, counters)
+
+    def counters(self, node: ForLoop) -> range:
+        """
+        Evaluates the bounds and step of a FOR loop into the range of values taken by its counter. The last value is
+        included if the step reaches it exactly
+
+        :param node: The loop node
+        :type node: ForLoop()
+        :rtype: range
+        """
+        start, end = self.visit(node.start), self.visit(node.end)
+        if node.step is None:
+            return range(start, end + 1)
+        step = self.visit(node.step)
+        if step == 0:
+            self.ExceptionHandler.raise_exception("FOR loop STEP cannot be 0")
+        return range(start, end + 1 if step > 0 else end - 1, step)
+
+    def run_for(self, node: ForLoop, counters: range):
+        """
+        Executes the iterations of a FOR loop for a range of values of the counter, in the tree-walking interpreter
+
+        :param node: The loop node
+        :type node: ForLoop()
+        :param counters: The values of the counter
+        :type counters: range
+        """
+        var_node = node.var_node
+        if var_node.slot is None and self.memory is None:
+            scope = self.GLOBAL_SCOPE
+            for value in counters:
+                scope[var_node.value] = value
+                self.visit(node.body)
+        else:
+            for value in counters:
+                self.store(var_node, value)
+                self.visit(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        """
+        Executes the body of a WHILE loop for as long as its condition holds, checked before each iteration. Once the
+        loop has run enough iterations, the rest are run by its compiled code if it can be compiled
+
+        :param node: The loop node
+        :type node: WhileLoop()
+        """
+        remaining = self.hot_after(node)
+        iterations = 0
+        try:
+            while True:
+                if iterations == remaining:
+                    loop = self.tier_up(node)
+                    if loop is not None:
+                        if loop(self.GLOBAL_SCOPE, self.frame):
+                            return
+                        self.deoptimise(node)
+                if not self.visit(node.condition):
+                    break
+                self.visit(node.body)
+                iterations += 1
+        finally:
+            self.back_edges[node] = self.back_edges.get(node, 0) + iterations
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        """
+        Executes the body of a REPEAT loop until its condition holds, checked after each iteration. Once the loop has
+        run enough iterations, the rest are run by its compiled code if it can be compiled
+
+        :param node: The loop node
+        :type node: RepeatLoop()
+        """
+        remaining = self.hot_after(node)
+        iterations = 0
+        try:
+            while True:
+                if iterations == remaining:
+                    loop = self.tier_up(node)
+                    if loop is not None:
+                        if loop(self.GLOBAL_SCOPE, self.frame):
+                            return
+                        self.deoptimise(node)
+                self.visit(node.body)
+                iterations += 1
+                if self.visit(node.condition):
+                    break
+        finally:
+            self.back_edges[node] = self.back_edges.get(node, 0) + iterations
+
+    def hot_after(self, node: ForLoop | WhileLoop | RepeatLoop) -> int | None:
+        """
+        Returns the number of iterations a loop can still run before it is compiled, or None if it will not be
+
+        :rtype: int | None
+        """
+        if self.tier_threshold is None or self.compiled_loops.get(node, True) is None:
+            return None
+        if node in self.compiled_loops:
+            return 0
+        return max(self.tier_threshold - self.back_edges.get(node, 0), 0)
+
+    def tier_up(self, node: ForLoop | WhileLoop | RepeatLoop) -> "function | None":
+        """
+        Returns the compiled code of a hot loop, compiling it first if it has not been already
+
+        :param node: The loop node
+        :type node: ForLoop() | WhileLoop() | RepeatLoop()
+        :return: The loop's compiled code, or None if it cannot be compiled
+        :rtype: function | None
+        """
+        if node in self.compiled_loops:
+            return self.compiled_loops[node]
+        from .tiering import LoopCompiler
+
+        compiled = LoopCompiler(metered=self.memory is not None).compile(node, self.GLOBAL_SCOPE, self.frame)
+        loop = compiled.bind(self.output_sink.write, self.files, self.memory) if compiled is not None else None
+        if loop is not None and self.memory is not None:
+            loop = self.memory.metered(loop)
+        if loop is not None:
+            self.logger.info(f"Compiled hot {type(node).__name__} after {self.back_edges.get(node, 0)} iterations")
+        self.compiled_loops[node] = loop
+        return loop
+
+    def deoptimise(self, node: ForLoop | WhileLoop | RepeatLoop):
+        """
+        Discards the compiled code of a loop whose type assumptions no longer hold, so it is recompiled for the new types
+        the next time it is hot (or never again, once it has deoptimised too many times)
+
+        :param node: The loop node
+        :type node: ForLoop() | WhileLoop() | RepeatLoop()
+        """
+        count = self.deoptimisations[node] = self.deoptimisations.get(node, 0) + 1
+        self.logger.info(f"Deoptimised {type(node).__name__} ({count} time(s))")
+        if count >= self.MAX_DEOPTIMISATIONS:
+            self.compiled_loops[node] = None
+        else:
+            del self.compiled_loops[node]
 
-    def visit_Var(self, node: Variable) -> any:
+    def visit_VectorizedFor(self, node: VectorizedFor):
         """
-        Traverses through a variable node and performs a lookup of the variable name in the global scope. If a match is
-        found, the corrosponding value is returned. Otherwise, a NameError exception is thrown
+        Executes a vectorized FOR loop as whole-array operations over the loop's range. If the arrays used do not cover
+        the range, any variable is missing or holds a value of another type than its static type, or INTEGER arithmetic
+        could overflow 64 bits, the original loop is executed instead so it gives the same result or fails at the same
+        point
+
+        :param node: The vectorized loop node
+        :type node: VectorizedFor()
+        """
+        loop = node.loop
+        start = self.visit(loop.start)
+        end = self.visit(loop.end)
+        if end < start:
+            return
+
+        views = {}
+        for name in node.arrays:
+            array = self.GLOBAL_SCOPE.get(name)
+            view = array.as_numpy() if isinstance(array, TypedArray) and array.dimensions == 1 else None
+            if view is None or not array.bounds[0][0] <= start <= end <= array.bounds[0][1]:
+                return self.visit(loop)
+            lower = array.bounds[0][0]
+            views[name] = view[start - lower:end - lower + 1]
+        for name, data_type in node.scalars.items():
+            if type(self.GLOBAL_SCOPE.get(name)) not in SCALAR_TYPES[data_type]:
+                return self.visit(loop)
+
+        var_name = loop.var_node.value
+        evaluator = VectorEvaluator(self.GLOBAL_SCOPE, views, var_name, optional_import("numpy").arange(start, end + 1))
+        backups = {}
+        try:
+            for index, (target, expr) in enumerate(node.statements):
+                values = evaluator.visit(expr)
+                if target not in backups and index < len(node.statements) - 1:
+                    backups[target] = views[target].copy()
+                views[target][:] = values
+        except OverflowError:
+            # INTEGER arithmetic past 64 bits: the statements already run are undone, and the loop run (exactly) instead
+            for target, backup in backups.items():
+                views[target][:] = backup
+            return self.visit(loop)
+        self.store(loop.var_node, end)
+
+    def visit_Variable(self, node: Variable) -> any:
+        """
+        Traverses through a variable node and performs a lookup of the variable name in the global scope, or of its slot
+        in the current call frame for local variables. If a match is found, the corrosponding value is returned.
+        Otherwise, a NameError exception is thrown
 
         :param node: The variable node
         :type node: Variable()
         :return: The corrosponding value associated with the variable
         :rtype: any
         """
-        var_name = node.value
-        val = self.GLOBAL_SCOPE.get(var_name)
+        if node.slot is None:
+            val = self.GLOBAL_SCOPE.get(node.value)
+        elif node.byref:
+            val = self.frame[node.slot].get()
+        else:
+            val = self.frame[node.slot]
         if val is None:
-            raise NameError(repr(var_name))
+            raise NameError(repr(node.value))
         else:
             return val
 
@@ -108,5 +844,185 @@ class Interpreter(NodeVisitor):
         :return: Results from executing source code
         :rtype: any
         """
+        if self.streaming:
+            return self.interpret_streaming()
+        start = time.perf_counter()
         tree = self.parser.parse()
-        return self.visit(tree)
\ No newline at end of file
+        parsed = time.perf_counter()
+        PHASE_SECONDS.observe(parsed - start, "Parser")
+        checker = TypeChecker(self.parser.lexer.line_index)
+        tree = checker.check(tree)
+        checked = time.perf_counter()
+        PHASE_SECONDS.observe(checked - parsed, "TypeChecker")
+        key = self.cache_key(tree) if self.checkpointer is None else None
+        if key is not None:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.output_sink.write(cached.output)
+                self.output_sink.flush()
+                self.GLOBAL_SCOPE.update(cached.scope)
+                return None
+            sink, self.output_sink = self.output_sink, RecordingOutput(self.output_sink)
+
+        if self.partial_evaluator is not None and self.checkpointer is None:
+            tree = self.specialise(tree)
+        tree = self.transform(tree, checker)
+        execute = self.visit if self.checkpointer is None else functools.partial(self.checkpointer.run, self)
+        if self.memory is not None:
+            self.memory.start(self.GLOBAL_SCOPE)
+        try:
+            try:
+                if checker.subroutines:
+                    result = self.run_with_deep_stack(execute, tree)
+                else:
+                    result = execute(tree)
+            finally:
+                if self.optimizer is not None:
+                    self.optimizer.discard(self.GLOBAL_SCOPE)
+            if key is not None:
+                self.result_cache.put(key, self.output_sink.getvalue(), self.GLOBAL_SCOPE)
+            return result
+        except Exception:
+            ERRORS.inc(label="Interpreter")
+            raise
+        finally:
+            self.files.close_all()
+            if key is not None:
+                self.output_sink = sink
+            self.output_sink.flush()
+            PHASE_SECONDS.observe(time.perf_counter() - checked, "Interpreter")
+            self.report()
+
+    def interpret_streaming(self):
+        """
+        Interprets the source code one top level statement at a time: each statement is parsed, checked, executed and
+        discarded before the next one is parsed, so memory use is proportional to the largest statement rather than to
+        the whole program, and the first statements take effect before the rest of the program has been parsed.
+        Subroutines must be declared before they are called
+        """
+        checker = TypeChecker(self.parser.lexer.line_index)
+        if self.memory is not None:
+            self.memory.start(self.GLOBAL_SCOPE)
+        # Time spent parsing and checking, as the phases are interleaved
+        timings = {"Parser": 0.0, "TypeChecker": 0.0}
+
+        def run():
+            start = time.perf_counter()
+            for statement in self.parser.parse_statements():
+                parsed = time.perf_counter()
+                block = Compound()
+                block.children = [checker.check_statement(statement)]
+                checked = time.perf_counter()
+                timings["Parser"] += parsed - start
+                timings["TypeChecker"] += checked - parsed
+                # Optimisations can add statements before the one being executed (such as hoisted invariants)
+                self.visit(self.transform(block, checker))
+                start = time.perf_counter()
+            timings["Parser"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            # The whole program is run on a thread with a deep stack, as subroutines may be declared later on
+            self.run_with_deep_stack(run)
+        except Exception:
+            ERRORS.inc(label="Interpreter")
+            raise
+        finally:
+            if self.optimizer is not None:
+                self.optimizer.discard(self.GLOBAL_SCOPE)
+            self.files.close_all()
+            self.output_sink.flush()
+            for phase, seconds in timings.items():
+                PHASE_SECONDS.observe(seconds, phase)
+            PHASE_SECONDS.observe(time.perf_counter() - start - sum(timings.values()), "Interpreter")
+            self.report()
+
+    def report(self):
+        """
+        Adds the statements executed and memoized calls made since the last report, and the peak memory held by the
+        program's values if it was counted, to the metrics
+        """
+        STATEMENTS_EXECUTED.inc(self.statements)
+        self.statements = 0
+        if self.memory is not None:
+            self.logger.info(f"Peak memory held by values: {self.memory.peak} bytes")
+            PEAK_MEMORY.observe(self.memory.peak)
+        for name, info in self.memo_stats().items():
+            self.logger.info(f"Memoized {name}: {info}")
+            CACHE_HITS.inc(info.hits, "memo")
+            CACHE_MISSES.inc(info.misses, "memo")
+
+    def cache_key(self, tree: AST) -> str | None:
+        """
+        Returns the key the results of a program are cached under, or None if they cannot be cached: when there is no
+        result cache, the program is not deterministic, its input is not known in advance, or variables left by an
+        earlier program could change its results
+
+        :param tree: The type checked AST
+        :type tree: AST()
+        :rtype: str | None
+        """
+        if self.result_cache is None or self.GLOBAL_SCOPE:
+            return None
+        from .resultcache import DeterminismAnalyser
+
+        deterministic, reads_input = DeterminismAnalyser().analyse(tree)
+        if not deterministic:
+            return None
+        inputs = self.input_source.contents() if reads_input else ()
+        if inputs is None:
+            return None
+        return self.result_cache.key(tree, inputs)
+
+    def specialise(self, tree: AST) -> Compound:
+        """
+        Specialises a type checked program with the partial evaluator. The lines of input it reads while specialising
+        are skipped, so the residual program reads the ones after them
+
+        :param tree: The type checked AST
+        :type tree: AST()
+        :return: The residual program
+        :rtype: Compound()
+        """
+        inputs = self.input_source.contents()
+        tree = self.partial_evaluator.specialise(tree, inputs, self.GLOBAL_SCOPE)
+        if self.partial_evaluator.consumed:
+            self.input_source = IterableInput(inputs[self.partial_evaluator.consumed:])
+        return tree
+
+    def transform(self, tree: AST, checker: TypeChecker) -> AST:
+        """
+        Runs the enabled optimisations over a type checked AST
+
+        :param tree: The AST (the whole program, or a single statement when streaming)
+        :type tree: AST()
+        :param checker: The type checker which checked the AST
+        :type checker: TypeChecker()
+        :return: The AST to execute
+        :rtype: AST()
+        """
+        if self.memoize:
+            self.memoize_subroutines(checker.subroutines)
+        if self.optimizer is not None:
+            tree = self.optimizer.optimise(tree)
+        if self.vectorize:
+            tree = LoopVectorizer().optimise(tree)
+        return tree
+
+    def run_with_deep_stack(self, func, *args) -> any:
+        """
+        Calls a function on a separate thread with a large stack and recursion limit, so deeply recursive subroutines
+        do not overflow the stack. Exceptions are rethrown on the calling thread, and recursion past the limit is
+        reported as a runtime error
+
+        :param func: The function to call, typically visit()
+        :type func: function
+        :return: The result of the function
+        :rtype: any
+        """
+        try:
+            return run_with_deep_stack(func, args, self.RECURSION_LIMIT, self.STACK_SIZE)
+        except RecursionError:
+            self.ExceptionHandler.raise_exception(
+                f"Subroutine calls nested too deeply (more than {self.RECURSION_LIMIT:,} levels of interpreter frames)"
+            )
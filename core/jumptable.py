@@ -0,0 +1,59 @@
+import bisect
+
+class JumpTable(object):
+    """
+    Finds the branch of a CASE statement matching a value without comparing it against each label in turn.
+
+    Branches labelled with a single value are looked up in a dict, in constant time however many branches there are.
+    Branches labelled with a range (eg. 1 TO 5) are sorted by their first value and found with a binary search, or
+    scanned in order if any two ranges overlap. As in an IF/ELSE chain, a value matching more than one label selects the
+    first branch listed
+
+    :param labels: The label of each branch, in order: its value, and the last value of its range (None if it is not a
+        range)
+    :type labels: list[tuple[any, any]]
+    """
+    def __init__(self, labels: list[tuple[any, any]]):
+        self.constants: dict[any, int] = {}
+        ranges = []
+        for index, (low, high) in enumerate(labels):
+            if high is None:
+                self.constants.setdefault(low, index)
+            elif low <= high:
+                ranges.append((low, high, index))
+        ranges.sort(key=lambda label: label[0])
+        self.ranges: list[tuple[any, any, int]] = ranges
+        self.lows: list[any] = [low for low, _, _ in ranges]
+        self.disjoint: bool = all(ranges[i][1] < ranges[i + 1][0] for i in range(len(ranges) - 1))
+
+    def lookup(self, value: any) -> int | None:
+        """
+        Returns the index of the branch a value selects, or None if it matches no label
+
+        :param value: The value of the CASE expression
+        :type value: any
+        :rtype: int | None
+        """
+        index = self.constants.get(value)
+        if self.ranges:
+            match = self.match_range(value)
+            if match is not None and (index is None or match < index):
+                return match
+        return index
+
+    def match_range(self, value: any) -> int | None:
+        """
+        Returns the index of the first branch whose range includes a value, or None if there is none
+
+        :rtype: int | None
+        """
+        try:
+            if self.disjoint:
+                position = bisect.bisect_right(self.lows, value) - 1
+                if position >= 0 and value <= self.ranges[position][1]:
+                    return self.ranges[position][2]
+                return None
+            return min((index for low, high, index in self.ranges if low <= value <= high), default=None)
+        except TypeError:
+            # A value of a type the labels cannot be compared with is in none of the ranges
+            return None
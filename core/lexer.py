@@ -1,5 +1,7 @@
-from .token import Token, TokenType
+from .token import Token, TokenType, RESERVED_KEYWORDS
 from .exception import ExceptionHandler
+from .positions import LineIndex
+from .metrics import TOKENS_LEXED
 import logging
 
 class Lexer(object):
@@ -9,12 +11,17 @@ class Lexer(object):
     :param source: Source code written in pseudocode, according to the syntax defined in the BNF syntax document
     :type source: str
     """
+    ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
     def __init__(self, source: str):
         self.logger: logging.Logger = logging.getLogger(__name__)
         self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
         self.source: str = source
         self.pos: int = 0
         self.cur_char: str | int | any = self.source[self.pos]
+        self.line_index: LineIndex = LineIndex(source)
+        # Tokens lexed since they were last added to the metrics, which is done in bulk so lexing a token stays cheap
+        self.tokens: int = 0
 
     def skip_whitespaces(self):
         """
@@ -47,18 +54,53 @@ class Lexer(object):
         else:
             return self.source[peek_pos]
 
-    def integer(self) -> int:
+    def number(self) -> Token(TokenType, int | float):
         """
-        Returns a multidigit integer consumed from the input
+        Returns a multidigit integer or real number consumed from the input
 
-        :rtype: int
+        :return: Token(TokenType.INTEGER, int) or Token(TokenType.REAL, float)
+        :rtype: Token()
         """
         result = ""
         while self.cur_char is not None and self.cur_char.isdigit():
             result += self.cur_char
             self.advance()
-        return int(result)
+
+        # A decimal point only belongs to the number if a digit follows it
+        peek_char = self.peek()
+        if self.cur_char == "." and peek_char is not None and peek_char.isdigit():
+            result += self.cur_char
+            self.advance()
+            while self.cur_char is not None and self.cur_char.isdigit():
+                result += self.cur_char
+                self.advance()
+            return Token(TokenType.REAL, float(result))
+        return Token(TokenType.INTEGER, int(result))
     
+    def string(self) -> Token(TokenType, str):
+        """
+        Returns a string literal consumed from the input, handling the escape sequences \\n, \\t, \\" and \\\\
+
+        :return: Token(TokenType.STRING, str)
+        :rtype: Token()
+        """
+        result = []
+        self.advance()  # Opening quote
+        while self.cur_char != '"':
+            if self.cur_char is None or self.cur_char == "\n":
+                self.error("Unterminated string literal")
+            if self.cur_char == "\\":
+                self.advance()
+                escaped = self.ESCAPES.get(self.cur_char)
+                if escaped is None:
+                    self.error(f"Invalid escape sequence: \\{self.cur_char}")
+                result.append(escaped)
+            else:
+                result.append(self.cur_char)
+            self.advance()
+        self.advance()  # Closing quote
+        return Token(TokenType.STRING, "".join(result))
+
     def _id(self) -> Token(any, str):
         """
         Handles reserved keywords and identifiers
@@ -70,12 +112,59 @@ class Lexer(object):
         while self.cur_char is not None and self.cur_char.isalnum():
             result += self.cur_char
             self.advance()
-        token = Token(TokenType.get_token_type(result), TokenType.get_values(result, ""))
-        return token
+        token_type = RESERVED_KEYWORDS.get(result, TokenType.IDENTIFIER)
+        return Token(token_type, result)
 
     def get_next_token(self) -> Token(TokenType, any):
         """
-        Lexical analyzer of the interpreter. Analyzes and breaks down source code into tokens
+        Lexical analyzer of the interpreter. Analyzes and breaks down source code into tokens, recording the offset of
+        each token in the source code
+
+        :return: The token form of the source code
+        :rtype: Token()
+        """
+        cur_char = self.cur_char
+        if cur_char is not None and cur_char.isspace():
+            self.skip_whitespaces()
+        start = self.pos
+        token = self.scan()
+        token.offset = start
+        self.tokens += 1
+        return token
+
+    def span(self, offset: int) -> int:
+        """
+        Returns the number of characters of source code spanned by the token at an offset. Lengths are only needed by
+        diagnostics, so rather than being recorded for every token, the token is lexed again
+
+        :param offset: The offset of the token's first character
+        :type offset: int
+        :rtype: int
+        """
+        lexer = Lexer(self.source)
+        lexer.pos, lexer.cur_char = offset, self.source[offset] if offset < len(self.source) else None
+        lexer.scan()
+        return lexer.pos - offset
+
+    def report(self):
+        """
+        Adds the tokens lexed since the last report to the metrics
+        """
+        TOKENS_LEXED.inc(self.tokens)
+        self.tokens = 0
+
+    def error(self, message: str):
+        """
+        Throws an error at the current position in the source code
+
+        :param message: The error message
+        :type message: str
+        """
+        self.ExceptionHandler.raise_exception(f"{message} at {self.line_index.describe(self.pos)}")
+
+    def scan(self) -> Token(TokenType, any):
+        """
+        Scans the next token from the current position
 
         :return: The token form of the source code
         :rtype: Token()
@@ -88,11 +177,57 @@ class Lexer(object):
             if self.cur_char.isalpha():
                 return self._id()
 
+            if self.cur_char == '"':
+                return self.string()
+
+            if self.cur_char == "←" or (self.cur_char == "<" and self.peek() == "-"):
+                token = Token(TokenType.ASSIGN, "<-")
+                if self.cur_char == "<":
+                    self.advance()
+                self.advance()
+                return token
+
             if self.cur_char == "=":
+                if self.peek() == "=":
+                    self.advance()
+                    self.advance()
+                    return Token(TokenType.EQEQ, "==")
                 token = Token(TokenType.EQ, self.cur_char)
                 self.advance()
                 return token
 
+            if self.cur_char == "<":
+                self.advance()
+                if self.cur_char == "=":
+                    self.advance()
+                    return Token(TokenType.LTEQ, "<=")
+                if self.cur_char == ">":
+                    self.advance()
+                    return Token(TokenType.NOTEQ, "<>")
+                return Token(TokenType.LTHAN, "<")
+
+            if self.cur_char == ">":
+                self.advance()
+                if self.cur_char == "=":
+                    self.advance()
+                    return Token(TokenType.GTEQ, ">=")
+                return Token(TokenType.GTHAN, ">")
+
+            if self.cur_char == "!" and self.peek() == "=":
+                self.advance()
+                self.advance()
+                return Token(TokenType.NOTEQ, "!=")
+
+            if self.cur_char == ":":
+                token = Token(TokenType.COLON, self.cur_char)
+                self.advance()
+                return token
+
+            if self.cur_char == ",":
+                token = Token(TokenType.COMMA, self.cur_char)
+                self.advance()
+                return token
+
             if self.cur_char == ";":
                 token = Token(TokenType.SEMI, self.cur_char)
                 self.advance()
@@ -104,7 +239,7 @@ class Lexer(object):
                 return token
 
             if self.cur_char.isnumeric():
-                token = Token(TokenType.INTEGER, self.integer())
+                token = self.number()
             elif self.cur_char == "+":
                 token = Token(TokenType.PLUS, self.cur_char)
                 self.advance()
@@ -117,13 +252,22 @@ class Lexer(object):
             elif self.cur_char == "/":
                 token = Token(TokenType.DIV, self.cur_char)
                 self.advance()
+            elif self.cur_char == "&":
+                token = Token(TokenType.CONCAT, self.cur_char)
+                self.advance()
             elif self.cur_char == "(":
                 token = Token(TokenType.LPAREN, self.cur_char)
                 self.advance()
             elif self.cur_char == ")":
                 token = Token(TokenType.RPAREN, self.cur_char)
                 self.advance()
+            elif self.cur_char == "[":
+                token = Token(TokenType.LBRACKET, self.cur_char)
+                self.advance()
+            elif self.cur_char == "]":
+                token = Token(TokenType.RBRACKET, self.cur_char)
+                self.advance()
             else:
-                self.ExceptionHandler.raise_exception(f"Unidentified character found: {self.cur_char}")
+                self.error(f"Unidentified character found: {self.cur_char}")
             return token
         return Token(TokenType.EOF, None)
\ No newline at end of file
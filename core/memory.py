@@ -0,0 +1,286 @@
+from .storage import TypedArray
+from .strings import StringBuilder
+from .frames import Reference
+from .metrics import ERRORS
+import logging
+import weakref
+
+class MemoryLimitExceeded(SystemExit):
+    """
+    Raised when the values held by a program grow past its memory limit. Like the errors thrown by ExceptionHandler it
+    ends the run (and exits the command line interpreter with its message), but can be caught by code embedding the
+    interpreter, which can read what was being stored and how much memory was held
+
+    :param limit: The memory limit, in bytes
+    :type limit: int
+    :param used: The memory held once the value was stored, in bytes
+    :type used: int
+    :param name: The variable being stored to (None for array elements and call frames)
+    :type name: str | None
+    """
+    def __init__(self, limit: int, used: int, name: str | None):
+        target = f" storing to {name}" if name is not None else ""
+        super().__init__(f"Memory limit of {limit:,} bytes exceeded{target}: {used:,} bytes held")
+        self.limit: int = limit
+        self.used: int = used
+        self.name: str | None = name
+
+
+class MemoryMeter(object):
+    """
+    Keeps an approximate count of the memory held by a program's values: its global variables, the elements of its
+    arrays, and the call frames of the subroutines being executed, with what is stored in them. The count is kept up to
+    date as values are stored, from the size of each value stored and the one it replaces, so the cost of an assignment
+    does not depend on the size of the values (sys.getsizeof is not used: it is slower, and does not follow the pieces of
+    StringBuilders or the elements of arrays anyway).
+
+    Sizes are estimated as on 64 bit CPython: an INTEGER takes 28 bytes plus 4 for each 30 bits past the first, a REAL
+    24, a STRING 49 plus a byte per character, an array 8 bytes per element plus the STRINGs it holds, and a frame 8
+    bytes per slot. BOOLEANs are shared, so take nothing. A STRING built by concatenation is counted as the STRING it is
+    joined into, as its pieces are shared with the values it was built from.
+
+    The STRINGs held by each array are counted as they are stored in its elements (with the array, as arrays cannot be
+    shared between variables), and stop being counted once the variable holding the array is given another value or its
+    call frame is left. Compiled loops store values in variables without counting them, so the count is brought up to
+    date each time one returns; they store array elements through store, like the interpreter. Global variables left by
+    earlier programs count towards the memory of the next one
+
+    :param limit: The memory the program's values may hold, in bytes (None to only count it)
+    :type limit: int | None
+    """
+    INT = 28
+    INT_DIGIT = 4
+    FLOAT = 24
+    STR = 49
+    BUILDER = 72
+    ARRAY = 120
+    REFERENCE = 48
+    FRAME = 56
+    SLOT = 8
+
+    def __init__(self, limit: int | None = None):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.limit: int | None = limit
+        # The size of the value each global variable holds
+        self.sizes: dict[str, int] = {}
+        # The array each global variable holding one holds, and the size of the STRINGs held by each array counted
+        self.arrays: dict[str, TypedArray] = {}
+        self.contents: weakref.WeakKeyDictionary[TypedArray, int] = weakref.WeakKeyDictionary()
+        self.used: int = 0
+        self.peak: int = 0
+
+    def measure(self, value: any) -> int:
+        """
+        Returns the approximate size of a value in bytes, in constant time. The size of an array does not include the
+        STRINGs it holds (see contained)
+
+        :param value: The value
+        :type value: any
+        :rtype: int
+        """
+        kind = type(value)
+        if kind is int:
+            return self.INT + value.bit_length() // 30 * self.INT_DIGIT
+        if kind is float:
+            return self.FLOAT
+        if kind is str:
+            return self.STR + len(value)
+        if kind is StringBuilder:
+            return self.BUILDER + self.STR + value.length
+        if kind is TypedArray:
+            # INTEGER and REAL arrays are unboxed; the elements of others are references, to STRINGs counted separately
+            return self.ARRAY + value.size * self.SLOT
+        if kind is Reference:
+            return self.REFERENCE
+        return 0
+
+    def contained(self, array: TypedArray) -> int:
+        """
+        Returns the size of the STRINGs held by an array in bytes, past the empty STRINGs it was declared with. The
+        elements are only measured the first time an array is seen; from then on the size is kept up to date as they are
+        stored
+
+        :param array: The array
+        :type array: TypedArray()
+        :rtype: int
+        """
+        if type(array.data) is not list:
+            return 0
+        size = self.contents.get(array)
+        if size is None:
+            empty = self.measure(array.DEFAULTS[array.element_type])
+            size = self.contents[array] = sum(map(self.measure, array.data)) - array.size * empty
+        return size
+
+    def exchange(self, old: any, new: any) -> int:
+        """
+        Returns the change in the size of the STRINGs held by arrays when a variable holding one value is given another:
+        those of an array it held stop being counted, and those of an array it is given start being counted
+
+        :param old: The value held before
+        :type old: any
+        :param new: The value stored
+        :type new: any
+        :rtype: int
+        """
+        if old is new:
+            return 0
+        change = 0
+        if type(old) is TypedArray:
+            change -= self.contents.pop(old, 0)
+        if type(new) is TypedArray:
+            change += self.contained(new)
+        return change
+
+    def start(self, scope: dict):
+        """
+        Starts counting for a new run, from the global variables already defined
+
+        :param scope: The global scope
+        :type scope: dict
+        """
+        self.sizes.clear()
+        self.arrays.clear()
+        self.contents.clear()
+        self.used = self.peak = 0
+        self.sync(scope)
+
+    def grow(self, change: int, name: str | None = None):
+        """
+        Adds to the memory held, checking the limit whenever it reaches a new peak
+
+        :param change: The number of bytes the memory held changed by
+        :type change: int
+        :param name: The variable being stored to, if any
+        :type name: str | None
+        """
+        used = self.used = self.used + change
+        if used > self.peak:
+            self.peak = used
+            if self.limit is not None and used > self.limit:
+                self.logger.error(f"Memory limit of {self.limit} bytes exceeded: {used} bytes held")
+                ERRORS.inc(label="Interpreter")
+                raise MemoryLimitExceeded(self.limit, used, name)
+
+    def assign(self, name: str, value: any):
+        """
+        Counts a value stored to a global variable, in place of the one it held
+
+        :param name: The variable's name
+        :type name: str
+        :param value: The value stored
+        :type value: any
+        """
+        size = self.measure(value)
+        change = size - self.sizes.get(name, 0)
+        self.sizes[name] = size
+        if type(value) is TypedArray or name in self.arrays:
+            change += self.exchange(self.arrays.pop(name, None), value)
+            if type(value) is TypedArray:
+                self.arrays[name] = value
+        if change:
+            self.grow(change, name)
+
+    def replace(self, old: any, new: any):
+        """
+        Counts a value stored to a slot of a call frame, in place of the one it held
+
+        :param old: The value held before
+        :type old: any
+        :param new: The value stored
+        :type new: any
+        """
+        change = self.measure(new) - self.measure(old)
+        if type(old) is TypedArray or type(new) is TypedArray:
+            change += self.exchange(old, new)
+        if change:
+            self.grow(change)
+
+    def replace_element(self, array: TypedArray, old: any, new: any):
+        """
+        Counts a value stored to an element of an array, in place of the one it held
+
+        :param array: The array
+        :type array: TypedArray()
+        :param old: The value the element held before
+        :type old: any
+        :param new: The value stored
+        :type new: any
+        """
+        if type(array.data) is not list:
+            return
+        change = self.measure(new) - self.measure(old)
+        if change:
+            self.contents[array] = self.contained(array) + change
+            self.grow(change)
+
+    def store(self, array: TypedArray, index: int | tuple[int, ...], value: any):
+        """
+        Stores a value in an element of an array, counting it in place of the one it held
+
+        :param array: The array
+        :type array: TypedArray()
+        :param index: The index of the element
+        :type index: int | tuple[int, ...]
+        :param value: The value to store
+        :type value: any
+        """
+        self.replace_element(array, array[index], value)
+        array[index] = value
+
+    def sync(self, scope: dict):
+        """
+        Brings the count for the global variables up to date, after values were stored without being counted
+
+        :param scope: The global scope
+        :type scope: dict
+        """
+        for name in self.sizes.keys() - scope.keys():
+            self.grow(-self.sizes.pop(name) + self.exchange(self.arrays.pop(name, None), None))
+        for name, value in scope.items():
+            self.assign(name, value)
+
+    def frame_size(self, frame: list) -> int:
+        return self.FRAME + len(frame) * self.SLOT + sum(map(self.measure, frame))
+
+    def enter(self, frame: list):
+        """
+        Counts a call frame, with the arguments stored in it, as a subroutine is called
+
+        :param frame: The call frame
+        :type frame: list
+        """
+        self.grow(self.frame_size(frame))
+
+    def leave(self, frame: list):
+        """
+        Stops counting a call frame, with the values stored in it, as its subroutine returns
+
+        :param frame: The call frame
+        :type frame: list
+        """
+        self.used -= self.frame_size(frame)
+        for value in frame:
+            if type(value) is TypedArray:
+                self.used -= self.contents.pop(value, 0)
+
+    def metered(self, loop: "function") -> "function":
+        """
+        Wraps the function of a compiled loop, so the values it stored in variables are counted once it returns (the
+        elements it stored were counted as they were stored)
+
+        :param loop: The compiled loop's function, taking the global scope and the current call frame (and possibly
+            other arguments)
+        :type loop: function
+        :rtype: function
+        """
+        def run(scope: dict, frame: list | None, *args) -> any:
+            before = self.frame_size(frame) if frame is not None else 0
+            try:
+                return loop(scope, frame, *args)
+            finally:
+                if frame is not None:
+                    self.grow(self.frame_size(frame) - before)
+                self.sync(scope)
+
+        return run
@@ -0,0 +1,290 @@
+import bisect
+import threading
+import logging
+
+class Metric(object):
+    """
+    Base class for metrics. Each thread updates its own shard of the values, so updating a metric takes no lock and
+    threads never contend; the shards are only added together when the metric is read
+
+    :param name: The name the metric is exposed under
+    :type name: str
+    :param description: What the metric measures
+    :type description: str
+    :param label: The name of the label distinguishing the metric's values, eg. "phase" (None for a single value)
+    :type label: str | None
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, label: str | None = None):
+        self.name: str = name
+        self.description: str = description
+        self.label: str | None = label
+        self.local: threading.local = threading.local()
+        # The shard of each thread which has updated the metric, and the values of threads which have since finished
+        self.shards: list[tuple[threading.Thread, dict]] = []
+        self.retired: dict = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def shard(self) -> dict:
+        """
+        Returns the calling thread's values, by label value
+
+        :rtype: dict
+        """
+        try:
+            return self.local.values
+        except AttributeError:
+            values = self.local.values = {}
+            with self.lock:
+                self.retire()
+                self.shards.append((threading.current_thread(), values))
+            return values
+
+    def retire(self):
+        """
+        Folds the shards of threads which have finished into the retired values, so threads started for each program
+        (see run_with_deep_stack) do not leave a shard behind each. Must be called holding the lock
+        """
+        live = []
+        for thread, values in self.shards:
+            if thread.is_alive():
+                live.append((thread, values))
+            else:
+                self.merge(self.retired, values)
+        self.shards = live
+
+    def merge(self, totals: dict, values: dict):
+        for label, value in list(values.items()):
+            totals[label] = self.combine(totals[label], value) if label in totals else self.copy(value)
+
+    def items(self) -> list[tuple[str | None, any]]:
+        """
+        Returns the value for each label value, added up across every thread's shard
+
+        :rtype: list[tuple[str | None, any]]
+        """
+        totals = {}
+        with self.lock:
+            self.retire()
+            self.merge(totals, self.retired)
+            for _, values in self.shards:
+                self.merge(totals, values)
+        return sorted(totals.items(), key=lambda item: item[0] or "")
+
+    def reset(self):
+        with self.lock:
+            self.retired.clear()
+            for _, values in self.shards:
+                values.clear()
+
+    def labels(self, label: str | None, *extra: str) -> str:
+        pairs = ([f'{self.label}="{label}"'] if self.label is not None else []) + list(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @staticmethod
+    def copy(value: any) -> any:
+        return value
+
+    @staticmethod
+    def combine(total: any, value: any) -> any:
+        raise NotImplementedError
+
+    def exposition(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """
+    A count which only goes up, eg. the number of tokens lexed
+    """
+    kind = "counter"
+
+    def inc(self, amount: int | float = 1, label: str | None = None):
+        """
+        Adds to the count
+
+        :param amount: The amount to add
+        :type amount: int | float
+        :param label: The label value counted under (None if the metric has no label)
+        :type label: str | None
+        """
+        values = self.shard()
+        values[label] = values.get(label, 0) + amount
+
+    def value(self, label: str | None = None) -> int | float:
+        return dict(self.items()).get(label, 0)
+
+    @staticmethod
+    def combine(total: int | float, value: int | float) -> int | float:
+        return total + value
+
+    def exposition(self) -> list[str]:
+        return [f"{self.name}{self.labels(label)} {value}" for label, value in self.items()]
+
+
+class Histogram(Metric):
+    """
+    The distribution of measurements such as latencies, counted into buckets by their upper bound, along with their sum
+    and count
+
+    :param buckets: The upper bounds of the buckets, in ascending order (an unbounded bucket is added)
+    :type buckets: tuple[float, ...]
+    """
+    kind = "histogram"
+    # Latencies from 100us to 10s
+    DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name: str, description: str, label: str | None = None, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, description, label)
+        self.buckets: tuple[float, ...] = tuple(buckets)
+
+    def observe(self, value: float, label: str | None = None):
+        """
+        Records a measurement
+
+        :param value: The measurement, eg. a latency in seconds
+        :type value: float
+        :param label: The label value recorded under (None if the metric has no label)
+        :type label: str | None
+        """
+        values = self.shard()
+        # The count of each bucket, then the sum of the measurements
+        counts = values.get(label)
+        if counts is None:
+            counts = values[label] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def summary(self, label: str | None = None) -> tuple[int, float]:
+        """
+        Returns the number and sum of the measurements recorded
+
+        :rtype: tuple[int, float]
+        """
+        counts = dict(self.items()).get(label)
+        if counts is None:
+            return 0, 0.0
+        return sum(counts[:-1]), counts[-1]
+
+    @staticmethod
+    def copy(value: list) -> list:
+        return list(value)
+
+    @staticmethod
+    def combine(total: list, value: list) -> list:
+        return [a + b for a, b in zip(total, value)]
+
+    def exposition(self) -> list[str]:
+        lines = []
+        for label, counts in self.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self.labels(label, bucket)} {cumulative}")
+            lines.append(f"{self.name}_sum{self.labels(label)} {counts[-1]}")
+            lines.append(f"{self.name}_count{self.labels(label)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry(object):
+    """
+    A set of metrics, which can be read as a dictionary or in the Prometheus text exposition format
+    """
+    def __init__(self):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, label: str | None = None) -> Counter:
+        return self.register(Counter(name, description, label))
+
+    def histogram(self, name: str, description: str, label: str | None = None, **kwargs) -> Histogram:
+        return self.register(Histogram(name, description, label, **kwargs))
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Returns the current value of every metric, by metric name then label value (None for metrics without a label).
+        Histogram values are the count of each bucket followed by the sum of the measurements
+
+        :rtype: dict[str, dict]
+        """
+        return {name: dict(metric.items()) for name, metric in self.metrics.items()}
+
+    def exposition(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format
+
+        :rtype: str
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """
+        Serves the metrics over HTTP at /metrics in the Prometheus text format, from a background thread
+
+        :param port: The port to listen on (0 to pick a free port)
+        :type port: int
+        :param host: The address to listen on (local connections only by default)
+        :type host: str
+        :return: The server, which is stopped with shutdown()
+        :rtype: ThreadingHTTPServer()
+        """
+        # Only needed when serving, so not imported with the module
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args):
+                registry.logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        self.logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+# The phase each module's errors are counted under
+PHASES = {"core.lexer": "Lexer", "core.parser": "Parser", "core.tableparser": "Parser", "core.typechecker": "TypeChecker"}
+
+METRICS = MetricsRegistry()
+TOKENS_LEXED = METRICS.counter("pseudocode_tokens_lexed_total", "Tokens produced by the lexer")
+NODES_PARSED = METRICS.counter(
+    "pseudocode_nodes_parsed_total", "AST nodes parsed, counted as the type checker visits them"
+)
+STATEMENTS_EXECUTED = METRICS.counter(
+    "pseudocode_statements_executed_total", "Statements executed by the tree-walking interpreter"
+)
+CACHE_HITS = METRICS.counter("pseudocode_cache_hits_total", "Lookups answered from a cache", "cache")
+CACHE_MISSES = METRICS.counter("pseudocode_cache_misses_total", "Lookups not answered from a cache", "cache")
+ERRORS = METRICS.counter("pseudocode_errors_total", "Errors raised, by the phase raising them", "phase")
+PHASE_SECONDS = METRICS.histogram("pseudocode_phase_seconds", "Time spent in each phase of running a program", "phase")
+PEAK_MEMORY = METRICS.histogram(
+    "pseudocode_peak_memory_bytes", "Peak memory held by the values of each program run with a memory meter",
+    buckets=(1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+)
@@ -0,0 +1,591 @@
+from .nodevisitor import NodeVisitor
+from .token import Token, TokenType
+from .datatype import DataType
+from .ast import *
+import collections
+import logging
+
+class DefUse(NodeVisitor):
+    """
+    Collects the variables a statement (or expression) defines and uses. Variables are identified by their (slot, name)
+    key, as a name can refer to a global variable or to a slot of a subroutine's frame. Calls to user defined
+    subroutines can assign to any global variable, so they are only recorded in `calls` rather than resolved
+    """
+    def __init__(self):
+        self.defs: set[tuple[int | None, str]] = set()
+        self.uses: set[tuple[int | None, str]] = set()
+        self.calls: bool = False
+
+    @classmethod
+    def of(cls, node: AST) -> "DefUse":
+        """
+        Returns the definitions and uses of a node and everything nested in it
+
+        :rtype: DefUse()
+        """
+        def_use = cls()
+        def_use.visit(node)
+        return def_use
+
+    @staticmethod
+    def key(node: Variable) -> tuple[int | None, str]:
+        return node.slot, node.value
+
+    def generic_visit(self, node: AST):
+        # Anything not understood is treated like a call, which could define anything
+        self.calls = True
+
+    def visit_Compound(self, node: Compound):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOP(self, node: NoOP):
+        pass
+
+    def visit_Num(self, node: Num):
+        pass
+
+    def visit_String(self, node: String):
+        pass
+
+    def visit_Boolean(self, node: Boolean):
+        pass
+
+    def visit_Variable(self, node: Variable):
+        self.uses.add(self.key(node))
+
+    def visit_ArrayElement(self, node: ArrayElement):
+        self.visit(node.var_node)
+        for index in node.indices:
+            self.visit(index)
+
+    def visit_BinOP(self, node: BinOP):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+    visit_LogicalOP = visit_BinOP
+
+    def visit_UnaryOP(self, node: UnaryOP):
+        self.visit(node.expr)
+
+    def visit_FunctionCall(self, node: FunctionCall):
+        if node.subroutine is not None:
+            self.calls = True
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_ProcedureCall(self, node: ProcedureCall):
+        self.calls = True
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_Assign(self, node: Assign):
+        self.visit(node.right)
+        self.define(node.left)
+
+    def visit_Input(self, node: Input):
+        self.define(node.var_node)
+
+    def visit_ReadFile(self, node: ReadFile):
+        self.visit(node.filename)
+        self.define(node.var_node)
+
+    def visit_WriteFile(self, node: WriteFile):
+        self.visit(node.filename)
+        self.visit(node.expr)
+
+    def visit_OpenFile(self, node: OpenFile):
+        self.visit(node.filename)
+
+    visit_CloseFile = visit_OpenFile
+    visit_EndOfFile = visit_OpenFile
+
+    def define(self, node: Variable | ArrayElement):
+        if isinstance(node, ArrayElement):
+            for index in node.indices:
+                self.visit(index)
+            node = node.var_node
+        self.defs.add(self.key(node))
+
+    def visit_VarDecl(self, node: VarDecl):
+        self.defs.add(self.key(node.var_node))
+
+    def visit_Output(self, node: Output):
+        for expr in node.exprs:
+            self.visit(expr)
+
+    def visit_Return(self, node: Return):
+        self.visit(node.expr)
+
+    def visit_IfStatement(self, node: IfStatement):
+        self.visit(node.condition)
+        self.visit(node.then_body)
+        if node.else_body is not None:
+            self.visit(node.else_body)
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        self.visit(node.expr)
+        for branch in node.branches:
+            self.visit(branch.body)
+        if node.otherwise is not None:
+            self.visit(node.otherwise)
+
+    def visit_ForLoop(self, node: ForLoop):
+        self.visit(node.start)
+        self.visit(node.end)
+        if node.step is not None:
+            self.visit(node.step)
+        self.defs.add(self.key(node.var_node))
+        self.visit(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        self.visit(node.condition)
+        self.visit(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.visit(node.body)
+        self.visit(node.condition)
+
+
+class DataflowOptimizer(NodeVisitor):
+    """
+    Optimisation pipeline run over the type checked AST, made up of three passes which can each be switched off:
+
+    - Strength reduction rewrites INTEGER operations into cheaper equivalents (x * 2 into x + x, x * 1 and x + 0 into x)
+    - Common subexpression elimination computes an expression repeated within a basic block (a run of assignments and
+      OUTPUT statements without calls) once, into a temporary variable used by every occurrence
+    - Loop-invariant code motion computes expressions whose variables are not assigned anywhere in a WHILE, REPEAT or
+      FOR loop once, into a temporary variable assigned before the loop
+
+    Only expressions which cannot throw an error and have no side effects are moved: their operands must have known
+    static types, every variable in them must be definitely assigned beforehand, and they cannot divide by anything but
+    a non-zero constant. Moving them therefore never changes what a program outputs or when it fails. AND and OR are
+    never moved as a whole, as whether their right operand is evaluated depends on their left one.
+
+    Temporary variables are named with an underscore (eg. cse_1), which identifiers in the source code cannot contain.
+    At the top level of a program they are global variables, removed by the interpreter (see discard) once the program
+    has run, so it leaves the same variables as when it is not optimised; inside a subroutine they are given new frame
+    slots
+    """
+    # Operators whose result depends only on their operands. & is excluded, as it builds a shared StringBuilder
+    PURE_OPERATORS = (
+        TokenType.PLUS,
+        TokenType.MINUS,
+        TokenType.MUL,
+        TokenType.DIV,
+        TokenType.EQ,
+        TokenType.EQEQ,
+        TokenType.NOTEQ,
+        TokenType.LTHAN,
+        TokenType.LTEQ,
+        TokenType.GTHAN,
+        TokenType.GTEQ,
+    )
+
+    def __init__(self, cse: bool = True, licm: bool = True, strength_reduction: bool = True):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.cse: bool = cse
+        self.licm: bool = licm
+        self.strength_reduction: bool = strength_reduction
+        self.temporaries: int = 0
+        # Names of the temporary variables created in the global scope
+        self.globals: list[str] = []
+        self.subroutine: SubroutineDecl | None = None
+        # Variables definitely assigned at the statement being optimised
+        self.assigned: set[tuple[int | None, str]] = set()
+        # The current version of each variable, increased every time it is assigned within a basic block
+        self.versions: dict[tuple[int | None, str], int] = {}
+
+    def optimise(self, tree: AST) -> AST:
+        """
+        Runs every enabled pass over the AST passed
+
+        :param tree: Root node of a type checked AST
+        :type tree: AST()
+        :return: The optimised AST
+        :rtype: AST()
+        """
+        if self.strength_reduction:
+            self.map_statements(tree, self.reduce)
+        self.visit(tree)
+        self.logger.info(f"Optimised AST using {self.temporaries} temporary variable(s)")
+        return tree
+
+    def generic_visit(self, node: AST):
+        pass
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl):
+        outer_assigned = self.assigned
+        self.subroutine = node
+        self.assigned = {DefUse.key(param.var_node) for param in node.params}
+        self.visit(node.body)
+        self.subroutine, self.assigned = None, outer_assigned
+
+    def visit_IfStatement(self, node: IfStatement):
+        assigned = self.assigned
+        for body in (node.then_body, node.else_body):
+            if body is not None:
+                self.assigned = set(assigned)
+                self.visit(body)
+        self.assigned = assigned
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        assigned = self.assigned
+        for body in self.bodies(node):
+            self.assigned = set(assigned)
+            self.visit(body)
+        self.assigned = assigned
+
+    def visit_ForLoop(self, node: ForLoop):
+        assigned = self.assigned
+        self.assigned = assigned | {DefUse.key(node.var_node)}
+        self.visit(node.body)
+        self.assigned = assigned
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        assigned = self.assigned
+        self.assigned = set(assigned)
+        self.visit(node.body)
+        self.assigned = assigned
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        assigned = self.assigned
+        self.assigned = set(assigned)
+        self.visit(node.body)
+        self.assigned = assigned
+
+    def visit_Compound(self, node: Compound):
+        """
+        Optimises a list of statements: each loop has its invariant expressions moved out before the statements nested
+        in it are optimised, and each basic block has its common subexpressions eliminated
+        """
+        children, block = [], []
+        for child in node.children:
+            if self.in_block(child):
+                block.append(child)
+                continue
+            children += self.eliminate_common(block)
+            block = []
+            if self.licm and isinstance(child, (ForLoop, WhileLoop, RepeatLoop)):
+                children += self.hoist_invariants(child)
+            self.visit(child)
+            children.append(child)
+            self.assigned |= self.definitely_assigned(child)
+        children += self.eliminate_common(block)
+        node.children = children
+
+    def in_block(self, node: AST) -> bool:
+        """
+        Checks if a statement can be part of a basic block: an assignment or OUTPUT statement which calls no subroutines
+
+        :rtype: bool
+        """
+        return isinstance(node, (Assign, Output)) and not DefUse.of(node).calls
+
+    @staticmethod
+    def definitely_assigned(node: AST) -> set[tuple[int | None, str]]:
+        """
+        Returns the variables certainly assigned once a statement has been executed
+
+        :rtype: set[tuple[int | None, str]]
+        """
+        if isinstance(node, (Assign, Input)):
+            target = node.left if isinstance(node, Assign) else node.var_node
+            if isinstance(target, Variable):
+                return {DefUse.key(target)}
+        return set()
+
+    def temporary(self, prefix: str, data_type: DataType) -> Variable:
+        """
+        Creates a new temporary variable, in a new frame slot if a subroutine is being optimised
+
+        :param prefix: The pass creating the variable, used in its name
+        :type prefix: str
+        :param data_type: The static type of the variable
+        :type data_type: DataType()
+        :rtype: Variable()
+        """
+        self.temporaries += 1
+        node = Variable(Token(TokenType.IDENTIFIER, f"{prefix}_{self.temporaries}"))
+        if self.subroutine is not None:
+            node.slot = self.subroutine.slot_count
+            self.subroutine.slot_count += 1
+        else:
+            self.globals.append(node.value)
+        node.type = data_type
+        return node
+
+    def discard(self, scope: dict):
+        """
+        Removes the temporary variables created in the global scope from it, once the optimised program has run
+
+        :param scope: The global scope
+        :type scope: dict
+        """
+        for name in self.globals:
+            scope.pop(name, None)
+
+    @staticmethod
+    def copy(node: Variable) -> Variable:
+        copied = Variable(Token(TokenType.IDENTIFIER, node.value, node.offset))
+        copied.slot, copied.type = node.slot, node.type
+        return copied
+
+    def key(self, node: AST, assigned: set) -> tuple | None:
+        """
+        Returns a key identifying the value of an expression, which is equal for any two expressions certain to have the
+        same value. None is returned if the expression could throw an error or have side effects
+
+        :param node: The expression node
+        :type node: AST()
+        :param assigned: The variables definitely assigned where the expression is evaluated
+        :type assigned: set[tuple[int | None, str]]
+        :rtype: tuple | None
+        """
+        if isinstance(node, (Num, String, Boolean)):
+            return type(node).__name__, type(node.value), node.value
+        if isinstance(node, Variable):
+            key = DefUse.key(node)
+            if node.byref or getattr(node, "type", None) is None or key not in assigned:
+                return None
+            return "Variable", key, self.versions.get(key, 0)
+        if isinstance(node, UnaryOP):
+            operand = self.key(node.expr, assigned)
+            if operand is None or getattr(node, "type", None) is None:
+                return None
+            return "UnaryOP", node.op.type, operand
+        if isinstance(node, BinOP):
+            operand_types = getattr(node.left, "type", None), getattr(node.right, "type", None)
+            if node.op.type not in self.PURE_OPERATORS or None in operand_types:
+                return None
+            if node.op.type == TokenType.DIV and not (isinstance(node.right, Num) and node.right.value != 0):
+                return None
+            left, right = self.key(node.left, assigned), self.key(node.right, assigned)
+            if left is None or right is None:
+                return None
+            return "BinOP", node.op.type, left, right
+        return None
+
+    @staticmethod
+    def is_operation(node: AST) -> bool:
+        return isinstance(node, (BinOP, UnaryOP))
+
+    def eliminate_common(self, block: list[AST]) -> list[AST]:
+        """
+        Eliminates the common subexpressions of a basic block. The expressions repeated in the block are counted first,
+        then each is assigned to a temporary variable just before the statement it first appears in
+
+        :param block: The statements of the block
+        :type block: list[AST()]
+        :return: The statements of the optimised block
+        :rtype: list[AST()]
+        """
+        if not self.cse:
+            for statement in block:
+                self.kill(statement, self.assigned)
+            return block
+
+        assigned, versions = set(self.assigned), dict(self.versions)
+        counts = collections.Counter()
+
+        def count(node: AST) -> AST:
+            key = self.key(node, assigned) if self.is_operation(node) else None
+            if key is not None:
+                counts[key] += 1
+                if counts[key] > 1:
+                    # Every later occurrence is replaced as a whole, so the expressions in it are not repeated
+                    return node
+            self.map_children(node, count)
+            return node
+
+        for statement in block:
+            self.map_expressions(statement, count)
+            self.kill(statement, assigned)
+
+        repeated = {key for key, occurrences in counts.items() if occurrences > 1}
+        if not repeated:
+            self.assigned = assigned
+            return block
+
+        # Replay the block from the versions it started with, so each expression gets the same key as when counted
+        self.versions = versions
+        assigned = set(self.assigned)
+        temporaries = {}
+        optimised = []
+
+        def replace(node: AST) -> AST:
+            key = self.key(node, assigned) if self.is_operation(node) else None
+            if key in temporaries:
+                return self.copy(temporaries[key])
+            self.map_children(node, replace)
+            if key in repeated:
+                temporary = temporaries[key] = self.temporary("cse", node.type)
+                optimised.append(Assign(temporary, Token(TokenType.ASSIGN, "<-"), node))
+                assigned.add(DefUse.key(temporary))
+                return self.copy(temporary)
+            return node
+
+        for statement in block:
+            self.map_expressions(statement, replace)
+            optimised.append(statement)
+            self.kill(statement, assigned)
+
+        self.assigned = assigned
+        return optimised
+
+    def kill(self, statement: AST, assigned: set):
+        """
+        Records the variables assigned by a statement of a basic block: expressions using their previous values are no
+        longer common with later ones
+        """
+        for key in DefUse.of(statement).defs:
+            self.versions[key] = self.versions.get(key, 0) + 1
+        assigned |= self.definitely_assigned(statement)
+
+    def hoist_invariants(self, loop: ForLoop | WhileLoop | RepeatLoop) -> list[Assign]:
+        """
+        Moves the loop-invariant expressions of a loop into temporary variables assigned before the loop
+
+        :param loop: The loop node
+        :type loop: ForLoop() | WhileLoop() | RepeatLoop()
+        :return: The assignments to run before the loop
+        :rtype: list[Assign()]
+        """
+        def_use = DefUse.of(loop)
+        if def_use.calls:
+            return []
+        # Expressions using variables assigned in the loop are not invariant
+        assigned = self.assigned - def_use.defs
+
+        temporaries = {}
+        preheader = []
+
+        def hoist(node: AST) -> AST:
+            key = self.key(node, assigned) if self.is_operation(node) else None
+            if key is not None and self.has_variable(key):
+                temporary = temporaries.get(key)
+                if temporary is None:
+                    temporary = temporaries[key] = self.temporary("licm", node.type)
+                    preheader.append(Assign(temporary, Token(TokenType.ASSIGN, "<-"), node))
+                return self.copy(temporary)
+            self.map_children(node, hoist)
+            return node
+
+        if isinstance(loop, (WhileLoop, RepeatLoop)):
+            loop.condition = hoist(loop.condition)
+        self.map_statements(loop.body, hoist)
+        self.assigned |= {DefUse.key(assign.left) for assign in preheader}
+        if preheader:
+            self.logger.info(f"Hoisted {len(preheader)} invariant expression(s) out of {type(loop).__name__}")
+        return preheader
+
+    @classmethod
+    def has_variable(cls, key: tuple) -> bool:
+        # Expressions of constants only are left in place
+        if key[0] == "Variable":
+            return True
+        return any(cls.has_variable(part) for part in key[2:] if isinstance(part, tuple))
+
+    def reduce(self, node: AST) -> AST:
+        """
+        Replaces an INTEGER operation with a cheaper equivalent, after reducing its operands
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        self.map_children(node, self.reduce)
+        if not isinstance(node, IntBinOP):
+            return node
+        op, left, right = node.op.type, node.left, node.right
+        if op == TokenType.MUL:
+            for operand, other in ((left, right), (right, left)):
+                if isinstance(operand, Num) and operand.value == 1:
+                    return other
+                if isinstance(operand, Num) and operand.value == 2 and isinstance(other, Variable):
+                    reduced = IntBinOP(other, Token(TokenType.PLUS, "+"), self.copy(other))
+                    reduced.type = node.type
+                    return reduced
+        elif op == TokenType.PLUS:
+            for operand, other in ((left, right), (right, left)):
+                if isinstance(operand, Num) and operand.value == 0:
+                    return other
+        elif op == TokenType.MINUS and isinstance(right, Num) and right.value == 0:
+            return left
+        return node
+
+    def map_children(self, node: AST, func):
+        """
+        Replaces each operand, argument or index of an expression with the result of a function called on it
+
+        :param node: The expression node
+        :type node: AST()
+        :param func: Function taking an expression node and returning the node to replace it with
+        :type func: function
+        """
+        if isinstance(node, BinOP):
+            node.left, node.right = func(node.left), func(node.right)
+        elif isinstance(node, UnaryOP):
+            node.expr = func(node.expr)
+        elif isinstance(node, FunctionCall):
+            node.args = [func(arg) for arg in node.args]
+        elif isinstance(node, ArrayElement):
+            node.indices = [func(index) for index in node.indices]
+
+    def map_expressions(self, node: AST, func):
+        """
+        Replaces each expression directly part of a statement (not those of statements nested in it) with the result of
+        a function called on it
+        """
+        if isinstance(node, Assign):
+            node.right = func(node.right)
+            if isinstance(node.left, ArrayElement):
+                self.map_children(node.left, func)
+        elif isinstance(node, Output):
+            node.exprs = [func(expr) for expr in node.exprs]
+        elif isinstance(node, (Input, ReadFile)):
+            if isinstance(node.var_node, ArrayElement):
+                self.map_children(node.var_node, func)
+        elif isinstance(node, WriteFile):
+            node.expr = func(node.expr)
+        elif isinstance(node, Return):
+            node.expr = func(node.expr)
+        elif isinstance(node, ProcedureCall):
+            node.args = [func(arg) for arg in node.args]
+        elif isinstance(node, IfStatement):
+            node.condition = func(node.condition)
+        elif isinstance(node, CaseStatement):
+            node.expr = func(node.expr)
+        elif isinstance(node, (WhileLoop, RepeatLoop)):
+            node.condition = func(node.condition)
+        elif isinstance(node, ForLoop):
+            node.start, node.end = func(node.start), func(node.end)
+            if node.step is not None:
+                node.step = func(node.step)
+        elif isinstance(node, VarDecl) and isinstance(node.type_node, ArrayType):
+            node.type_node.bounds = [(func(lower), func(upper)) for lower, upper in node.type_node.bounds]
+
+    def map_statements(self, node: AST, func):
+        """
+        Replaces every expression in a statement and all statements nested in it with the result of a function
+        called on it
+        """
+        self.map_expressions(node, func)
+        for body in self.bodies(node):
+            for child in body.children:
+                self.map_statements(child, func)
+
+    @staticmethod
+    def bodies(node: AST) -> list[Compound]:
+        if isinstance(node, Compound):
+            return [node]
+        if isinstance(node, IfStatement):
+            return [body for body in (node.then_body, node.else_body) if body is not None]
+        if isinstance(node, CaseStatement):
+            return [branch.body for branch in node.branches] + ([node.otherwise] if node.otherwise is not None else [])
+        if isinstance(node, (ForLoop, WhileLoop, RepeatLoop, SubroutineDecl)):
+            return [node.body]
+        return []
@@ -0,0 +1,29 @@
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional dependencies looked for so far, by module name (None if not installed)
+MODULES: dict[str, "module | None"] = {}
+
+def optional_import(name: str) -> "module | None":
+    """
+    Imports an optional dependency (such as NumPy) the first time it is needed rather than when the package is
+    imported, so programs which never use it do not pay for loading it
+
+    :param name: The name of the module
+    :type name: str
+    :return: The module, or None if it is not installed
+    :rtype: module | None
+    """
+    try:
+        return MODULES[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        logger.info(f"Optional dependency {name} is not installed")
+        module = None
+    MODULES[name] = module
+    return module
@@ -3,6 +3,7 @@ from .lexer import Lexer
 from .ast import *
 from .nodevisitor import NodeVisitor
 from .exception import ExceptionHandler
+from typing import Iterator
 import logging
 
 class Parser(NodeVisitor):
@@ -12,11 +13,25 @@ class Parser(NodeVisitor):
     :param lexer: The lexical analyzer used
     :type lexer: Lexer()
     """
+    COMPARISON_OPERATORS = (
+        TokenType.EQ,
+        TokenType.EQEQ,
+        TokenType.NOTEQ,
+        TokenType.LTHAN,
+        TokenType.LTEQ,
+        TokenType.GTHAN,
+        TokenType.GTEQ,
+    )
+
     def __init__(self, lexer: Lexer):
         self.logger: logging.Logger = logging.getLogger(__name__)
         self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
         self.lexer: Lexer = lexer
         self.cur_token: Token = self.lexer.get_next_token()
+
+        # Slots of the local variables of the subroutine being parsed (None outside of subroutines)
+        self.frame_slots: dict[str, int] | None = None
+        self.byref_slots: set[int] = set()
     
     def eat(self, token_type: TokenType):
         """
@@ -27,7 +42,19 @@ class Parser(NodeVisitor):
             self.cur_token = self.lexer.get_next_token()
         else:
             self.logger.error(f"Token 1: {self.cur_token.type}; Token 2: {token_type}")
-            self.ExceptionHandler.raise_exception("Tokens do not match")
+            self.error(f"Expected {token_type.value}, got {self.cur_token.type.value} instead")
+
+    def error(self, message: str, token: Token | None = None):
+        """
+        Throws a syntax error at the position of a token
+
+        :param message: The error message
+        :type message: str
+        :param token: The token the error is at (the current token by default)
+        :type token: Token()
+        """
+        token = token if token is not None else self.cur_token
+        self.ExceptionHandler.raise_exception(f"{message} at {self.lexer.line_index.describe(token.offset)}")
     
     def program(self) -> any:
         """
@@ -66,50 +93,519 @@ class Parser(NodeVisitor):
         :return:
         :rtype: list
         """
-        node = self.statement()
-        results = [node]
+        return list(self.statements())
 
-        while self.cur_token.type != TokenType.EOF:
+    def statements(self) -> Iterator[AST]:
+        """
+        Parses a statement list lazily, yielding each statement as soon as it has been parsed
+        Ruleset: <stmt_list> ::= <stmt> | <stmt> ";" <stmt_list>
+
+        :rtype: Iterator[AST()]
+        """
+        yield self.statement()
+
+        while self.cur_token.type == TokenType.SEMI:
             self.eat(TokenType.SEMI)
-            results.append(self.statement())
+            yield self.statement()
         
         if self.cur_token.type == TokenType.IDENTIFIER:
-            self.ExceptionHandler.raise_exception(f"Unexpected identifier: {self.cur_token.value}")
-        
-        return results
+            self.error(f"Unexpected identifier: {self.cur_token.value}")
     
-    def statement(self) -> Assign | Compound | NoOP:
+    def statement(self) -> AST:
         """
         Parses a statement
         Ruleset: <stmt> ::= <compound> 
+            | <declaration>
             | <assignment>
+            | <for_loop>
+            | <while_loop>
+            | <repeat_loop>
+            | <if_stmt>
+            | <case_stmt>
+            | <subroutine>
+            | <call_stmt>
+            | <return_stmt>
+            | <output>
+            | <input>
+            | <openfile>
+            | <readfile>
+            | <writefile>
+            | <closefile>
             | <empty>
         
         :return:
-        :rtype: Assign() | Compound() | NoOP()
+        :rtype: AST()
         """
+        offset = self.cur_token.offset
         if self.cur_token.type == TokenType.START:
             node = self.compound()
-        elif self.cur_token.type == TokenType.IDENTIFIER:
+        elif self.cur_token.type == TokenType.DECLARE:
+            node = self.declaration()
+        elif self.cur_token.type == TokenType.FOR:
+            node = self.for_loop()
+        elif self.cur_token.type == TokenType.WHILE:
+            node = self.while_loop()
+        elif self.cur_token.type == TokenType.REPEAT:
+            node = self.repeat_loop()
+        elif self.cur_token.type == TokenType.IF:
+            node = self.if_statement()
+        elif self.cur_token.type == TokenType.CASE:
+            node = self.case_statement()
+        elif self.cur_token.type in (TokenType.PROCEDURE, TokenType.FUNCTION):
+            node = self.subroutine()
+        elif self.cur_token.type == TokenType.CALL:
+            node = self.call_statement()
+        elif self.cur_token.type == TokenType.RETURN:
+            node = self.return_statement()
+        elif self.cur_token.type == TokenType.OUTPUT:
+            node = self.output_statement()
+        elif self.cur_token.type == TokenType.INPUT:
+            node = self.input_statement()
+        elif self.cur_token.type == TokenType.OPENFILE:
+            node = self.openfile_statement()
+        elif self.cur_token.type == TokenType.READFILE:
+            node = self.readfile_statement()
+        elif self.cur_token.type == TokenType.WRITEFILE:
+            node = self.writefile_statement()
+        elif self.cur_token.type == TokenType.CLOSEFILE:
+            node = self.closefile_statement()
+        elif self.cur_token.type in (TokenType.LET, TokenType.IDENTIFIER):
             node = self.assignment()
         else:
             node = self.empty()
+        node.offset = offset
         return node
     
     def assignment(self) -> Assign:
         """
         Parses an assignment statement
-        Ruleset: <assignment> ::= LET <var> = <expr>
+        Ruleset: <assignment> ::= [LET] (<var> | <element>) ("=" | "<-") <condition>
 
         :rtype: Assign()
         """
+        if self.cur_token.type == TokenType.LET:
+            self.eat(TokenType.LET)
         left = self.variable()
-        token = self.cur_token()
-        self.eat(TokenType.EQ)
-        right = self.expr()
+        if self.cur_token.type == TokenType.LBRACKET:
+            left = self.array_element(left)
+        token = self.assign_op()
+        right = self.condition()
         node = Assign(left, token, right)
         return node
 
+    def assign_op(self) -> Token:
+        """
+        Consumes an assignment operator, which can be written as either "=" or "<-"
+
+        :return: The operator's token
+        :rtype: Token()
+        """
+        token = self.cur_token
+        if token.type == TokenType.ASSIGN:
+            self.eat(TokenType.ASSIGN)
+        else:
+            self.eat(TokenType.EQ)
+        return token
+
+    def for_loop(self) -> ForLoop:
+        """
+        Parses a count-controlled loop
+        Ruleset: <for_loop> ::= FOR <var> ("=" | "<-") <expr> TO <expr> [STEP <expr>] <stmt_list> NEXT [<var>]
+
+        :rtype: ForLoop()
+        """
+        self.eat(TokenType.FOR)
+        var_node = self.variable()
+        self.assign_op()
+        start = self.expr()
+        self.eat(TokenType.TO)
+        end = self.expr()
+        step = None
+        if self.cur_token.type == TokenType.STEP:
+            self.eat(TokenType.STEP)
+            step = self.expr()
+
+        body = Compound()
+        body.children = self.statement_list()
+        self.eat(TokenType.NEXT)
+        if self.cur_token.type == TokenType.IDENTIFIER:
+            if self.cur_token.value != var_node.value:
+                self.error(
+                    f"NEXT {self.cur_token.value} does not match FOR {var_node.value}"
+                )
+            self.eat(TokenType.IDENTIFIER)
+        return ForLoop(var_node, start, end, body, step)
+
+    def while_loop(self) -> WhileLoop:
+        """
+        Parses a pre-condition loop
+        Ruleset: <while_loop> ::= WHILE <condition> DO <stmt_list> ENDWHILE
+
+        :rtype: WhileLoop()
+        """
+        self.eat(TokenType.WHILE)
+        condition = self.condition()
+        self.eat(TokenType.DO)
+        body = Compound()
+        body.children = self.statement_list()
+        self.eat(TokenType.ENDWHILE)
+        return WhileLoop(condition, body)
+
+    def repeat_loop(self) -> RepeatLoop:
+        """
+        Parses a post-condition loop
+        Ruleset: <repeat_loop> ::= REPEAT <stmt_list> UNTIL <condition>
+
+        :rtype: RepeatLoop()
+        """
+        self.eat(TokenType.REPEAT)
+        body = Compound()
+        body.children = self.statement_list()
+        self.eat(TokenType.UNTIL)
+        return RepeatLoop(body, self.condition())
+
+    def if_statement(self) -> IfStatement:
+        """
+        Parses a selection statement
+        Ruleset: <if_stmt> ::= IF <condition> THEN <stmt_list> [ELSE <stmt_list>] ENDIF
+
+        :rtype: IfStatement()
+        """
+        self.eat(TokenType.IF)
+        condition = self.condition()
+        self.eat(TokenType.THEN)
+        then_body = Compound()
+        then_body.children = self.statement_list()
+
+        else_body = None
+        if self.cur_token.type == TokenType.ELSE:
+            self.eat(TokenType.ELSE)
+            else_body = Compound()
+            else_body.children = self.statement_list()
+        self.eat(TokenType.ENDIF)
+        return IfStatement(condition, then_body, else_body)
+
+    def case_statement(self) -> CaseStatement:
+        """
+        Parses a selection statement choosing a branch by the value of an expression
+        Ruleset: <case_stmt> ::= CASE OF <condition> <case_branch> {<case_branch>} [OTHERWISE [":"] <stmt_list>] ENDCASE
+
+        :rtype: CaseStatement()
+        """
+        self.eat(TokenType.CASE)
+        self.eat(TokenType.OF)
+        expr = self.condition()
+        branches = [self.case_branch()]
+        while self.cur_token.type not in (TokenType.OTHERWISE, TokenType.ENDCASE):
+            branches.append(self.case_branch())
+
+        otherwise = None
+        if self.cur_token.type == TokenType.OTHERWISE:
+            self.eat(TokenType.OTHERWISE)
+            if self.cur_token.type == TokenType.COLON:
+                self.eat(TokenType.COLON)
+            otherwise = Compound()
+            otherwise.children = self.statement_list()
+        self.eat(TokenType.ENDCASE)
+        return CaseStatement(expr, branches, otherwise)
+
+    def case_branch(self) -> CaseBranch:
+        """
+        Parses a branch of a CASE statement. The statements of a branch end where the next label starts; a label which
+        is a negative number must follow a ";" if the branch before it ends with an expression
+        Ruleset: <case_branch> ::= <case_label> [TO <case_label>] ":" <stmt_list>
+
+        :rtype: CaseBranch()
+        """
+        low = self.case_label()
+        high = None
+        if self.cur_token.type == TokenType.TO:
+            self.eat(TokenType.TO)
+            high = self.case_label()
+        self.eat(TokenType.COLON)
+        body = Compound()
+        body.children = self.statement_list()
+        return CaseBranch(low, high, body)
+
+    def case_label(self) -> Num | String | Boolean:
+        """
+        Parses the literal value of a CASE label
+        Ruleset: <case_label> ::= ["-"] (<int> | <real>) | <string> | TRUE | FALSE
+
+        :rtype: Num() | String() | Boolean()
+        """
+        token = self.cur_token
+        if token.type == TokenType.MINUS:
+            self.eat(TokenType.MINUS)
+            number = self.cur_token
+            if number.type not in (TokenType.INTEGER, TokenType.REAL):
+                self.error(f"Expected a number after -, got {number.type.value} instead")
+            self.eat(number.type)
+            return Num(Token(number.type, -number.value, token.offset))
+        if token.type in (TokenType.INTEGER, TokenType.REAL):
+            self.eat(token.type)
+            return Num(token)
+        if token.type == TokenType.STRING:
+            self.eat(TokenType.STRING)
+            return String(token)
+        if token.type in (TokenType.TRUE, TokenType.FALSE):
+            self.eat(token.type)
+            return Boolean(token)
+        self.error(f"Expected a CASE label, got {token.type.value} instead")
+
+    def subroutine(self) -> SubroutineDecl:
+        """
+        Parses a procedure or function declaration. Parameters and variables declared in the body are assigned slots in
+        the subroutine's call frame as they are parsed, and every variable node referring to them is resolved to its
+        slot, so no lookups by name are needed when it is called
+        Ruleset: <subroutine> ::= PROCEDURE <identifier> ["(" [<params>] ")"] <stmt_list> ENDPROCEDURE
+                    | FUNCTION <identifier> ["(" [<params>] ")"] RETURNS <type> <stmt_list> ENDFUNCTION
+                 <params> ::= <param> {"," <param>}
+
+        :rtype: SubroutineDecl()
+        """
+        if self.frame_slots is not None:
+            self.error("Subroutines cannot be declared inside other subroutines")
+        is_function = self.cur_token.type == TokenType.FUNCTION
+        self.eat(TokenType.FUNCTION if is_function else TokenType.PROCEDURE)
+        name = self.cur_token.value
+        self.eat(TokenType.IDENTIFIER)
+
+        self.frame_slots, self.byref_slots = {}, set()
+        params = []
+        if self.cur_token.type == TokenType.LPAREN:
+            self.eat(TokenType.LPAREN)
+            if self.cur_token.type != TokenType.RPAREN:
+                params.append(self.param())
+                while self.cur_token.type == TokenType.COMMA:
+                    self.eat(TokenType.COMMA)
+                    params.append(self.param())
+            self.eat(TokenType.RPAREN)
+
+        return_type = None
+        if is_function:
+            self.eat(TokenType.RETURNS)
+            return_type = Type(self.cur_token)
+            self.eat(TokenType.DATATYPE)
+
+        body = Compound()
+        body.children = self.statement_list()
+        self.eat(TokenType.ENDFUNCTION if is_function else TokenType.ENDPROCEDURE)
+
+        slot_count = len(self.frame_slots)
+        self.frame_slots, self.byref_slots = None, set()
+        return SubroutineDecl(name, params, body, return_type, slot_count)
+
+    def param(self) -> Param:
+        """
+        Parses a subroutine parameter, passed by value unless BYREF is given
+        Ruleset: <param> ::= [BYVAL | BYREF] <identifier> ":" <type>
+
+        :rtype: Param()
+        """
+        byref = False
+        if self.cur_token.type == TokenType.BYREF:
+            self.eat(TokenType.BYREF)
+            byref = True
+        elif self.cur_token.type == TokenType.BYVAL:
+            self.eat(TokenType.BYVAL)
+
+        var_node = self.local_variable()
+        if byref:
+            self.byref_slots.add(var_node.slot)
+            var_node.byref = True
+        self.eat(TokenType.COLON)
+        type_node = Type(self.cur_token)
+        self.eat(TokenType.DATATYPE)
+        return Param(var_node, type_node, byref)
+
+    def local_variable(self) -> Variable:
+        """
+        Parses the name of a new local variable of the subroutine being parsed, assigning it the next free slot
+
+        :rtype: Variable()
+        """
+        node = Variable(self.cur_token)
+        if node.value in self.frame_slots:
+            self.error(f"Duplicate local variable {repr(node.value)}")
+        self.eat(TokenType.IDENTIFIER)
+        node.slot = self.frame_slots[node.value] = len(self.frame_slots)
+        return node
+
+    def call_statement(self) -> ProcedureCall:
+        """
+        Parses a procedure call
+        Ruleset: <call_stmt> ::= CALL <identifier> ["(" [<condition> {"," <condition>}] ")"]
+
+        :rtype: ProcedureCall()
+        """
+        self.eat(TokenType.CALL)
+        name = self.cur_token.value
+        self.eat(TokenType.IDENTIFIER)
+        args = self.arguments() if self.cur_token.type == TokenType.LPAREN else []
+        return ProcedureCall(name, args)
+
+    def return_statement(self) -> Return:
+        """
+        Parses a return statement
+        Ruleset: <return_stmt> ::= RETURN <condition>
+
+        :rtype: Return()
+        """
+        self.eat(TokenType.RETURN)
+        return Return(self.condition())
+
+    def output_statement(self) -> Output:
+        """
+        Parses an output statement
+        Ruleset: <output> ::= OUTPUT <condition> {"," <condition>}
+
+        :rtype: Output()
+        """
+        self.eat(TokenType.OUTPUT)
+        exprs = [self.condition()]
+        while self.cur_token.type == TokenType.COMMA:
+            self.eat(TokenType.COMMA)
+            exprs.append(self.condition())
+        return Output(exprs)
+
+    def input_statement(self) -> Input:
+        """
+        Parses an input statement
+        Ruleset: <input> ::= INPUT (<var> | <element>)
+
+        :rtype: Input()
+        """
+        self.eat(TokenType.INPUT)
+        var_node = self.variable()
+        if self.cur_token.type == TokenType.LBRACKET:
+            var_node = self.array_element(var_node)
+        return Input(var_node)
+
+    def openfile_statement(self) -> OpenFile:
+        """
+        Parses a file opening statement. The mode is not a reserved keyword, so READ, WRITE and APPEND can still be used
+        as identifiers
+        Ruleset: <openfile> ::= OPENFILE <expr> FOR (READ | WRITE | APPEND)
+
+        :rtype: OpenFile()
+        """
+        self.eat(TokenType.OPENFILE)
+        filename = self.expr()
+        self.eat(TokenType.FOR)
+        mode = self.cur_token
+        if mode.type != TokenType.IDENTIFIER or mode.value not in ("READ", "WRITE", "APPEND"):
+            self.error(f"Expected READ, WRITE or APPEND, got {mode.value} instead")
+        self.eat(TokenType.IDENTIFIER)
+        return OpenFile(filename, mode.value)
+
+    def readfile_statement(self) -> ReadFile:
+        """
+        Parses a file reading statement
+        Ruleset: <readfile> ::= READFILE <expr> "," (<var> | <element>)
+
+        :rtype: ReadFile()
+        """
+        self.eat(TokenType.READFILE)
+        filename = self.expr()
+        self.eat(TokenType.COMMA)
+        var_node = self.variable()
+        if self.cur_token.type == TokenType.LBRACKET:
+            var_node = self.array_element(var_node)
+        return ReadFile(filename, var_node)
+
+    def writefile_statement(self) -> WriteFile:
+        """
+        Parses a file writing statement
+        Ruleset: <writefile> ::= WRITEFILE <expr> "," <condition>
+
+        :rtype: WriteFile()
+        """
+        self.eat(TokenType.WRITEFILE)
+        filename = self.expr()
+        self.eat(TokenType.COMMA)
+        return WriteFile(filename, self.condition())
+
+    def closefile_statement(self) -> CloseFile:
+        """
+        Parses a file closing statement
+        Ruleset: <closefile> ::= CLOSEFILE <expr>
+
+        :rtype: CloseFile()
+        """
+        self.eat(TokenType.CLOSEFILE)
+        return CloseFile(self.expr())
+
+    def declaration(self) -> VarDecl:
+        """
+        Parses a variable declaration
+        Ruleset: <declaration> ::= DECLARE <var> : <type>
+
+        :rtype: VarDecl()
+        """
+        self.eat(TokenType.DECLARE)
+        var_node = self.variable() if self.frame_slots is None else self.local_variable()
+        self.eat(TokenType.COLON)
+        type_node = self.type_spec()
+        return VarDecl(var_node, type_node)
+
+    def type_spec(self) -> Type | ArrayType:
+        """
+        Parses a data type
+        Ruleset: <type> ::= INTEGER | REAL | STRING | BOOLEAN | CHAR | <array_type>
+
+        :rtype: Type() | ArrayType()
+        """
+        if self.cur_token.type == TokenType.ARRAY:
+            return self.array_type()
+        node = Type(self.cur_token)
+        self.eat(TokenType.DATATYPE)
+        return node
+
+    def array_type(self) -> ArrayType:
+        """
+        Parses an array data type
+        Ruleset: <array_type> ::= ARRAY "[" <bound> {"," <bound>} "]" OF <type>
+                 <bound> ::= <expr> ":" <expr>
+
+        :rtype: ArrayType()
+        """
+        self.eat(TokenType.ARRAY)
+        self.eat(TokenType.LBRACKET)
+        bounds = [self.array_bound()]
+        while self.cur_token.type == TokenType.COMMA:
+            self.eat(TokenType.COMMA)
+            bounds.append(self.array_bound())
+        self.eat(TokenType.RBRACKET)
+        self.eat(TokenType.OF)
+
+        element_type = Type(self.cur_token)
+        self.eat(TokenType.DATATYPE)
+        return ArrayType(bounds, element_type)
+
+    def array_bound(self) -> tuple[AST, AST]:
+        lower = self.expr()
+        self.eat(TokenType.COLON)
+        upper = self.expr()
+        return (lower, upper)
+
+    def array_element(self, var_node: Variable) -> ArrayElement:
+        """
+        Parses the index of an array element following the array's variable
+        Ruleset: <element> ::= <var> "[" <expr> {"," <expr>} "]"
+
+        :param var_node: The array variable that has already been parsed
+        :type var_node: Variable()
+        :rtype: ArrayElement()
+        """
+        self.eat(TokenType.LBRACKET)
+        indices = [self.expr()]
+        while self.cur_token.type == TokenType.COMMA:
+            self.eat(TokenType.COMMA)
+            indices.append(self.expr())
+        self.eat(TokenType.RBRACKET)
+        return ArrayElement(var_node, indices)
+
     def variable(self) -> Variable:
         """
         Parses a variable statement
@@ -119,6 +615,9 @@ class Parser(NodeVisitor):
         """
         node = Variable(self.cur_token)
         self.eat(TokenType.IDENTIFIER)
+        if self.frame_slots is not None:
+            node.slot = self.frame_slots.get(node.value)
+            node.byref = node.slot in self.byref_slots
         return node
     
     def empty(self) -> NoOP:
@@ -133,7 +632,8 @@ class Parser(NodeVisitor):
     def factor(self) -> Num | BinOP | Variable:
         """
         Parses a factor statement
-        Ruleset: <factor> ::= [("-" | "+")] <factor> | <int> | <LPAREN> <expr> <RPAREN> | <var>
+        Ruleset: <factor> ::= [("-" | "+")] <factor> | <int> | <real> | <string> | TRUE | FALSE
+            | <LPAREN> <condition> <RPAREN> | <var> | <element> | <call>
 
         :return: Evaluation result(s)
         :rtype: BinOP() | Num()
@@ -150,15 +650,62 @@ class Parser(NodeVisitor):
         elif token.type == TokenType.INTEGER:
             self.eat(TokenType.INTEGER)
             return Num(token)
+        elif token.type == TokenType.REAL:
+            self.eat(TokenType.REAL)
+            return Num(token)
+        elif token.type == TokenType.STRING:
+            self.eat(TokenType.STRING)
+            return String(token)
+        elif token.type in (TokenType.TRUE, TokenType.FALSE):
+            self.eat(token.type)
+            return Boolean(token)
         elif token.type == TokenType.LPAREN:
             self.eat(TokenType.LPAREN)
-            node = self.expr()
+            node = self.condition()
             self.eat(TokenType.RPAREN)
             return node
         else:
             node = self.variable()
+            if self.cur_token.type == TokenType.LBRACKET:
+                node = self.array_element(node)
+            elif self.cur_token.type == TokenType.LPAREN:
+                node = self.function_call(node)
             return node
 
+    def function_call(self, var_node: Variable) -> FunctionCall | EndOfFile:
+        """
+        Parses the arguments of a function call following the function's name. EOF(<expr>), which checks whether a file
+        has been read to the end, is parsed as a call but produces an EndOfFile node
+        Ruleset: <call> ::= <identifier> "(" [<condition> {"," <condition>}] ")"
+
+        :param var_node: The name of the function, already parsed as a variable
+        :type var_node: Variable()
+        :rtype: FunctionCall() | EndOfFile()
+        """
+        token = self.cur_token
+        args = self.arguments()
+        if var_node.value == "EOF":
+            if len(args) != 1:
+                self.error(f"EOF takes 1 argument, got {len(args)}", token)
+            return EndOfFile(args[0])
+        return FunctionCall(var_node.value, args)
+
+    def arguments(self) -> list[AST]:
+        """
+        Parses the parenthesised argument list of a subroutine or function call
+
+        :rtype: list[AST()]
+        """
+        self.eat(TokenType.LPAREN)
+        args = []
+        if self.cur_token.type != TokenType.RPAREN:
+            args.append(self.condition())
+            while self.cur_token.type == TokenType.COMMA:
+                self.eat(TokenType.COMMA)
+                args.append(self.condition())
+        self.eat(TokenType.RPAREN)
+        return args
+
     def term(self) -> BinOP:
         """
         Parses a term statement
@@ -183,22 +730,80 @@ class Parser(NodeVisitor):
     def expr(self) -> BinOP:
         """
         Parses an expression statement
-        Ruleset: <expr> ::= <term> {("-" | "+") <term>}
+        Ruleset: <expr> ::= <term> {("-" | "+" | "&") <term>}
 
         :return: Evaluation result(s)
         :rtype: BinOP()
         """
         # Simple expression parsing for x + y
         node = self.term()
-        while self.cur_token.type in (TokenType.PLUS, TokenType.MINUS):
+        while self.cur_token.type in (TokenType.PLUS, TokenType.MINUS, TokenType.CONCAT):
             token = self.cur_token
             if token.type == TokenType.PLUS:
                 self.eat(TokenType.PLUS)
             elif token.type == TokenType.MINUS:
                 self.eat(TokenType.MINUS)
+            elif token.type == TokenType.CONCAT:
+                self.eat(TokenType.CONCAT)
             else:
                 pass # Placeholder
-            node = BinOP(left=node, op=token, right=self.factor())
+            node = BinOP(left=node, op=token, right=self.term())
+        return node
+
+    def comparison(self) -> BinOP:
+        """
+        Parses a comparison between two expressions, or a single expression
+        Ruleset: <comparison> ::= <expr> [("=" | "==" | "<>" | "<" | "<=" | ">" | ">=") <expr>]
+
+        :return: Evaluation result(s)
+        :rtype: BinOP()
+        """
+        node = self.expr()
+        if self.cur_token.type in self.COMPARISON_OPERATORS:
+            token = self.cur_token
+            self.eat(token.type)
+            node = BinOP(left=node, op=token, right=self.expr())
+        return node
+
+    def negation(self) -> AST:
+        """
+        Parses a comparison, or the negation of one
+        Ruleset: <negation> ::= NOT <negation> | <comparison>
+
+        :rtype: AST()
+        """
+        if self.cur_token.type == TokenType.NOT:
+            token = self.cur_token
+            self.eat(TokenType.NOT)
+            return UnaryOP(token, self.negation())
+        return self.comparison()
+
+    def conjunction(self) -> AST:
+        """
+        Parses negations joined by AND
+        Ruleset: <conjunction> ::= <negation> {AND <negation>}
+
+        :rtype: AST()
+        """
+        node = self.negation()
+        while self.cur_token.type == TokenType.AND:
+            token = self.cur_token
+            self.eat(TokenType.AND)
+            node = LogicalOP(left=node, op=token, right=self.negation())
+        return node
+
+    def condition(self) -> AST:
+        """
+        Parses conjunctions joined by OR, which binds more loosely than AND (so a OR b AND c is a OR (b AND c))
+        Ruleset: <condition> ::= <conjunction> {OR <conjunction>}
+
+        :rtype: AST()
+        """
+        node = self.conjunction()
+        while self.cur_token.type == TokenType.OR:
+            token = self.cur_token
+            self.eat(TokenType.OR)
+            node = LogicalOP(left=node, op=token, right=self.conjunction())
         return node
 
     def parse(self) -> BinOP:
@@ -210,6 +815,22 @@ class Parser(NodeVisitor):
         """
         node = self.program()
         if self.cur_token.type != TokenType.EOF:
-            self.ExceptionHandler.raise_exception(f"EOF character expected, got {self.cur_token.type} instead")
+            self.error(f"EOF character expected, got {self.cur_token.type} instead")
+        self.lexer.report()
+
+        return node
+
+    def parse_statements(self) -> Iterator[AST]:
+        """
+        Parses the program one top level statement at a time, yielding each statement as soon as it has been parsed
+        instead of building the Compound of the whole program. Only the statement being parsed is held in memory
+        Ruleset: <prgm> ::= START <stmt_list> END
 
-        return node
\ No newline at end of file
+        :rtype: Iterator[AST()]
+        """
+        self.eat(TokenType.START)
+        yield from self.statements()
+        self.eat(TokenType.END)
+        if self.cur_token.type != TokenType.EOF:
+            self.error(f"EOF character expected, got {self.cur_token.type} instead")
+        self.lexer.report()
@@ -0,0 +1,519 @@
+"""
+LL(1) parse table of the pseudocode, generated from grammar/syntax.txt by core.grammar. Do not edit: regenerate
+it with python -m core.grammar
+"""
+
+# SHA-256 digest of the grammar the table was generated from
+GRAMMAR_DIGEST = '98afcb16a5cd3a025cbec5e73d612c265a02361268c854d011d695855ac9131f'
+
+# The nonterminals parsing can start from
+STARTS = ('<program>', '<stream>')
+
+# The productions, by number, as the nonterminal expanded and the symbols it expands into: nonterminals in <>,
+# actions after #, and the names of token types
+PRODUCTIONS = (
+    ('<program>', ('<compound>', 'EOF')),  # 0
+    ('<stream.1>', ('SEMI', '<stmt>', '#emit', '<stream.1>')),  # 1
+    ('<stream.1>', ()),  # 2
+    ('<stream>', ('START', '<stmt>', '#emit', '<stream.1>', 'END', 'EOF')),  # 3
+    ('<compound>', ('START', '<block>', 'END')),  # 4
+    ('<block.1>', ('SEMI', '<stmt>', '<block.1>')),  # 5
+    ('<block.1>', ()),  # 6
+    ('<block>', ('#mark', '<stmt>', '<block.1>', '#list', '#compound')),  # 7
+    ('<stmt>', ('#here', '<stmt_body>', '#locate')),  # 8
+    ('<stmt_body>', ('<compound>',)),  # 9
+    ('<stmt_body>', ('<declaration>',)),  # 10
+    ('<stmt_body>', ('<assignment>',)),  # 11
+    ('<stmt_body>', ('<for_loop>',)),  # 12
+    ('<stmt_body>', ('<while_loop>',)),  # 13
+    ('<stmt_body>', ('<repeat_loop>',)),  # 14
+    ('<stmt_body>', ('<if_stmt>',)),  # 15
+    ('<stmt_body>', ('<case_stmt>',)),  # 16
+    ('<stmt_body>', ('<subroutine>',)),  # 17
+    ('<stmt_body>', ('<call_stmt>',)),  # 18
+    ('<stmt_body>', ('<return_stmt>',)),  # 19
+    ('<stmt_body>', ('<output>',)),  # 20
+    ('<stmt_body>', ('<input>',)),  # 21
+    ('<stmt_body>', ('<openfile>',)),  # 22
+    ('<stmt_body>', ('<readfile>',)),  # 23
+    ('<stmt_body>', ('<writefile>',)),  # 24
+    ('<stmt_body>', ('<closefile>',)),  # 25
+    ('<stmt_body>', ('#noop',)),  # 26
+    ('<declaration>', ('DECLARE', 'IDENTIFIER', '#declared', 'COLON', '<type>', '#declare')),  # 27
+    ('<type.1>', ('COMMA', '<bound>', '<type.1>')),  # 28
+    ('<type.1>', ()),  # 29
+    ('<type>', ('DATATYPE', '#type')),  # 30
+    ('<type>', ('ARRAY', 'LBRACKET', '#mark', '<bound>', '<type.1>', 'RBRACKET', '#list', 'OF', 'DATATYPE', '#type',
+        '#array_type')),  # 31
+    ('<bound>', ('<expr>', 'COLON', '<expr>', '#pair')),  # 32
+    ('<assignment.1>', ('LET',)),  # 33
+    ('<assignment.1>', ()),  # 34
+    ('<assignment.2>', ('ASSIGN',)),  # 35
+    ('<assignment.2>', ('EQ',)),  # 36
+    ('<assignment>', ('<assignment.1>', '<target>', '<assignment.2>', '#token', '<condition>', '#assign')),  # 37
+    ('<target.1>', ('<index>',)),  # 38
+    ('<target.1>', ()),  # 39
+    ('<target>', ('<variable>', '<target.1>')),  # 40
+    ('<variable>', ('IDENTIFIER', '#variable')),  # 41
+    ('<index.1>', ('COMMA', '<expr>', '<index.1>')),  # 42
+    ('<index.1>', ()),  # 43
+    ('<index>', ('LBRACKET', '#mark', '<expr>', '<index.1>', 'RBRACKET', '#list', '#element')),  # 44
+    ('<for_loop.1>', ('ASSIGN',)),  # 45
+    ('<for_loop.1>', ('EQ',)),  # 46
+    ('<for_loop.2>', ('STEP', '<expr>')),  # 47
+    ('<for_loop.2>', ('#none',)),  # 48
+    ('<for_loop.3>', ('IDENTIFIER', '#next')),  # 49
+    ('<for_loop.3>', ()),  # 50
+    ('<for_loop>', ('FOR', '<variable>', '<for_loop.1>', '<expr>', 'TO', '<expr>', '<for_loop.2>', '<block>', 'NEXT',
+        '<for_loop.3>', '#for')),  # 51
+    ('<while_loop>', ('WHILE', '<condition>', 'DO', '<block>', 'ENDWHILE', '#while')),  # 52
+    ('<repeat_loop>', ('REPEAT', '<block>', 'UNTIL', '<condition>', '#repeat')),  # 53
+    ('<if_stmt.1>', ('ELSE', '<block>')),  # 54
+    ('<if_stmt.1>', ('#none',)),  # 55
+    ('<if_stmt>', ('IF', '<condition>', 'THEN', '<block>', '<if_stmt.1>', 'ENDIF', '#if')),  # 56
+    ('<case_stmt.1>', ('<case_branch>', '<case_stmt.1>')),  # 57
+    ('<case_stmt.1>', ()),  # 58
+    ('<case_stmt.2>', ('COLON',)),  # 59
+    ('<case_stmt.2>', ()),  # 60
+    ('<case_stmt.3>', ('OTHERWISE', '<case_stmt.2>', '<block>')),  # 61
+    ('<case_stmt.3>', ('#none',)),  # 62
+    ('<case_stmt>', ('CASE', 'OF', '<condition>', '#mark', '<case_branch>', '<case_stmt.1>', '#list', '<case_stmt.3>',
+        'ENDCASE', '#case')),  # 63
+    ('<case_branch.1>', ('TO', '<case_label>')),  # 64
+    ('<case_branch.1>', ('#none',)),  # 65
+    ('<case_branch>', ('<case_label>', '<case_branch.1>', 'COLON', '<block>', '#branch')),  # 66
+    ('<case_label.1>', ('INTEGER',)),  # 67
+    ('<case_label.1>', ('REAL',)),  # 68
+    ('<case_label.2>', ('INTEGER',)),  # 69
+    ('<case_label.2>', ('REAL',)),  # 70
+    ('<case_label.3>', ('TRUE',)),  # 71
+    ('<case_label.3>', ('FALSE',)),  # 72
+    ('<case_label>', ('MINUS', '#token', '<case_label.1>', '#negative')),  # 73
+    ('<case_label>', ('<case_label.2>', '#number')),  # 74
+    ('<case_label>', ('STRING', '#string')),  # 75
+    ('<case_label>', ('<case_label.3>', '#boolean')),  # 76
+    ('<subroutine>', ('#frame', 'PROCEDURE', 'IDENTIFIER', '#token', '<params>', '#none', '<block>', 'ENDPROCEDURE',
+        '#subroutine')),  # 77
+    ('<subroutine>', ('#frame', 'FUNCTION', 'IDENTIFIER', '#token', '<params>', 'RETURNS', 'DATATYPE', '#type',
+        '<block>', 'ENDFUNCTION', '#subroutine')),  # 78
+    ('<params.1>', ('COMMA', '<param>', '<params.1>')),  # 79
+    ('<params.1>', ()),  # 80
+    ('<params.2>', ('<param>', '<params.1>')),  # 81
+    ('<params.2>', ()),  # 82
+    ('<params.3>', ('LPAREN', '<params.2>', 'RPAREN')),  # 83
+    ('<params.3>', ()),  # 84
+    ('<params>', ('#mark', '<params.3>', '#list')),  # 85
+    ('<param.1>', ('BYREF', '#true')),  # 86
+    ('<param.1>', ('BYVAL', '#false')),  # 87
+    ('<param.1>', ('#false',)),  # 88
+    ('<param>', ('<param.1>', 'IDENTIFIER', '#local', 'COLON', 'DATATYPE', '#type', '#param')),  # 89
+    ('<call_stmt.1>', ('<arguments>',)),  # 90
+    ('<call_stmt.1>', ('#mark', '#list')),  # 91
+    ('<call_stmt>', ('CALL', 'IDENTIFIER', '#token', '<call_stmt.1>', '#call')),  # 92
+    ('<arguments.1>', ('COMMA', '<condition>', '<arguments.1>')),  # 93
+    ('<arguments.1>', ()),  # 94
+    ('<arguments.2>', ('<condition>', '<arguments.1>')),  # 95
+    ('<arguments.2>', ()),  # 96
+    ('<arguments>', ('LPAREN', '#mark', '<arguments.2>', 'RPAREN', '#list')),  # 97
+    ('<return_stmt>', ('RETURN', '<condition>', '#return')),  # 98
+    ('<output.1>', ('COMMA', '<condition>', '<output.1>')),  # 99
+    ('<output.1>', ()),  # 100
+    ('<output>', ('OUTPUT', '#mark', '<condition>', '<output.1>', '#list', '#output')),  # 101
+    ('<input>', ('INPUT', '<target>', '#input')),  # 102
+    ('<openfile>', ('OPENFILE', '<expr>', 'FOR', 'IDENTIFIER', '#mode', '#openfile')),  # 103
+    ('<readfile>', ('READFILE', '<expr>', 'COMMA', '<target>', '#readfile')),  # 104
+    ('<writefile>', ('WRITEFILE', '<expr>', 'COMMA', '<condition>', '#writefile')),  # 105
+    ('<closefile>', ('CLOSEFILE', '<expr>', '#closefile')),  # 106
+    ('<condition.1>', ('OR', '#token', '<conjunction>', '#logical', '<condition.1>')),  # 107
+    ('<condition.1>', ()),  # 108
+    ('<condition>', ('<conjunction>', '<condition.1>')),  # 109
+    ('<conjunction.1>', ('AND', '#token', '<negation>', '#logical', '<conjunction.1>')),  # 110
+    ('<conjunction.1>', ()),  # 111
+    ('<conjunction>', ('<negation>', '<conjunction.1>')),  # 112
+    ('<negation>', ('NOT', '#token', '<negation>', '#unary')),  # 113
+    ('<negation>', ('<comparison>',)),  # 114
+    ('<comparison.1>', ('EQ',)),  # 115
+    ('<comparison.1>', ('EQEQ',)),  # 116
+    ('<comparison.1>', ('NOTEQ',)),  # 117
+    ('<comparison.1>', ('LTHAN',)),  # 118
+    ('<comparison.1>', ('LTEQ',)),  # 119
+    ('<comparison.1>', ('GTHAN',)),  # 120
+    ('<comparison.1>', ('GTEQ',)),  # 121
+    ('<comparison.2>', ('<comparison.1>', '#token', '<expr>', '#binary')),  # 122
+    ('<comparison.2>', ()),  # 123
+    ('<comparison>', ('<expr>', '<comparison.2>')),  # 124
+    ('<expr.1>', ('PLUS',)),  # 125
+    ('<expr.1>', ('MINUS',)),  # 126
+    ('<expr.1>', ('CONCAT',)),  # 127
+    ('<expr.2>', ('<expr.1>', '#token', '<term>', '#binary', '<expr.2>')),  # 128
+    ('<expr.2>', ()),  # 129
+    ('<expr>', ('<term>', '<expr.2>')),  # 130
+    ('<term.1>', ('MUL',)),  # 131
+    ('<term.1>', ('DIV',)),  # 132
+    ('<term.2>', ('<term.1>', '#token', '<factor>', '#binary', '<term.2>')),  # 133
+    ('<term.2>', ()),  # 134
+    ('<term>', ('<factor>', '<term.2>')),  # 135
+    ('<factor.1>', ('PLUS',)),  # 136
+    ('<factor.1>', ('MINUS',)),  # 137
+    ('<factor.2>', ('INTEGER',)),  # 138
+    ('<factor.2>', ('REAL',)),  # 139
+    ('<factor.3>', ('TRUE',)),  # 140
+    ('<factor.3>', ('FALSE',)),  # 141
+    ('<factor.4>', ('<index>',)),  # 142
+    ('<factor.4>', ('<arguments>', '#function')),  # 143
+    ('<factor.4>', ()),  # 144
+    ('<factor>', ('<factor.1>', '#token', '<factor>', '#unary')),  # 145
+    ('<factor>', ('<factor.2>', '#number')),  # 146
+    ('<factor>', ('STRING', '#string')),  # 147
+    ('<factor>', ('<factor.3>', '#boolean')),  # 148
+    ('<factor>', ('LPAREN', '<condition>', 'RPAREN')),  # 149
+    ('<factor>', ('<variable>', '<factor.4>')),  # 150
+)
+
+# For each nonterminal, the production it is expanded with by the token types which can come next. Any other
+# token type is a syntax error
+TABLE = {
+    '<program>': {
+        0: ('START',),
+    },
+    '<stream>': {
+        3: ('START',),
+    },
+    '<stream.1>': {
+        1: ('SEMI',),
+        2: ('END',),
+    },
+    '<compound>': {
+        4: ('START',),
+    },
+    '<block>': {
+        7: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF',
+            'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT', 'INTEGER', 'LET',
+            'MINUS', 'NEXT', 'OPENFILE', 'OTHERWISE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REAL', 'REPEAT', 'RETURN',
+            'SEMI', 'START', 'STRING', 'TRUE', 'UNTIL', 'WHILE', 'WRITEFILE',),
+    },
+    '<block.1>': {
+        5: ('SEMI',),
+        6: ('ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'INTEGER',
+            'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<stmt>': {
+        8: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF',
+            'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT', 'INTEGER', 'LET',
+            'MINUS', 'NEXT', 'OPENFILE', 'OTHERWISE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REAL', 'REPEAT', 'RETURN',
+            'SEMI', 'START', 'STRING', 'TRUE', 'UNTIL', 'WHILE', 'WRITEFILE',),
+    },
+    '<stmt_body>': {
+        9: ('START',),
+        10: ('DECLARE',),
+        11: ('IDENTIFIER', 'LET',),
+        12: ('FOR',),
+        13: ('WHILE',),
+        14: ('REPEAT',),
+        15: ('IF',),
+        16: ('CASE',),
+        17: ('FUNCTION', 'PROCEDURE',),
+        18: ('CALL',),
+        19: ('RETURN',),
+        20: ('OUTPUT',),
+        21: ('INPUT',),
+        22: ('OPENFILE',),
+        23: ('READFILE',),
+        24: ('WRITEFILE',),
+        25: ('CLOSEFILE',),
+        26: ('ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'INTEGER',
+            'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'SEMI', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<declaration>': {
+        27: ('DECLARE',),
+    },
+    '<type>': {
+        30: ('DATATYPE',),
+        31: ('ARRAY',),
+    },
+    '<type.1>': {
+        28: ('COMMA',),
+        29: ('RBRACKET',),
+    },
+    '<bound>': {
+        32: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<assignment>': {
+        37: ('IDENTIFIER', 'LET',),
+    },
+    '<assignment.1>': {
+        33: ('LET',),
+        34: ('IDENTIFIER',),
+    },
+    '<assignment.2>': {
+        35: ('ASSIGN',),
+        36: ('EQ',),
+    },
+    '<target>': {
+        40: ('IDENTIFIER',),
+    },
+    '<target.1>': {
+        38: ('LBRACKET',),
+        39: ('ASSIGN', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'EQ', 'FALSE',
+            'INTEGER', 'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'SEMI', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<variable>': {
+        41: ('IDENTIFIER',),
+    },
+    '<index>': {
+        44: ('LBRACKET',),
+    },
+    '<index.1>': {
+        42: ('COMMA',),
+        43: ('RBRACKET',),
+    },
+    '<for_loop>': {
+        51: ('FOR',),
+    },
+    '<for_loop.1>': {
+        45: ('ASSIGN',),
+        46: ('EQ',),
+    },
+    '<for_loop.2>': {
+        47: ('STEP',),
+        48: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT', 'LET', 'NEXT',
+            'OPENFILE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REPEAT', 'RETURN', 'SEMI', 'START', 'WHILE', 'WRITEFILE',),
+    },
+    '<for_loop.3>': {
+        49: ('IDENTIFIER',),
+        50: ('ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'INTEGER',
+            'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'SEMI', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<while_loop>': {
+        52: ('WHILE',),
+    },
+    '<repeat_loop>': {
+        53: ('REPEAT',),
+    },
+    '<if_stmt>': {
+        56: ('IF',),
+    },
+    '<if_stmt.1>': {
+        54: ('ELSE',),
+        55: ('ENDIF',),
+    },
+    '<case_stmt>': {
+        63: ('CASE',),
+    },
+    '<case_stmt.1>': {
+        57: ('FALSE', 'INTEGER', 'MINUS', 'REAL', 'STRING', 'TRUE',),
+        58: ('ENDCASE', 'OTHERWISE',),
+    },
+    '<case_stmt.2>': {
+        59: ('COLON',),
+        60: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'ENDCASE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT',
+            'LET', 'OPENFILE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REPEAT', 'RETURN', 'SEMI', 'START', 'WHILE',
+            'WRITEFILE',),
+    },
+    '<case_stmt.3>': {
+        61: ('OTHERWISE',),
+        62: ('ENDCASE',),
+    },
+    '<case_branch>': {
+        66: ('FALSE', 'INTEGER', 'MINUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<case_branch.1>': {
+        64: ('TO',),
+        65: ('COLON',),
+    },
+    '<case_label>': {
+        73: ('MINUS',),
+        74: ('INTEGER', 'REAL',),
+        75: ('STRING',),
+        76: ('FALSE', 'TRUE',),
+    },
+    '<case_label.1>': {
+        67: ('INTEGER',),
+        68: ('REAL',),
+    },
+    '<case_label.2>': {
+        69: ('INTEGER',),
+        70: ('REAL',),
+    },
+    '<case_label.3>': {
+        71: ('TRUE',),
+        72: ('FALSE',),
+    },
+    '<subroutine>': {
+        77: ('PROCEDURE',),
+        78: ('FUNCTION',),
+    },
+    '<params>': {
+        85: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'ENDPROCEDURE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT',
+            'LET', 'LPAREN', 'OPENFILE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REPEAT', 'RETURN', 'RETURNS', 'SEMI',
+            'START', 'WHILE', 'WRITEFILE',),
+    },
+    '<params.1>': {
+        79: ('COMMA',),
+        80: ('RPAREN',),
+    },
+    '<params.2>': {
+        81: ('BYREF', 'BYVAL', 'IDENTIFIER',),
+        82: ('RPAREN',),
+    },
+    '<params.3>': {
+        83: ('LPAREN',),
+        84: ('CALL', 'CASE', 'CLOSEFILE', 'DECLARE', 'ENDPROCEDURE', 'FOR', 'FUNCTION', 'IDENTIFIER', 'IF', 'INPUT',
+            'LET', 'OPENFILE', 'OUTPUT', 'PROCEDURE', 'READFILE', 'REPEAT', 'RETURN', 'RETURNS', 'SEMI', 'START',
+            'WHILE', 'WRITEFILE',),
+    },
+    '<param>': {
+        89: ('BYREF', 'BYVAL', 'IDENTIFIER',),
+    },
+    '<param.1>': {
+        86: ('BYREF',),
+        87: ('BYVAL',),
+        88: ('IDENTIFIER',),
+    },
+    '<call_stmt>': {
+        92: ('CALL',),
+    },
+    '<call_stmt.1>': {
+        90: ('LPAREN',),
+        91: ('ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'INTEGER',
+            'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'SEMI', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<arguments>': {
+        97: ('LPAREN',),
+    },
+    '<arguments.1>': {
+        93: ('COMMA',),
+        94: ('RPAREN',),
+    },
+    '<arguments.2>': {
+        95: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'NOT', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+        96: ('RPAREN',),
+    },
+    '<return_stmt>': {
+        98: ('RETURN',),
+    },
+    '<output>': {
+        101: ('OUTPUT',),
+    },
+    '<output.1>': {
+        99: ('COMMA',),
+        100: ('ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE', 'INTEGER',
+            'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'SEMI', 'STRING', 'TRUE', 'UNTIL',),
+    },
+    '<input>': {
+        102: ('INPUT',),
+    },
+    '<openfile>': {
+        103: ('OPENFILE',),
+    },
+    '<readfile>': {
+        104: ('READFILE',),
+    },
+    '<writefile>': {
+        105: ('WRITEFILE',),
+    },
+    '<closefile>': {
+        106: ('CLOSEFILE',),
+    },
+    '<condition>': {
+        109: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'NOT', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<condition.1>': {
+        107: ('OR',),
+        108: ('COMMA', 'DO', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE',
+            'INTEGER', 'MINUS', 'NEXT', 'OTHERWISE', 'REAL', 'RPAREN', 'SEMI', 'STRING', 'THEN', 'TRUE', 'UNTIL',),
+    },
+    '<conjunction>': {
+        112: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'NOT', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<conjunction.1>': {
+        110: ('AND',),
+        111: ('COMMA', 'DO', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'FALSE',
+            'INTEGER', 'MINUS', 'NEXT', 'OR', 'OTHERWISE', 'REAL', 'RPAREN', 'SEMI', 'STRING', 'THEN', 'TRUE',
+            'UNTIL',),
+    },
+    '<negation>': {
+        113: ('NOT',),
+        114: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<comparison>': {
+        124: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<comparison.1>': {
+        115: ('EQ',),
+        116: ('EQEQ',),
+        117: ('NOTEQ',),
+        118: ('LTHAN',),
+        119: ('LTEQ',),
+        120: ('GTHAN',),
+        121: ('GTEQ',),
+    },
+    '<comparison.2>': {
+        122: ('EQ', 'EQEQ', 'GTEQ', 'GTHAN', 'LTEQ', 'LTHAN', 'NOTEQ',),
+        123: ('AND', 'COMMA', 'DO', 'ELSE', 'END', 'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE',
+            'FALSE', 'INTEGER', 'MINUS', 'NEXT', 'OR', 'OTHERWISE', 'REAL', 'RPAREN', 'SEMI', 'STRING', 'THEN', 'TRUE',
+            'UNTIL',),
+    },
+    '<expr>': {
+        130: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<expr.1>': {
+        125: ('PLUS',),
+        126: ('MINUS',),
+        127: ('CONCAT',),
+    },
+    '<expr.2>': {
+        128: ('CONCAT', 'MINUS', 'PLUS',),
+        129: ('AND', 'CALL', 'CASE', 'CLOSEFILE', 'COLON', 'COMMA', 'DECLARE', 'DO', 'ELSE', 'END', 'ENDCASE',
+            'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'EQ', 'EQEQ', 'FALSE', 'FOR', 'FUNCTION', 'GTEQ',
+            'GTHAN', 'IDENTIFIER', 'IF', 'INPUT', 'INTEGER', 'LET', 'LTEQ', 'LTHAN', 'NEXT', 'NOTEQ', 'OPENFILE', 'OR',
+            'OTHERWISE', 'OUTPUT', 'PROCEDURE', 'RBRACKET', 'READFILE', 'REAL', 'REPEAT', 'RETURN', 'RPAREN', 'SEMI',
+            'START', 'STEP', 'STRING', 'THEN', 'TO', 'TRUE', 'UNTIL', 'WHILE', 'WRITEFILE',),
+    },
+    '<term>': {
+        135: ('FALSE', 'IDENTIFIER', 'INTEGER', 'LPAREN', 'MINUS', 'PLUS', 'REAL', 'STRING', 'TRUE',),
+    },
+    '<term.1>': {
+        131: ('MUL',),
+        132: ('DIV',),
+    },
+    '<term.2>': {
+        133: ('DIV', 'MUL',),
+        134: ('AND', 'CALL', 'CASE', 'CLOSEFILE', 'COLON', 'COMMA', 'CONCAT', 'DECLARE', 'DO', 'ELSE', 'END',
+            'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'EQ', 'EQEQ', 'FALSE', 'FOR', 'FUNCTION',
+            'GTEQ', 'GTHAN', 'IDENTIFIER', 'IF', 'INPUT', 'INTEGER', 'LET', 'LTEQ', 'LTHAN', 'MINUS', 'NEXT', 'NOTEQ',
+            'OPENFILE', 'OR', 'OTHERWISE', 'OUTPUT', 'PLUS', 'PROCEDURE', 'RBRACKET', 'READFILE', 'REAL', 'REPEAT',
+            'RETURN', 'RPAREN', 'SEMI', 'START', 'STEP', 'STRING', 'THEN', 'TO', 'TRUE', 'UNTIL', 'WHILE',
+            'WRITEFILE',),
+    },
+    '<factor>': {
+        145: ('MINUS', 'PLUS',),
+        146: ('INTEGER', 'REAL',),
+        147: ('STRING',),
+        148: ('FALSE', 'TRUE',),
+        149: ('LPAREN',),
+        150: ('IDENTIFIER',),
+    },
+    '<factor.1>': {
+        136: ('PLUS',),
+        137: ('MINUS',),
+    },
+    '<factor.2>': {
+        138: ('INTEGER',),
+        139: ('REAL',),
+    },
+    '<factor.3>': {
+        140: ('TRUE',),
+        141: ('FALSE',),
+    },
+    '<factor.4>': {
+        142: ('LBRACKET',),
+        143: ('LPAREN',),
+        144: ('AND', 'CALL', 'CASE', 'CLOSEFILE', 'COLON', 'COMMA', 'CONCAT', 'DECLARE', 'DIV', 'DO', 'ELSE', 'END',
+            'ENDCASE', 'ENDFUNCTION', 'ENDIF', 'ENDPROCEDURE', 'ENDWHILE', 'EQ', 'EQEQ', 'FALSE', 'FOR', 'FUNCTION',
+            'GTEQ', 'GTHAN', 'IDENTIFIER', 'IF', 'INPUT', 'INTEGER', 'LET', 'LTEQ', 'LTHAN', 'MINUS', 'MUL', 'NEXT',
+            'NOTEQ', 'OPENFILE', 'OR', 'OTHERWISE', 'OUTPUT', 'PLUS', 'PROCEDURE', 'RBRACKET', 'READFILE', 'REAL',
+            'REPEAT', 'RETURN', 'RPAREN', 'SEMI', 'START', 'STEP', 'STRING', 'THEN', 'TO', 'TRUE', 'UNTIL', 'WHILE',
+            'WRITEFILE',),
+    },
+}
@@ -0,0 +1,757 @@
+from .nodevisitor import NodeVisitor
+from .token import Token, TokenType
+from .datatype import DataType
+from .strings import StringBuilder
+from .storage import TypedArray
+from .builtins import BUILTINS
+from .streams import format_value, parse_value
+from .optimizer import DefUse
+from .ast import *
+import operator
+import logging
+
+class PartialEvaluator(NodeVisitor):
+    """
+    Specialises a type checked program against values known before it runs: the lines of input it will read, and the
+    global variables already assigned. Whatever only depends on those values is computed once, while specialising, and
+    the residual program left holds only the rest, so running it gives the same output and final variables as running
+    the original program on that input.
+
+    - Known values are propagated through assignments into every expression using them, and expressions whose operands
+      are all known are folded into constants. Arrays of up to `size_limit` elements with constant bounds are tracked
+      element by element, as long as they are only indexed by known values. Expressions which would throw an error (eg. a division by zero) are left
+      in place, so the residual program fails where the original one would
+    - IF and CASE statements whose condition or expression becomes known are replaced by the branch selected
+    - FOR loops with known bounds, and WHILE and REPEAT loops whose condition stays known on every iteration, are
+      unrolled, as long as the residual statements produced stay within `size_limit`. Loops are either unrolled in full
+      or left as loops, with the variables they assign treated as unknown
+    - INPUT statements executed unconditionally read their line while specialising. The first INPUT which cannot
+      (inside a branch or loop left in the program, or once the input runs out) and every later one read at runtime,
+      from the lines after the `consumed` ones
+
+    Assignments of known values are only written into the residual program where the variable's value is needed at
+    runtime: before a loop or call which uses it, at the end of a branch whose value differs from the other branches',
+    and at the end of the program. Calls to user defined subroutines can read and assign any global variable, so every
+    known value is written out before them and forgotten after them; subroutines themselves are left as written.
+
+    The residual program shares unchanged nodes with the AST passed, which is itself not modified, so one program can
+    be specialised against any number of input sets. Flattened into a ProgramImage, a residual program can be cached by
+    the program and input set it was specialised for
+
+    :param unroll_limit: The maximum number of loop iterations unrolled while specialising a program, in total
+    :type unroll_limit: int
+    :param size_limit: The maximum number of statements a single unrolled loop may leave in the residual program, and
+        of elements in an array tracked element by element
+    :type size_limit: int
+    """
+    OPERATIONS = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+        TokenType.DIV: operator.truediv,
+        TokenType.EQ: operator.eq,
+        TokenType.EQEQ: operator.eq,
+        TokenType.NOTEQ: operator.ne,
+        TokenType.LTHAN: operator.lt,
+        TokenType.LTEQ: operator.le,
+        TokenType.GTHAN: operator.gt,
+        TokenType.GTEQ: operator.ge,
+    }
+
+    # The fields of each node class, declared by the __slots__ of the class and its bases
+    FIELDS: dict[type, tuple[str, ...]] = {}
+
+    def __init__(self, unroll_limit: int = 10_000, size_limit: int = 100):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.unroll_limit: int = unroll_limit
+        self.size_limit: int = size_limit
+        # The known value of each global variable (a TypedArray for arrays known in full), and the static type of each
+        # variable seen
+        self.env: dict[str, any] = {}
+        self.types: dict[str, DataType | None] = {}
+        # The declaration of each array known in full, with its bounds folded
+        self.declarations: dict[str, VarDecl] = {}
+        # Statements to run before the statement being specialised: arrays written out as it uses them as a whole
+        self.pending: list[AST] = []
+        self.inputs: tuple[str, ...] = ()
+        # The number of lines of input read while specialising, and whether the next INPUT can still read one
+        self.consumed: int = 0
+        self.reading: bool = False
+        # Whether the statement being specialised is certain to be executed, rather than in a branch or loop left in
+        # the residual program
+        self.static: bool = True
+        self.budget: int = unroll_limit
+        self.unrolled: int = 0
+        self.folded: int = 0
+        # Literal nodes by the value they hold, and whether each expression of the program calls a user defined
+        # subroutine, as loops being unrolled create and check the same ones on every iteration
+        self.constants: dict[tuple, AST] = {}
+        self.calls: dict[AST, bool] = {}
+
+    def specialise(self, tree: AST, inputs: tuple[str, ...] | None = None, bindings: dict | None = None) -> Compound:
+        """
+        Returns the residual program of a type checked program given its input and initial variables
+
+        :param tree: Root node of the type checked AST
+        :type tree: AST()
+        :param inputs: The lines of input the program will read (None if they are not known)
+        :type inputs: tuple[str, ...] | None
+        :param bindings: The global variables assigned before the program runs. Only INTEGER, REAL, STRING and BOOLEAN
+            values are used
+        :type bindings: dict | None
+        :return: Root node of the residual program, to be run with the lines of input after the first `consumed`
+        :rtype: Compound()
+        """
+        self.env = {
+            name: str(value) if isinstance(value, StringBuilder) else value
+            for name, value in (bindings or {}).items()
+            if DataType.of(value) is not None
+        }
+        self.types, self.declarations, self.pending = {}, {}, []
+        self.inputs = tuple(inputs) if inputs is not None else ()
+        self.consumed, self.reading, self.static = 0, inputs is not None, True
+        self.budget, self.unrolled, self.folded = self.unroll_limit, 0, 0
+        self.constants, self.calls = {}, {}
+
+        statements = self.visit(tree) + self.materialise(list(self.env))
+        self.logger.info(
+            f"Specialised program: {self.consumed} line(s) of input read, {self.unrolled} loop(s) unrolled, "
+            f"{self.folded} branch(es) selected"
+        )
+        return self.compound(statements)
+
+    @staticmethod
+    def compound(statements: list[AST]) -> Compound:
+        node = Compound()
+        node.children = statements
+        return node
+
+    @classmethod
+    def clone(cls, node: AST) -> AST:
+        """
+        Returns a shallow copy of a node, faster than copy.copy() as it does not go through the pickle protocol
+
+        :rtype: AST()
+        """
+        node_type = type(node)
+        fields = cls.FIELDS.get(node_type)
+        if fields is None:
+            fields = cls.FIELDS[node_type] = tuple(
+                field for base in node_type.__mro__ for field in getattr(base, "__slots__", ()) if field != "__weakref__"
+            )
+        copied = object.__new__(node_type)
+        for field in fields:
+            try:
+                setattr(copied, field, getattr(node, field))
+            except AttributeError:
+                pass
+        return copied
+
+    @staticmethod
+    def is_constant(node: AST) -> bool:
+        return isinstance(node, (Num, String, Boolean))
+
+    @staticmethod
+    def same(value: any, other: any) -> bool:
+        # 1, 1.0 and TRUE are equal in Python but are different values in a program
+        if isinstance(value, TypedArray):
+            return (
+                isinstance(other, TypedArray)
+                and value.bounds == other.bounds
+                and value.element_type == other.element_type
+                and value.data == other.data
+            )
+        return type(value) is type(other) and value == other
+
+    @staticmethod
+    def copy_env(env: dict) -> dict:
+        """
+        Copies known values, including the elements of known arrays, so they can be changed independently
+
+        :rtype: dict
+        """
+        copied = dict(env)
+        for name, value in env.items():
+            if isinstance(value, TypedArray):
+                array = copied[name] = object.__new__(TypedArray)
+                array.__dict__.update(value.__dict__)
+                array.data = value.data[:]
+        return copied
+
+    @staticmethod
+    def position(array: TypedArray, indices: list) -> int | None:
+        """
+        Returns the position of an element in the flat buffer of an array, or None if the indices are out of bounds
+
+        :rtype: int | None
+        """
+        if len(indices) != array.dimensions:
+            return None
+        position = 0
+        for index, (lower, upper), stride in zip(indices, array.bounds, array.strides):
+            if type(index) is not int or not lower <= index <= upper:
+                return None
+            position += (index - lower) * stride
+        return position
+
+    def constant(self, value: any, data_type: DataType | None) -> Num | String | Boolean | None:
+        """
+        Creates a literal node holding a value, or returns None if the value has no literal form
+
+        :param value: The value
+        :type value: any
+        :param data_type: The static type of the expression the value is computed from
+        :type data_type: DataType() | None
+        :rtype: Num() | String() | Boolean() | None
+        """
+        if isinstance(value, StringBuilder):
+            value = str(value)
+        key = type(value), value, data_type == DataType.CHAR
+        node = self.constants.get(key)
+        if node is not None:
+            return node
+        value_type = DataType.of(value)
+        if value_type == DataType.BOOLEAN:
+            node = Boolean(Token(TokenType.TRUE if value else TokenType.FALSE, value))
+        elif value_type == DataType.STRING:
+            node = String(Token(TokenType.STRING, value))
+            if data_type == DataType.CHAR:
+                value_type = data_type
+        elif value_type is not None:
+            node = Num(Token(TokenType[value_type.value], value))
+        else:
+            return None
+        node.type = value_type
+        self.constants[key] = node
+        return node
+
+    def materialise(self, names: list[str], env: dict | None = None) -> list[AST]:
+        """
+        Returns assignments of the known values of variables, which are then no longer known. Known arrays are declared
+        again, and each element not holding its default value assigned
+
+        :param names: The names of the variables
+        :type names: list[str]
+        :param env: The known values to take them from (the current ones by default)
+        :type env: dict | None
+        :rtype: list[AST()]
+        """
+        env = self.env if env is None else env
+        assignments = []
+        for name in names:
+            if name not in env:
+                continue
+            value = env.pop(name)
+            if isinstance(value, TypedArray):
+                assignments += self.materialise_array(name, value)
+                continue
+            var_node = Variable(Token(TokenType.IDENTIFIER, name))
+            var_node.type = self.types.get(name, DataType.of(value))
+            assignments.append(Assign(var_node, Token(TokenType.ASSIGN, "<-"), self.constant(value, var_node.type)))
+        return assignments
+
+    def materialise_array(self, name: str, array: TypedArray) -> list[AST]:
+        declaration = self.clone(self.declarations[name])
+        statements = [declaration]
+        default = TypedArray.DEFAULTS[array.element_type]
+        for position, value in enumerate(array.data):
+            if self.same(value, default):
+                continue
+            indices = [
+                self.constant(lower + position // stride % (upper - lower + 1), DataType.INTEGER)
+                for (lower, upper), stride in zip(array.bounds, array.strides)
+            ]
+            element = ArrayElement(declaration.var_node, indices)
+            element.type = array.element_type
+            statements.append(Assign(element, Token(TokenType.ASSIGN, "<-"), self.constant(value, array.element_type)))
+        return statements
+
+    def settle(self, *exprs: AST | None) -> list[AST]:
+        """
+        Writes out and forgets every known value if any of the expressions calls a user defined subroutine, which can
+        read and assign any global variable
+
+        :return: The assignments to run first
+        :rtype: list[AST()]
+        """
+        for expr in exprs:
+            if expr is None:
+                continue
+            calls = self.calls.get(expr)
+            if calls is None:
+                calls = self.calls[expr] = DefUse.of(expr).calls
+            if calls:
+                return self.barrier()
+        return []
+
+    def barrier(self) -> list[AST]:
+        # Subroutines can also use INPUT, so later INPUT statements are left to read at runtime
+        self.reading = False
+        return self.materialise(list(self.env))
+
+    def reduce(self, node: AST) -> AST:
+        """
+        Returns an expression with the known values substituted into it and folded where possible. Operation nodes are
+        always copied, so no two statements of the residual program share one
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        if isinstance(node, (Num, String, Boolean)):
+            return node
+        if isinstance(node, Variable):
+            if node.slot is None and node.value in self.env:
+                value = self.env[node.value]
+                if not isinstance(value, TypedArray):
+                    return self.constant(value, node.type)
+                # A known array used as a whole
+                self.pending += self.materialise([node.value])
+            return node
+        if isinstance(node, LogicalOP):
+            left = self.reduce(node.left)
+            if self.is_constant(left):
+                # The right operand is only evaluated if the left one does not decide the result
+                if (node.op.type == TokenType.AND) != bool(left.value):
+                    return left
+                return self.reduce(node.right)
+            reduced = self.clone(node)
+            reduced.left, reduced.right = left, self.reduce(node.right)
+            return reduced
+        if isinstance(node, BinOP):
+            left, right = self.reduce(node.left), self.reduce(node.right)
+            if self.is_constant(left) and self.is_constant(right):
+                constant = self.fold(node, self.operate, node, left.value, right.value)
+                if constant is not None:
+                    return constant
+            reduced = self.clone(node)
+            reduced.left, reduced.right = left, right
+            return reduced
+        if isinstance(node, UnaryOP):
+            expr = self.reduce(node.expr)
+            if self.is_constant(expr):
+                constant = self.fold(node, self.negate, node.op.type, expr.value)
+                if constant is not None:
+                    return constant
+            reduced = self.clone(node)
+            reduced.expr = expr
+            return reduced
+        if isinstance(node, FunctionCall):
+            args = [self.reduce(arg) for arg in node.args]
+            if node.subroutine is None and BUILTINS[node.name].deterministic and all(map(self.is_constant, args)):
+                constant = self.fold(node, BUILTINS[node.name], *[arg.value for arg in args])
+                if constant is not None:
+                    return constant
+            reduced = self.clone(node)
+            reduced.args = args
+            return reduced
+        if isinstance(node, ArrayElement):
+            indices = [self.reduce(index) for index in node.indices]
+            array = self.env.get(node.value) if node.var_node.slot is None else None
+            if isinstance(array, TypedArray):
+                position = self.position(array, [index.value for index in indices if self.is_constant(index)])
+                if position is not None:
+                    return self.constant(array.data[position], node.type)
+                # Indexed by an unknown value (or out of bounds), so the array is needed at runtime
+                self.pending += self.materialise([node.value])
+            reduced = self.clone(node)
+            reduced.indices = indices
+            return reduced
+        if isinstance(node, EndOfFile):
+            reduced = self.clone(node)
+            reduced.filename = self.reduce(node.filename)
+            return reduced
+        return node
+
+    def fold(self, node: AST, func, *args) -> Num | String | Boolean | None:
+        """
+        Returns the literal node an expression folds into: the value of a function of its known operands. None is
+        returned if the function throws an error, so the expression is left to throw it at runtime
+
+        :param node: The expression node
+        :type node: AST()
+        :param func: The function computing its value
+        :type func: function
+        :rtype: Num() | String() | Boolean() | None
+        """
+        try:
+            value = func(*args)
+        except Exception:
+            return None
+        return self.constant(value, node.type)
+
+    def operate(self, node: BinOP, left: any, right: any) -> any:
+        if type(node) is not BinOP:
+            return node.func(left, right)
+        if node.op.type == TokenType.CONCAT:
+            return StringBuilder.concat(left, right)
+        return self.OPERATIONS[node.op.type](left, right)
+
+    @staticmethod
+    def negate(op: TokenType, value: any) -> any:
+        if op == TokenType.MINUS:
+            return -value
+        if op == TokenType.NOT:
+            return not value
+        return +value
+
+    def visit(self, node: AST) -> list[AST]:
+        """
+        Specialises a statement
+
+        :param node: The statement node
+        :type node: AST()
+        :return: Its residual statements
+        :rtype: list[AST()]
+        """
+        pending, self.pending = self.pending, []
+        statements = super().visit(node)
+        statements, self.pending = self.pending + statements, pending
+        return statements
+
+    def block(self, node: Compound | None) -> list[AST]:
+        """
+        Specialises a list of statements
+
+        :rtype: list[AST()]
+        """
+        statements = []
+        if node is not None:
+            for child in node.children:
+                statements += self.visit(child)
+        return statements
+
+    def generic_visit(self, node: AST) -> list[AST]:
+        # Statements not understood are left as written, with nothing known about the variables before or after them
+        return self.barrier() + [node]
+
+    def visit_Compound(self, node: Compound) -> list[AST]:
+        return self.block(node)
+
+    def visit_NoOP(self, node: NoOP) -> list[AST]:
+        return []
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl) -> list[AST]:
+        return [node]
+
+    def visit_VarDecl(self, node: VarDecl) -> list[AST]:
+        name = node.var_node.value
+        self.types[name] = node.var_node.type
+        if not isinstance(node.type_node, ArrayType):
+            return [node]
+        self.env.pop(name, None)
+        reduced = self.clone(node)
+        reduced.type_node = self.clone(node.type_node)
+        reduced.type_node.bounds = [(self.reduce(lower), self.reduce(upper)) for lower, upper in node.type_node.bounds]
+
+        bounds = [
+            (lower.value, upper.value)
+            for lower, upper in reduced.type_node.bounds
+            if self.is_constant(lower) and self.is_constant(upper)
+        ]
+        if node.var_node.slot is not None or len(bounds) != len(reduced.type_node.bounds):
+            return [reduced]
+        size = 1
+        for lower, upper in bounds:
+            if type(lower) is not int or type(upper) is not int or upper < lower:
+                return [reduced]
+            size *= upper - lower + 1
+        if size > self.size_limit:
+            return [reduced]
+        # Small arrays are allocated while specialising, and only declared in the residual program once needed
+        self.declarations[name] = reduced
+        self.env[name] = TypedArray(bounds, DataType(node.type_node.element_type.value))
+        return []
+
+    def store(self, node: Variable | ArrayElement, value: any) -> bool:
+        """
+        Records a known value assigned to a variable or array element
+
+        :return: Whether the value is known from then on, rather than having to be assigned at runtime
+        :rtype: bool
+        """
+        if isinstance(node, Variable):
+            if node.slot is not None:
+                return False
+            self.env[node.value] = value
+            self.types[node.value] = node.type
+            return True
+        array = self.env.get(node.value) if node.var_node.slot is None else None
+        if not isinstance(array, TypedArray):
+            return False
+        indices = [self.reduce(index) for index in node.indices]
+        position = self.position(array, [index.value for index in indices if self.is_constant(index)])
+        if position is None:
+            return False
+        try:
+            array.data[position] = value
+        except (TypeError, OverflowError):
+            # Left to fail at runtime
+            return False
+        return True
+
+    def target(self, node: Variable | ArrayElement) -> Variable | ArrayElement:
+        """
+        Returns the variable or array element a statement assigns an unknown value to, with its indices reduced. The
+        variable's value is no longer known, and a known array is written out first
+        """
+        if isinstance(node, ArrayElement):
+            reduced = self.clone(node)
+            reduced.indices = [self.reduce(index) for index in node.indices]
+            if node.var_node.slot is None:
+                self.pending += self.materialise([node.value])
+            return reduced
+        self.env.pop(node.value, None)
+        self.types[node.value] = node.type
+        return node
+
+    def visit_Assign(self, node: Assign) -> list[AST]:
+        statements = self.settle(node.right, node.left)
+        right = self.reduce(node.right)
+        if self.is_constant(right) and self.store(node.left, right.value):
+            return statements
+        reduced = self.clone(node)
+        reduced.right, reduced.left = right, self.target(node.left)
+        return statements + [reduced]
+
+    def visit_Output(self, node: Output) -> list[AST]:
+        statements = self.settle(*node.exprs)
+        exprs = []
+        for expr in map(self.reduce, node.exprs):
+            # Runs of known values are written out as one string
+            if self.is_constant(expr) and exprs and self.is_constant(exprs[-1]):
+                expr = self.constant(format_value(exprs.pop().value) + format_value(expr.value), DataType.STRING)
+            exprs.append(expr)
+        return statements + [Output(exprs)]
+
+    def visit_Input(self, node: Input) -> list[AST]:
+        statements = self.settle(node.var_node)
+        var_node = node.var_node
+        if self.reading and self.static and self.consumed < len(self.inputs):
+            try:
+                value = parse_value(self.inputs[self.consumed], var_node.type)
+            except ValueError:
+                # Left to fail at runtime
+                value = None
+            else:
+                self.consumed += 1
+            if value is not None and self.store(var_node, value):
+                return statements
+            if value is not None:
+                constant = self.constant(value, var_node.type)
+                return statements + [Assign(self.target(var_node), Token(TokenType.ASSIGN, "<-"), constant)]
+        self.reading = False
+        reduced = self.clone(node)
+        reduced.var_node = self.target(var_node)
+        return statements + [reduced]
+
+    def visit_ProcedureCall(self, node: ProcedureCall) -> list[AST]:
+        statements = self.barrier()
+        reduced = self.clone(node)
+        reduced.args = [self.reduce(arg) for arg in node.args]
+        return statements + [reduced]
+
+    def visit_OpenFile(self, node: OpenFile) -> list[AST]:
+        statements = self.settle(node.filename)
+        reduced = self.clone(node)
+        reduced.filename = self.reduce(node.filename)
+        return statements + [reduced]
+
+    visit_CloseFile = visit_OpenFile
+
+    def visit_ReadFile(self, node: ReadFile) -> list[AST]:
+        statements = self.settle(node.filename, node.var_node)
+        reduced = self.clone(node)
+        reduced.filename, reduced.var_node = self.reduce(node.filename), self.target(node.var_node)
+        return statements + [reduced]
+
+    def visit_WriteFile(self, node: WriteFile) -> list[AST]:
+        statements = self.settle(node.filename, node.expr)
+        reduced = self.clone(node)
+        reduced.filename, reduced.expr = self.reduce(node.filename), self.reduce(node.expr)
+        return statements + [reduced]
+
+    def fork(self, bodies: list[Compound | None]) -> list[list[AST]]:
+        """
+        Specialises the branches of a selection statement whose branch is not known. A variable stays known after the
+        statement if every branch leaves it with the same value; otherwise each branch knowing its value assigns it at
+        its end
+
+        :param bodies: The statements of each branch (None for a missing ELSE or OTHERWISE branch)
+        :type bodies: list[Compound() | None]
+        :return: The residual statements of each branch
+        :rtype: list[list[AST()]]
+        """
+        entry, static = self.env, self.static
+        self.static = False
+        branches = []
+        for body in bodies:
+            self.env = self.copy_env(entry)
+            branches.append((self.block(body), self.env))
+        self.static = static
+
+        self.env = {
+            name: value
+            for name, value in branches[0][1].items()
+            if all(name in env and self.same(env[name], value) for _, env in branches[1:])
+        }
+        for statements, env in branches:
+            statements += self.materialise([name for name in env if name not in self.env], env)
+        return [statements for statements, _ in branches]
+
+    def visit_IfStatement(self, node: IfStatement) -> list[AST]:
+        statements = self.settle(node.condition)
+        condition = self.reduce(node.condition)
+        if self.is_constant(condition):
+            self.folded += 1
+            return statements + self.block(node.then_body if condition.value else node.else_body)
+        then_body, else_body = self.fork([node.then_body, node.else_body])
+        reduced = self.clone(node)
+        reduced.condition, reduced.then_body = condition, self.compound(then_body)
+        reduced.else_body = self.compound(else_body) if node.else_body is not None or else_body else None
+        return statements + [reduced]
+
+    def visit_CaseStatement(self, node: CaseStatement) -> list[AST]:
+        statements = self.settle(node.expr)
+        expr = self.reduce(node.expr)
+        if self.is_constant(expr):
+            self.folded += 1
+            index = node.table.lookup(expr.value)
+            return statements + self.block(node.branches[index].body if index is not None else node.otherwise)
+        bodies = self.fork([branch.body for branch in node.branches] + [node.otherwise])
+        reduced = self.clone(node)
+        reduced.expr = expr
+        reduced.branches = [
+            CaseBranch(branch.low, branch.high, self.compound(body)) for branch, body in zip(node.branches, bodies)
+        ]
+        reduced.otherwise = self.compound(bodies[-1]) if node.otherwise is not None or bodies[-1] else None
+        return statements + [reduced]
+
+    def snapshot(self) -> tuple:
+        return self.copy_env(self.env), dict(self.types), self.consumed, self.reading, len(self.pending)
+
+    def restore(self, snapshot: tuple):
+        env, types, self.consumed, self.reading, pending = snapshot
+        self.env, self.types = self.copy_env(env), dict(types)
+        del self.pending[pending:]
+
+    def unroll(self, iterations) -> list[AST] | None:
+        """
+        Unrolls a loop, giving up if it runs past the unrolling limits, in which case everything known is as it was
+        before the loop
+
+        :param iterations: Generator specialising each iteration in turn and yielding its residual statements, which
+            stops once the loop would have finished, or yields None if it cannot tell whether the loop continues
+        :type iterations: Generator
+        :return: The residual statements of every iteration, or None if the loop cannot be unrolled
+        :rtype: list[AST()] | None
+        """
+        snapshot = self.snapshot()
+        statements = []
+        for iteration in iterations:
+            if iteration is None or self.budget <= 0 or len(statements) > self.size_limit:
+                self.restore(snapshot)
+                return None
+            self.budget -= 1
+            statements += iteration
+        if len(statements) > self.size_limit:
+            self.restore(snapshot)
+            return None
+        self.unrolled += 1
+        return statements
+
+    def generalise(self, node: ForLoop | WhileLoop | RepeatLoop) -> tuple[list[AST], set[str]]:
+        """
+        Prepares a loop left in the residual program: the variables it assigns, and the known arrays it uses, are
+        assigned their known values before it and are unknown from then on
+
+        :return: The assignments to run before the loop, and the names of the variables the loop assigns
+        :rtype: tuple[list[AST()], set[str]]
+        """
+        def_use = DefUse.of(node)
+        if def_use.calls:
+            return self.barrier(), set()
+        names = {name for slot, name in def_use.defs if slot is None}
+        names |= {name for slot, name in def_use.uses if slot is None and isinstance(self.env.get(name), TypedArray)}
+        return self.materialise([name for name in self.env if name in names]), names
+
+    def residual_body(self, body: Compound, names: set[str], condition: AST | None = None) -> tuple[Compound, AST]:
+        """
+        Specialises the body of a loop left in the residual program (and a condition checked after it), then assigns the
+        values it leaves known to the variables the loop assigns at its end, so every iteration starts alike
+        """
+        entry, static = self.env, self.static
+        self.env, self.static = self.copy_env(entry), False
+        statements = self.block(body)
+        if condition is not None:
+            condition = self.reduce(condition)
+        statements += self.materialise([name for name in self.env if name in names or name not in entry])
+        self.env, self.static = entry, static
+        return self.compound(statements), condition
+
+    def visit_ForLoop(self, node: ForLoop) -> list[AST]:
+        statements = self.settle(node.start, node.end, node.step)
+        start, end = self.reduce(node.start), self.reduce(node.end)
+        step = self.reduce(node.step) if node.step is not None else None
+        bounds = [start, end] + ([step] if step is not None else [])
+        if all(self.is_constant(bound) and type(bound.value) is int for bound in bounds):
+            increment = step.value if step is not None else 1
+            if increment != 0:
+                counters = range(start.value, end.value + 1 if increment > 0 else end.value - 1, increment)
+                unrolled = self.unroll(self.iterate_for(node, counters))
+                if unrolled is not None:
+                    return statements + unrolled
+
+        assignments, names = self.generalise(node)
+        statements += assignments
+        reduced = self.clone(node)
+        reduced.start, reduced.end, reduced.step = start, end, step
+        reduced.body = self.residual_body(node.body, names)[0]
+        return statements + [reduced]
+
+    def iterate_for(self, node: ForLoop, counters: range):
+        name = node.var_node.value
+        self.types[name] = node.var_node.type
+        for counter in counters:
+            self.env[name] = counter
+            yield self.block(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop) -> list[AST]:
+        unrolled = None if DefUse.of(node.condition).calls else self.unroll(self.iterate_while(node))
+        if unrolled is not None:
+            return unrolled
+        statements, names = self.generalise(node)
+        reduced = self.clone(node)
+        reduced.condition = self.reduce(node.condition)
+        reduced.body = self.residual_body(node.body, names)[0]
+        return statements + [reduced]
+
+    def iterate_while(self, node: WhileLoop):
+        while True:
+            condition = self.reduce(node.condition)
+            if not self.is_constant(condition):
+                yield None
+                return
+            if not condition.value:
+                return
+            yield self.block(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop) -> list[AST]:
+        unrolled = None if DefUse.of(node.condition).calls else self.unroll(self.iterate_repeat(node))
+        if unrolled is not None:
+            return unrolled
+        statements, names = self.generalise(node)
+        reduced = self.clone(node)
+        reduced.body, reduced.condition = self.residual_body(node.body, names, node.condition)
+        return statements + [reduced]
+
+    def iterate_repeat(self, node: RepeatLoop):
+        while True:
+            statements = self.block(node.body)
+            condition = self.reduce(node.condition)
+            if not self.is_constant(condition):
+                yield None
+                return
+            yield statements
+            if condition.value:
+                return
@@ -0,0 +1,56 @@
+import bisect
+
+class LineIndex(object):
+    """
+    Converts offsets in the source code into line and column numbers. Tokens and AST nodes only store the offset of
+    their first character, so lexing does not need to track lines; the offsets at which each line starts are found the
+    first time a position is converted (typically to report an error), then each conversion is a binary search
+
+    :param source: The source code
+    :type source: str
+    """
+    __slots__ = ("source", "line_starts")
+
+    def __init__(self, source: str):
+        self.source: str = source
+        self.line_starts: list[int] | None = None
+
+    def build(self) -> list[int]:
+        """
+        Returns the offset of the first character of each line, finding them if they have not been already
+
+        :rtype: list[int]
+        """
+        if self.line_starts is None:
+            line_starts = [0]
+            newline = self.source.find("\n")
+            while newline != -1:
+                line_starts.append(newline + 1)
+                newline = self.source.find("\n", newline + 1)
+            self.line_starts = line_starts
+        return self.line_starts
+
+    def location(self, offset: int) -> tuple[int, int]:
+        """
+        Converts an offset into a line and column number, both starting at 1
+
+        :param offset: The offset of a character in the source code
+        :type offset: int
+        :rtype: tuple[int, int]
+        """
+        line_starts = self.build()
+        line = bisect.bisect_right(line_starts, offset)
+        return line, offset - line_starts[line - 1] + 1
+
+    def describe(self, offset: int | None) -> str:
+        """
+        Describes the position of an offset for use in a diagnostic, eg. "line 3, column 14"
+
+        :param offset: The offset of a character in the source code (None if unknown)
+        :type offset: int | None
+        :rtype: str
+        """
+        if offset is None:
+            return "unknown position"
+        line, column = self.location(offset)
+        return f"line {line}, column {column}"
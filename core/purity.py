@@ -0,0 +1,139 @@
+from .nodevisitor import NodeVisitor
+from .ast import *
+import logging
+
+class PurityAnalyser(NodeVisitor):
+    """
+    Finds the subroutines whose result depends only on their arguments and which have no side effects, so calls to them
+    can be memoized.
+
+    A subroutine is pure if it has no BYREF parameters, does not use INPUT or OUTPUT, does not read or write any global
+    variable, and only calls built in functions and other pure subroutines. Subroutines are first checked on their own,
+    after which any subroutine calling an impure subroutine is marked as impure too, until nothing changes
+    """
+    def __init__(self):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.pure: bool = True
+        self.callees: set[str] = set()
+
+    def analyse(self, subroutines: dict[str, SubroutineDecl]) -> set[str]:
+        """
+        Returns the names of the pure subroutines among those passed
+
+        :param subroutines: Every subroutine in the program, by name
+        :type subroutines: dict[str, SubroutineDecl()]
+        :rtype: set[str]
+        """
+        calls: dict[str, set[str]] = {}
+        pure = set()
+        for name, subroutine in subroutines.items():
+            self.pure, self.callees = not any(param.byref for param in subroutine.params), set()
+            self.visit(subroutine.body)
+            calls[name] = self.callees
+            if self.pure:
+                pure.add(name)
+
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not calls[name] <= pure:
+                    pure.discard(name)
+                    changed = True
+        self.logger.info(f"Pure subroutines: {sorted(pure)}")
+        return pure
+
+    def generic_visit(self, node: AST):
+        # Anything not explicitly known to be pure is assumed not to be
+        self.pure = False
+
+    def visit_Compound(self, node: Compound):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOP(self, node: NoOP):
+        pass
+
+    def visit_Num(self, node: Num):
+        pass
+
+    def visit_String(self, node: String):
+        pass
+
+    def visit_Boolean(self, node: Boolean):
+        pass
+
+    def visit_Variable(self, node: Variable):
+        if node.slot is None:
+            self.pure = False
+
+    def visit_ArrayElement(self, node: ArrayElement):
+        self.visit(node.var_node)
+        for index in node.indices:
+            self.visit(index)
+
+    def visit_VarDecl(self, node: VarDecl):
+        self.visit(node.var_node)
+        if isinstance(node.type_node, ArrayType):
+            for lower, upper in node.type_node.bounds:
+                self.visit(lower)
+                self.visit(upper)
+
+    def visit_Assign(self, node: Assign):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_BinOP(self, node: BinOP):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+    visit_LogicalOP = visit_BinOP
+
+    def visit_UnaryOP(self, node: UnaryOP):
+        self.visit(node.expr)
+
+    def visit_FunctionCall(self, node: FunctionCall):
+        if node.subroutine is not None:
+            self.callees.add(node.name)
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_ProcedureCall(self, node: ProcedureCall):
+        self.callees.add(node.name)
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_IfStatement(self, node: IfStatement):
+        self.visit(node.condition)
+        self.visit(node.then_body)
+        if node.else_body is not None:
+            self.visit(node.else_body)
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        self.visit(node.expr)
+        for branch in node.branches:
+            self.visit(branch.body)
+        if node.otherwise is not None:
+            self.visit(node.otherwise)
+
+    def visit_ForLoop(self, node: ForLoop):
+        self.visit(node.var_node)
+        self.visit(node.start)
+        self.visit(node.end)
+        if node.step is not None:
+            self.visit(node.step)
+        self.visit(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        self.visit(node.condition)
+        self.visit(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.visit(node.body)
+        self.visit(node.condition)
+
+    def visit_Return(self, node: Return):
+        self.visit(node.expr)
@@ -0,0 +1,262 @@
+from . import __version__
+from .nodevisitor import NodeVisitor
+from .builtins import BUILTINS
+from .image import ProgramImage
+from .metrics import CACHE_HITS, CACHE_MISSES
+from .ast import *
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import tempfile
+import logging
+
+class DeterminismAnalyser(NodeVisitor):
+    """
+    Finds whether a program always produces the same output and final variables given the same input, so its results
+    can be cached. A program is deterministic unless it calls a built in function which is not (such as a random number
+    generator); programs using INPUT are deterministic too, but their results depend on the lines they read
+    """
+    def __init__(self):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.deterministic: bool = True
+        self.reads_input: bool = False
+
+    def analyse(self, tree: AST) -> tuple[bool, bool]:
+        """
+        Returns whether a type checked program is deterministic, and whether it uses INPUT
+
+        :param tree: Root node of the AST
+        :type tree: AST()
+        :rtype: tuple[bool, bool]
+        """
+        self.deterministic, self.reads_input = True, False
+        self.visit(tree)
+        self.logger.info(f"Program deterministic: {self.deterministic}, reads input: {self.reads_input}")
+        return self.deterministic, self.reads_input
+
+    def generic_visit(self, node: AST):
+        # Anything not explicitly known to be deterministic is assumed not to be
+        self.deterministic = False
+
+    def visit_Compound(self, node: Compound):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOP(self, node: NoOP):
+        pass
+
+    def visit_Num(self, node: Num):
+        pass
+
+    def visit_String(self, node: String):
+        pass
+
+    def visit_Boolean(self, node: Boolean):
+        pass
+
+    def visit_Variable(self, node: Variable):
+        pass
+
+    def visit_ArrayElement(self, node: ArrayElement):
+        for index in node.indices:
+            self.visit(index)
+
+    def visit_VarDecl(self, node: VarDecl):
+        if isinstance(node.type_node, ArrayType):
+            for lower, upper in node.type_node.bounds:
+                self.visit(lower)
+                self.visit(upper)
+
+    def visit_BinOP(self, node: BinOP):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+    visit_LogicalOP = visit_BinOP
+
+    def visit_UnaryOP(self, node: UnaryOP):
+        self.visit(node.expr)
+
+    def visit_Assign(self, node: Assign):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_ForLoop(self, node: ForLoop):
+        self.visit(node.start)
+        self.visit(node.end)
+        if node.step is not None:
+            self.visit(node.step)
+        self.visit(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        self.visit(node.condition)
+        self.visit(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.visit(node.body)
+        self.visit(node.condition)
+
+    def visit_IfStatement(self, node: IfStatement):
+        self.visit(node.condition)
+        self.visit(node.then_body)
+        if node.else_body is not None:
+            self.visit(node.else_body)
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        self.visit(node.expr)
+        for branch in node.branches:
+            self.visit(branch.body)
+        if node.otherwise is not None:
+            self.visit(node.otherwise)
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl):
+        self.visit(node.body)
+
+    def visit_Return(self, node: Return):
+        self.visit(node.expr)
+
+    def visit_ProcedureCall(self, node: ProcedureCall):
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_FunctionCall(self, node: FunctionCall):
+        if node.subroutine is None and not BUILTINS[node.name].deterministic:
+            self.deterministic = False
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_Output(self, node: Output):
+        for expr in node.exprs:
+            self.visit(expr)
+
+    def visit_Input(self, node: Input):
+        self.reads_input = True
+        self.visit(node.var_node)
+
+
+class CachedResult(object):
+    """
+    The results of running a program: everything it output, and its global variables once it finished
+
+    :param output: The output transcript
+    :type output: str
+    :param scope: The global variables
+    :type scope: dict
+    """
+    def __init__(self, output: str, scope: dict):
+        self.output: str = output
+        self.scope: dict = scope
+
+
+class ResultCache(object):
+    """
+    Caches the results of deterministic programs, so running the same program on the same input again returns its
+    output and final variables without executing it.
+
+    Results are looked up by a key hashing the interpreter version, the program's image (see ProgramImage), which holds
+    its type checked AST without positions, whitespace or comments, and the lines of input supplied. Results are kept in
+    memory, evicting the least recently used once `maxsize` are held, and if a directory is passed are also stored on
+    disk, so they outlive the process. Entries are stored pickled, so every hit returns a fresh copy of the variables
+    which the caller is free to modify
+
+    :param maxsize: The maximum number of results kept in memory
+    :type maxsize: int
+    :param directory: Directory results are also stored in (None to only keep them in memory)
+    :type directory: str | None
+    """
+    def __init__(self, maxsize: int = 256, directory: str | None = None):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.maxsize: int = maxsize
+        self.directory: str | None = directory
+        self.entries: OrderedDict[str, bytes] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(tree: AST, inputs: tuple[str, ...] = ()) -> str:
+        """
+        Returns the key of the results of a type checked program run on the input passed
+
+        :param tree: Root node of the type checked AST, before any optimisation
+        :type tree: AST()
+        :param inputs: The lines of input supplied to the program
+        :type inputs: tuple[str, ...]
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}/{ProgramImage.VERSION}\0".encode())
+        digest.update(ProgramImage.from_tree(tree).tobytes())
+        for line in inputs:
+            digest.update(b"\0" + line.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key: str) -> CachedResult | None:
+        """
+        Returns the results stored under a key, or None if there are none
+
+        :rtype: CachedResult() | None
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        elif self.directory is not None:
+            try:
+                with open(self.path(key), "rb") as file:
+                    entry = file.read()
+            except FileNotFoundError:
+                pass
+            else:
+                self.remember(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            CACHE_MISSES.inc(label="result")
+            return None
+        self.hits += 1
+        CACHE_HITS.inc(label="result")
+        self.logger.info(f"Result cache hit for {key}")
+        return CachedResult(*pickle.loads(entry))
+
+    def put(self, key: str, output: str, scope: dict):
+        """
+        Stores the results of a program under a key
+
+        :param key: The key of the program and its input
+        :type key: str
+        :param output: The output transcript
+        :type output: str
+        :param scope: The global variables once the program finished
+        :type scope: dict
+        """
+        entry = pickle.dumps((output, scope), protocol=pickle.HIGHEST_PROTOCOL)
+        self.remember(key, entry)
+        if self.directory is not None:
+            # Written to a temporary file then renamed, so concurrent readers never see a partial entry
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(entry)
+            os.replace(temporary, self.path(key))
+
+    def remember(self, key: str, entry: bytes):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every result, from memory and disk
+        """
+        self.entries.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,139 @@
+from .exception import ExceptionHandler
+from .datatype import DataType
+from .optional import optional_import
+import array
+import logging
+
+class TypedArray(object):
+    """
+    Storage backing arrays declared with DECLARE ... ARRAY. Elements are stored in a single flat buffer in row-major
+    order, and are indexed using the bounds given in the declaration (eg. 1-based for ARRAY[1:N])
+
+    INTEGER and REAL arrays are stored unboxed in an `array.array` (8 bytes per element), which can additionally be
+    viewed as a NumPy array without copying when NumPy is installed. Other element types are stored in a list
+
+    :param bounds: The inclusive (lower, upper) bounds of each dimension
+    :type bounds: list[tuple[int, int]]
+    :param element_type: The data type of each element
+    :type element_type: DataType()
+    """
+    TYPECODES = {
+        DataType.INTEGER: "q",
+        DataType.REAL: "d",
+    }
+    DEFAULTS = {
+        DataType.INTEGER: 0,
+        DataType.REAL: 0.0,
+        DataType.STRING: "",
+        DataType.CHAR: "",
+        DataType.BOOLEAN: False,
+    }
+
+    def __init__(self, bounds: list[tuple[int, int]], element_type: DataType):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.bounds: list[tuple[int, int]] = bounds
+        self.element_type: DataType = element_type
+        self.dimensions: int = len(bounds)
+
+        # Strides are computed from the last dimension backwards, as elements are stored in row-major order
+        self.strides: list[int] = [1] * self.dimensions
+        self.size: int = 1
+        for dim in range(self.dimensions - 1, -1, -1):
+            lower, upper = bounds[dim]
+            if upper < lower:
+                self.ExceptionHandler.raise_exception(f"Invalid array bounds [{lower}:{upper}]")
+            self.strides[dim] = self.size
+            self.size *= upper - lower + 1
+
+        default = self.DEFAULTS[element_type]
+        typecode = self.TYPECODES.get(element_type)
+        if typecode is not None:
+            self.data: array.array | list = array.array(typecode, [default]) * self.size
+        else:
+            self.data: array.array | list = [default] * self.size
+
+    def offset(self, index: int | tuple[int, ...]) -> int:
+        """
+        Converts an index (a tuple of indices for multidimensional arrays) into the position of the element in the flat
+        buffer, throwing an exception if it falls outside the array's bounds
+
+        :param index: The index of the element
+        :type index: int | tuple[int, ...]
+        :rtype: int
+        """
+        if self.dimensions == 1:
+            lower, upper = self.bounds[0]
+            if type(index) is not int or not lower <= index <= upper:
+                self.out_of_bounds(index)
+            return index - lower
+
+        if type(index) is not tuple or len(index) != self.dimensions:
+            self.out_of_bounds(index)
+        position = 0
+        for i, (lower, upper), stride in zip(index, self.bounds, self.strides):
+            if type(i) is not int or not lower <= i <= upper:
+                self.out_of_bounds(index)
+            position += (i - lower) * stride
+        return position
+
+    def out_of_bounds(self, index: any):
+        bounds = ", ".join(f"{lower}:{upper}" for lower, upper in self.bounds)
+        self.ExceptionHandler.raise_exception(f"Array index {index} out of bounds [{bounds}]")
+
+    def __getitem__(self, index: int | tuple[int, ...]) -> any:
+        return self.data[self.offset(index)]
+
+    def __setitem__(self, index: int | tuple[int, ...], value: any):
+        try:
+            self.data[self.offset(index)] = value
+        except (TypeError, OverflowError):
+            self.ExceptionHandler.raise_exception(f"Cannot store {repr(value)} in an array of {self.element_type.value}")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def fill(self, value: any):
+        """
+        Sets every element of the array to the value passed
+
+        :param value: The value to store
+        :type value: any
+        """
+        # Slice assignment keeps the existing buffer, so NumPy views returned by as_numpy() stay valid
+        try:
+            if isinstance(self.data, array.array):
+                self.data[:] = array.array(self.data.typecode, [value]) * self.size
+            else:
+                self.data[:] = [value] * self.size
+        except (TypeError, OverflowError):
+            self.ExceptionHandler.raise_exception(f"Cannot store {repr(value)} in an array of {self.element_type.value}")
+
+    def to_list(self) -> list:
+        """
+        Returns the elements of the array as a flat list in row-major order
+
+        :rtype: list
+        """
+        return list(self.data)
+
+    def as_numpy(self) -> "numpy.ndarray | None":
+        """
+        Returns a writable NumPy view of the array's elements, shaped according to its dimensions. The view shares
+        memory with the array, so writes to it are visible to the program. Returns None if NumPy is not installed or the
+        array does not have a fixed-size element type
+
+        :rtype: numpy.ndarray | None
+        """
+        numpy = optional_import("numpy")
+        if numpy is None or not isinstance(self.data, array.array):
+            return None
+        shape = tuple(upper - lower + 1 for lower, upper in self.bounds)
+        return numpy.frombuffer(self.data, dtype=self.data.typecode).reshape(shape)
+
+    def __str__(self):
+        bounds = ", ".join(f"{lower}:{upper}" for lower, upper in self.bounds)
+        return f"ARRAY[{bounds}] OF {self.element_type.value}"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,262 @@
+from .exception import ExceptionHandler
+from .datatype import DataType
+import io
+import sys
+import logging
+
+def format_value(value: any) -> str:
+    """
+    Converts a value into the text written by OUTPUT
+
+    :param value: The value to format
+    :type value: any
+    :rtype: str
+    """
+    if value is True:
+        return "TRUE"
+    if value is False:
+        return "FALSE"
+    return str(value)
+
+def parse_value(text: str, data_type: DataType | None) -> any:
+    """
+    Converts a line of text read by INPUT into a value of the data type passed. If the data type is unknown, the text is
+    read as an INTEGER or REAL if possible, and kept as a STRING otherwise
+
+    :param text: The line of text read, without its line terminator
+    :type text: str
+    :param data_type: The data type of the variable being input into
+    :type data_type: DataType() | None
+    :rtype: any
+    """
+    if data_type == DataType.INTEGER:
+        return int(text)
+    if data_type == DataType.REAL:
+        return float(text)
+    if data_type == DataType.BOOLEAN:
+        return text.strip().upper() == "TRUE"
+    if data_type is not None:
+        return text
+
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+class OutputSink(object):
+    """
+    Base class for destinations of the text written by OUTPUT statements. Writes are buffered in an io.StringIO and
+    passed on to emit() in bulk, once at least `buffer_size` characters are pending or flush() is called
+
+    :param buffer_size: Number of pending characters that triggers a flush
+    :type buffer_size: int
+    """
+    def __init__(self, buffer_size: int = 65536):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.buffer_size: int = buffer_size
+        self.buffer: io.StringIO = io.StringIO()
+        self.pending: int = 0
+
+    def write(self, text: str):
+        self.buffer.write(text)
+        self.pending += len(text)
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.emit(self.buffer.getvalue())
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.pending = 0
+
+    def emit(self, text: str):
+        raise NotImplementedError
+
+
+class ConsoleOutput(OutputSink):
+    """
+    Writes output to a text stream (standard output by default), buffered so each OUTPUT does not cost a write and flush
+
+    :param stream: The stream to write to
+    :type stream: TextIO
+    :param buffer_size: Number of pending characters that triggers a flush
+    :type buffer_size: int
+    """
+    def __init__(self, stream: "io.TextIOBase | None" = None, buffer_size: int = 65536):
+        super().__init__(buffer_size)
+        self.stream = stream
+
+    def emit(self, text: str):
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+class RecordingOutput(OutputSink):
+    """
+    Passes output on to another sink unchanged, keeping a copy of everything written so the transcript of a run can be
+    retrieved with getvalue()
+
+    :param sink: The sink output is passed on to
+    :type sink: OutputSink()
+    """
+    def __init__(self, sink: OutputSink):
+        super().__init__(buffer_size=sys.maxsize)
+        self.sink: OutputSink = sink
+
+    def write(self, text: str):
+        self.buffer.write(text)
+        self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
+
+    def getvalue(self) -> str:
+        """
+        Returns everything written so far
+
+        :rtype: str
+        """
+        return self.buffer.getvalue()
+
+
+class CountingOutput(OutputSink):
+    """
+    Passes output on to another sink unchanged, counting the characters written so far in `written`
+
+    :param sink: The sink output is passed on to
+    :type sink: OutputSink()
+    """
+    def __init__(self, sink: OutputSink):
+        super().__init__(buffer_size=sys.maxsize)
+        self.sink: OutputSink = sink
+        self.written: int = 0
+
+    def write(self, text: str):
+        self.written += len(text)
+        self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
+
+
+class CaptureOutput(OutputSink):
+    """
+    Keeps every line of output in memory, so the full transcript of a run can be retrieved with getvalue()
+    """
+    def __init__(self):
+        super().__init__(buffer_size=sys.maxsize)
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> str:
+        """
+        Returns everything written so far
+
+        :rtype: str
+        """
+        return self.buffer.getvalue()
+
+
+class InputSource(object):
+    """
+    Base class for sources of the lines read by INPUT statements
+
+    :param interactive: Whether reading may block on a user, in which case pending output is flushed first so prompts
+        are visible
+    :type interactive: bool
+    """
+    def __init__(self, interactive: bool = False):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.interactive: bool = interactive
+
+    def read_line(self) -> str:
+        raise NotImplementedError
+
+    def contents(self) -> tuple[str, ...] | None:
+        """
+        Returns every line the source will supply, if they are known before the program runs (so the results of a
+        program reading them can be cached), or None otherwise
+
+        :rtype: tuple[str, ...] | None
+        """
+        return None
+
+
+class ConsoleInput(InputSource):
+    """
+    Reads input from the terminal (standard input)
+    """
+    def __init__(self):
+        super().__init__(interactive=True)
+
+    def read_line(self) -> str:
+        try:
+            return input()
+        except EOFError:
+            self.ExceptionHandler.raise_exception("INPUT reached the end of standard input")
+
+
+class IterableInput(InputSource):
+    """
+    Reads input from pre-supplied lines, taken from any iterable of strings such as a list, a generator or an open file.
+    Trailing line terminators are removed
+
+    :param lines: The lines to be read, in order
+    :type lines: Iterable[str]
+    """
+    def __init__(self, lines):
+        super().__init__(interactive=False)
+        # Lines supplied as a list or tuple are known in advance; other iterables are only read as INPUT needs them
+        self.supplied: tuple[str, ...] | None = tuple(lines) if isinstance(lines, (list, tuple)) else None
+        self.lines = iter(self.supplied if self.supplied is not None else lines)
+
+    @classmethod
+    def from_file(cls, path: str, encoding: str = "utf-8") -> "IterableInput":
+        """
+        Creates an input source reading the lines of a text file
+
+        :param path: Path to the file
+        :type path: str
+        :rtype: IterableInput()
+        """
+        with open(path, encoding=encoding) as file:
+            return cls(file.read().splitlines())
+
+    def read_line(self) -> str:
+        line = next(self.lines, None)
+        if line is None:
+            self.ExceptionHandler.raise_exception("INPUT reached the end of the supplied input")
+        return line.rstrip("\r\n")
+
+    def contents(self) -> tuple[str, ...] | None:
+        if self.supplied is None:
+            return None
+        return tuple(line.rstrip("\r\n") for line in self.supplied)
+
+
+class CountingInput(InputSource):
+    """
+    Reads input from another source, counting the lines read so far in `count`
+
+    :param source: The source lines are read from
+    :type source: InputSource()
+    """
+    def __init__(self, source: InputSource):
+        super().__init__(interactive=source.interactive)
+        self.source: InputSource = source
+        self.count: int = 0
+
+    def read_line(self) -> str:
+        line = self.source.read_line()
+        self.count += 1
+        return line
+
+    def contents(self) -> tuple[str, ...] | None:
+        return self.source.contents()
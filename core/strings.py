@@ -0,0 +1,65 @@
+class StringBuilder(object):
+    """
+    STRING value produced by concatenation, which makes repeatedly appending to the same variable (eg. s <- s & x in a
+    loop) amortized O(1) instead of copying the whole string on each append.
+
+    A builder is a view of the first `count` pieces of a list of strings. Appending to the builder that views the whole
+    list (the most recent value) adds a piece to the shared list and returns a new view of one more piece, leaving
+    every older view unchanged. Appending to an older view copies its pieces into a new list first, so values behave
+    exactly like immutable strings. The text is only joined together (and then cached) when it is needed
+
+    :param parts: The pieces of text, shared with other builders
+    :type parts: list[str]
+    :param count: The number of pieces of `parts` belonging to this value
+    :type count: int
+    :param length: The total length of those pieces
+    :type length: int
+    """
+    __slots__ = ("parts", "count", "length", "text")
+
+    def __init__(self, parts: list[str], count: int, length: int):
+        self.parts: list[str] = parts
+        self.count: int = count
+        self.length: int = length
+        self.text: str | None = None
+
+    @classmethod
+    def concat(cls, left: "str | StringBuilder", right: any) -> "StringBuilder":
+        """
+        Concatenates two values, as done by the "&" operator
+
+        :param left: The string being appended to
+        :type left: str | StringBuilder()
+        :param right: The value being appended
+        :type right: any
+        :rtype: StringBuilder()
+        """
+        right = str(right)
+        if isinstance(left, StringBuilder):
+            if left.count == len(left.parts):
+                parts = left.parts
+            else:
+                parts = left.parts[:left.count]
+            parts.append(right)
+            return cls(parts, left.count + 1, left.length + len(right))
+        left = str(left)
+        return cls([left, right], 2, len(left) + len(right))
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = "".join(self.parts[:self.count])
+        return self.text
+
+    def __repr__(self) -> str:
+        return repr(self.__str__())
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other: any) -> bool:
+        if isinstance(other, (str, StringBuilder)):
+            return self.length == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
@@ -0,0 +1,424 @@
+from .token import Token, TokenType
+from .lexer import Lexer
+from .ast import *
+from .exception import ExceptionHandler
+from . import parsetable
+from types import FunctionType
+from typing import Iterator
+import logging
+
+# Marks where the values gathered into a list by the #list action start
+MARK = object()
+
+class TableParser(object):
+    """
+    Table-driven LL(1) parser, producing the same syntax tree as Parser. Instead of a function for each rule of the
+    grammar, a single loop expands nonterminals on an explicit stack using the parse table generated from
+    grammar/syntax.txt by core.grammar, so the parser cannot diverge from the grammar, and nesting constructs does not
+    deepen the Python call stack.
+
+    The symbols of a production are pushed in reverse. Popping a terminal consumes the current token; popping a
+    nonterminal pushes the production the table selects for the current token; and popping an action #name calls the
+    method on_name() with the value stack, the token consumed last and the current token. Actions build nodes from the
+    values on top of the value stack and push them in their place.
+
+    When the table is loaded, nonterminals with a single production are replaced by its symbols, and a production
+    starting with a terminal consumes it as it is pushed, since the token selecting the production is that terminal
+
+    :param lexer: The lexical analyzer used
+    :type lexer: Lexer()
+    """
+    # The parse table, built from the generated module the first time the class is used: for each nonterminal, its row
+    # maps token types to the reversed symbols of the production to push, and whether the current token is consumed
+    # first. Rows stand for their nonterminals on the stack, terminals are token types and actions are functions
+    ROWS: dict[str, dict[TokenType, tuple[tuple, bool]]] | None = None
+    # The nonterminals of the rows, for error messages
+    NAMES: dict[int, str] = {}
+
+    def __init__(self, lexer: Lexer):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.lexer: Lexer = lexer
+        self.cur_token: Token = self.lexer.get_next_token()
+
+        # Slots of the local variables of the subroutine being parsed (None outside of subroutines)
+        self.frame_slots: dict[str, int] | None = None
+        self.byref_slots: set[int] = set()
+
+        if TableParser.ROWS is None:
+            TableParser.load()
+
+    @classmethod
+    def load(cls):
+        """
+        Builds the rows of the parse table from the generated module
+        """
+        rows = {name: {} for name in parsetable.TABLE}
+        # Nonterminals with a single production are replaced by its symbols wherever they are not part of it
+        # themselves, which saves looking them up in the table
+        single = {}
+        for name, row in parsetable.TABLE.items():
+            if len(row) == 1:
+                single[name] = parsetable.PRODUCTIONS[next(iter(row))][1]
+
+        def expand(symbols: tuple[str, ...], inlining: tuple[str, ...]) -> list:
+            expanded = []
+            for symbol in symbols:
+                if symbol in single and symbol not in inlining:
+                    expanded += expand(single[symbol], inlining + (symbol,))
+                elif symbol[0] == "<":
+                    expanded.append(rows[symbol])
+                elif symbol[0] == "#":
+                    expanded.append(getattr(cls, f"on_{symbol[1:]}"))
+                else:
+                    expanded.append(TokenType[symbol])
+            return expanded
+
+        for name, row in parsetable.TABLE.items():
+            for number, tokens in row.items():
+                lhs, rhs = parsetable.PRODUCTIONS[number]
+                symbols = expand(rhs, (lhs,))
+                shifts = bool(symbols) and symbols[0].__class__ is TokenType and symbols[0] is not TokenType.EOF
+                entry = (tuple(reversed(symbols[1:] if shifts else symbols)), shifts)
+                for token in tokens:
+                    rows[name][TokenType[token]] = entry
+        cls.NAMES = {id(row): name for name, row in rows.items()}
+        cls.ROWS = rows
+
+    def error(self, message: str, token: Token | None = None):
+        """
+        Throws a syntax error at the position of a token
+
+        :param message: The error message
+        :type message: str
+        :param token: The token the error is at (the current token by default)
+        :type token: Token()
+        """
+        token = token if token is not None else self.cur_token
+        self.ExceptionHandler.raise_exception(f"{message} at {self.lexer.line_index.describe(token.offset)}")
+
+    def unexpected(self, row: dict, token: Token):
+        """
+        Throws a syntax error for a token which cannot come next while parsing a nonterminal
+
+        :param row: The row of the nonterminal in the parse table
+        :type row: dict
+        :param token: The current token
+        :type token: Token()
+        """
+        if token.type == TokenType.IDENTIFIER:
+            self.error(f"Unexpected identifier: {token.value}", token)
+        # Nonterminals made up by the generator are named after the rule they are part of
+        name = TableParser.NAMES[id(row)].split(".")[0].rstrip(">") + ">"
+        expected = sorted(token_type.value for token_type in row)
+        if len(expected) <= 3:
+            self.error(f"Expected {' or '.join(expected)} in {name}, got {token.type.value} instead", token)
+        self.error(f"Unexpected {token.type.value} in {name}", token)
+
+    def drive(self, start: str) -> Iterator[AST]:
+        """
+        Parses from a nonterminal until its stack of symbols is empty. The #emit action yields the value on top of the
+        value stack as soon as it has been built; otherwise the single value left once parsing ends is yielded
+
+        :param start: The nonterminal parsed
+        :type start: str
+        :rtype: Iterator[AST()]
+        """
+        stack = [TableParser.ROWS[start]]
+        values = []
+        pop = stack.pop
+        push = stack.extend
+        next_token = self.lexer.get_next_token
+        emit = TableParser.on_emit
+        end = TokenType.EOF
+        token = self.cur_token
+        last = None
+        while stack:
+            symbol = pop()
+            kind = symbol.__class__
+            if kind is dict:
+                entry = symbol.get(token.type)
+                if entry is None:
+                    self.unexpected(symbol, token)
+                push(entry[0])
+                if entry[1]:
+                    last = token
+                    token = next_token()
+            elif kind is FunctionType:
+                if symbol is emit:
+                    self.cur_token = token
+                    yield values.pop()
+                else:
+                    symbol(self, values, last, token)
+            elif symbol is token.type:
+                last = token
+                # Nothing is lexed after the end of the source
+                if symbol is not end:
+                    token = next_token()
+            else:
+                self.error(f"Expected {symbol.value}, got {token.type.value} instead", token)
+        self.cur_token = token
+        if values:
+            yield values.pop()
+
+    def parse(self) -> Compound:
+        """
+        Parses the whole program
+
+        :rtype: Compound()
+        """
+        # The program rule leaves a single value, the Compound of the whole program
+        (node,) = self.drive("<program>")
+        self.lexer.report()
+        return node
+
+    def parse_statements(self) -> Iterator[AST]:
+        """
+        Parses the program one top level statement at a time, yielding each statement as soon as it has been parsed
+        instead of building the Compound of the whole program. Only the statement being parsed is held in memory
+
+        :rtype: Iterator[AST()]
+        """
+        yield from self.drive("<stream>")
+        self.lexer.report()
+
+    # Actions: #name in the grammar calls on_name()
+
+    def on_emit(self, values: list, last: Token, token: Token):
+        """
+        Yields the value on top of the value stack from drive(), which handles it itself
+        """
+
+    def on_mark(self, values: list, last: Token, token: Token):
+        values.append(MARK)
+
+    def on_list(self, values: list, last: Token, token: Token):
+        """
+        Replaces the values pushed since the last #mark with a list of them
+        """
+        index = len(values) - 1
+        while values[index] is not MARK:
+            index -= 1
+        items = values[index + 1:]
+        del values[index:]
+        values.append(items)
+
+    def on_token(self, values: list, last: Token, token: Token):
+        values.append(last)
+
+    def on_none(self, values: list, last: Token, token: Token):
+        values.append(None)
+
+    def on_true(self, values: list, last: Token, token: Token):
+        values.append(True)
+
+    def on_false(self, values: list, last: Token, token: Token):
+        values.append(False)
+
+    def on_here(self, values: list, last: Token, token: Token):
+        """
+        Pushes the offset of the first token of a statement
+        """
+        values.append(token.offset)
+
+    def on_locate(self, values: list, last: Token, token: Token):
+        """
+        Gives a statement the offset pushed by #here before it
+        """
+        node = values.pop()
+        node.offset = values[-1]
+        values[-1] = node
+
+    def on_compound(self, values: list, last: Token, token: Token):
+        node = Compound()
+        node.children = values[-1]
+        values[-1] = node
+
+    def on_noop(self, values: list, last: Token, token: Token):
+        values.append(NoOP())
+
+    def on_variable(self, values: list, last: Token, token: Token):
+        """
+        Pushes the variable just consumed, resolved to its slot if it is a local variable of the subroutine being
+        parsed
+        """
+        node = Variable(last)
+        if self.frame_slots is not None:
+            node.slot = self.frame_slots.get(node.value)
+            node.byref = node.slot in self.byref_slots
+        values.append(node)
+
+    def on_local(self, values: list, last: Token, token: Token):
+        """
+        Pushes a new local variable of the subroutine being parsed, assigning it the next free slot
+        """
+        node = Variable(last)
+        if node.value in self.frame_slots:
+            self.error(f"Duplicate local variable {repr(node.value)}", last)
+        node.slot = self.frame_slots[node.value] = len(self.frame_slots)
+        values.append(node)
+
+    def on_declared(self, values: list, last: Token, token: Token):
+        if self.frame_slots is None:
+            self.on_variable(values, last, token)
+        else:
+            self.on_local(values, last, token)
+
+    def on_declare(self, values: list, last: Token, token: Token):
+        type_node = values.pop()
+        values[-1] = VarDecl(values[-1], type_node)
+
+    def on_type(self, values: list, last: Token, token: Token):
+        values.append(Type(last))
+
+    def on_array_type(self, values: list, last: Token, token: Token):
+        element_type = values.pop()
+        values[-1] = ArrayType(values[-1], element_type)
+
+    def on_pair(self, values: list, last: Token, token: Token):
+        upper = values.pop()
+        values[-1] = (values[-1], upper)
+
+    def on_element(self, values: list, last: Token, token: Token):
+        indices = values.pop()
+        values[-1] = ArrayElement(values[-1], indices)
+
+    def on_assign(self, values: list, last: Token, token: Token):
+        right = values.pop()
+        op = values.pop()
+        values[-1] = Assign(values[-1], op, right)
+
+    def on_next(self, values: list, last: Token, token: Token):
+        """
+        Checks that the variable after NEXT is the one counted by its FOR loop
+        """
+        var_node = values[-5]
+        if last.value != var_node.value:
+            self.error(f"NEXT {last.value} does not match FOR {var_node.value}", last)
+
+    def on_for(self, values: list, last: Token, token: Token):
+        var_node, start, end, step, body = values[-5:]
+        del values[-4:]
+        values[-1] = ForLoop(var_node, start, end, body, step)
+
+    def on_while(self, values: list, last: Token, token: Token):
+        body = values.pop()
+        values[-1] = WhileLoop(values[-1], body)
+
+    def on_repeat(self, values: list, last: Token, token: Token):
+        condition = values.pop()
+        values[-1] = RepeatLoop(values[-1], condition)
+
+    def on_if(self, values: list, last: Token, token: Token):
+        else_body = values.pop()
+        then_body = values.pop()
+        values[-1] = IfStatement(values[-1], then_body, else_body)
+
+    def on_case(self, values: list, last: Token, token: Token):
+        otherwise = values.pop()
+        branches = values.pop()
+        values[-1] = CaseStatement(values[-1], branches, otherwise)
+
+    def on_branch(self, values: list, last: Token, token: Token):
+        body = values.pop()
+        high = values.pop()
+        values[-1] = CaseBranch(values[-1], high, body)
+
+    def on_negative(self, values: list, last: Token, token: Token):
+        """
+        Pushes a negative number CASE label, replacing the "-" before it
+        """
+        values[-1] = Num(Token(last.type, -last.value, values[-1].offset))
+
+    def on_number(self, values: list, last: Token, token: Token):
+        values.append(Num(last))
+
+    def on_string(self, values: list, last: Token, token: Token):
+        values.append(String(last))
+
+    def on_boolean(self, values: list, last: Token, token: Token):
+        values.append(Boolean(last))
+
+    def on_frame(self, values: list, last: Token, token: Token):
+        """
+        Starts the call frame of a subroutine. Subroutines cannot be declared inside other subroutines
+        """
+        if self.frame_slots is not None:
+            self.error("Subroutines cannot be declared inside other subroutines", token)
+        self.frame_slots, self.byref_slots = {}, set()
+
+    def on_param(self, values: list, last: Token, token: Token):
+        type_node = values.pop()
+        var_node = values.pop()
+        byref = values[-1]
+        if byref:
+            self.byref_slots.add(var_node.slot)
+            var_node.byref = True
+        values[-1] = Param(var_node, type_node, byref)
+
+    def on_subroutine(self, values: list, last: Token, token: Token):
+        name, params, return_type, body = values[-4:]
+        del values[-3:]
+        values[-1] = SubroutineDecl(name.value, params, body, return_type, len(self.frame_slots))
+        self.frame_slots, self.byref_slots = None, set()
+
+    def on_call(self, values: list, last: Token, token: Token):
+        args = values.pop()
+        values[-1] = ProcedureCall(values[-1].value, args)
+
+    def on_function(self, values: list, last: Token, token: Token):
+        """
+        Replaces a function's name and arguments with a call to it. EOF(<expr>), which checks whether a file has been
+        read to the end, produces an EndOfFile node
+        """
+        args = values.pop()
+        var_node = values[-1]
+        if var_node.value == "EOF":
+            if len(args) != 1:
+                self.error(f"EOF takes 1 argument, got {len(args)}", var_node)
+            values[-1] = EndOfFile(args[0])
+        else:
+            values[-1] = FunctionCall(var_node.value, args)
+
+    def on_return(self, values: list, last: Token, token: Token):
+        values[-1] = Return(values[-1])
+
+    def on_output(self, values: list, last: Token, token: Token):
+        values[-1] = Output(values[-1])
+
+    def on_input(self, values: list, last: Token, token: Token):
+        values[-1] = Input(values[-1])
+
+    def on_mode(self, values: list, last: Token, token: Token):
+        if last.value not in ("READ", "WRITE", "APPEND"):
+            self.error(f"Expected READ, WRITE or APPEND, got {last.value} instead", last)
+        values.append(last.value)
+
+    def on_openfile(self, values: list, last: Token, token: Token):
+        mode = values.pop()
+        values[-1] = OpenFile(values[-1], mode)
+
+    def on_readfile(self, values: list, last: Token, token: Token):
+        var_node = values.pop()
+        values[-1] = ReadFile(values[-1], var_node)
+
+    def on_writefile(self, values: list, last: Token, token: Token):
+        expr = values.pop()
+        values[-1] = WriteFile(values[-1], expr)
+
+    def on_closefile(self, values: list, last: Token, token: Token):
+        values[-1] = CloseFile(values[-1])
+
+    def on_unary(self, values: list, last: Token, token: Token):
+        expr = values.pop()
+        values[-1] = UnaryOP(values[-1], expr)
+
+    def on_binary(self, values: list, last: Token, token: Token):
+        right = values.pop()
+        op = values.pop()
+        values[-1] = BinOP(left=values[-1], op=op, right=right)
+
+    def on_logical(self, values: list, last: Token, token: Token):
+        right = values.pop()
+        op = values.pop()
+        values[-1] = LogicalOP(left=values[-1], op=op, right=right)
@@ -0,0 +1,412 @@
+from .compiler import ExpressionCompiler
+from .token import TokenType
+from .datatype import DataType
+from .storage import TypedArray
+from .streams import format_value
+from .ast import *
+import logging
+
+# Python types a variable of each static type may hold in compiled code. STRING values built by concatenation are
+# StringBuilders, which compiled code does not handle, so they deoptimise
+GUARD_TYPES = {
+    DataType.INTEGER: (int,),
+    DataType.REAL: (int, float),
+    DataType.BOOLEAN: (bool,),
+    DataType.STRING: (str,),
+    DataType.CHAR: (str,),
+}
+
+class Uncompilable(Exception):
+    """
+    Raised while compiling a loop which uses a statement or expression compiled code does not support
+    """
+
+
+class LoopCompiler(ExpressionCompiler):
+    """
+    Translates a hot WHILE, REPEAT or FOR loop into the source code of an equivalent Python function.
+
+    Every variable the loop uses is loaded into a Python local variable on entry and written back to the global scope or
+    call frame on exit (including when an exception is thrown), so the tree-walking interpreter sees the same state it
+    would have produced itself. Only assignments, IF statements, OUTPUT, file handling, nested loops and arithmetic,
+    comparison, logical and array expressions are supported; loops using anything else (calls, INPUT, concatenation,
+    BYREF parameters, or nested FOR loops whose STEP is not a constant) are left to the interpreter. AND and OR are compiled to Python's
+    `and` and `or`, so they still short-circuit.
+
+    Variables whose static type is unknown are specialised to the type they hold when the loop is compiled. If an
+    assignment in the loop changes that type, a guard at the end of the iteration returns control to the interpreter,
+    which continues the loop from the next iteration
+
+    :param metered: Whether the program's memory is metered, in which case array elements are stored through the
+        memory meter so the STRINGs they hold are counted
+    :type metered: bool
+    """
+    COMPARISONS = {
+        TokenType.EQ: "==",
+        TokenType.EQEQ: "==",
+        TokenType.NOTEQ: "!=",
+        TokenType.LTHAN: "<",
+        TokenType.LTEQ: "<=",
+        TokenType.GTHAN: ">",
+        TokenType.GTEQ: ">=",
+    }
+
+    def __init__(self, metered: bool = False):
+        super().__init__()
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.metered: bool = metered
+        # Each variable used, by name, with its node (for its scope and static type)
+        self.variables: dict[str, Variable] = {}
+        # The static type of each variable, or None if it is unknown or differs between its uses
+        self.static_types: dict[str, DataType | None] = {}
+        self.assigned: set[str] = set()
+        self.arrays: set[str] = set()
+        # Variables without a static type used as operands of arithmetic, which must hold numbers
+        self.numeric: set[str] = set()
+        # Variables assigned values that may not be numbers
+        self.untyped: set[str] = set()
+        self.lines: list[str] = []
+        self.depth: int = 0
+
+    def compile(self, node: "WhileLoop | RepeatLoop | ForLoop", scope: dict, frame: list | None) -> "CompiledLoop | None":
+        """
+        Compiles a loop, specialised to the types of the values its variables currently hold
+
+        :param node: The loop node
+        :type node: WhileLoop() | RepeatLoop() | ForLoop()
+        :param scope: The global scope
+        :type scope: dict
+        :param frame: The current call frame
+        :type frame: list | None
+        :return: The compiled loop, or None if the loop cannot be compiled
+        :rtype: CompiledLoop() | None
+        """
+        try:
+            self.depth = 2
+            if isinstance(node, ForLoop):
+                # The counter is copied from a separate variable, so the loop can resume at the right iteration even if
+                # the body assigns to the counter
+                finished, deoptimised, resume = "None", "counters.start", "counter + counters.step"
+                self.emit("for counter in counters:")
+                self.emit(f"    {self.variable(node.var_node, assigned=True)} = counter")
+            elif isinstance(node, RepeatLoop):
+                finished, deoptimised, resume = "True", "False", "False"
+                self.emit("while True:")
+            else:
+                finished, deoptimised, resume = "True", "False", "False"
+                self.emit(f"while {self.visit(node.condition)}:")
+            self.depth += 1
+            self.visit(node.body)
+            if isinstance(node, RepeatLoop):
+                # Checked before the guards, so the interpreter resumes at the start of the next iteration
+                self.emit(f"if {self.visit(node.condition)}:")
+                self.emit("    break")
+            types = self.specialise(scope, frame)
+            # Only variables without a static type can change type; the type checker guarantees the others
+            guards = [
+                self.guard(name, types[name])
+                for name in sorted(self.assigned)
+                if name in types and self.static_types[name] is None
+            ]
+            if guards:
+                self.emit(f"if not ({' and '.join(guards)}):")
+                self.emit(f"    return {resume}")
+            self.depth -= 1
+            self.emit(f"return {finished}")
+        except Uncompilable as error:
+            self.logger.info(f"Loop not compiled: {error}")
+            return None
+
+        loads, stores = [], []
+        for name, var_node in self.variables.items():
+            if var_node.slot is None:
+                loads.append(f"    v_{name} = scope.get({name!r})")
+                location = f"scope[{name!r}]"
+            else:
+                location = f"frame[{var_node.slot}]"
+                loads.append(f"    v_{name} = {location}")
+            if name in self.assigned:
+                stores.append(f"        {location} = v_{name}")
+        # Arrays must still be arrays, and every other variable must hold a value of the type specialised to
+        entry = [f"isinstance(v_{name}, TypedArray)" for name in sorted(self.arrays)]
+        entry += [self.guard(name, types[name]) for name in types]
+        source = "\n".join(
+            ["def loop(scope, frame, counters=None):"]
+            + loads
+            + ([f"    if not ({' and '.join(entry)}):", f"        return {deoptimised}"] if entry else [])
+            + ["    try:"]
+            + self.lines
+            + ["    finally:"]
+            + (stores or ["        pass"])
+        )
+        return CompiledLoop(
+            node, source, {"format_value": format_value, "TypedArray": TypedArray, "DataType": DataType}
+        )
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.depth + line)
+
+    def variable(self, node: Variable, assigned: bool = False) -> str:
+        """
+        Records a variable used by the loop and returns the name of its Python local variable
+
+        :rtype: str
+        """
+        if node.byref:
+            raise Uncompilable(f"BYREF parameter {node.value!r}")
+        known = self.variables.get(node.value)
+        if known is not None and known.slot != node.slot:
+            raise Uncompilable(f"{node.value!r} refers to more than one variable")
+        self.variables.setdefault(node.value, node)
+        static_type = getattr(node, "type", None)
+        if self.static_types.setdefault(node.value, static_type) != static_type:
+            self.static_types[node.value] = None
+        if assigned:
+            self.assigned.add(node.value)
+        return f"v_{node.value}"
+
+    def specialise(self, scope: dict, frame: list | None) -> dict[str, tuple[type, ...]]:
+        """
+        Returns the Python types each scalar variable used by the loop is specialised to: those allowed by its static
+        type if it has one, or the type of the value it currently holds otherwise
+
+        :param scope: The global scope
+        :type scope: dict
+        :param frame: The current call frame
+        :type frame: list | None
+        :rtype: dict[str, tuple[type, ...]]
+        """
+        types = {}
+        for name, var_node in self.variables.items():
+            if name in self.arrays:
+                continue
+            static_type = self.static_types[name]
+            if static_type is not None:
+                if static_type not in GUARD_TYPES:
+                    raise Uncompilable(f"{name!r} is {static_type.value}")
+                types[name] = GUARD_TYPES[static_type]
+                continue
+            value = scope.get(name) if var_node.slot is None else frame[var_node.slot]
+            if type(value) not in (int, float, bool, str):
+                raise Uncompilable(f"{name!r} holds {type(value).__name__}")
+            if name in self.numeric and (type(value) not in (int, float) or name in self.untyped):
+                raise Uncompilable(f"{name!r} may not hold a number, and is used in arithmetic")
+            types[name] = (type(value),)
+        return types
+
+    @staticmethod
+    def guard(name: str, types: tuple[type, ...]) -> str:
+        if len(types) == 1:
+            return f"type(v_{name}) is {types[0].__name__}"
+        return f"type(v_{name}) in ({', '.join(t.__name__ for t in types)})"
+
+    def generic_visit(self, node: AST):
+        raise Uncompilable(f"{type(node).__name__} is not supported")
+
+    def visit_Compound(self, node: Compound):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOP(self, node: NoOP):
+        pass
+
+    def visit_String(self, node: String) -> str:
+        return repr(node.value)
+
+    def visit_Boolean(self, node: Boolean) -> str:
+        return repr(node.value)
+
+    def visit_Variable(self, node: Variable) -> str:
+        return self.variable(node)
+
+    def visit_ArrayElement(self, node: ArrayElement) -> str:
+        self.arrays.add(node.value)
+        name = self.variable(node.var_node)
+        indices = [self.visit(index) for index in node.indices]
+        if len(indices) == 1:
+            return f"{name}[{indices[0]}]"
+        return f"{name}[({', '.join(indices)},)]"
+
+    def visit_BinOP(self, node: BinOP) -> str:
+        op = self.COMPARISONS.get(node.op.type) or self.OPERATORS.get(node.op.type)
+        if op is None:
+            raise Uncompilable(f"Operator {node.op.value} is not supported")
+        if node.op.type in self.OPERATORS:
+            # Python arithmetic also applies to strings, so operands must be known to be numbers
+            for operand in (node.left, node.right):
+                if getattr(operand, "type", None) is None:
+                    if not isinstance(operand, Variable):
+                        raise Uncompilable(f"Operand of {node.op.value} of unknown type")
+                    self.numeric.add(operand.value)
+        return f"({self.visit(node.left)} {op} {self.visit(node.right)})"
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+
+    def visit_LogicalOP(self, node: LogicalOP) -> str:
+        op = "and" if node.op.type == TokenType.AND else "or"
+        return f"({self.visit(node.left)} {op} {self.visit(node.right)})"
+
+    def visit_UnaryOP(self, node: UnaryOP) -> str:
+        if node.op.type == TokenType.NOT:
+            return f"(not {self.visit(node.expr)})"
+        return super().visit_UnaryOP(node)
+
+    def element_store(self, node: ArrayElement, value: str) -> str:
+        """
+        Returns the statement storing a value in an array element, through the memory meter's store if it is metered
+
+        :param node: The array element node
+        :type node: ArrayElement()
+        :param value: The expression of the value
+        :type value: str
+        :rtype: str
+        """
+        if not self.metered:
+            return f"{self.visit(node)} = {value}"
+        self.arrays.add(node.value)
+        indices = [self.visit(index) for index in node.indices]
+        index = indices[0] if len(indices) == 1 else f"({', '.join(indices)},)"
+        return f"store({self.variable(node.var_node)}, {index}, {value})"
+
+    def visit_Assign(self, node: Assign):
+        value = self.visit(node.right)
+        if isinstance(node.left, ArrayElement):
+            self.emit(self.element_store(node.left, value))
+        else:
+            # Arithmetic only produces numbers, as its operands must be numbers
+            right = node.right
+            if getattr(right, "type", None) not in (DataType.INTEGER, DataType.REAL) and not (
+                isinstance(right, BinOP) and right.op.type in self.OPERATORS
+            ):
+                self.untyped.add(node.left.value)
+            self.emit(f"{self.variable(node.left, assigned=True)} = {value}")
+
+    def visit_IfStatement(self, node: IfStatement):
+        self.emit(f"if {self.visit(node.condition)}:")
+        self.block(node.then_body)
+        if node.else_body is not None:
+            self.emit("else:")
+            self.block(node.else_body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        self.emit(f"while {self.visit(node.condition)}:")
+        self.block(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.emit("while True:")
+        self.depth += 1
+        self.visit(node.body)
+        self.emit(f"if {self.visit(node.condition)}:")
+        self.emit("    break")
+        self.depth -= 1
+
+    def visit_ForLoop(self, node: ForLoop):
+        counter = self.variable(node.var_node, assigned=True)
+        start, end = self.visit(node.start), self.visit(node.end)
+        if node.step is None:
+            self.emit(f"for {counter} in range({start}, {end} + 1):")
+        else:
+            step = self.constant_step(node.step)
+            self.emit(f"for {counter} in range({start}, {end} {'+' if step > 0 else '-'} 1, {step}):")
+        self.block(node.body)
+
+    @staticmethod
+    def constant_step(node: AST) -> int:
+        """
+        Returns the value of the STEP of a nested FOR loop, which must be a non-zero constant for the direction of the
+        loop to be known when it is compiled
+
+        :param node: The STEP expression
+        :type node: AST()
+        :rtype: int
+        """
+        sign = 1
+        if isinstance(node, UnaryOP) and node.op.type in (TokenType.PLUS, TokenType.MINUS):
+            sign = -1 if node.op.type == TokenType.MINUS else 1
+            node = node.expr
+        if not isinstance(node, Num) or node.value == 0:
+            raise Uncompilable("FOR loop STEP is not a non-zero constant")
+        return sign * node.value
+
+    def visit_Output(self, node: Output):
+        values = ", ".join(f"format_value({self.visit(expr)})" for expr in node.exprs)
+        self.emit(f'write("".join(({values},)) + "\\n")')
+
+    def visit_OpenFile(self, node: OpenFile):
+        self.emit(f"files.open({self.visit(node.filename)}, {node.mode!r})")
+
+    def visit_ReadFile(self, node: ReadFile):
+        var_node = node.var_node
+        data_type = f"DataType.{var_node.type.name}" if var_node.type is not None else "None"
+        value = f"files.read_value({self.visit(node.filename)}, {data_type})"
+        if isinstance(var_node, ArrayElement):
+            self.emit(self.element_store(var_node, value))
+        else:
+            if var_node.type not in (DataType.INTEGER, DataType.REAL):
+                self.untyped.add(var_node.value)
+            self.emit(f"{self.variable(var_node, assigned=True)} = {value}")
+
+    def visit_WriteFile(self, node: WriteFile):
+        self.emit(f"files.write_line({self.visit(node.filename)}, format_value({self.visit(node.expr)}))")
+
+    def visit_CloseFile(self, node: CloseFile):
+        self.emit(f"files.close({self.visit(node.filename)})")
+
+    def visit_EndOfFile(self, node: EndOfFile) -> str:
+        return f"files.eof({self.visit(node.filename)})"
+
+    def block(self, node: Compound):
+        """
+        Emits the statements of a nested block, indented one level further
+
+        :param node: The block
+        :type node: Compound()
+        """
+        self.depth += 1
+        start = len(self.lines)
+        self.visit(node)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.depth -= 1
+
+
+class CompiledLoop(object):
+    """
+    A loop compiled into a Python function by the LoopCompiler
+
+    :param node: The loop node compiled
+    :type node: WhileLoop() | RepeatLoop() | ForLoop()
+    :param source: Source code of the Python function
+    :type source: str
+    :param namespace: Globals of the Python function
+    :type namespace: dict
+    """
+    def __init__(self, node: "WhileLoop | RepeatLoop | ForLoop", source: str, namespace: dict):
+        self.node: WhileLoop | RepeatLoop | ForLoop = node
+        self.source: str = source
+        self.namespace: dict = namespace
+        self.code = compile(source, f"<loop {type(node).__name__} {id(node):#x}>", "exec")
+        self.deoptimisations: int = 0
+
+    def bind(self, write, files: "FileTable", memory: "MemoryMeter | None" = None) -> "function":
+        """
+        Creates the loop's function, writing OUTPUT with the function passed
+
+        :param write: Writes a string to the output sink
+        :type write: function
+        :param files: The files opened by the program
+        :type files: FileTable()
+        :param memory: The memory meter array elements are stored through, if the loop was compiled to be metered
+        :type memory: MemoryMeter() | None
+        :return: A function taking the global scope and call frame, and for FOR loops the range of values of the counter
+            left to run. FOR loops return the value of the counter the interpreter must resume from, or None once
+            finished; WHILE and REPEAT loops return True once finished, or False if the interpreter must resume the loop
+        :rtype: function
+        """
+        namespace = dict(self.namespace, write=write, files=files)
+        if memory is not None:
+            namespace["store"] = memory.store
+        exec(self.code, namespace)
+        return namespace["loop"]
@@ -9,34 +9,66 @@ class TokenType(enum.Enum):
     INTEGER = "INTEGER"
     IDENTIFIER = "IDENTIFIER"
     STRING = "STRING"
+    REAL = "REAL"
     BOOL = "BOOL"
+    DATATYPE = "DATATYPE"
     SEMI = ";"
     DOT = "."
+    COLON = ":"
+    COMMA = ","
 
     # Reserved Keywords
+    DECLARE = "DECLARE"
+    ARRAY = "ARRAY"
+    OF = "OF"
     INPUT = "INPUT"
     OUTPUT = "OUTPUT"
+    OPENFILE = "OPENFILE"
+    READFILE = "READFILE"
+    WRITEFILE = "WRITEFILE"
+    CLOSEFILE = "CLOSEFILE"
     IF = "IF"
     THEN = "THEN"
+    ELSE = "ELSE"
     ENDIF = "ENDIF"
+    CASE = "CASE"
+    OTHERWISE = "OTHERWISE"
+    ENDCASE = "ENDCASE"
     WHILE = "WHILE"
     DO = "DO"
     ENDWHILE = "ENDWHILE"
+    REPEAT = "REPEAT"
+    UNTIL = "UNTIL"
     LET = "LET"
     FOR = "FOR"
     TO = "TO"
+    STEP = "STEP"
     NEXT = "NEXT"
     TRUE = "TRUE"
     FALSE = "FALSE"
     START = "START"
     END = "END"
+    PROCEDURE = "PROCEDURE"
+    ENDPROCEDURE = "ENDPROCEDURE"
+    FUNCTION = "FUNCTION"
+    ENDFUNCTION = "ENDFUNCTION"
+    RETURNS = "RETURNS"
+    RETURN = "RETURN"
+    CALL = "CALL"
+    BYVAL = "BYVAL"
+    BYREF = "BYREF"
+    AND = "AND"
+    OR = "OR"
+    NOT = "NOT"
 
     # Operators
     EQ = "EQ"
+    ASSIGN = "ASSIGN"
     PLUS = "PLUS"
     MINUS = "MINUS"
     MUL = "MUL"
     DIV = "DIV"
+    CONCAT = "CONCAT"
     EQEQ = "EQEQ"
     NOTEQ = "NOTEQ"
     GTEQ = "GTEQ"
@@ -45,6 +77,8 @@ class TokenType(enum.Enum):
     LTHAN = "LTHAN"
     LPAREN = "LPAREN"
     RPAREN = "RPAREN"
+    LBRACKET = "LBRACKET"
+    RBRACKET = "RBRACKET"
 
     @classmethod
     def get_values(cls, target: str, _default:  str = ""):
@@ -87,10 +121,16 @@ class Token(object):
     :type token_type: TokenType()
     :param token_value: The value associated with the token
     :type token_value: any
+    :param offset: The offset of the token's first character in the source code (None for tokens not lexed from it).
+        The number of characters the token spans is found from it by Lexer.span() when needed
+    :type offset: int | None
     """
-    def __init__(self, token_type: TokenType, token_value: any):        
+    __slots__ = ("type", "value", "offset")
+
+    def __init__(self, token_type: TokenType, token_value: any, offset: int | None = None):
         self.type: TokenType = token_type
         self.value: any = token_value
+        self.offset: int | None = offset
     
     def __str__(self):
         """
@@ -102,3 +142,56 @@ class Token(object):
     
     def __repr__(self):
         return self.__str__()
+
+
+# Maps the source text of every reserved keyword to the token type it is lexed as. Data type names (eg. INTEGER, REAL)
+# are all lexed as TokenType.DATATYPE, with the name of the data type kept as the token's value
+RESERVED_KEYWORDS: dict[str, TokenType] = {
+    "DECLARE": TokenType.DECLARE,
+    "ARRAY": TokenType.ARRAY,
+    "OF": TokenType.OF,
+    "INPUT": TokenType.INPUT,
+    "OUTPUT": TokenType.OUTPUT,
+    "OPENFILE": TokenType.OPENFILE,
+    "READFILE": TokenType.READFILE,
+    "WRITEFILE": TokenType.WRITEFILE,
+    "CLOSEFILE": TokenType.CLOSEFILE,
+    "IF": TokenType.IF,
+    "THEN": TokenType.THEN,
+    "ELSE": TokenType.ELSE,
+    "ENDIF": TokenType.ENDIF,
+    "CASE": TokenType.CASE,
+    "OTHERWISE": TokenType.OTHERWISE,
+    "ENDCASE": TokenType.ENDCASE,
+    "WHILE": TokenType.WHILE,
+    "DO": TokenType.DO,
+    "ENDWHILE": TokenType.ENDWHILE,
+    "REPEAT": TokenType.REPEAT,
+    "UNTIL": TokenType.UNTIL,
+    "LET": TokenType.LET,
+    "FOR": TokenType.FOR,
+    "TO": TokenType.TO,
+    "STEP": TokenType.STEP,
+    "NEXT": TokenType.NEXT,
+    "TRUE": TokenType.TRUE,
+    "FALSE": TokenType.FALSE,
+    "START": TokenType.START,
+    "END": TokenType.END,
+    "PROCEDURE": TokenType.PROCEDURE,
+    "ENDPROCEDURE": TokenType.ENDPROCEDURE,
+    "FUNCTION": TokenType.FUNCTION,
+    "ENDFUNCTION": TokenType.ENDFUNCTION,
+    "RETURNS": TokenType.RETURNS,
+    "RETURN": TokenType.RETURN,
+    "CALL": TokenType.CALL,
+    "BYVAL": TokenType.BYVAL,
+    "BYREF": TokenType.BYREF,
+    "AND": TokenType.AND,
+    "OR": TokenType.OR,
+    "NOT": TokenType.NOT,
+    "INTEGER": TokenType.DATATYPE,
+    "REAL": TokenType.DATATYPE,
+    "STRING": TokenType.DATATYPE,
+    "BOOLEAN": TokenType.DATATYPE,
+    "CHAR": TokenType.DATATYPE,
+}
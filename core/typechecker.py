@@ -0,0 +1,612 @@
+from .exception import ExceptionHandler
+from .nodevisitor import NodeVisitor
+from .token import TokenType
+from .datatype import DataType
+from .builtins import BUILTINS
+from .positions import LineIndex
+from .metrics import NODES_PARSED
+from .jumptable import JumpTable
+from .ast import *
+import logging
+
+class TypeChecker(NodeVisitor):
+    """
+    Static type inference and checking pass, run over the AST before it is executed.
+
+    Every expression node visited is annotated with its static data type through a `type` attribute (None when the type
+    cannot be known before runtime). Binary operations whose operand types are known are replaced with specialised
+    IntBinOP/RealBinOP/CompareOP nodes, which the interpreter can evaluate without re-dispatching on the operator.
+
+    Variables declared with DECLARE keep their declared type (the element type for arrays), and assigning an
+    incompatible value to them is reported as an error. Variables that are only ever assigned to take on the type of the
+    first value assigned, falling back to an unknown type if later assignments disagree. As a loop (or a subroutine)
+    can use a variable before an assignment that changes its type, the program is checked again whenever a variable's
+    type changed, with that variable's type unknown from the start, until no type changes.
+
+    Subroutines are collected from the top level of the program before anything is checked, so they can be called
+    before they are declared. Calls to them are checked against their parameters and resolved to their declaration.
+    """
+    COMPARISON_OPERATORS = (
+        TokenType.EQ,
+        TokenType.EQEQ,
+        TokenType.NOTEQ,
+        TokenType.LTHAN,
+        TokenType.LTEQ,
+        TokenType.GTHAN,
+        TokenType.GTEQ,
+    )
+
+    def __init__(self, line_index: LineIndex | None = None):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.ExceptionHandler: ExceptionHandler = ExceptionHandler(__name__)
+        self.line_index: LineIndex | None = line_index
+        # The innermost statement being checked, whose position is reported with errors
+        self.statement: AST | None = None
+        self.globals: SymbolTable = SymbolTable()
+        self.locals: SymbolTable | None = None
+        self.subroutines: dict[str, SubroutineDecl] = {}
+        self.subroutine: SubroutineDecl | None = None
+        # Variables whose type changed, as (subroutine name or None for globals, variable name), and those whose type
+        # changed in the current check
+        self.unstable: set[tuple[str | None, str]] = set()
+        self.changed: set[tuple[str | None, str]] = set()
+        # Nodes visited since they were last added to the metrics
+        self.nodes: int = 0
+
+    def check(self, tree: AST) -> AST:
+        """
+        Type checks the AST passed and returns it with its expressions annotated and specialised
+
+        :param tree: Root node of the AST
+        :type tree: AST()
+        :return: The checked AST
+        :rtype: AST()
+        """
+        for child in getattr(tree, "children", []):
+            if isinstance(child, SubroutineDecl):
+                self.statement = child
+                self.declare(child)
+        self.statement = None
+        self.stabilise(tree)
+        return tree
+
+    def check_statement(self, node: AST) -> AST:
+        """
+        Type checks a single top level statement of a program checked one statement at a time. Symbols are kept from
+        the statements checked before, but subroutines can only be called once they have been declared
+
+        :param node: The statement
+        :type node: AST()
+        :return: The checked statement
+        :rtype: AST()
+        """
+        self.statement = node
+        if isinstance(node, SubroutineDecl):
+            self.declare(node)
+        self.stabilise(node)
+        return node
+
+    def stabilise(self, node: AST):
+        """
+        Checks a program or statement, and checks it again from the symbols known before it while the type of a
+        variable changed, with the variables whose type changed unknown from the start. Uses of a variable checked before
+        its type changed are then no longer specialised to the type it held at first
+
+        :param node: The program or statement
+        :type node: AST()
+        """
+        symbols = self.globals.copy()
+        while True:
+            self.changed = set()
+            self.nodes = 0
+            self.visit(node)
+            if not self.changed:
+                break
+            self.unstable |= self.changed
+            self.globals = symbols.copy()
+            self.unsettle(self.globals, None)
+        NODES_PARSED.inc(self.nodes)
+        self.nodes = 0
+
+    def unsettle(self, table: "SymbolTable", subroutine: str | None):
+        """
+        Makes the type of the variables of a scope whose type changes unknown
+
+        :param table: The symbol table of the scope
+        :type table: SymbolTable()
+        :param subroutine: The name of the subroutine the scope belongs to, or None for the global scope
+        :type subroutine: str | None
+        """
+        for scope, name in self.unstable:
+            if scope == subroutine and name not in table.declared:
+                table.symbols[name] = None
+
+    def forget(self, var_node: Variable, table: "SymbolTable"):
+        """
+        Makes the type of a variable unknown, recording it as changed if it was known
+
+        :param var_node: The variable
+        :type var_node: Variable()
+        :param table: The symbol table of the variable's scope
+        :type table: SymbolTable()
+        """
+        if table.symbols.get(var_node.value) is not None:
+            scope = self.subroutine.name if var_node.slot is not None else None
+            self.changed.add((scope, var_node.value))
+        table.symbols[var_node.value] = None
+
+    def visit(self, node: AST) -> any:
+        self.nodes += 1
+        return super().visit(node)
+
+    def declare(self, node: SubroutineDecl):
+        if node.name in self.subroutines or node.name in BUILTINS:
+            self.error(f"Duplicate declaration of subroutine {repr(node.name)}")
+        self.subroutines[node.name] = node
+
+    def error(self, message: str):
+        """
+        Throws a type error, at the position of the statement being checked if the line index of the source is known
+
+        :param message: The error message
+        :type message: str
+        """
+        if self.line_index is not None and self.statement is not None and self.statement.offset is not None:
+            message = f"{message} at {self.line_index.describe(self.statement.offset)}"
+        self.ExceptionHandler.raise_exception(message)
+
+    def scope(self, var_node: Variable) -> "SymbolTable":
+        """
+        Returns the symbol table a variable belongs to: the subroutine's if it was resolved to a frame slot, and the
+        global one otherwise
+
+        :rtype: SymbolTable()
+        """
+        return self.locals if var_node.slot is not None else self.globals
+
+    def expression(self, node: AST) -> AST:
+        """
+        Type checks an expression and returns the node that should replace it in its parent
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        self.visit(node)
+        return self.specialise(node)
+
+    def specialise(self, node: AST) -> AST:
+        """
+        Replaces a generic BinOP with its type specialised equivalent if the types of both operands are known. Only
+        comparisons of numbers or of BOOLEANs are specialised, as strings may still be being built by concatenation.
+        A node specialised when the program was checked before is specialised again, or made generic
+
+        :param node: An expression node that has already been type checked
+        :type node: AST()
+        :rtype: AST()
+        """
+        if type(node) in (IntBinOP, RealBinOP, CompareOP):
+            generic = BinOP(node.left, node.op, node.right)
+            generic.type, node = node.type, generic
+        elif type(node) is not BinOP:
+            return node
+        if node.op.type in self.COMPARISON_OPERATORS:
+            operand_types = node.left.type, node.right.type
+            if None in operand_types or not (
+                all(operand_type.is_numeric for operand_type in operand_types)
+                or operand_types == (DataType.BOOLEAN, DataType.BOOLEAN)
+            ):
+                return node
+            specialised = CompareOP(node.left, node.op, node.right)
+        elif node.type not in (DataType.INTEGER, DataType.REAL):
+            return node
+        elif node.type == DataType.INTEGER:
+            specialised = IntBinOP(node.left, node.op, node.right)
+        else:
+            specialised = RealBinOP(node.left, node.op, node.right)
+        specialised.type = node.type
+        return specialised
+
+    def visit_Compound(self, node: Compound):
+        statement = self.statement
+        for child in node.children:
+            self.statement = child
+            self.visit(child)
+        self.statement = statement
+
+    def visit_NoOP(self, node: NoOP):
+        pass
+
+    def visit_VarDecl(self, node: VarDecl):
+        var_name = node.var_node.value
+        table = self.scope(node.var_node)
+        if var_name in table.declared:
+            self.error(f"Duplicate declaration of variable {repr(var_name)}")
+        table.declared.add(var_name)
+
+        if isinstance(node.type_node, ArrayType):
+            type_node = node.type_node
+            type_node.bounds = [
+                (self.integer_expression(lower), self.integer_expression(upper)) for lower, upper in type_node.bounds
+            ]
+            table.arrays[var_name] = len(type_node.bounds)
+            table.symbols[var_name] = DataType(type_node.element_type.value)
+        else:
+            table.symbols[var_name] = DataType(node.type_node.value)
+
+    def integer_expression(self, node: AST) -> AST:
+        """
+        Type checks an expression that must evaluate to an INTEGER, such as an array bound or index
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        node = self.expression(node)
+        if node.type is not None and node.type != DataType.INTEGER:
+            self.error(f"Expected an INTEGER expression, got {node.type.value} instead")
+        return node
+
+    def visit_Assign(self, node: Assign):
+        var_name = node.left.value
+        node.right = self.expression(node.right)
+        value_type = node.right.type
+
+        if isinstance(node.left, ArrayElement):
+            self.visit(node.left)
+            element_type = node.left.type
+            if value_type is not None and not element_type.accepts(value_type):
+                self.error(
+                    f"Cannot assign {value_type.value} value to element of array {repr(var_name)} of type "
+                    f"{element_type.value}"
+                )
+            return
+        table = self.scope(node.left)
+        if var_name in table.arrays:
+            self.error(f"Cannot assign a value to array {repr(var_name)} without an index")
+
+        if var_name in table.declared:
+            var_type = table.symbols[var_name]
+            if value_type is not None and not var_type.accepts(value_type):
+                self.error(
+                    f"Cannot assign {value_type.value} value to variable {repr(var_name)} of type {var_type.value}"
+                )
+        elif var_name not in table.symbols:
+            table.symbols[var_name] = value_type
+        elif table.symbols[var_name] != value_type:
+            self.forget(node.left, table)
+        node.left.type = table.symbols[var_name]
+
+    def visit_ForLoop(self, node: ForLoop):
+        var_name = node.var_node.value
+        table = self.scope(node.var_node)
+        if var_name in table.arrays or table.symbols.get(var_name, DataType.INTEGER) not in (DataType.INTEGER, None):
+            self.error(f"FOR loop counter {repr(var_name)} must be an INTEGER")
+        if var_name not in table.symbols:
+            table.symbols[var_name] = DataType.INTEGER
+        node.var_node.type = table.symbols[var_name]
+        node.start = self.integer_expression(node.start)
+        node.end = self.integer_expression(node.end)
+        if node.step is not None:
+            node.step = self.integer_expression(node.step)
+        self.visit(node.body)
+
+    def visit_WhileLoop(self, node: WhileLoop):
+        node.condition = self.condition(node.condition)
+        self.visit(node.body)
+
+    def visit_RepeatLoop(self, node: RepeatLoop):
+        self.visit(node.body)
+        node.condition = self.condition(node.condition)
+
+    def visit_IfStatement(self, node: IfStatement):
+        node.condition = self.condition(node.condition)
+        self.visit(node.then_body)
+        if node.else_body is not None:
+            self.visit(node.else_body)
+
+    def condition(self, node: AST) -> AST:
+        """
+        Type checks an expression that must evaluate to a BOOLEAN, such as the condition of an IF statement
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        node = self.expression(node)
+        if node.type is not None and node.type != DataType.BOOLEAN:
+            self.error(f"Expected a BOOLEAN condition, got {node.type.value} instead")
+        return node
+
+    def visit_CaseStatement(self, node: CaseStatement):
+        node.expr = self.expression(node.expr)
+        labels = [label for branch in node.branches for label in (branch.low, branch.high) if label is not None]
+        for label in labels:
+            self.visit(label)
+        if not self.comparable(node.expr.type, *[label.type for label in labels]):
+            types = " and ".join(sorted({label.type.value for label in labels}))
+            if node.expr.type is None:
+                self.error(f"CASE labels of type {types} cannot be compared with each other")
+            self.error(f"Cannot compare {node.expr.type.value} value with CASE labels of type {types}")
+        for branch in node.branches:
+            if branch.high is not None and branch.low.type == DataType.BOOLEAN:
+                self.error("A range of BOOLEAN values cannot be a CASE label")
+            self.visit(branch.body)
+        if node.otherwise is not None:
+            self.visit(node.otherwise)
+        node.table = JumpTable(
+            [(branch.low.value, branch.high.value if branch.high is not None else None) for branch in node.branches]
+        )
+
+    @staticmethod
+    def comparable(*types: DataType | None) -> bool:
+        """
+        Checks if values of the types passed can be compared with each other: numbers with numbers, and STRING and CHAR
+        values with each other. Unknown types are compatible with anything
+
+        :rtype: bool
+        """
+        known = {data_type for data_type in types if data_type is not None}
+        return (
+            len(known) <= 1
+            or all(data_type.is_numeric for data_type in known)
+            or known == {DataType.STRING, DataType.CHAR}
+        )
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl):
+        if self.subroutines.get(node.name) is not node:
+            self.error(
+                f"Subroutine {repr(node.name)} must be declared at the top level of the program"
+            )
+        self.locals = SymbolTable()
+        self.subroutine = node
+        self.unsettle(self.locals, node.name)
+        for param in node.params:
+            self.locals.declared.add(param.var_node.value)
+            self.locals.symbols[param.var_node.value] = param.var_node.type = DataType(param.type_node.value)
+        self.visit(node.body)
+        self.locals, self.subroutine = None, None
+
+    def visit_Return(self, node: Return):
+        if self.subroutine is None or self.subroutine.return_type is None:
+            self.error("RETURN can only be used inside a FUNCTION")
+        node.expr = self.expression(node.expr)
+        return_type = DataType(self.subroutine.return_type.value)
+        if node.expr.type is not None and not return_type.accepts(node.expr.type):
+            self.error(
+                f"FUNCTION {self.subroutine.name} returns {return_type.value}, got {node.expr.type.value} instead"
+            )
+
+    def visit_ProcedureCall(self, node: ProcedureCall):
+        subroutine = self.subroutines.get(node.name)
+        if subroutine is None or subroutine.return_type is not None:
+            self.error(f"Unknown procedure {repr(node.name)}")
+        self.check_call(node, subroutine)
+
+    def check_call(self, node: FunctionCall | ProcedureCall, subroutine: SubroutineDecl):
+        """
+        Type checks the arguments of a call to a user defined subroutine, and resolves the call to its declaration
+
+        :param node: The call node
+        :type node: FunctionCall() | ProcedureCall()
+        :param subroutine: The subroutine being called
+        :type subroutine: SubroutineDecl()
+        """
+        if len(node.args) != len(subroutine.params):
+            self.error(
+                f"{subroutine.name} takes {len(subroutine.params)} argument(s), got {len(node.args)}"
+            )
+
+        args = []
+        for param, arg in zip(subroutine.params, node.args):
+            param_type = param.var_node.type
+            if param.byref:
+                if not isinstance(arg, (Variable, ArrayElement)):
+                    self.error(
+                        f"BYREF parameter {repr(param.var_node.value)} of {subroutine.name} must be passed a variable"
+                    )
+                self.visit(arg)
+                if arg.type is not None and arg.type != param_type:
+                    self.error(
+                        f"BYREF parameter {repr(param.var_node.value)} of {subroutine.name} is {param_type.value}, "
+                        f"got {arg.type.value} instead"
+                    )
+            else:
+                arg = self.expression(arg)
+                if arg.type is not None and not param_type.accepts(arg.type):
+                    self.error(
+                        f"Parameter {repr(param.var_node.value)} of {subroutine.name} is {param_type.value}, "
+                        f"got {arg.type.value} instead"
+                    )
+            args.append(arg)
+        node.args = args
+        node.subroutine = subroutine
+
+    def visit_Output(self, node: Output):
+        node.exprs = [self.expression(expr) for expr in node.exprs]
+
+    def visit_Input(self, node: Input):
+        self.input_target(node.var_node, "INPUT")
+
+    def input_target(self, var_node: Variable | ArrayElement, statement: str):
+        """
+        Type checks the variable or array element a line of text is read into, by INPUT or READFILE
+
+        :param var_node: The variable or array element
+        :type var_node: Variable() | ArrayElement()
+        :param statement: The statement reading the line, for error messages
+        :type statement: str
+        """
+        if isinstance(var_node, ArrayElement):
+            self.visit(var_node)
+            return
+        table = self.scope(var_node)
+        if var_node.value in table.arrays:
+            self.error(f"Cannot {statement} into array {repr(var_node.value)} without an index")
+        elif var_node.value in table.declared:
+            var_node.type = table.symbols[var_node.value]
+        else:
+            # The type of undeclared input is only known once the input has been read
+            self.forget(var_node, table)
+            var_node.type = None
+
+    def filename(self, node: AST) -> AST:
+        """
+        Type checks the expression naming a file, which must evaluate to a STRING
+
+        :param node: The expression node
+        :type node: AST()
+        :rtype: AST()
+        """
+        node = self.expression(node)
+        if node.type is not None and node.type not in (DataType.STRING, DataType.CHAR):
+            self.error(f"Expected a STRING file name, got {node.type.value} instead")
+        return node
+
+    def visit_OpenFile(self, node: OpenFile):
+        node.filename = self.filename(node.filename)
+
+    def visit_ReadFile(self, node: ReadFile):
+        node.filename = self.filename(node.filename)
+        self.input_target(node.var_node, "READFILE")
+
+    def visit_WriteFile(self, node: WriteFile):
+        node.filename = self.filename(node.filename)
+        node.expr = self.expression(node.expr)
+
+    def visit_CloseFile(self, node: CloseFile):
+        node.filename = self.filename(node.filename)
+
+    def visit_EndOfFile(self, node: EndOfFile) -> DataType:
+        node.filename = self.filename(node.filename)
+        node.type = DataType.BOOLEAN
+        return node.type
+
+    def visit_Num(self, node: Num) -> DataType:
+        node.type = DataType.of(node.value)
+        return node.type
+
+    def visit_String(self, node: String) -> DataType:
+        node.type = DataType.STRING
+        return node.type
+
+    def visit_Boolean(self, node: Boolean) -> DataType:
+        node.type = DataType.BOOLEAN
+        return node.type
+
+    def visit_FunctionCall(self, node: FunctionCall) -> DataType | None:
+        subroutine = self.subroutines.get(node.name)
+        if subroutine is not None:
+            if subroutine.return_type is None:
+                self.error(f"Procedure {repr(node.name)} cannot be used in an expression")
+            self.check_call(node, subroutine)
+            node.type = DataType(subroutine.return_type.value)
+            return node.type
+
+        builtin = BUILTINS.get(node.name)
+        if builtin is None:
+            self.error(f"Unknown function {repr(node.name)}")
+        if len(node.args) != len(builtin.params):
+            self.error(
+                f"{node.name} takes {len(builtin.params)} argument(s), got {len(node.args)}"
+            )
+
+        node.args = [self.expression(arg) for arg in node.args]
+        for arg, accepted in zip(node.args, builtin.params):
+            if arg.type is not None and arg.type not in accepted:
+                self.error(f"{node.name} cannot be called with a {arg.type.value} argument")
+        node.type = builtin.return_type if builtin.return_type is not None else node.args[0].type
+        return node.type
+
+    def visit_Variable(self, node: Variable) -> DataType | None:
+        table = self.scope(node)
+        if node.value in table.arrays:
+            self.error(f"Array {repr(node.value)} used without an index")
+        node.type = table.symbols.get(node.value)
+        return node.type
+
+    def visit_ArrayElement(self, node: ArrayElement) -> DataType:
+        var_name = node.value
+        table = self.scope(node.var_node)
+        if var_name not in table.arrays:
+            self.error(f"{repr(var_name)} is not a declared array")
+        if len(node.indices) != table.arrays[var_name]:
+            self.error(
+                f"Array {repr(var_name)} has {table.arrays[var_name]} dimension(s), got {len(node.indices)} indices"
+            )
+        node.indices = [self.integer_expression(index) for index in node.indices]
+        node.type = table.symbols[var_name]
+        return node.type
+
+    def visit_UnaryOP(self, node: UnaryOP) -> DataType | None:
+        if node.op.type == TokenType.NOT:
+            node.expr = self.condition(node.expr)
+            node.type = DataType.BOOLEAN
+            return node.type
+        node.expr = self.expression(node.expr)
+        operand_type = node.expr.type
+        if operand_type is not None and not operand_type.is_numeric:
+            self.error(f"Unary {node.op.value} cannot be applied to {operand_type.value}")
+        node.type = operand_type
+        return node.type
+
+    def visit_LogicalOP(self, node: LogicalOP) -> DataType:
+        node.left = self.condition(node.left)
+        node.right = self.condition(node.right)
+        node.type = DataType.BOOLEAN
+        return node.type
+
+    def visit_BinOP(self, node: BinOP) -> DataType | None:
+        node.left = self.expression(node.left)
+        node.right = self.expression(node.right)
+        left_type, right_type = node.left.type, node.right.type
+
+        if node.op.type == TokenType.CONCAT:
+            for operand_type in (left_type, right_type):
+                if operand_type not in (DataType.STRING, DataType.CHAR, None):
+                    self.error(f"Operator & cannot be applied to {operand_type.value}")
+            node.type = DataType.STRING
+            return node.type
+
+        if node.op.type in self.COMPARISON_OPERATORS:
+            if not self.comparable(left_type, right_type):
+                types = " and ".join(operand_type.value for operand_type in (left_type, right_type))
+                self.error(f"Cannot compare {types} with {node.op.value}")
+            node.type = DataType.BOOLEAN
+            return node.type
+
+        for operand_type in (left_type, right_type):
+            if operand_type is not None and not operand_type.is_numeric:
+                self.error(
+                    f"Operator {node.op.value} cannot be applied to {operand_type.value}"
+                )
+
+        if left_type is None or right_type is None:
+            node.type = None
+        elif node.op.type == TokenType.DIV:
+            node.type = DataType.REAL
+        elif left_type == DataType.INTEGER and right_type == DataType.INTEGER:
+            node.type = DataType.INTEGER
+        else:
+            node.type = DataType.REAL
+        return node.type
+
+    # Checked again once the program has been specialised, if a variable's type changed
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
+    visit_CompareOP = visit_BinOP
+
+
+class SymbolTable(object):
+    """
+    The data types of the variables of a single scope (the program's globals, or the locals of a subroutine)
+    """
+    def __init__(self):
+        self.symbols: dict[str, DataType | None] = {}
+        self.declared: set[str] = set()
+        self.arrays: dict[str, int] = {}
+
+    def copy(self) -> "SymbolTable":
+        table = SymbolTable()
+        table.symbols, table.declared, table.arrays = dict(self.symbols), set(self.declared), dict(self.arrays)
+        return table
@@ -0,0 +1,247 @@
+from .nodevisitor import NodeVisitor
+from .token import TokenType
+from .datatype import DataType
+from .optional import optional_import
+from .ast import *
+import logging
+
+# Python types a scalar variable of each static type must hold at runtime for a loop to be vectorized: NumPy computes in
+# the static types, so a REAL held by a variable typed INTEGER would be truncated where the loop would fail
+SCALAR_TYPES = {
+    DataType.INTEGER: (int,),
+    DataType.REAL: (int, float),
+}
+
+class LoopVectorizer(NodeVisitor):
+    """
+    Optimisation pass which rewrites FOR loops performing only element-wise arithmetic on arrays into VectorizedFor
+    nodes, executed as whole-array NumPy operations instead of one iteration at a time.
+
+    A loop is only vectorized if every statement in its body assigns to an element of an array at exactly the loop
+    counter (eg. C[i] <- A[i] * B[i] + 1), and every array read is also indexed by exactly the loop counter. As each
+    iteration then only touches its own element, there are no loop-carried dependencies and running each statement
+    over the whole range in turn gives the same result as the loop. Any other statement (including I/O and nested
+    loops) prevents vectorization. Must be run after the TypeChecker, as it relies on the static types it annotates.
+    """
+    OPERATORS = (TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV)
+
+    def __init__(self):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Whether NumPy is installed, which is required to execute vectorized loops. NumPy is only imported once a loop
+        which can be vectorized is found
+
+        :rtype: bool
+        """
+        return optional_import("numpy") is not None
+
+    def optimise(self, tree: AST) -> AST:
+        """
+        Vectorizes every eligible FOR loop in the AST passed
+
+        :param tree: Root node of a type checked AST
+        :type tree: AST()
+        :return: The optimised AST
+        :rtype: AST()
+        """
+        return self.visit(tree)
+
+    def generic_visit(self, node: AST) -> AST:
+        return node
+
+    def visit_Compound(self, node: Compound) -> Compound:
+        node.children = [self.visit(child) for child in node.children]
+        return node
+
+    def visit_IfStatement(self, node: IfStatement) -> IfStatement:
+        node.then_body = self.visit(node.then_body)
+        if node.else_body is not None:
+            node.else_body = self.visit(node.else_body)
+        return node
+
+    def visit_CaseStatement(self, node: CaseStatement) -> CaseStatement:
+        for branch in node.branches:
+            branch.body = self.visit(branch.body)
+        if node.otherwise is not None:
+            node.otherwise = self.visit(node.otherwise)
+        return node
+
+    def visit_WhileLoop(self, node: WhileLoop) -> WhileLoop:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_RepeatLoop(self, node: RepeatLoop) -> RepeatLoop:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_SubroutineDecl(self, node: SubroutineDecl) -> SubroutineDecl:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_ForLoop(self, node: ForLoop) -> AST:
+        node.body = self.visit(node.body)
+        counter = node.var_node.value
+        # Vectorized loops read and write variables in the global scope only, over a range with a step of 1
+        if node.var_node.slot is not None or node.step is not None:
+            return node
+        statements = []
+        arrays, scalars = set(), {}
+
+        for child in node.body.children:
+            if isinstance(child, NoOP):
+                continue
+            if not (isinstance(child, Assign) and self.is_counter_element(child.left, counter)):
+                return node
+            element_type = child.left.type
+            if child.right.type is None or not element_type.is_numeric or not element_type.accepts(child.right.type):
+                return node
+            if not self.collect(child.right, counter, arrays, scalars):
+                return node
+            arrays.add(child.left.value)
+            statements.append((child.left.value, child.right))
+
+        if not statements or not self.available():
+            return node
+        self.logger.info(f"Vectorized FOR loop over {counter} ({len(statements)} statement(s))")
+        return VectorizedFor(node, statements, arrays, scalars)
+
+    def is_counter_element(self, node: AST, counter: str) -> bool:
+        """
+        Checks if a node is a one dimensional global array element indexed by exactly the loop counter
+
+        :rtype: bool
+        """
+        return (
+            isinstance(node, ArrayElement)
+            and node.var_node.slot is None
+            and len(node.indices) == 1
+            and isinstance(node.indices[0], Variable)
+            and node.indices[0].value == counter
+        )
+
+    def collect(self, node: AST, counter: str, arrays: set[str], scalars: dict[str, DataType]) -> bool:
+        """
+        Checks if an expression can be evaluated element-wise, collecting the names of the arrays and the names and
+        static types of the scalar variables it reads along the way
+
+        :param node: The expression node
+        :type node: AST()
+        :param counter: Name of the loop counter
+        :type counter: str
+        :rtype: bool
+        """
+        if isinstance(node, Num):
+            return True
+        if isinstance(node, Variable):
+            if node.value != counter:
+                scalars[node.value] = node.type
+            return node.slot is None and node.type is not None and node.type.is_numeric
+        if isinstance(node, ArrayElement):
+            arrays.add(node.value)
+            return self.is_counter_element(node, counter)
+        if isinstance(node, UnaryOP):
+            return self.collect(node.expr, counter, arrays, scalars)
+        if isinstance(node, BinOP):
+            return (
+                node.op.type in self.OPERATORS
+                and self.collect(node.left, counter, arrays, scalars)
+                and self.collect(node.right, counter, arrays, scalars)
+            )
+        return False
+
+
+class VectorEvaluator(NodeVisitor):
+    """
+    Evaluates the element-wise expressions of a VectorizedFor node over the whole range of the loop at once
+
+    :param scope: The variables of the program
+    :type scope: dict
+    :param views: NumPy views of each array used, sliced to the loop's range
+    :type views: dict[str, numpy.ndarray]
+    :param counter: Name of the loop counter
+    :type counter: str
+    :param counter_values: Every value taken by the loop counter
+    :type counter_values: numpy.ndarray
+    """
+    INT64_MAX = 2 ** 63 - 1
+
+    def __init__(self, scope: dict, views: dict, counter: str, counter_values: "numpy.ndarray"):
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.scope: dict = scope
+        self.views: dict = views
+        self.counter: str = counter
+        self.counter_values: "numpy.ndarray" = counter_values
+
+    def visit_Num(self, node: Num) -> int | float:
+        return node.value
+
+    def visit_Variable(self, node: Variable) -> "int | float | numpy.ndarray":
+        if node.value == self.counter:
+            return self.counter_values
+        return self.scope[node.value]
+
+    def visit_ArrayElement(self, node: ArrayElement) -> "numpy.ndarray":
+        return self.views[node.value]
+
+    @staticmethod
+    def magnitude(value: "int | float | numpy.ndarray") -> int | None:
+        """
+        Returns the largest absolute value of an INTEGER operand, or None for a REAL one
+
+        :rtype: int | None
+        """
+        if isinstance(value, int):
+            return abs(value)
+        if isinstance(value, float) or value.dtype.kind != "i":
+            return None
+        return max(-int(value.min()), int(value.max())) if value.size else 0
+
+    @classmethod
+    def check_overflow(cls, left: "int | float | numpy.ndarray", right: "int | float | numpy.ndarray", product: bool):
+        """
+        Throws an OverflowError if adding, subtracting or multiplying INTEGER operands could give a result outside 64
+        bits. NumPy would silently wrap it around, where the interpreter computes it exactly
+
+        :param left: The left operand
+        :type left: int | float | numpy.ndarray
+        :param right: The right operand
+        :type right: int | float | numpy.ndarray
+        :param product: Whether the operands are multiplied, rather than added or subtracted
+        :type product: bool
+        """
+        left, right = cls.magnitude(left), cls.magnitude(right)
+        if left is None or right is None:
+            return
+        if (left * right if product else left + right) > cls.INT64_MAX:
+            raise OverflowError("INTEGER arithmetic exceeds 64 bits")
+
+    def visit_UnaryOP(self, node: UnaryOP) -> "numpy.ndarray":
+        if node.op.type == TokenType.MINUS:
+            value = self.visit(node.expr)
+            self.check_overflow(value, 0, product=False)
+            return -value
+        return self.visit(node.expr)
+
+    def visit_BinOP(self, node: BinOP) -> "numpy.ndarray":
+        left, right = self.visit(node.left), self.visit(node.right)
+        op = node.op.type
+        if op != TokenType.DIV:
+            self.check_overflow(left, right, product=op == TokenType.MUL)
+        if op == TokenType.PLUS:
+            return left + right
+        elif op == TokenType.MINUS:
+            return left - right
+        elif op == TokenType.MUL:
+            return left * right
+        else:
+            # Match the ZeroDivisionError the interpreter would throw, rather than NumPy's inf/nan
+            numpy = optional_import("numpy")
+            if numpy.any(numpy.asarray(right) == 0):
+                raise ZeroDivisionError("division by zero")
+            return numpy.true_divide(left, right)
+
+    visit_IntBinOP = visit_BinOP
+    visit_RealBinOP = visit_BinOP
@@ -1,19 +1,86 @@
-import enum
+# The package loads its submodules on first use, so optional engines are only imported when their flags are passed
+import core
+import argparse
+import signal
+import sys
 
-class TestClass(enum.Enum):
-    PLACEHOLDER1 = "1"
-    PLACEHOLDER2 = "2"
-    PLACEHOLDER3 = "3"
-    PLACEHOLDER4 = "4"
+def main():
+    arg_parser = argparse.ArgumentParser(description="Executes a program written in IGCSE pseudocode")
+    arg_parser.add_argument("source", help="path to the program's source code")
+    arg_parser.add_argument(
+        "--memoize", action="store_true", help="cache the results of FUNCTIONs found to be pure"
+    )
+    arg_parser.add_argument("-O", "--optimise", action="store_true", help="optimise the program before running it")
+    arg_parser.add_argument("--no-cse", action="store_true", help="skip common subexpression elimination")
+    arg_parser.add_argument("--no-licm", action="store_true", help="skip loop-invariant code motion")
+    arg_parser.add_argument("--no-strength-reduction", action="store_true", help="skip strength reduction")
+    arg_parser.add_argument(
+        "--stream", action="store_true", help="execute each statement as soon as it is parsed, without parsing the whole "
+        "program first"
+    )
+    arg_parser.add_argument(
+        "--table-parser", action="store_true", help="parse with the table-driven LL(1) parser generated from "
+        "grammar/syntax.txt"
+    )
+    arg_parser.add_argument(
+        "--cache", metavar="DIRECTORY", help="reuse the output of deterministic programs stored in DIRECTORY by earlier "
+        "runs, storing it there otherwise"
+    )
+    arg_parser.add_argument(
+        "--checkpoint", metavar="FILE", help="save the program's execution state to FILE at safe points (on SIGTERM, "
+        "and every --checkpoint-every steps), resuming from FILE if it exists"
+    )
+    arg_parser.add_argument(
+        "--checkpoint-every", metavar="STEPS", type=int, help="save a checkpoint every STEPS statements executed"
+    )
+    arg_parser.add_argument(
+        "--memory-limit", metavar="BYTES", type=int, help="end the program if its variables, arrays and call frames hold "
+        "more than about BYTES of memory, and report the most they held"
+    )
+    arg_parser.add_argument(
+        "--metrics", action="store_true", help="print the interpreter's metrics to stderr, in the Prometheus text format"
+    )
+    args = arg_parser.parse_args()
 
-    @classmethod
-    def get_values(cls, target):
-        for member in cls:
-            if member.name == target:
-                return member.value
-            else:
-                pass
-    
+    with open(args.source, encoding="utf-8") as file:
+        source = file.read()
 
-results = TestClass.get_values("PLACEHOLDER1")
-print(results)
\ No newline at end of file
+    optimizer = None
+    if args.optimise:
+        optimizer = core.DataflowOptimizer(
+            cse=not args.no_cse, licm=not args.no_licm, strength_reduction=not args.no_strength_reduction
+        )
+    parser_class = core.TableParser if args.table_parser else core.Parser
+    result_cache = core.ResultCache(directory=args.cache) if args.cache is not None else None
+    checkpointer = None
+    if args.checkpoint is not None:
+        checkpointer = core.Checkpointer(args.checkpoint, every=args.checkpoint_every)
+        # A terminated run is checkpointed at the next safe point, so it can be resumed
+        signal.signal(signal.SIGTERM, lambda signum, frame: checkpointer.request(stop=True))
+    memory = core.MemoryMeter(limit=args.memory_limit) if args.memory_limit is not None else None
+    interpreter = core.Interpreter(
+        parser_class(core.Lexer(source)),
+        memoize=args.memoize,
+        optimizer=optimizer,
+        streaming=args.stream,
+        result_cache=result_cache,
+        checkpointer=checkpointer,
+        memory=memory,
+    )
+    try:
+        interpreter.interpret()
+        if checkpointer is not None and checkpointer.suspended:
+            sys.exit(f"Stopped at a checkpoint, saved to {args.checkpoint}")
+    finally:
+        for name, info in interpreter.memo_stats().items():
+            print(
+                f"{name}: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} cached",
+                file=sys.stderr,
+            )
+        if memory is not None:
+            print(f"Peak memory: {memory.peak:,} of {memory.limit:,} bytes", file=sys.stderr)
+        if args.metrics:
+            print(core.METRICS.exposition(), end="", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
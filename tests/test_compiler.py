@@ -0,0 +1,52 @@
+"""
+Checks expressions compiled with compile_expression evaluate batches as the interpreter would evaluate each row
+"""
+from core.compiler import compile_expression
+from core.optional import optional_import
+import math
+import unittest
+
+numpy = optional_import("numpy")
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class EvaluateBatchTest(unittest.TestCase):
+    def assertSameAsRows(self, source: str, columns: dict):
+        expression = compile_expression(source)
+        # The interpreter holds INTEGERs as Python ints
+        rows = [dict(zip(columns, values)) for values in zip(*(column.tolist() for column in columns.values()))]
+        self.assertEqual(expression.evaluate_batch(columns).tolist(), [expression.evaluate(row) for row in rows])
+
+    def test_arithmetic(self):
+        self.assertSameAsRows("a * b + 1 - -a / 4", {"a": numpy.arange(10), "b": numpy.arange(10) * 1.5})
+
+    def test_constant_is_broadcast(self):
+        self.assertEqual(compile_expression("2 * 3").evaluate_batch({"a": [1, 2, 3]}).tolist(), [6, 6, 6])
+        self.assertEqual(compile_expression("2 * 3").evaluate_batch({}, size=2).tolist(), [6, 6])
+
+    def test_integer_overflow_computed_exactly(self):
+        self.assertSameAsRows("a * 3037000500 * 3037000500", {"a": numpy.arange(5)})
+        self.assertSameAsRows("a * 3037000500 * 3037000500 - a * 3037000500 * 3037000500 + a", {"a": numpy.arange(5)})
+        self.assertSameAsRows("-a - 1", {"a": numpy.array([2 ** 63 - 1, 0])})
+
+    def test_division_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            compile_expression("a / b").evaluate_batch({"a": [1, 2], "b": [0, 4]})
+        for dividend in (0.0, math.inf, math.nan):
+            with self.subTest(dividend=dividend), self.assertRaises(ZeroDivisionError):
+                compile_expression("a / b").evaluate_batch(
+                    {"a": numpy.array([dividend, 1.0]), "b": numpy.array([0.0, 1.0])}
+                )
+
+    def test_invalid_operations_give_nan(self):
+        expression = compile_expression("a - b + c * 0")
+        columns = {
+            "a": numpy.array([math.inf, 1.0]), "b": numpy.array([math.inf, 2.0]), "c": numpy.array([1.0, math.inf])
+        }
+        for row in range(2):
+            bindings = {name: column.tolist()[row] for name, column in columns.items()}
+            self.assertTrue(math.isnan(expression.evaluate(bindings)))
+        self.assertTrue(numpy.isnan(expression.evaluate_batch(columns)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Checks READFILE's LineReader reads the lines Python's own text files would, whatever the encoding and however the
+bytes of a character or line break are split between the blocks read ahead
+"""
+from core.files import LineReader
+import os
+import tempfile
+import unittest
+
+TEXT = "first line\r\nsecond — ünïcödé 日本語\n\n\U0001f600 emoji\r\nlast line without a break"
+
+class LineReaderTest(unittest.TestCase):
+    def read_lines(self, data: bytes, encoding: str, buffer_size: int) -> list[str]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.txt")
+            with open(path, "wb") as file:
+                file.write(data)
+            reader = LineReader(path, buffer_size, encoding)
+            lines = []
+            while (line := reader.read_line()) is not None:
+                lines.append(line)
+            reader.close()
+        return lines
+
+    def test_encodings(self):
+        for encoding in ("utf-8", "utf-16", "utf-16-le", "utf-32", "cp1252", "shift_jis"):
+            text = TEXT if encoding not in ("cp1252", "shift_jis") else TEXT.encode(encoding, "replace").decode(encoding)
+            expected = text.replace("\r\n", "\n").split("\n")
+            for buffer_size in (1, 2, 3, 5, 7, 64, 1 << 20):
+                with self.subTest(encoding=encoding, buffer_size=buffer_size):
+                    self.assertEqual(self.read_lines(text.encode(encoding), encoding, buffer_size), expected)
+
+    def test_final_line_break(self):
+        self.assertEqual(self.read_lines("a\r\nb\n".encode("utf-16"), "utf-16", 3), ["a", "b"])
+        self.assertEqual(self.read_lines(b"", "utf-8", 4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
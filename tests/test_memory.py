@@ -0,0 +1,116 @@
+"""
+Checks the memory meter releases what a program stops holding, so loops with a fixed working set run under a limit
+just above it however many times they go round, in the interpreter and in compiled loops, while growth is still caught
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.memory import MemoryMeter, MemoryLimitExceeded
+from core.streams import CaptureOutput
+import unittest
+
+LIMIT = 10_000
+
+TEXT = "x" * 1000
+
+BYREF_GLOBAL = """START
+PROCEDURE Fill(BYREF s : STRING)
+  s <- "{text}"
+ENDPROCEDURE;
+FOR i <- 1 TO 20
+  s <- "";
+  CALL Fill(s)
+NEXT i;
+OUTPUT LENGTH(s)
+END"""
+
+BYREF_ELEMENT = """START
+PROCEDURE Fill(BYREF s : STRING)
+  s <- "{text}"
+ENDPROCEDURE;
+DECLARE Names : ARRAY[1:2] OF STRING;
+FOR i <- 1 TO 20
+  Names[1] <- "";
+  CALL Fill(Names[1])
+NEXT i;
+OUTPUT LENGTH(Names[1])
+END"""
+
+REDECLARED = """START
+FOR i <- 1 TO 20
+  DECLARE Names : ARRAY[1:4] OF STRING;
+  Names[1] <- "{text}";
+  Names[2] <- "{text}"
+NEXT i;
+OUTPUT LENGTH(Names[1])
+END"""
+
+LOCAL_ARRAY = """START
+PROCEDURE Fill()
+  DECLARE Names : ARRAY[1:4] OF STRING;
+  Names[1] <- "{text}";
+  Names[2] <- "{text}"
+ENDPROCEDURE;
+FOR i <- 1 TO 20
+  CALL Fill()
+NEXT i;
+OUTPUT i
+END"""
+
+COMPILED = """START
+DECLARE Names : ARRAY[1:{size}] OF STRING;
+FOR i <- 1 TO 50
+  FOR j <- 1 TO {size}
+    Names[j] <- "{text}"
+  NEXT j
+NEXT i;
+OUTPUT LENGTH(Names[1])
+END"""
+
+class MemoryTest(unittest.TestCase):
+    def run_program(self, source: str, tier_threshold: int | None = None) -> tuple[str, MemoryMeter]:
+        Interpreter.GLOBAL_SCOPE = {}
+        meter = MemoryMeter(limit=LIMIT)
+        output = CaptureOutput()
+        Interpreter(
+            Parser(Lexer(source.format(text=TEXT, size=4))), output_sink=output, tier_threshold=tier_threshold,
+            memory=meter,
+        ).interpret()
+        return output.getvalue(), meter
+
+    def assertFixed(self, source: str, output: str, tier_threshold: int | None = None):
+        result, meter = self.run_program(source, tier_threshold)
+        self.assertEqual(result, output)
+        self.assertLess(meter.peak, 3 * len(TEXT))
+
+    def test_byref_global(self):
+        self.assertFixed(BYREF_GLOBAL, "1000\n")
+
+    def test_byref_element(self):
+        self.assertFixed(BYREF_ELEMENT, "1000\n")
+
+    def test_redeclared_array(self):
+        self.assertFixed(REDECLARED, "1000\n")
+
+    def test_local_array(self):
+        self.assertFixed(LOCAL_ARRAY, "20\n")
+
+    def test_compiled_loop(self):
+        result, meter = self.run_program(COMPILED, tier_threshold=2)
+        self.assertEqual(result, "1000\n")
+        self.assertLess(meter.peak, 5 * len(TEXT))
+        self.assertEqual(meter.used, meter.peak)
+
+    def test_compiled_loop_growth(self):
+        Interpreter.GLOBAL_SCOPE = {}
+        meter = MemoryMeter(limit=LIMIT)
+        source = COMPILED.format(text=TEXT, size=100)
+        with self.assertRaises(MemoryLimitExceeded) as context:
+            Interpreter(
+                Parser(Lexer(source)), output_sink=CaptureOutput(), tier_threshold=2, memory=meter
+            ).interpret()
+        self.assertLess(context.exception.used, LIMIT + 2 * len(TEXT))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Checks optimised programs leave exactly the global variables of the same programs run unoptimised, without the
+temporary variables the optimizer introduces, including in the results stored by the result cache
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.optimizer import DataflowOptimizer
+from core.resultcache import ResultCache
+from core.streams import CaptureOutput
+import unittest
+
+SOURCE = """START
+a <- 3;
+b <- 4;
+x <- a * b + 1;
+y <- a * b + 1;
+total <- 0;
+FOR i <- 1 TO 10
+  total <- total + a * b
+NEXT i
+END"""
+
+def run(optimizer: DataflowOptimizer | None, **options) -> dict:
+    Interpreter.GLOBAL_SCOPE = {}
+    Interpreter(Parser(Lexer(SOURCE)), output_sink=CaptureOutput(), optimizer=optimizer, **options).interpret()
+    return dict(Interpreter.GLOBAL_SCOPE)
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_temporaries_discarded(self):
+        expected = run(None)
+        for options in ({}, {"streaming": True}):
+            with self.subTest(**options):
+                optimizer = DataflowOptimizer()
+                self.assertEqual(run(optimizer, **options), expected)
+                self.assertTrue(optimizer.globals)
+
+    def test_cached_scope_without_temporaries(self):
+        cache = ResultCache()
+        expected = run(None)
+        self.assertEqual(run(DataflowOptimizer(), result_cache=cache), expected)
+        self.assertEqual(run(DataflowOptimizer(), result_cache=cache), expected)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Checks deeply recursive subroutines run past the depth Python's own recursion limit would allow, without leaving the
+recursion limit or thread stack size changed, and that recursion past the interpreter's limit is a runtime error
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.interpreter import Interpreter
+from core.streams import CaptureOutput
+import sys
+import threading
+import unittest
+
+SOURCE = """START
+FUNCTION Depth(n : INTEGER) RETURNS INTEGER
+  IF n = 0 THEN RETURN 0 ENDIF;
+  RETURN Depth(n - 1) + 1
+ENDFUNCTION;
+OUTPUT Depth({depth})
+END"""
+
+class ShallowInterpreter(Interpreter):
+    RECURSION_LIMIT = 20_000
+
+
+class RecursionTest(unittest.TestCase):
+    def run_program(self, interpreter_class: type, depth: int) -> str:
+        Interpreter.GLOBAL_SCOPE = {}
+        output = CaptureOutput()
+        interpreter_class(Parser(Lexer(SOURCE.format(depth=depth))), output_sink=output).interpret()
+        return output.getvalue()
+
+    def test_deep_recursion(self):
+        limit, stack_size = sys.getrecursionlimit(), threading.stack_size()
+        self.assertEqual(self.run_program(Interpreter, 200_000), "200000\n")
+        self.assertEqual((sys.getrecursionlimit(), threading.stack_size()), (limit, stack_size))
+
+    def test_recursion_past_the_limit(self):
+        limit = sys.getrecursionlimit()
+        with self.assertRaises(SystemExit):
+            self.run_program(ShallowInterpreter, 10_000)
+        self.assertEqual(sys.getrecursionlimit(), limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
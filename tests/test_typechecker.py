@@ -0,0 +1,59 @@
+"""
+Checks the type checker only specialises uses of a variable to a type the variable keeps for the whole program, even
+when a loop uses it before the assignment that changes its type
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.interpreter import Interpreter
+from core.streams import CaptureOutput
+from core.ast import BinOP, IntBinOP
+import unittest
+
+CHANGING = """START
+x <- 1;
+FOR k <- 1 TO 2
+  y <- x * 3;
+  OUTPUT y;
+  x <- "ab"
+NEXT k
+END"""
+
+STABLE = """START
+x <- 1;
+FOR k <- 1 TO 2
+  y <- x * 3;
+  OUTPUT y;
+  x <- k
+NEXT k
+END"""
+
+class TypeCheckerTest(unittest.TestCase):
+    def product(self, source: str) -> BinOP:
+        tree = TypeChecker().check(Parser(Lexer(source)).parse())
+        return tree.children[1].body.children[0].right
+
+    def run_program(self, source: str, **options) -> tuple[str, bool]:
+        Interpreter.GLOBAL_SCOPE = {}
+        output = CaptureOutput()
+        try:
+            Interpreter(Parser(Lexer(source)), output_sink=output, **options).interpret()
+        except SystemExit:
+            return output.getvalue(), False
+        return output.getvalue(), True
+
+    def test_type_changed_later_in_loop(self):
+        product = self.product(CHANGING)
+        self.assertIs(type(product), BinOP)
+        self.assertIsNone(product.type)
+        for options in ({}, {"streaming": True}, {"tier_threshold": 1}):
+            with self.subTest(**options):
+                self.assertEqual(self.run_program(CHANGING, **options), ("3\n", False))
+
+    def test_stable_type(self):
+        self.assertIs(type(self.product(STABLE)), IntBinOP)
+        self.assertEqual(self.run_program(STABLE), ("3\n3\n", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
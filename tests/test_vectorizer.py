@@ -0,0 +1,89 @@
+"""
+Checks FOR loops executed by the loop vectorizer give exactly the arrays (or errors) of the same loops interpreted one
+iteration at a time
+"""
+from core.parser import Parser
+from core.lexer import Lexer
+from core.typechecker import TypeChecker
+from core.interpreter import Interpreter
+from core.vectorizer import LoopVectorizer
+from core.ast import VectorizedFor
+import unittest
+
+def run(source: str, vectorize: bool) -> dict | str:
+    """
+    Runs a program, returning its arrays as lists, or the message it exited with
+    """
+    Interpreter.GLOBAL_SCOPE = {}
+    interpreter = Interpreter(Parser(Lexer(source)), vectorize=vectorize, tier_threshold=None)
+    try:
+        interpreter.interpret()
+    except SystemExit as error:
+        return str(error.code)
+    return {name: value.to_list() for name, value in interpreter.GLOBAL_SCOPE.items() if hasattr(value, "to_list")}
+
+
+@unittest.skipUnless(LoopVectorizer.available(), "NumPy is not installed")
+class VectorizedLoopTest(unittest.TestCase):
+    def assertSameAsInterpreted(self, body: str, element_type: str = "INTEGER", fill: str = "i * 3"):
+        source = f"""START
+            DECLARE A : ARRAY[1:100] OF {element_type};
+            DECLARE B : ARRAY[1:100] OF {element_type};
+            big <- 3037000500;
+            FOR i <- 1 TO 100 A[i] <- {fill}; B[i] <- 100 - i NEXT i;
+            FOR i <- 1 TO 100 {body} NEXT i
+        END"""
+        vectorized = run(source, vectorize=True)
+        self.assertEqual(vectorized, run(source, vectorize=False))
+        return vectorized
+
+    def test_integer_arithmetic(self):
+        self.assertSameAsInterpreted("A[i] <- A[i] * B[i] - i + 7; B[i] <- -A[i] * 2")
+
+    def test_real_arithmetic(self):
+        self.assertSameAsInterpreted("A[i] <- A[i] / 4 + B[i] * 1.5; B[i] <- A[i] - i", element_type="REAL")
+
+    def test_integer_overflow_fails_as_interpreted(self):
+        self.assertIsInstance(self.assertSameAsInterpreted("A[i] <- A[i] * big", fill="i * big"), str)
+
+    def test_intermediate_overflow_computed_exactly(self):
+        # Past 64 bits part way through, but the results stored fit
+        result = self.assertSameAsInterpreted("B[i] <- B[i] + 1; A[i] <- A[i] * big * big - A[i] * big * big + B[i]")
+        self.assertEqual(result["A"], [101 - i for i in range(1, 101)])
+
+    def test_overflow_negating_smallest_integer(self):
+        self.assertIsInstance(self.assertSameAsInterpreted("A[i] <- -A[i]", fill="-9223372036854775807 - 1"), str)
+
+    def test_scalar_changing_type(self):
+        source = """START
+            DECLARE A : ARRAY[1:40] OF INTEGER;
+            x <- 1;
+            FOR k <- 1 TO 2
+                x <- x + 0.5;
+                FOR i <- 1 TO 40 A[i] <- A[i] + x NEXT i
+            NEXT k
+        END"""
+        self.assertIsInstance(run(source, vectorize=True), str)
+        self.assertEqual(run(source, vectorize=True), run(source, vectorize=False))
+
+    def test_scalar_holding_another_type_than_its_static_type(self):
+        source = """START
+            DECLARE A : ARRAY[1:40] OF INTEGER;
+            x <- 1;
+            FOR i <- 1 TO 40 A[i] <- A[i] + x NEXT i
+        END"""
+        tree = LoopVectorizer().optimise(TypeChecker().check(Parser(Lexer(source)).parse()))
+        declaration, _, loop = tree.children
+        self.assertIsInstance(loop, VectorizedFor)
+        Interpreter.GLOBAL_SCOPE = {}
+        interpreter = Interpreter(Parser(Lexer(source)), tier_threshold=None)
+        interpreter.visit(declaration)
+        # A REAL the static type does not allow for: the loop must fail storing it, not truncate it
+        Interpreter.GLOBAL_SCOPE["x"] = 1.5
+        with self.assertRaises(SystemExit):
+            interpreter.visit(loop)
+        self.assertEqual(Interpreter.GLOBAL_SCOPE["A"].to_list(), [0] * 40)
+
+
+if __name__ == "__main__":
+    unittest.main()